@@ -6,6 +6,13 @@ from pathlib import Path
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+# --profile-startup: дерево импортов и фазы старта (ставится до импортов src)
+_profiler = None
+if "--profile-startup" in sys.argv:
+    sys.argv.remove("--profile-startup")
+    from src.shared.startup_profile import StartupProfiler
+    _profiler = StartupProfiler().install()
+
 from src.shared.logging_config import setup_logging
 from src.shared.constants import DirectoryPaths
 
@@ -79,56 +86,94 @@ def _splash_msg(splash, app, text: str):
     app.processEvents()
 
 
-def _cleanup_stale_temp() -> None:
-    """
-    Удаляет старые папки build_* из tools/temp при старте приложения.
-
-    Эти папки остаются после прерванных или упавших сборок.
-    Активная сборка создаёт папку только во время работы, поэтому
-    при старте все build_* можно безопасно удалять.
-    """
-    import shutil
-    temp_dir = Path("tools/temp")
-    if not temp_dir.exists():
-        return
-    removed = 0
-    for entry in temp_dir.iterdir():
-        if entry.is_dir() and entry.name.startswith("build_"):
-            try:
-                shutil.rmtree(entry)
-                removed += 1
-            except Exception as e:
-                logger.warning(f"Не удалось удалить старую temp папку {entry.name}: {e}")
-    if removed:
-        logger.info(f"Очищено {removed} старых temp папок при старте")
+def _mark(label: str) -> None:
+    if _profiler is not None:
+        _profiler.mark(label)
+
+
+def _finish_profile() -> None:
+    """Первый оборот цикла событий: окно нарисовано — печатаем профиль."""
+    _mark("первый оборот цикла событий")
+    _profiler.uninstall()
+    _profiler.report(logger)
+
+
+def run_prewarm_cli(argv) -> int:
+    """main.py --prewarm: прогрев кэшей превью без окна (см. prewarm_service)."""
+    import argparse
+    from src.config.app_config import AppConfig
+    from src.services import prewarm_service
+
+    parser = argparse.ArgumentParser(prog="main.py --prewarm",
+                                     description="Prewarm preview caches for the model catalog")
+    parser.add_argument("--prewarm", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--classes", nargs="+", metavar="CLASS", type=str.lower,
+                        choices=prewarm_service.known_classes(),
+                        help="only these classes (default: whole catalog)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help=f"worker processes (default: {prewarm_service.default_jobs()})")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the checkpoint and start over")
+    parser.add_argument("--tf2-root", default=None,
+                        help="TF2 folder (default: from settings)")
+    args = parser.parse_args(argv)
+
+    tf2_root = args.tf2_root or AppConfig.snapshot().tf2_game_folder
+    if not tf2_root or not os.path.isdir(tf2_root):
+        print("TF2 folder is not set: pass --tf2-root or choose it in the app", file=sys.stderr)
+        return 2
+
+    targets = prewarm_service.catalog_targets(args.classes)
+
+    def _progress(done, total, result):
+        status = "ok" if result.ok else f"FAILED: {result.message}"
+        print(f"[{done}/{total}] {result.label} ({result.seconds:.1f}s) {status}", flush=True)
+
+    try:
+        counts = prewarm_service.run_prewarm(tf2_root, targets, jobs=args.jobs,
+                                             restart=args.restart, on_progress=_progress)
+    except KeyboardInterrupt:
+        print("Interrupted: the next run resumes from the checkpoint", file=sys.stderr)
+        return 130
+    print(f"Done: {counts['ok']} warmed, {counts['failed']} failed, "
+          f"{counts['skipped']} already done, {counts['remaining']} remaining")
+    return 0 if not counts["failed"] else 1
 
 
 def main():
     logger.info("Запуск TF2 Skin Generator")
+    _mark("логирование")
 
     try:
         from src.core.app_factory import AppFactory
 
+        # Старые temp-папки убирает TempJanitorWorker после показа окна
         DirectoryPaths.ensure_exists()
-        _cleanup_stale_temp()
 
         # ── Создаём приложение и сразу показываем сплэш ──────────────────── #
         app = AppFactory.create_app(apply_theme=True)
         splash = _make_splash(app)
+        _mark("QApplication и сплэш")
 
         # ── Тяжёлые импорты с обновлением статуса ────────────────────────── #
         _splash_msg(splash, app, "Loading modules...")
 
         from src.ui.main_window import MainWindow
+        _mark("импорт main_window")
 
         _splash_msg(splash, app, "Initializing interface...")
 
         window = MainWindow()
+        _mark("MainWindow()")
 
         _splash_msg(splash, app, "Starting...")
 
         window.show()
         splash.finish(window)   # закрываем сплэш как только окно готово
+        _mark("window.show()")
+        if _profiler is not None:
+            from PySide6.QtCore import QTimer
+            QTimer.singleShot(0, _finish_profile)
 
         logger.info("Приложение успешно запущено")
 
@@ -140,4 +185,10 @@ def main():
 
 
 if __name__ == '__main__':
+    # Дочерние процессы пулов (сборка моделей классов шапки) в frozen-сборке
+    # запускают тот же .exe — freeze_support не даёт им стартовать UI.
+    import multiprocessing
+    multiprocessing.freeze_support()
+    if "--prewarm" in sys.argv:
+        sys.exit(run_prewarm_cli(sys.argv[1:]))
     main()
@@ -0,0 +1,357 @@
+"""
+Бенчмарк старта приложения с порогами регрессии.
+
+Каждый замер — в отдельном чистом процессе (иначе импорты уже закэшированы
+в sys.modules), без экрана: QT_QPA_PLATFORM=offscreen. Метрики:
+
+  services_import_ms    — импорт всех модулей src.services.*
+  main_window_import_ms — импорт src.ui.main_window (вместе с PySide6)
+  main_window_ms        — конструктор MainWindow()
+  first_paint_ms        — от window.show() до первого Paint окна
+  startup_total_ms      — от старта процесса-замера до первой отрисовки
+  rss_mb                — память процесса после первой отрисовки
+
+Замеры не трогают данные пользователя: HOME (кэши ~/.tf2skingen_cache) —
+временная папка на весь бенчмарк, конфиг — копия настоящего в ней же.
+Отложенный старт окна (_deferred_startup: проверка обновлений, уборка
+temp-папок, 3D-превью) выполняется после первой отрисовки, в метрики не
+входит и в замере отключён.
+
+По каждой метрике берётся медиана из --runs запусков. Результат дописывается
+в JSON-историю; база для сравнения — медиана последних --window записей.
+Метрика считается регрессией, если она больше базы на порог в процентах И
+на абсолютный допуск (шум offscreen-старта — единицы мс). Пороги: DEFAULT_THRESHOLDS,
+секция "thresholds" файла истории, --threshold метрика=ПРОЦЕНТ[:ДОПУСК].
+
+Запуск:
+  python scripts/bench_startup.py                 # 5 прогонов, запись в историю
+  python scripts/bench_startup.py --runs 3 --no-save
+  python scripts/bench_startup.py --threshold rss_mb=10:8
+
+Код возврата 1 — есть регрессия (для проверки перед релизом).
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_HISTORY = Path(__file__).resolve().parent / "startup_bench_history.json"
+
+# метрика → (порог в %, абсолютный допуск в единицах метрики)
+DEFAULT_THRESHOLDS: Dict[str, Tuple[float, float]] = {
+    "services_import_ms": (20.0, 15.0),
+    "main_window_import_ms": (20.0, 20.0),
+    "main_window_ms": (20.0, 20.0),
+    "first_paint_ms": (25.0, 20.0),
+    "startup_total_ms": (20.0, 40.0),
+    "rss_mb": (10.0, 5.0),
+}
+METRICS = list(DEFAULT_THRESHOLDS)
+
+
+# ── Замер (дочерний процесс) ─────────────────────────────────────────────── #
+
+def _rss_mb() -> float:
+    """Текущий RSS процесса в МБ (Linux /proc, Windows psapi, иначе пик по rusage)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize / (1024.0 * 1024.0)
+        return 0.0
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def _measure_services() -> dict:
+    """Импорт всех src.services.*: общее время и самые дорогие модули."""
+    import importlib
+    import pkgutil
+
+    t0 = time.perf_counter()
+    import src.services as services
+    per_module: Dict[str, float] = {}
+    failed: List[str] = []
+    for info in sorted(pkgutil.iter_modules(services.__path__), key=lambda m: m.name):
+        name = f"src.services.{info.name}"
+        t = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Платформенные модули (windll и т.п.) — не ошибка бенчмарка
+            failed.append(name)
+        per_module[name] = (time.perf_counter() - t) * 1000.0
+    total = (time.perf_counter() - t0) * 1000.0
+    slowest = sorted(per_module.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    return {"services_import_ms": total,
+            "slowest_services": [[n, round(ms, 1)] for n, ms in slowest],
+            "failed_imports": failed}
+
+
+def _isolate_config() -> None:
+    """Конфиг — копия настоящего во временном HOME: замер ничего не пишет в настоящий."""
+    from src.config.app_config import AppConfig
+
+    config_dir = Path.home() / "config"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    config_file = config_dir / AppConfig.CONFIG_FILE.name
+    if not config_file.exists() and AppConfig.CONFIG_FILE.exists():
+        shutil.copyfile(AppConfig.CONFIG_FILE, config_file)
+    AppConfig.CONFIG_DIR = config_dir
+    AppConfig.CONFIG_FILE = config_file
+    AppConfig.invalidate_cache()
+
+
+def _measure_window() -> dict:
+    """Импорт main_window, MainWindow(), первая отрисовка, RSS."""
+    _isolate_config()
+    t_start = time.perf_counter()
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+
+    t0 = time.perf_counter()
+    from src.ui.main_window import MainWindow
+    import_ms = (time.perf_counter() - t0) * 1000.0
+    # Проверка обновлений ходит в сеть, уборка удаляет настоящие temp-папки
+    MainWindow._deferred_startup = lambda self: None
+
+    t0 = time.perf_counter()
+    window = MainWindow()
+    ctor_ms = (time.perf_counter() - t0) * 1000.0
+
+    painted: Dict[str, float] = {}
+
+    class _PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and "at" not in painted:
+                painted["at"] = time.perf_counter()
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    watcher = _PaintWatcher()
+    window.installEventFilter(watcher)
+    QTimer.singleShot(10_000, app.quit)   # страховка: окно так и не нарисовалось
+    t_show = time.perf_counter()
+    window.show()
+    app.exec()
+    window.removeEventFilter(watcher)
+
+    result = {
+        "main_window_import_ms": import_ms,
+        "main_window_ms": ctor_ms,
+        "rss_mb": _rss_mb(),
+    }
+    if "at" in painted:
+        result["first_paint_ms"] = (painted["at"] - t_show) * 1000.0
+        result["startup_total_ms"] = (painted["at"] - t_start) * 1000.0
+    window.close()
+    return result
+
+
+def _child(kind: str) -> int:
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    import logging
+    logging.disable(logging.CRITICAL)
+    result = _measure_services() if kind == "services" else _measure_window()
+    sys.stdout.write("BENCH_RESULT " + json.dumps(result) + "\n")
+    sys.stdout.flush()
+    return 0
+
+
+def _run_child(kind: str, timeout: float, home: Path) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1",
+               HOME=str(home), USERPROFILE=str(home))
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", kind],
+        cwd=str(ROOT), env=env, capture_output=True, text=True, timeout=timeout,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH_RESULT "):
+            return json.loads(line[len("BENCH_RESULT "):])
+    raise RuntimeError(f"замер '{kind}' не вернул результат (код {proc.returncode}):\n"
+                       f"{proc.stderr[-2000:]}")
+
+
+def measure(runs: int, timeout: float = 120.0) -> Tuple[Dict[str, float], dict]:
+    """Медианы метрик по runs прогонам и детали последнего прогона."""
+    samples: Dict[str, List[float]] = {m: [] for m in METRICS}
+    details: dict = {}
+    with tempfile.TemporaryDirectory(prefix="tf2sg_bench_") as home:
+        for _ in range(runs):
+            for kind in ("services", "window"):
+                result = _run_child(kind, timeout, Path(home))
+                for metric in METRICS:
+                    if metric in result:
+                        samples[metric].append(float(result[metric]))
+                details.update({k: v for k, v in result.items() if k not in METRICS})
+    medians = {m: round(statistics.median(v), 1) for m, v in samples.items() if v}
+    return medians, details
+
+
+# ── История и пороги ─────────────────────────────────────────────────────── #
+
+def load_history(path: Path) -> dict:
+    if not path.exists():
+        return {"thresholds": {}, "runs": []}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data.setdefault("thresholds", {})
+    data.setdefault("runs", [])
+    return data
+
+
+def save_history(path: Path, history: dict) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(history, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def parse_threshold(spec: str) -> Tuple[str, Tuple[float, Optional[float]]]:
+    """'метрика=ПРОЦЕНТ[:ДОПУСК]' → (метрика, (процент, допуск | None))."""
+    name, _, value = spec.partition("=")
+    if name not in DEFAULT_THRESHOLDS or not value:
+        raise argparse.ArgumentTypeError(
+            f"ожидается метрика=ПРОЦЕНТ[:ДОПУСК], метрики: {', '.join(METRICS)}")
+    pct, _, slack = value.partition(":")
+    return name, (float(pct), float(slack) if slack else None)
+
+
+def effective_thresholds(history: dict, overrides: Dict[str, Tuple[float, Optional[float]]]
+                         ) -> Dict[str, Tuple[float, float]]:
+    """По умолчанию ← секция истории ← аргументы командной строки."""
+    result = dict(DEFAULT_THRESHOLDS)
+    for name, value in history.get("thresholds", {}).items():
+        if name in result:
+            result[name] = (float(value[0]), float(value[1]))
+    for name, (pct, slack) in overrides.items():
+        result[name] = (pct, result[name][1] if slack is None else slack)
+    return result
+
+
+def baseline(runs: List[dict], window: int) -> Dict[str, float]:
+    """Медиана каждой метрики по последним window записям истории."""
+    recent = runs[-window:] if window > 0 else []
+    base: Dict[str, float] = {}
+    for metric in METRICS:
+        values = [r["metrics"][metric] for r in recent if metric in r.get("metrics", {})]
+        if values:
+            base[metric] = statistics.median(values)
+    return base
+
+
+def find_regressions(current: Dict[str, float], base: Dict[str, float],
+                     thresholds: Dict[str, Tuple[float, float]]) -> List[str]:
+    """Описания метрик, вышедших за порог относительно базы."""
+    problems = []
+    for metric, value in current.items():
+        if metric not in base or metric not in thresholds:
+            continue
+        pct, slack = thresholds[metric]
+        limit = base[metric] * (1.0 + pct / 100.0)
+        if value > limit and value - base[metric] > slack:
+            problems.append(f"{metric}: {value:.1f} > база {base[metric]:.1f} "
+                            f"(+{pct:g}% и >{slack:g})")
+    return problems
+
+
+def _git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT),
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк старта TF2 Skin Generator")
+    parser.add_argument("--child", choices=("services", "window"), help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5, help="прогонов на метрику (медиана)")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="JSON-файл истории")
+    parser.add_argument("--window", type=int, default=5, help="записей истории в базе сравнения")
+    parser.add_argument("--threshold", action="append", type=parse_threshold, default=[],
+                        metavar="МЕТРИКА=ПРОЦЕНТ[:ДОПУСК]", help="порог регрессии метрики")
+    parser.add_argument("--save-thresholds", action="store_true",
+                        help="сохранить --threshold в файл истории")
+    parser.add_argument("--no-save", action="store_true", help="не дописывать результат в историю")
+    parser.add_argument("--label", default="", help="пометка записи (например, версия)")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _child(args.child)
+
+    history = load_history(args.history)
+    overrides = dict(args.threshold)
+    thresholds = effective_thresholds(history, overrides)
+
+    current, details = measure(max(1, args.runs))
+    base = baseline(history["runs"], args.window)
+    regressions = find_regressions(current, base, thresholds)
+
+    for metric in METRICS:
+        if metric in current:
+            ref = f"  (база {base[metric]:.1f})" if metric in base else ""
+            print(f"{metric:24s} {current[metric]:9.1f}{ref}")
+    for name, ms in details.get("slowest_services", []):
+        print(f"    {ms:7.1f} мс  {name}")
+    if details.get("failed_imports"):
+        print(f"не импортировались: {', '.join(details['failed_imports'])}")
+
+    if not args.no_save:
+        if args.save_thresholds:
+            for name in overrides:
+                history["thresholds"][name] = list(thresholds[name])
+        history["runs"].append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "label": args.label,
+            "platform": f"{platform.system()} {platform.release()} / Python {platform.python_version()}",
+            "runs": args.runs,
+            "metrics": current,
+            "regressions": regressions,
+        })
+        save_history(args.history, history)
+
+    if regressions:
+        print("РЕГРЕССИЯ СТАРТА:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,7 +2,7 @@
 Конфигурация для TF2 Skin Generator
 """
 
-from .app_config import AppConfig
+from .app_config import AppConfig, ConfigSnapshot
 
-__all__ = ['AppConfig']
+__all__ = ['AppConfig', 'ConfigSnapshot']
 
@@ -5,20 +5,161 @@
 import copy
 import json
 import os
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union, get_args, get_origin
 from src.shared.logging_config import get_logger
 from src.shared.constants import DirectoryPaths, DefaultFilenames
 
 logger = get_logger(__name__)
 
 
+def _freeze(value: Any) -> Any:
+    """dict → MappingProxyType, list → tuple (рекурсивно); скаляры как есть."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Обратное _freeze: изменяемая копия (для load_config/get)."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _coerce(value: Any, kind: Any) -> Any:
+    """
+    Приводит значение из файла к типу поля снимка.
+
+    Безопасные приведения (число → str, 0/1 → bool, число или строка → float)
+    выполняются; остальное — TypeError/ValueError.
+    """
+    if kind is Any:
+        return value
+    if get_origin(kind) is Union:                          # Optional[X]
+        if value is None:
+            return None
+        kind = next(arg for arg in get_args(kind) if arg is not type(None))
+    if get_origin(kind) is tuple:                          # Tuple[X, ...]
+        if not isinstance(value, tuple):
+            raise TypeError(f"ожидался список, получено {type(value).__name__}")
+        item = get_args(kind)[0]
+        return tuple(_coerce(v, item) for v in value)
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+    elif kind is float:
+        if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+            return float(value)
+    elif kind is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+    raise TypeError(f"ожидался {getattr(kind, '__name__', kind)}, получено {type(value).__name__}")
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Неизменяемый снимок конфига: общий для всех читателей, без копирования.
+
+    Известные ключи — типизированные поля (по одному на ключ
+    AppConfig.DEFAULT_CONFIG, с теми же значениями по умолчанию); полный
+    набор (включая ключи, о которых DEFAULT_CONFIG не знает, например
+    "theme") — в values/get(). Списки в снимке — кортежи, словари —
+    MappingProxyType. from_dict приводит значения к типам полей: то, что
+    привести нельзя (руками испорченный конфиг), заменяется значением по
+    умолчанию — и в поле, и в values.
+    """
+
+    tf2_game_folder: str = ""
+    export_folder: str = "export"
+    export_image_format: str = "VTF"
+    language: str = "en"
+    last_size: str = "512"
+    last_format: str = "DXT1"
+    last_flags: Tuple[str, ...] = ()
+    keep_temp_on_error: bool = False
+    debug_mode: bool = False
+    window_geometry: Optional[str] = None
+    material_blacklist: Tuple[str, ...] = ()
+    prefetch_decompile: bool = True
+    mip_filter: str = "BOX"
+    srgb_mips: bool = True
+    animated_budget_mb: float = 0
+    vram_budget_mb: float = 64
+    vram_texture_budget_mb: float = 16
+    texture_variants: Tuple[Any, ...] = ()
+    values: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}), repr=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConfigSnapshot":
+        values = dict(_freeze(data))
+        known = {}
+        for name, spec in cls.__dataclass_fields__.items():
+            if name == "values" or name not in values:
+                continue
+            try:
+                known[name] = _coerce(values[name], spec.type)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Настройка {name!r} = {values[name]!r} отброшена: {e}")
+                known[name] = spec.default
+            if known[name] != values[name]:
+                values[name] = known[name]
+        return cls(values=MappingProxyType(values), **known)
+
+    @property
+    def theme(self) -> str:
+        return self.values.get("theme") or "dark"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.values.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.values[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.values
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Изменяемая копия всех значений."""
+        return _thaw(self.values)
+
+    def changed_keys(self, other: Optional["ConfigSnapshot"]) -> FrozenSet[str]:
+        """Ключи, значения которых отличаются от other."""
+        if other is None:
+            return frozenset(self.values)
+        keys = set(self.values) | set(other.values)
+        return frozenset(k for k in keys if self.values.get(k) != other.values.get(k))
+
+
+# Подписчик изменений: (новый снимок, изменившиеся ключи)
+ConfigListener = Callable[[ConfigSnapshot, FrozenSet[str]], None]
+
+
 class AppConfig:
     """
     Класс для работы с конфигурацией приложения.
 
-    Конфиг кэшируется в памяти: get()/load_config() не читают диск, пока
-    файл не изменился (проверка по mtime) или не было save_config().
+    Конфиг кэшируется в памяти как неизменяемый ConfigSnapshot: snapshot()
+    отдаёт общий снимок без копирования, get() копирует только запрошенное
+    значение-контейнер. Диск не читается, пока файл не изменился (проверка
+    по mtime) или не было save_config(); при сохранении снимок заменяется
+    целиком, подписчики (add_listener, ConfigSignals) получают изменившиеся
+    ключи.
+
+    load_config() по-прежнему возвращает изменяемую копию — для кода,
+    который правит словарь и передаёт его в save_config().
     """
 
     CONFIG_DIR = Path(DirectoryPaths.CONFIG_DIR)
@@ -39,13 +180,32 @@ class AppConfig:
         # Пользовательские паттерны материалов-исключений (доп. к дефолтным
         # из material_filter): не показываются в 2D и не пишутся в мод.
         "material_blacklist": [],
+        # Фоновый прогрев кэша декомпиляции при выборе модели
+        "prefetch_decompile": True,
+        # Фильтр мипмапов (имена VTFCmd -mfilter: BOX, TRIANGLE, CUBIC, KAISER...)
+        # и усреднение цвета анимированных мипов в линейном пространстве
+        "mip_filter": "BOX",
+        "srgb_mips": True,
+        # Потолок размера анимированной VTF, МБ (0 — без ограничения):
+        # при превышении анализ анимации снижает FPS
+        "animated_budget_mb": 0,
+        # Бюджеты видеопамяти для отчёта после сборки, МБ (0 — не проверять):
+        # на весь мод и на одну текстуру
+        "vram_budget_mb": 64,
+        "vram_texture_budget_mb": 16,
+        # Доп. варианты текстур за одну сборку — по VPK на каждый, например
+        # [{"suffix": "lite", "size": 512, "format": "DXT1"}]; поле в настройках
+        # (texture_variants.parse_spec / format_spec)
+        "texture_variants": [],
     }
 
     # ── Кэш в памяти ───────────────────────────────────────────────────── #
-    _cache: Optional[Dict[str, Any]] = None
+    _snapshot: Optional[ConfigSnapshot] = None
     # Ключ кэша: (путь файла, mtime) — путь нужен, потому что CONFIG_FILE
     # подменяется в тестах
     _cache_key: Optional[tuple] = None
+    _lock = threading.RLock()
+    _listeners: List[ConfigListener] = []
 
     @staticmethod
     def _ensure_config_dir() -> None:
@@ -66,44 +226,104 @@ class AppConfig:
     @staticmethod
     def invalidate_cache() -> None:
         """Сбрасывает кэш (для тестов и при внешнем изменении файла)."""
-        AppConfig._cache = None
-        AppConfig._cache_key = None
+        with AppConfig._lock:
+            AppConfig._snapshot = None
+            AppConfig._cache_key = None
+
+    # ── Подписка на изменения ──────────────────────────────────────────── #
 
     @staticmethod
-    def load_config() -> Dict[str, Any]:
+    def add_listener(listener: ConfigListener) -> None:
+        """listener(snapshot, changed_keys) — после каждой замены снимка."""
+        with AppConfig._lock:
+            if listener not in AppConfig._listeners:
+                AppConfig._listeners.append(listener)
+
+    @staticmethod
+    def remove_listener(listener: ConfigListener) -> None:
+        with AppConfig._lock:
+            if listener in AppConfig._listeners:
+                AppConfig._listeners.remove(listener)
+
+    @staticmethod
+    def _publish(snapshot: ConfigSnapshot, cache_key: Optional[tuple]) -> None:
+        """Атомарно заменяет снимок и оповещает подписчиков об изменениях."""
+        with AppConfig._lock:
+            previous = AppConfig._snapshot
+            AppConfig._snapshot = snapshot
+            AppConfig._cache_key = cache_key
+            listeners = list(AppConfig._listeners)
+        if previous is None:
+            return
+        changed = snapshot.changed_keys(previous)
+        if not changed:
+            return
+        for listener in listeners:
+            try:
+                listener(snapshot, changed)
+            except Exception as e:
+                logger.warning(f"Подписчик конфигурации упал: {e}", exc_info=True)
+
+    @staticmethod
+    def _merged(config: Dict[str, Any]) -> Dict[str, Any]:
+        # Объединяем с настройками по умолчанию (на случай, если в файле нет каких-то ключей)
+        merged_config = copy.deepcopy(AppConfig.DEFAULT_CONFIG)
+        merged_config.update(config)
+        return merged_config
+
+    # ── Чтение ─────────────────────────────────────────────────────────── #
+
+    @staticmethod
+    def snapshot() -> ConfigSnapshot:
         """
-        Загружает конфигурацию (из кэша, если файл не менялся).
+        Текущий неизменяемый снимок конфига — без копирования.
 
-        Returns:
-            Глубокая копия словаря с настройками — мутации результата
-            не влияют ни на кэш, ни на DEFAULT_CONFIG.
+        Снимок не меняется: после save_config() или правки файла на диске
+        следующий вызов вернёт новый объект.
         """
-        current_key = AppConfig._current_cache_key()
-        if AppConfig._cache is not None and AppConfig._cache_key == current_key:
-            return copy.deepcopy(AppConfig._cache)
+        snap = AppConfig._snapshot
+        if snap is not None and AppConfig._cache_key == AppConfig._current_cache_key():
+            return snap
+        return AppConfig._reload()
 
-        AppConfig._ensure_config_dir()
+    @staticmethod
+    def _reload() -> ConfigSnapshot:
+        with AppConfig._lock:
+            current_key = AppConfig._current_cache_key()
+            if AppConfig._snapshot is not None and AppConfig._cache_key == current_key:
+                return AppConfig._snapshot
 
-        if not AppConfig.CONFIG_FILE.exists():
-            # Если файл не существует, создаем с настройками по умолчанию
-            logger.info("Файл конфигурации не найден, создается с настройками по умолчанию")
-            AppConfig.save_config(copy.deepcopy(AppConfig.DEFAULT_CONFIG))
-            return copy.deepcopy(AppConfig.DEFAULT_CONFIG)
+            AppConfig._ensure_config_dir()
 
-        try:
-            with open(AppConfig.CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            # Объединяем с настройками по умолчанию (на случай, если в файле нет каких-то ключей)
-            merged_config = copy.deepcopy(AppConfig.DEFAULT_CONFIG)
-            merged_config.update(config)
-            AppConfig._cache = copy.deepcopy(merged_config)
-            AppConfig._cache_key = current_key
+            if not AppConfig.CONFIG_FILE.exists():
+                # Если файл не существует, создаем с настройками по умолчанию
+                logger.info("Файл конфигурации не найден, создается с настройками по умолчанию")
+                AppConfig.save_config(copy.deepcopy(AppConfig.DEFAULT_CONFIG))
+                return AppConfig._snapshot or ConfigSnapshot.from_dict(AppConfig.DEFAULT_CONFIG)
+
+            try:
+                with open(AppConfig.CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error(f"Ошибка при загрузке конфига: {e}. Используются настройки по умолчанию.", exc_info=True)
+                return ConfigSnapshot.from_dict(AppConfig.DEFAULT_CONFIG)
+
+            snap = ConfigSnapshot.from_dict(AppConfig._merged(config))
+            AppConfig._publish(snap, current_key)
             logger.debug("Конфигурация успешно загружена")
-            return merged_config
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Ошибка при загрузке конфига: {e}. Используются настройки по умолчанию.", exc_info=True)
-            return copy.deepcopy(AppConfig.DEFAULT_CONFIG)
+            return snap
+
+    @staticmethod
+    def load_config() -> Dict[str, Any]:
+        """
+        Загружает конфигурацию (из кэша, если файл не менялся).
+
+        Returns:
+            Изменяемая копия словаря с настройками — мутации результата
+            не влияют ни на кэш, ни на DEFAULT_CONFIG. Только для чтения
+            дешевле snapshot().
+        """
+        return AppConfig.snapshot().to_dict()
 
     @staticmethod
     def save_config(config: Dict[str, Any]) -> bool:
@@ -123,8 +343,8 @@ class AppConfig:
             with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4, ensure_ascii=False)
             os.replace(tmp_path, AppConfig.CONFIG_FILE)
-            AppConfig._cache = copy.deepcopy(config)
-            AppConfig._cache_key = AppConfig._current_cache_key()
+            AppConfig._publish(ConfigSnapshot.from_dict(AppConfig._merged(config)),
+                               AppConfig._current_cache_key())
             logger.debug("Конфигурация успешно сохранена")
             return True
         except IOError as e:
@@ -146,10 +366,10 @@ class AppConfig:
             default: Значение по умолчанию, если ключ не найден
 
         Returns:
-            Значение настройки или default
+            Значение настройки или default (списки/словари — копией)
         """
-        config = AppConfig.load_config()
-        return config.get(key, default)
+        value = AppConfig.snapshot().values.get(key, default)
+        return _thaw(value) if isinstance(value, (tuple, Mapping)) else value
 
     @staticmethod
     def set(key: str, value: Any) -> bool:
@@ -163,10 +383,11 @@ class AppConfig:
         Returns:
             True если успешно, False если ошибка
         """
-        config = AppConfig.load_config()
-        config[key] = value
-        logger.debug(f"Установлено значение конфигурации: {key} = {value}")
-        return AppConfig.save_config(config)
+        with AppConfig._lock:
+            config = AppConfig.load_config()
+            config[key] = value
+            logger.debug(f"Установлено значение конфигурации: {key} = {value}")
+            return AppConfig.save_config(config)
 
     @staticmethod
     def get_tf2_game_folder() -> str:
@@ -0,0 +1,50 @@
+"""
+Qt-сигналы об изменении конфигурации.
+
+AppConfig не зависит от Qt: он зовёт подписчиков (add_listener) после каждой
+замены снимка — при save_config()/set() и при правке файла на диске.
+ConfigSignals переводит это в сигналы для UI; подписчики, живущие в
+GUI-потоке, получают их через очередь событий, даже если конфиг сохранил
+фоновый воркер.
+
+    from src.config.config_signals import config_signals
+    config_signals().key_changed.connect(self._on_config_key)
+"""
+
+from typing import FrozenSet, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from src.config.app_config import AppConfig, ConfigSnapshot
+
+
+class ConfigSignals(QObject):
+    """Мост AppConfig → Qt-сигналы (один экземпляр на приложение)."""
+
+    # (новый ConfigSnapshot, frozenset изменившихся ключей)
+    changed = Signal(object, object)
+    # (ключ, новое значение из снимка) — по сигналу на каждый изменившийся ключ
+    key_changed = Signal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        AppConfig.add_listener(self._on_config_changed)
+
+    def _on_config_changed(self, snapshot: ConfigSnapshot, keys: FrozenSet[str]) -> None:
+        self.changed.emit(snapshot, keys)
+        for key in sorted(keys):
+            self.key_changed.emit(key, snapshot.get(key))
+
+    def detach(self) -> None:
+        AppConfig.remove_listener(self._on_config_changed)
+
+
+_instance: Optional[ConfigSignals] = None
+
+
+def config_signals() -> ConfigSignals:
+    """Общий экземпляр ConfigSignals (создаётся при первом обращении)."""
+    global _instance
+    if _instance is None:
+        _instance = ConfigSignals()
+    return _instance
@@ -97,7 +97,7 @@ class AppFactory:
     @staticmethod
     def _apply_theme(app: QApplication) -> None:
         from src.utils.themes import apply_theme
-        config = AppConfig.load_config()
+        config = AppConfig.snapshot()
         theme_name = config.get('theme', 'dark')
         
         if theme_name not in ['dark', 'blue']:
@@ -0,0 +1,125 @@
+"""
+Поисковый индекс вкладки шапок.
+
+Раньше каждый ввод в поиске вызывал HatItem.matches() для всех ~5000 шапок:
+на каждую пересобиралась строка name + internal_name + classes_str (с join
+классов) и переводилась в нижний регистр. Теперь всё это считается один раз
+при загрузке списка:
+
+  • строки поиска и имена в нижнем регистре — заранее;
+  • триграммы → битовые множества шапок (int как bitset): слово из 3+ букв
+    сразу сужает кандидатов до пересечения множеств его триграмм;
+  • класс → битовое множество шапок (правила те же, что у HatItem.matches:
+    шапки «для всех классов» видны только при фильтре "all");
+  • дописанный символ уточняет прошлый результат: если каждое прошлое слово
+    входит в одно из новых, проверяются только прошлые совпадения.
+
+Итоговый порядок совпадает со старым: по релевантности, затем по имени.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.data.hats_parser import HatItem
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _bits_from_ids(ids: Sequence[int], size: int) -> int:
+    """Битовое множество из номеров (через bytearray — без роста int в цикле)."""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _ids_from_bits(bits: int) -> List[int]:
+    """Номера установленных битов по возрастанию."""
+    return [i for i, c in enumerate(reversed(bin(bits)[2:])) if c == "1"]
+
+
+def _relevance(name_lower: str, q: str) -> int:
+    """То же, что HatItem.relevance, но по готовому имени в нижнем регистре."""
+    if name_lower == q:
+        return 0
+    if name_lower.startswith(q):
+        return 1
+    if q in name_lower:
+        return 2
+    return 3
+
+
+def _refines(prev_words: List[str], words: List[str]) -> bool:
+    """Любое совпадение по words совпадает и по prev_words."""
+    return all(any(p in w for w in words) for p in prev_words)
+
+
+class HatSearchIndex:
+    """Неизменяемый индекс списка шапок; search() помнит прошлый запрос."""
+
+    def __init__(self, hats: Sequence[HatItem]):
+        self._hats = list(hats)
+        n = len(self._hats)
+        self._names = [h.name.lower() for h in self._hats]
+        self._searchable = [
+            f"{h.name} {h.internal_name} {h.classes_str}".lower() for h in self._hats
+        ]
+        self._all = (1 << n) - 1
+
+        postings: Dict[str, List[int]] = {}
+        by_class: Dict[str, List[int]] = {}
+        for i, (text, hat) in enumerate(zip(self._searchable, self._hats)):
+            for tri in _trigrams(text):
+                postings.setdefault(tri, []).append(i)
+            if hat.classes and len(hat.classes) < 9:
+                for cls in {c.lower() for c in hat.classes}:
+                    by_class.setdefault(cls, []).append(i)
+        self._trigram_bits = {t: _bits_from_ids(ids, n) for t, ids in postings.items()}
+        self._class_bits = {c: _bits_from_ids(ids, n) for c, ids in by_class.items()}
+
+        # (слова, фильтр класса, номера совпавших шапок) прошлого запроса
+        self._last: Optional[Tuple[List[str], str, List[int]]] = None
+
+    @property
+    def hats(self) -> List[HatItem]:
+        return list(self._hats)
+
+    def __len__(self) -> int:
+        return len(self._hats)
+
+    def _candidates(self, words: List[str], cls: str) -> List[int]:
+        bits = self._all if cls == "all" else self._class_bits.get(cls, 0)
+        for w in words:
+            for tri in _trigrams(w):
+                bits &= self._trigram_bits.get(tri, 0)
+                if not bits:
+                    return []
+        return _ids_from_bits(bits)
+
+    def search(self, query: str, class_filter: Optional[str] = "all") -> List[HatItem]:
+        """
+        Шапки, подходящие под запрос и фильтр класса (как HatItem.matches),
+        отсортированные как раньше в HatsPanel.
+        """
+        words = query.lower().split()
+        cls = (class_filter or "all").lower()
+
+        last = self._last
+        if last is not None and last[1] == cls and _refines(last[0], words):
+            candidates = last[2]
+        else:
+            candidates = self._candidates(words, cls)
+
+        if words:
+            searchable = self._searchable
+            ids = [i for i in candidates if all(w in searchable[i] for w in words)]
+        else:
+            ids = candidates
+        self._last = (words, cls, ids)
+
+        if words:
+            q = " ".join(words)
+            names = self._names
+            ids = sorted(ids, key=lambda i: (_relevance(names[i], q), names[i]))
+        return [self._hats[i] for i in ids]
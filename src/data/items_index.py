@@ -0,0 +1,303 @@
+"""
+Единый индекс данных из items_game.txt с постоянным хранилищем SQLite.
+
+Раньше шапки (cache/hats_cache_v3.json) и пути оружия
+(cache/weapon_paths_cache.json) кэшировались отдельно: каждый файл проверялся
+по своему mtime, грузился целиком через json.loads и перестраивался своим
+полным разбором 8 МБ items_game.txt.
+
+Теперь после обновления игры items_game разбирается ОДИН раз
+(keyvalues.parse_keyvalues + раскрытие префабов), и из дерева сразу
+извлекается всё нужное:
+
+  items          — все предметы: defindex, имя, токен локализации, класс, слот, модель
+  hats           — косметика для вкладки шапок (пути, классы, per-class модели)
+  weapon_models  — стебель модели оружия → путь model_player
+  hat_names      — локализованные названия шапок по языку (заполняется
+                   лениво, при первом запросе языка; из tf_<язык>.txt
+                   читаются только токены шапок — см. localization)
+
+Всё лежит в cache/items_index.sqlite. Актуальность — по версии схемы, пути,
+mtime и размеру items_game.txt (строка meta.source); названия языка —
+по подписи его файла локализации (meta.names:<язык>). Запросы по defindex,
+имени или стеблю оружия читают только нужные строки — старт не грузит весь
+индекс в память.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.data import localization
+from src.data.hats_parser import HatItem, _display_name, _hat_from_item
+from src.data.keyvalues import KVNode, load_keyvalues, resolve_prefabs
+from src.data.weapon_model_index import get_items_game_path, weapon_paths_from_tree
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_DB_FILE = Path("cache") / "items_index.sqlite"
+# Поднимать при изменении схемы или правил извлечения — индекс перестроится
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE items (
+    defindex TEXT PRIMARY KEY, name TEXT, item_name TEXT,
+    item_class TEXT, item_slot TEXT, model_player TEXT
+);
+CREATE INDEX items_by_name ON items(name COLLATE NOCASE);
+CREATE TABLE hats (
+    defindex TEXT PRIMARY KEY, internal_name TEXT, item_name TEXT,
+    mdl_path TEXT, classes TEXT, slot TEXT, per_class_models TEXT
+);
+CREATE TABLE weapon_models (stem TEXT PRIMARY KEY, path TEXT);
+CREATE TABLE hat_names (
+    lang TEXT, defindex TEXT, name TEXT, PRIMARY KEY (lang, defindex)
+);
+"""
+
+# Сериализует перестройку: вкладка шапок и сборка могут попросить индекс одновременно
+_lock = threading.RLock()
+# (файл БД, tf2_root) → строка source, уже сверенная в этом процессе
+_verified: Dict[tuple, str] = {}
+
+
+def _source_signature(items_path: Path) -> str:
+    st = items_path.stat()
+    return f"v{_SCHEMA_VERSION}|{items_path.resolve()}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def _connect(path: Path = None) -> sqlite3.Connection:
+    return sqlite3.connect(str(path or _DB_FILE))
+
+
+def _stored_signature() -> Optional[str]:
+    if not _DB_FILE.exists():
+        return None
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        return row[0] if row else None
+    except sqlite3.Error:
+        return None
+
+
+# ── Построение ─────────────────────────────────────────────────────────────── #
+
+def _build(items_path: Path, signature: str,
+           progress_cb: Optional[Callable[[int, str], None]] = None) -> None:
+    """Один разбор items_game → новая БД (атомарная замена файла)."""
+    t0 = time.time()
+    if progress_cb:
+        progress_cb(10, "Parsing items_game.txt...")
+    root = load_keyvalues(items_path)
+    items_game = root.child("items_game")
+    items_section = items_game.child("items") if items_game is not None else None
+    prefabs = items_game.child("prefabs") if items_game is not None else None
+
+    item_rows = []
+    hat_rows = []
+    stats = {"no_mdl": 0, "path": 0, "slot": 0, "class": 0}
+    prefab_cache: Dict[str, KVNode] = {}
+    total = len(items_section) if items_section is not None else 0
+
+    for n, (defindex, raw_item) in enumerate(items_section or (), 1):
+        if not isinstance(raw_item, KVNode):
+            continue
+        item = resolve_prefabs(raw_item, prefabs, prefab_cache)
+        token = item.get_str("item_name") or ""
+        item_rows.append((
+            defindex, item.get_str("name") or defindex, token,
+            item.get_str("item_class") or "", (item.get_str("item_slot") or "").lower(),
+            item.get_str("model_player") or "",
+        ))
+        hat = _hat_from_item(defindex, item, {}, stats)
+        if hat is not None:
+            hat_rows.append((
+                defindex, hat.internal_name, token, hat.mdl_path,
+                ",".join(hat.classes), hat.slot, json.dumps(hat.per_class_models),
+            ))
+        if progress_cb and n % 500 == 0:
+            progress_cb(10 + min(75, n * 75 // max(total, 1)),
+                        f"Parsing... ({len(hat_rows)} cosmetics found)")
+
+    weapon_rows = list(weapon_paths_from_tree(root).items())
+
+    if progress_cb:
+        progress_cb(90, "Saving cache...")
+    _DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = _DB_FILE.with_name(f"{_DB_FILE.name}.tmp{os.getpid()}")
+    if tmp_file.exists():
+        tmp_file.unlink()
+    with closing(_connect(tmp_file)) as conn:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT OR IGNORE INTO items VALUES (?, ?, ?, ?, ?, ?)", item_rows)
+        conn.executemany("INSERT OR IGNORE INTO hats VALUES (?, ?, ?, ?, ?, ?, ?)", hat_rows)
+        conn.executemany("INSERT OR IGNORE INTO weapon_models VALUES (?, ?)", weapon_rows)
+        conn.execute("INSERT INTO meta VALUES ('source', ?)", (signature,))
+        conn.commit()
+    os.replace(tmp_file, _DB_FILE)
+
+    logger.info(
+        f"Индекс items_game построен за {time.time() - t0:.1f}s: "
+        f"{len(item_rows)} предметов, {len(hat_rows)} косметики, "
+        f"{len(weapon_rows)} моделей оружия "
+        f"(пропущено: нет MDL={stats['no_mdl']}, не player/items={stats['path']}, "
+        f"не косметика slot={stats['slot']}, класс не wearable={stats['class']})"
+    )
+
+
+def ensure_index(tf2_root: str, force: bool = False,
+                 progress_cb: Optional[Callable[[int, str], None]] = None) -> bool:
+    """
+    Гарантирует актуальный индекс для tf2_root (перестраивает при обновлении
+    игры или force=True).
+
+    Returns:
+        False, если items_game.txt недоступен или индекс не построился.
+    """
+    items_path = get_items_game_path(tf2_root)
+    if not items_path:
+        return False
+    with _lock:
+        try:
+            signature = _source_signature(items_path)
+            key = (str(_DB_FILE), tf2_root)
+            if not force and _verified.get(key) == signature:
+                return True
+            if force or _stored_signature() != signature:
+                _verified.clear()
+                _build(items_path, signature, progress_cb)
+            _verified[key] = signature
+            return True
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Не удалось построить индекс items_game: {e}")
+            return False
+
+
+def invalidate() -> None:
+    """Удаляет индекс (следующий запрос перестроит его)."""
+    with _lock:
+        _verified.clear()
+        if _DB_FILE.exists():
+            _DB_FILE.unlink()
+            logger.info("Индекс items_game удалён")
+
+
+# ── Шапки ─────────────────────────────────────────────────────────────────── #
+
+def _ensure_hat_names(conn: sqlite3.Connection, tf2_root: str, language: str) -> None:
+    """
+    Заполняет hat_names для языка при первом обращении к нему и после
+    обновления файла локализации.
+    """
+    meta_key = f"names:{language}"
+    loc_signature = localization.signature(tf2_root, language)
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (meta_key,)).fetchone()
+    if row and row[0] == loc_signature:
+        return
+    hats = conn.execute("SELECT defindex, internal_name, item_name FROM hats").fetchall()
+    names = localization.lookup_tokens(tf2_root, language, (token for _, _, token in hats))
+    rows = [
+        (language, defindex, _display_name(internal_name, token, names))
+        for defindex, internal_name, token in hats
+    ]
+    conn.execute("DELETE FROM hat_names WHERE lang = ?", (language,))
+    conn.executemany("INSERT OR REPLACE INTO hat_names VALUES (?, ?, ?)", rows)
+    conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (meta_key, loc_signature))
+    conn.commit()
+
+
+def _hat_from_row(row) -> HatItem:
+    defindex, name, internal_name, mdl_path, classes, slot, per_class = row
+    return HatItem(
+        defindex=defindex,
+        name=name or internal_name,
+        internal_name=internal_name,
+        mdl_path=mdl_path,
+        classes=[c for c in classes.split(",") if c],
+        slot=slot,
+        per_class_models=json.loads(per_class) if per_class else {},
+    )
+
+
+_HAT_SELECT = """
+    SELECT h.defindex, n.name, h.internal_name, h.mdl_path, h.classes, h.slot, h.per_class_models
+    FROM hats h LEFT JOIN hat_names n ON n.defindex = h.defindex AND n.lang = ?
+"""
+
+
+def load_hats(tf2_root: str, language: str = "en", force: bool = False,
+              progress_cb: Optional[Callable[[int, str], None]] = None) -> List[HatItem]:
+    """Все шапки (List[HatItem]) с названиями на языке language, по алфавиту."""
+    if not ensure_index(tf2_root, force=force, progress_cb=progress_cb):
+        return []
+    with _lock, closing(_connect()) as conn:
+        if progress_cb:
+            progress_cb(95, "Loading localization...")
+        _ensure_hat_names(conn, tf2_root, language)
+        hats = [_hat_from_row(r) for r in conn.execute(_HAT_SELECT, (language,))]
+    hats.sort(key=lambda h: h.name.lower())
+    if progress_cb:
+        progress_cb(100, f"Done — {len(hats)} cosmetics found")
+    return hats
+
+
+def hat_by_defindex(tf2_root: str, defindex: str, language: str = "en") -> Optional[HatItem]:
+    """Одна шапка по defindex или None."""
+    if not ensure_index(tf2_root):
+        return None
+    with _lock, closing(_connect()) as conn:
+        _ensure_hat_names(conn, tf2_root, language)
+        row = conn.execute(_HAT_SELECT + " WHERE h.defindex = ?", (language, str(defindex))).fetchone()
+    return _hat_from_row(row) if row else None
+
+
+# ── Предметы и модели оружия ─────────────────────────────────────────────── #
+
+_ITEM_FIELDS = ("defindex", "name", "item_name", "item_class", "item_slot", "model_player")
+
+
+def item_by_defindex(tf2_root: str, defindex: str) -> Optional[dict]:
+    """Поля предмета (см. _ITEM_FIELDS) по defindex или None."""
+    if not ensure_index(tf2_root):
+        return None
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT * FROM items WHERE defindex = ?", (str(defindex),)).fetchone()
+    return dict(zip(_ITEM_FIELDS, row)) if row else None
+
+
+def items_by_name(tf2_root: str, name: str) -> List[dict]:
+    """Предметы с внутренним именем name (без учёта регистра)."""
+    if not ensure_index(tf2_root):
+        return []
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT * FROM items WHERE name = ? COLLATE NOCASE", (name,)
+        ).fetchall()
+    return [dict(zip(_ITEM_FIELDS, r)) for r in rows]
+
+
+def weapon_model_path(tf2_root: str, stem: str) -> Optional[str]:
+    """Путь model_player для стебля модели оружия (одна строка из индекса)."""
+    if not stem or not ensure_index(tf2_root):
+        return None
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT path FROM weapon_models WHERE stem = ?", (stem.lower(),)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def weapon_models(tf2_root: str) -> Dict[str, str]:
+    """Весь индекс {стебель: model_player}."""
+    if not ensure_index(tf2_root):
+        return {}
+    with closing(_connect()) as conn:
+        return dict(conn.execute("SELECT stem, path FROM weapon_models"))
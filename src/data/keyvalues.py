@@ -0,0 +1,207 @@
+"""
+Однопроходный парсер Valve KeyValues (items_game.txt и подобные файлы).
+
+Раньше hats_parser шёл по 8 МБ items_game.txt посимвольно на Python, а потом
+гонял регэкспы по каждому срезу блока; weapon_model_index читал тот же файл
+своим регэкспом. Теперь текст один раз режется одним скомпилированным
+регэкспом на токены, из которых сразу строится дерево KVNode.
+
+  • ключи регистронезависимы, повторяющиеся ключи сохраняются (как в KV);
+    индекс для get()/child() строится лениво — при первом обращении к узлу;
+  • комментарии // и условия платформы [$WIN32] пропускаются;
+  • resolve_prefabs() раскрывает наследование "prefab" (в том числе вложенное
+    и списком через пробел): поля предмета важнее префабов, из нескольких
+    префабов важнее указанный позже — как при загрузке схемы в игре.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# Одно совпадение — либо целая пара "ключ" "значение" / "ключ" {, либо одиночный
+# токен: пары вдвое сокращают число итераций Python-цикла.
+# Группы: 1-3 — пара (ключ, "значение" в кавычках | '{'), 4 — '{', 5 — '}',
+# 6 — комментарий, 7 — одиночная "строка" в кавычках, 8 — токен без кавычек.
+# Значения захватываются с кавычками, чтобы пустая строка "" отличалась от
+# несработавшей группы в результате findall.
+_TOKEN_RE = re.compile(
+    r'[ \t\r\n]*(?:"([^"]*)"[ \t\r\n]*(?:("[^"]*")|(\{))'
+    r'|(\{)|(\})|(//[^\n]*)|("[^"]*")|([^\s{}"]+))'
+)
+
+KVValue = Union[str, "KVNode"]
+
+
+class KVNode:
+    """Блок { ... }: упорядоченные пары (ключ, строка | KVNode)."""
+
+    __slots__ = ("_pairs", "_index")
+
+    def __init__(self) -> None:
+        self._pairs: List[Tuple[str, KVValue]] = []
+        self._index: Optional[Dict[str, KVValue]] = None
+
+    def add(self, key: str, value: KVValue) -> None:
+        self._pairs.append((key, value))
+        self._index = None
+
+    def _lookup(self) -> Dict[str, KVValue]:
+        if self._index is None:
+            # reversed: при повторах ключа в словаре остаётся первое вхождение
+            self._index = {key.lower(): value for key, value in reversed(self._pairs)}
+        return self._index
+
+    def get(self, key: str, default=None):
+        """Значение первого ключа key (без учёта регистра)."""
+        return self._lookup().get(key.lower(), default)
+
+    def get_str(self, key: str) -> Optional[str]:
+        """Строковое значение ключа или None (нет ключа / это блок)."""
+        value = self._lookup().get(key.lower())
+        return value if isinstance(value, str) else None
+
+    def child(self, key: str) -> Optional["KVNode"]:
+        """Вложенный блок по ключу или None."""
+        value = self._lookup().get(key.lower())
+        return value if isinstance(value, KVNode) else None
+
+    def iter_leaves(self) -> Iterator[Tuple[str, str]]:
+        """Все строковые пары поддерева в порядке файла (обход в глубину)."""
+        stack = [iter(self._pairs)]
+        while stack:
+            for key, value in stack[-1]:
+                if isinstance(value, KVNode):
+                    stack.append(iter(value._pairs))
+                    break
+                yield key, value
+            else:
+                stack.pop()
+
+    def __contains__(self, key: str) -> bool:
+        return key.lower() in self._lookup()
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def __iter__(self) -> Iterator[Tuple[str, KVValue]]:
+        return iter(self._pairs)
+
+
+def parse_keyvalues(text: str) -> KVNode:
+    """
+    Разбирает текст KeyValues в дерево за один проход.
+
+    Возвращает корневой узел (обычно с одним ключом, например "items_game").
+    Непарные скобки и висящие ключи терпятся — файл игры не всегда идеален.
+    Экранирование внутри строк не обрабатывается — в items_game его нет.
+    """
+    root = KVNode()
+    stack = [root]
+    node = root
+    key: Optional[str] = None
+
+    for pkey, pvalue, popen, lone_open, close, comment, single, bare in _TOKEN_RE.findall(text):
+        if pvalue or popen:
+            if key is not None:
+                # Висел ключ без значения (токен без кавычек перед парой):
+                # первая строка пары — его значение, вторая — новый ключ.
+                node._pairs.append((key, pkey))
+                key = pvalue[1:-1] if pvalue else None
+                if popen:
+                    node = KVNode()
+                    stack[-1]._pairs.append(("", node))
+                    stack.append(node)
+            elif popen:
+                node = KVNode()
+                stack[-1]._pairs.append((pkey, node))
+                stack.append(node)
+            else:
+                node._pairs.append((pkey, pvalue[1:-1]))
+        elif close:
+            if len(stack) > 1:
+                stack.pop()
+                node = stack[-1]
+            key = None
+        elif lone_open:
+            node = KVNode()
+            stack[-1]._pairs.append((key if key is not None else "", node))
+            stack.append(node)
+            key = None
+        elif comment or bare.startswith('['):
+            continue  # комментарий или условие платформы [$WIN32]
+        else:
+            token = single[1:-1] if single else bare
+            if key is None:
+                key = token
+            else:
+                node._pairs.append((key, token))
+                key = None
+    return root
+
+
+def merge_nodes(base: KVNode, override: KVNode) -> KVNode:
+    """
+    Новый узел: base, поверх которого наложен override (рекурсивно для блоков).
+    Исходные узлы не меняются.
+    """
+    merged = KVNode()
+    pairs = merged._pairs
+    over = override._lookup()
+    used = set()
+    for key, value in base._pairs:
+        low = key.lower()
+        if low in over:
+            if low in used:
+                continue
+            used.add(low)
+            new_value = over[low]
+            if isinstance(value, KVNode) and isinstance(new_value, KVNode):
+                new_value = merge_nodes(value, new_value)
+            pairs.append((key, new_value))
+        else:
+            pairs.append((key, value))
+    if used:
+        pairs.extend(p for p in override._pairs if p[0].lower() not in used)
+    else:
+        pairs.extend(override._pairs)
+    return merged
+
+
+def resolve_prefabs(
+    node: KVNode,
+    prefabs: Optional[KVNode],
+    _cache: Optional[Dict[str, KVNode]] = None,
+    _chain: Tuple[str, ...] = (),
+) -> KVNode:
+    """
+    Узел предмета с раскрытыми префабами.
+
+    _cache — память уже раскрытых префабов (передаётся при обходе всех
+    предметов, чтобы общие префабы раскрывались один раз).
+    """
+    names = (node.get_str("prefab") or "").split()
+    if not names or prefabs is None:
+        return node
+    if _cache is None:
+        _cache = {}
+
+    base: Optional[KVNode] = None
+    for name in names:
+        low = name.lower()
+        if low in _chain:
+            continue  # цикл префабов — игнорируем
+        resolved = _cache.get(low)
+        if resolved is None:
+            raw = prefabs.child(name)
+            if raw is None:
+                continue
+            resolved = resolve_prefabs(raw, prefabs, _cache, _chain + (low,))
+            _cache[low] = resolved
+        base = resolved if base is None else merge_nodes(base, resolved)
+
+    return node if base is None else merge_nodes(base, node)
+
+
+def load_keyvalues(path, encoding: str = "utf-8") -> KVNode:
+    """Читает и разбирает файл KeyValues."""
+    with open(path, encoding=encoding, errors="replace") as f:
+        return parse_keyvalues(f.read())
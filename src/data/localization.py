@@ -0,0 +1,128 @@
+"""
+Локализация TF2 (tf/resource/tf_<язык>.txt) — общий сервис.
+
+Раньше hats_parser._parse_localization декодировал весь UTF-16 файл (~50 тыс.
+токенов) одной строкой, гонял по нему регэксп и хранил каждый токен дважды
+(как есть и в нижнем регистре) — хотя шапкам нужно ~2 тыс. токенов.
+
+Теперь:
+  • файл читается потоково, построчно; в память попадают только токены,
+    о которых спросили (lookup_tokens), ключи — в нижнем регистре
+    (токены Source регистронезависимы);
+  • найденное кэшируется в памяти по (файл, mtime, размер): повторный запрос
+    тех же токенов — без чтения файла; новые токены дочитываются отдельным
+    проходом только для них;
+  • signature() — подпись файла для внешних кэшей (items_index хранит по ней
+    названия шапок и перестраивает их после обновления локализации).
+"""
+
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Код языка приложения → суффикс файла tf_<суффикс>.txt
+LANG_FILES = {"en": "english", "ru": "russian"}
+
+_PAIR_RE = re.compile(r'"([^"]+)"\s+"([^"]*)"')
+
+
+class _LangCache:
+    """Найденные токены одного файла локализации."""
+
+    __slots__ = ("stamp", "values", "scanned")
+
+    def __init__(self, stamp: Tuple[int, int]):
+        self.stamp = stamp
+        self.values: Dict[str, str] = {}   # токен (lower) → текст
+        self.scanned: Set[str] = set()     # токены, которые уже искали (в т.ч. ненайденные)
+
+
+_lock = threading.Lock()
+_caches: Dict[str, _LangCache] = {}
+
+
+def localization_file(tf2_root: str, language: str = "en") -> Optional[Path]:
+    """tf_<язык>.txt (language — код приложения или имя, как 'english'); иначе английский."""
+    resource = Path(tf2_root) / "tf" / "resource"
+    lang = LANG_FILES.get(language, language)
+    for name in (f"tf_{lang}.txt", "tf_english.txt"):
+        path = resource / name
+        if path.exists():
+            return path
+    return None
+
+
+def signature(tf2_root: str, language: str = "en") -> str:
+    """Подпись файла локализации (путь, mtime, размер); "" — файла нет."""
+    path = localization_file(tf2_root, language)
+    if path is None:
+        return ""
+    try:
+        st = path.stat()
+    except OSError:
+        return ""
+    return f"{path.resolve()}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def _open_text(path: Path):
+    """Файлы локализации Valve — UTF-16 с BOM; без BOM читаем как UTF-8."""
+    with open(path, "rb") as f:
+        bom = f.read(2)
+    encoding = "utf-16" if bom in (b"\xff\xfe", b"\xfe\xff") else "utf-8-sig"
+    return open(path, encoding=encoding, errors="replace")
+
+
+def _scan(path: Path, wanted: Set[str]) -> Dict[str, str]:
+    """Один потоковый проход: значения только для токенов из wanted."""
+    found: Dict[str, str] = {}
+    with _open_text(path) as f:
+        for line in f:
+            # Обычно одна пара на строку, но бывает и весь блок в одной строке
+            for key, value in _PAIR_RE.findall(line):
+                key = key.lower()
+                if key in wanted:
+                    found[key] = value
+    return found
+
+
+def lookup_tokens(tf2_root: str, language: str, tokens: Iterable[str]) -> Dict[str, str]:
+    """
+    {токен в нижнем регистре: текст} для запрошенных токенов ('#' в начале
+    допускается). Отсутствующих в файле токенов в ответе нет.
+    """
+    wanted = {t.lstrip("#").lower() for t in tokens if t}
+    path = localization_file(tf2_root, language)
+    if path is None or not wanted:
+        if path is None:
+            logger.warning(f"Файл локализации не найден: {tf2_root} ({language})")
+        return {}
+    try:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        with _lock:
+            key = str(path)
+            cache = _caches.get(key)
+            if cache is None or cache.stamp != stamp:
+                cache = _caches[key] = _LangCache(stamp)
+            missing = wanted - cache.scanned
+            if missing:
+                cache.values.update(_scan(path, missing))
+                cache.scanned |= missing
+                logger.info(f"Локализация {path.name}: найдено "
+                            f"{sum(1 for t in missing if t in cache.values)}/{len(missing)} токенов")
+            values = cache.values
+            return {t: values[t] for t in wanted if t in values}
+    except OSError as e:
+        logger.warning(f"Не удалось прочитать локализацию {path}: {e}")
+        return {}
+
+
+def clear_cache() -> None:
+    """Сбрасывает кэш токенов в памяти."""
+    with _lock:
+        _caches.clear()
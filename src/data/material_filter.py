@@ -29,7 +29,7 @@ def _user_patterns() -> list:
     """Пользовательские паттерны блэклиста из конфига (могут отсутствовать)."""
     try:
         from src.config.app_config import AppConfig
-        raw = AppConfig.load_config().get('material_blacklist', []) or []
+        raw = AppConfig.snapshot().get('material_blacklist', ()) or ()
     except Exception:
         return []
     return [p.strip().lower() for p in raw if isinstance(p, str) and p.strip()]
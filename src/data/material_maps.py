@@ -118,6 +118,13 @@ MATERIAL_MAPS = {
     },
 }
 
+# «Сила нормали» для нормали, выводимой из базы (derive_auto_normal):
+# 0 — плоская, 1 — по умолчанию; одно значение на материал, поле связано
+# между карточками phong и rim light.
+DEFAULT_NORMAL_STRENGTH = 1.0
+MIN_NORMAL_STRENGTH = 0.0
+MAX_NORMAL_STRENGTH = 10.0
+
 # Порядок ОБРАБОТКИ при сборке (стабильный, не влияет на UI).
 MAP_ORDER = ("detail", "selfillum", "phongexp", "envmapmask", "rimlight",
              "phongwarp", "lightwarp")
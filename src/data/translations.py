@@ -110,6 +110,8 @@ TRANSLATIONS = {
         'map_auto': 'Авто из текстуры (без файла)',
         'map_auto_tip': 'Строит карту из базовой текстуры автоматически. Для блеска ещё добавляет карту нормалей и отражение мира — готовый «блестящий металл» в один клик.',
         'map_threshold': 'Порог',
+        'map_normal_strength': 'Сила нормали',
+        'map_normal_strength_tip': 'Насколько рельефной будет карта нормалей, которую сборка выводит из текстуры (0 — плоская, 1 — по умолчанию). Нормаль у материала одна, поэтому значение общее для Phong и Rim light.',
         'map_clear': 'Очистить',
         'map_detailscale': 'Масштаб',
         'map_detailblendmode': 'Смешивание',
@@ -141,10 +143,14 @@ TRANSLATIONS = {
         'browse': 'Обзор...',
         'language_label': 'Язык интерфейса',
         'theme_label': 'Тема оформления',
+        'texture_variants_label': 'Доп. варианты текстур',
+        'texture_variants_hint': 'суффикс:размер[:формат] через запятую. Каждый вариант пакуется в свой VPK (my_mod_lite.vpk) в той же сборке. Пусто — выключено.',
         'theme_dark': 'Темная',
         'theme_blue': 'Синяя',
         'keep_temp_files': 'Сохранить временные файлы при ошибке',
         'debug_mode': 'Режим отладки',
+        'temp_cleanup_none': 'Очистка временных файлов: пока ничего не освобождено',
+        'temp_cleanup_report': 'Очистка временных файлов при последнем запуске: {last} ({items} шт.), всего {total}',
         'cancel': 'Отмена',
         'advanced_title': 'Дополнительно',
         'support_header': 'Поддержка',
@@ -373,6 +379,11 @@ TRANSLATIONS = {
         'enter_output_filename': 'Введите имя выходного файла:',
         'merge_vpk_progress': 'Объединение VPK файлов...',
         'merge_vpk_extracting': 'Извлечение файлов...',
+        'merge_vpk_streaming': 'Объединение архивов...',
+        'merge_conflict_policy': 'При совпадении файлов:',
+        'merge_conflict_first_wins': 'оставить из первого мода',
+        'merge_conflict_last_wins': 'заменить из последнего мода',
+        'merge_conflict_rename': 'оставить оба (переименовать)',
         'merge_vpk_completed': 'Завершено',
         'merge_vpk_success': 'VPK файлы успешно объединены: {path}',
         'error_merging_vpk': 'Ошибка объединения VPK файлов: {error}',
@@ -390,7 +401,16 @@ TRANSLATIONS = {
         'clear_decompile_cache': 'Очистить кэш моделей',
         'clear_cache_confirm': 'Очистить кэш декомпилированных моделей?\n\nРазмер кэша: {size}\n\nКэш ускоряет повторную сборку того же оружия.\nПосле очистки первая сборка каждого оружия будет медленнее.',
         'clear_cache_done': 'Кэш очищен. Удалено записей: {count}.',
-        'clear_decompile_cache_tooltip': 'Удаляет кэш декомпилированных моделей (~/.tf2skingen_cache).\nИспользуйте если модели перестали собираться после обновления TF2.'
+        'clear_decompile_cache_tooltip': 'Удаляет кэш декомпилированных моделей (~/.tf2skingen_cache).\nИспользуйте если модели перестали собираться после обновления TF2.',
+
+        # Прогрев кэша превью
+        'prewarm_cache': 'Прогреть кэш моделей',
+        'prewarm_cache_tooltip': 'Заранее декомпилирует и готовит к 3D-превью все модели каталога,\nчтобы первое открытие любого оружия было мгновенным.\nИдёт в фоне; прерванный прогрев продолжится с места остановки.',
+        'prewarm_confirm': 'Прогреть кэш для {count} моделей?\n\nЭто может занять от нескольких минут до получаса и несколько сотен МБ на диске.\nПрогрев идёт в фоне; повторное нажатие кнопки останавливает его.',
+        'prewarm_progress': 'Прогрев: {done}/{total} (нажмите, чтобы остановить)',
+        'prewarm_stopping': 'Остановка прогрева...',
+        'prewarm_done': 'Прогрев завершён.\n\nГотово: {ok}, ошибок: {failed}, уже было: {skipped}, осталось: {remaining}.',
+        'prewarm_no_tf2': 'Сначала укажите папку Team Fortress 2.',
     },
     'en': {
         'error': 'Error',
@@ -499,6 +519,8 @@ TRANSLATIONS = {
         'map_auto': 'Auto from texture (no file)',
         'map_auto_tip': 'Builds the map from the base texture automatically. For gloss it also adds a normal map and world reflection — one-click shiny metal.',
         'map_threshold': 'Threshold',
+        'map_normal_strength': 'Normal strength',
+        'map_normal_strength_tip': 'How pronounced the normal map the build derives from the texture is (0 = flat, 1 = default). A material has one normal map, so the value is shared by Phong and Rim light.',
         'map_clear': 'Clear',
         'map_detailscale': 'Scale',
         'map_detailblendmode': 'Blend',
@@ -530,10 +552,14 @@ TRANSLATIONS = {
         'browse': 'Browse...',
         'language_label': 'Interface Language',
         'theme_label': 'Theme',
+        'texture_variants_label': 'Extra texture variants',
+        'texture_variants_hint': 'suffix:size[:format], comma separated. Each variant is packed into its own VPK (my_mod_lite.vpk) in the same build. Empty = off.',
         'theme_dark': 'Dark',
         'theme_blue': 'Blue',
         'keep_temp_files': 'Keep temporary files on error',
         'debug_mode': 'Debug mode',
+        'temp_cleanup_none': 'Temp cleanup: nothing reclaimed yet',
+        'temp_cleanup_report': 'Temp cleanup at last start: {last} ({items} items), {total} in total',
         'cancel': 'Cancel',
         'advanced_title': 'Advanced',
         'support_header': 'Support',
@@ -762,6 +788,11 @@ TRANSLATIONS = {
         'enter_output_filename': 'Enter output filename:',
         'merge_vpk_progress': 'Merging VPK files...',
         'merge_vpk_extracting': 'Extracting files...',
+        'merge_vpk_streaming': 'Merging archives...',
+        'merge_conflict_policy': 'When files collide:',
+        'merge_conflict_first_wins': 'keep from the first mod',
+        'merge_conflict_last_wins': 'replace from the last mod',
+        'merge_conflict_rename': 'keep both (rename)',
         'merge_vpk_completed': 'Completed',
         'merge_vpk_success': 'VPK files successfully merged: {path}',
         'error_merging_vpk': 'Error merging VPK files: {error}',
@@ -779,6 +810,15 @@ TRANSLATIONS = {
         'clear_decompile_cache': 'Clear Model Cache',
         'clear_cache_confirm': 'Clear the model decompile cache?\n\nCache size: {size}\n\nThe cache speeds up repeated builds of the same weapon.\nAfter clearing, the first build of each weapon will be slower.',
         'clear_cache_done': 'Cache cleared. {count} entries removed.',
-        'clear_decompile_cache_tooltip': 'Deletes cached decompiled models (~/.tf2skingen_cache).\nUse if models stopped building correctly after a TF2 update.'
+        'clear_decompile_cache_tooltip': 'Deletes cached decompiled models (~/.tf2skingen_cache).\nUse if models stopped building correctly after a TF2 update.',
+
+        # Preview cache prewarm
+        'prewarm_cache': 'Prewarm Model Cache',
+        'prewarm_cache_tooltip': 'Decompiles and prepares every catalog model for the 3D preview ahead of time,\nso the first open of any weapon is instant.\nRuns in the background; an interrupted prewarm resumes where it stopped.',
+        'prewarm_confirm': 'Prewarm the cache for {count} models?\n\nThis can take from a few minutes to half an hour and a few hundred MB of disk.\nIt runs in the background; click the button again to stop it.',
+        'prewarm_progress': 'Prewarming: {done}/{total} (click to stop)',
+        'prewarm_stopping': 'Stopping prewarm...',
+        'prewarm_done': 'Prewarm finished.\n\nWarmed: {ok}, failed: {failed}, already done: {skipped}, remaining: {remaining}.',
+        'prewarm_no_tf2': 'Select the Team Fortress 2 folder first.',
     }
 }
@@ -0,0 +1,393 @@
+"""
+Потоковая сборка анимированных VTF из GIF / APNG / WebP.
+
+Раньше все кадры (до 512) декодировались в список bytes, затем VTFLib ещё
+раз копировал каждый и держал сжатые буферы до сохранения — анимация
+512 кадров 1024² требовала больше 2 ГБ. Теперь:
+
+  • iter_frames — генератор: кадр декодируется, только когда нужен;
+  • write_animated_vtf — ресайз кадров в пуле потоков (Pillow отпускает
+    GIL), не более 2·jobs кадров в работе; сжатие — по одному вызову за
+    раз (DXT-кодер VTFLib не реентерабелен, см. _COMPRESS_LOCK); готовые
+    кадры пишутся в файл по порядку сразу после сжатия.
+
+Пиковая память — несколько кадров, а не вся анимация. Заголовок VTF
+(число кадров, reflectivity) дописывается в конце, файл появляется на
+месте атомарно.
+
+С mipmaps=True каждый кадр получает полную цепочку мипов (до 1×1) — без
+неё анимированные шины/killstreak-текстуры мерцают вдали. Фильтр
+задаётся именем как у VTFCmd -mfilter (BOX, TRIANGLE, CUBIC, LANCZOS...);
+srgb_mips усредняет цвет в линейном пространстве, а не в sRGB-байтах
+(иначе мипы темнеют). Мипы лежат в файле от меньшего к большему, поэтому
+число кадров нужно знать заранее (frame_count — длина плана
+plan_animation): готовый кадр пишется сразу во все уровни по вычисленным
+смещениям.
+
+plan_animation — проход анализа перед сборкой: кадры хэшируются, подряд
+идущие одинаковые склеиваются (их длительности суммируются), а переменные
+задержки переводятся в один целый FPS для $animatedtextureframerate:
+шаг — самая короткая задержка на сетке GIF (10 мс), так что каждая серия
+получает хотя бы кадр, а длинные — с точностью до полукадра; не чаще
+MAX_FPS и, если задан бюджет, не больше кадров, чем в него помещается. Повторы в плане пишутся
+одним и тем же сжатым кадром — сжатие не повторяется.
+"""
+
+import bisect
+import functools
+import hashlib
+import itertools
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from src.services import image_resize
+from src.services.vtf_file import (
+    HEADER_SIZE, THUMBNAIL_FORMAT, VTFHeader, VTFImageFormat,
+    alpha_flags, image_size, level_sizes, mip_count, thumbnail_size,
+)
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MAX_FRAMES = 512
+MAX_FPS = 60
+# Кадр без задержки — как раньше при отсутствии duration: 30 FPS
+DEFAULT_FRAME_MS = 1000 / 30
+# Задержки GIF кратны сотым секунды: к этой сетке сводятся и APNG-задержки
+_TICK_MS = 10
+
+# (rgba8888, width, height, vtf_format) → данные кадра в vtf_format
+Compressor = Callable[[bytes, int, int, int], bytes]
+
+# VTFLib 1.3.2 сжимает DXT через nvDXTcompress: выходной буфер и последняя
+# ошибка — глобальные переменные DLL, параллельные вызовы портят кадры.
+# Все вызовы Compressor в процессе идут по одному; пул параллелит остальное
+_COMPRESS_LOCK = threading.Lock()
+
+# sRGB → линейная яркость (как VTFLib при расчёте reflectivity)
+_LINEAR = [(i / 255.0) ** 2.2 for i in range(256)]
+
+# Имена фильтров VTFCmd -mfilter → ближайший фильтр Pillow (Kaiser, Sinc и
+# прочие оконные — Lanczos)
+MIP_FILTERS = {
+    "POINT": Image.NEAREST,
+    "BOX": Image.BOX,
+    "TRIANGLE": Image.BILINEAR,
+    "QUADRATIC": Image.BICUBIC,
+    "CUBIC": Image.BICUBIC,
+    "CATROM": Image.BICUBIC,
+    "MITCHELL": Image.BICUBIC,
+    "GAUSSIAN": Image.BILINEAR,
+    "HAMMING": Image.HAMMING,
+    "HANNING": Image.HAMMING,
+    "BLACKMAN": Image.LANCZOS,
+    "KAISER": Image.LANCZOS,
+    "SINC": Image.LANCZOS,
+    "BESSEL": Image.LANCZOS,
+}
+DEFAULT_MIP_FILTER = "BOX"
+
+
+def default_jobs() -> int:
+    """Потоков сжатия по умолчанию: ядра, но не больше 4."""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def iter_frames(input_path: str, max_frames: int = MAX_FRAMES,
+                indices: Optional[Sequence[int]] = None) -> Iterator[Image.Image]:
+    """
+    Кадры анимации в RGBA по одному; статичная картинка — один кадр.
+
+    indices — номера исходных кадров по порядку (план plan_animation);
+    повтор номера отдаёт тот же объект Image, без повторного декодирования.
+    """
+    with Image.open(input_path) as img:
+        if indices is None:
+            for index in range(max_frames):
+                try:
+                    img.seek(index)
+                except EOFError:
+                    return
+                yield img.convert("RGBA")
+            return
+        frame, current = None, None
+        for index in indices:
+            if index != current:
+                img.seek(index)
+                frame, current = img.convert("RGBA"), index
+            yield frame
+
+
+class AnimationPlan(NamedTuple):
+    """Результат анализа анимации: какие исходные кадры и с каким FPS писать."""
+    frames: Tuple[int, ...]     # номер исходного кадра для каждого кадра VTF
+    fps: Optional[int]          # None — анимации нет (один уникальный кадр)
+    source_frames: int
+    unique_frames: int
+
+    def summary(self) -> str:
+        fps = f" @ {self.fps} fps" if self.fps else ""
+        return (f"{self.source_frames} кадров → {self.unique_frames} уникальных → "
+                f"{len(self.frames)} в VTF{fps}")
+
+
+def _frame_runs(input_path: str, max_frames: int) -> Tuple[List[List], int]:
+    """
+    Серии одинаковых кадров подряд: [номер первого кадра, длительность, мс];
+    плюс число прочитанных кадров.
+    """
+    runs: List[List] = []
+    last_digest = None
+    decoded = 0
+    with Image.open(input_path) as img:
+        for index in range(max_frames):
+            try:
+                img.seek(index)
+            except EOFError:
+                break
+            decoded += 1
+            duration = float(img.info.get("duration") or 0) or DEFAULT_FRAME_MS
+            digest = hashlib.blake2b(img.convert("RGBA").tobytes(), digest_size=16).digest()
+            if digest == last_digest:
+                runs[-1][1] += duration
+            else:
+                runs.append([index, duration])
+                last_digest = digest
+    return runs, decoded
+
+
+def plan_animation(input_path: str, max_frames: int = MAX_FRAMES, max_fps: int = MAX_FPS,
+                   frame_bytes: int = 0, budget_bytes: int = 0) -> AnimationPlan:
+    """
+    Анализ анимации: склейка одинаковых кадров и пересчёт на постоянный FPS.
+
+    frame_bytes/budget_bytes — байт на кадр VTF и бюджет на всю анимацию
+    (0 — без ограничения): при превышении FPS снижается.
+    """
+    runs, source = _frame_runs(input_path, max_frames)
+    if len(runs) <= 1:
+        return AnimationPlan(tuple(run[0] for run in runs), None, source, len(runs))
+
+    ticks = [max(_TICK_MS, round(duration / _TICK_MS) * _TICK_MS) for _index, duration in runs]
+    fps = max(1, min(max_fps, round(1000 / min(ticks))))
+    limit = max_frames
+    if frame_bytes and budget_bytes:
+        limit = min(limit, max(2, budget_bytes // frame_bytes))
+    total_ms = sum(duration for _index, duration in runs)
+    count = max(1, round(total_ms * fps / 1000))
+    if count > limit:
+        fps = max(1, int(limit * 1000 // total_ms))
+        count = min(limit, max(1, round(total_ms * fps / 1000)))
+
+    # Кадр VTF k показывает то, что исходник показывает в середине его интервала
+    ends = list(itertools.accumulate(duration for _index, duration in runs))
+    frames = tuple(
+        runs[min(len(runs) - 1, bisect.bisect_right(ends, (k + 0.5) * 1000 / fps))][0]
+        for k in range(count)
+    )
+    return AnimationPlan(frames, fps, source, len(runs))
+
+
+def resample_filter(name: Optional[str]) -> int:
+    """Фильтр Pillow по имени VTFCmd; неизвестное имя — BOX."""
+    return MIP_FILTERS.get(str(name or DEFAULT_MIP_FILTER).upper(), Image.BOX)
+
+
+@functools.lru_cache(maxsize=1)
+def _srgb_tables() -> Tuple[List[int], List[int]]:
+    """LUT sRGB-байт → линейный 16 бит и обратно (для point L→I и I→L)."""
+    to_linear = [round(((i / 255.0) ** 2.2) * 65535) for i in range(256)]
+    to_srgb = [round(((v / 65535.0) ** (1 / 2.2)) * 255) for v in range(65536)]
+    return to_linear, to_srgb
+
+
+def mip_chain(frame: Image.Image, count: int, resample: int = Image.BOX,
+              srgb: bool = True) -> List[Image.Image]:
+    """
+    Уровни 0..count-1 кадра RGBA; каждый следующий — из предыдущего.
+
+    srgb=True: RGB уменьшается в линейном 16-битном пространстве (режим I),
+    альфа — как есть.
+    """
+    levels = [frame]
+    width, height = frame.size
+    if count <= 1:
+        return levels
+    if not srgb:
+        for _ in range(1, count):
+            width, height = max(1, width // 2), max(1, height // 2)
+            levels.append(levels[-1].resize((width, height), resample))
+        return levels
+    to_linear, to_srgb = _srgb_tables()
+    *color, alpha = frame.split()
+    color = [band.point(to_linear, "I") for band in color]
+    linear, alphas = [], []
+    for _ in range(1, count):
+        width, height = max(1, width // 2), max(1, height // 2)
+        color = [band.resize((width, height), resample) for band in color]
+        alpha = alpha.resize((width, height), resample)
+        linear.append(color)
+        alphas.append(alpha)
+    # Обратно в sRGB — одним point на кадр: все уровни всех каналов
+    # складываются в «атлас» (Pillow готовит таблицу I→L на 65536 значений
+    # заново при каждом вызове — это дороже самих пикселей)
+    atlas = Image.new("I", (linear[0][0].width, 3 * sum(bands[0].height for bands in linear)))
+    boxes, top = {}, 0
+    for channel in range(3):
+        for index, bands in enumerate(linear):
+            band = bands[channel]
+            atlas.paste(band, (0, top))
+            boxes[channel, index] = (0, top, band.width, top + band.height)
+            top += band.height
+    atlas = atlas.point(to_srgb, "L")
+    for index, alpha in enumerate(alphas):
+        rgb = [atlas.crop(boxes[channel, index]) for channel in range(3)]
+        levels.append(Image.merge("RGBA", rgb + [alpha]))
+    return levels
+
+
+def _reflectivity(frame: Image.Image) -> Tuple[float, float, float]:
+    """Средний линейный цвет кадра — по гистограмме, без обхода пикселей."""
+    hist = frame.histogram()
+    total = frame.width * frame.height
+    return tuple(
+        sum(count * lin for count, lin in zip(hist[band * 256:(band + 1) * 256], _LINEAR)) / total
+        for band in range(3)
+    )
+
+
+def _serialized(compress: Compressor) -> Compressor:
+    """compress под _COMPRESS_LOCK."""
+    def locked(rgba: bytes, width: int, height: int, image_format: int) -> bytes:
+        with _COMPRESS_LOCK:
+            return compress(rgba, width, height, image_format)
+    return locked
+
+
+def _compress(level: Image.Image, image_format: int, compress: Compressor) -> bytes:
+    rgba = level.tobytes()
+    width, height = level.size
+    data = rgba if image_format == VTFImageFormat.RGBA8888 else compress(rgba, width, height, image_format)
+    expected = image_size(width, height, image_format)
+    if len(data) != expected:
+        raise RuntimeError(f"Frame size mismatch: {len(data)} != {expected}")
+    return data
+
+
+def _encode(frame: Image.Image, size: Tuple[int, int], image_format: int, compress: Compressor,
+            mips: int, resample: int, srgb: bool) -> Tuple[List[bytes], Tuple[float, float, float]]:
+    """
+    Кадр → сжатые уровни мипов (0 — полный размер) + средний цвет.
+
+    Выполняется в пуле: ресайз и цепочка мипов идут параллельно, а каждый
+    compress (уже обёрнутый _serialized) ждёт своей очереди.
+    """
+    if frame.size != tuple(size):
+        # Кадры и так обрабатываются в пуле — ресайз без своих потоков
+        frame = image_resize.resize(frame, size, jobs=1)
+    levels = [_compress(level, image_format, compress)
+              for level in mip_chain(frame, mips, resample, srgb)]
+    return levels, _reflectivity(frame)
+
+
+def write_animated_vtf(
+    output_file: str,
+    frames: Iterable[Image.Image],
+    size: Tuple[int, int],
+    image_format: int,
+    flags: int,
+    compress: Compressor,
+    thumbnail: bool = True,
+    jobs: Optional[int] = None,
+    mipmaps: bool = False,
+    mip_filter: str = DEFAULT_MIP_FILTER,
+    srgb_mips: bool = True,
+    frame_count: Optional[int] = None,
+) -> int:
+    """
+    Пишет кадры в VTF 7.2 по мере сжатия; возвращает число записанных кадров.
+
+    Если кадров нет — файл не создаётся и возвращается 0. С mipmaps=True
+    обязателен frame_count: лишние кадры отбрасываются, недостача — ошибка.
+    """
+    width, height = size
+    jobs = max(1, jobs or default_jobs())
+    compress = _serialized(compress)
+    mips = mip_count(width, height) if mipmaps else 1
+    if mips > 1 and not frame_count:
+        raise ValueError("frame_count is required for mipmapped animation")
+    resample = resample_filter(mip_filter)
+    sizes = level_sizes(width, height, image_format, mips)
+    thumb = thumbnail_size(width, height) if thumbnail else (0, 0)
+    thumb_bytes = image_size(thumb[0], thumb[1], THUMBNAIL_FORMAT) if thumbnail else 0
+    data_start = HEADER_SIZE + thumb_bytes
+    thumb_data = b""
+    reflectivity = [0.0, 0.0, 0.0]
+    count = 0
+    part = f"{output_file}.part"
+
+    def _write(out, index: int, future: Future) -> None:
+        levels, mean = future.result()
+        for level, data in enumerate(levels):
+            # Перед уровнем — все кадры меньших уровней, затем кадры этого уровня
+            smaller = sum(sizes[level + 1:]) * (frame_count or 0)
+            out.seek(data_start + smaller + index * sizes[level])
+            out.write(data)
+        for i in range(3):
+            reflectivity[i] += mean[i]
+
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="animated-vtf")
+    try:
+        with open(part, "wb") as out:
+            pending: Deque[Tuple[int, Future]] = deque()
+            last_frame, future = None, None
+            for frame in frames:
+                if frame_count and count >= frame_count:
+                    break
+                if count == 0 and thumbnail:
+                    # Миниатюра сжимается в этом потоке — под тем же замком
+                    small = image_resize.resize(frame, thumb, purpose=image_resize.PREVIEW).tobytes()
+                    thumb_data = compress(small, thumb[0], thumb[1], THUMBNAIL_FORMAT)
+                # Повтор того же кадра (план с дубликатами) — уже сжатые данные
+                if frame is not last_frame:
+                    future = pool.submit(_encode, frame, size, image_format, compress,
+                                         mips, resample, srgb_mips)
+                    last_frame = frame
+                pending.append((count, future))
+                count += 1
+                del frame
+                while len(pending) >= 2 * jobs:
+                    _write(out, *pending.popleft())
+            while pending:
+                _write(out, *pending.popleft())
+            if count and mips > 1 and count != frame_count:
+                raise RuntimeError(f"Expected {frame_count} frames, decoded {count}")
+            if count:
+                header = VTFHeader(
+                    width=width, height=height,
+                    flags=flags | alpha_flags(image_format),
+                    frames=count, image_format=image_format, mipmap_count=mips,
+                    reflectivity=tuple(v / count for v in reflectivity),
+                    thumbnail_format=THUMBNAIL_FORMAT if thumbnail else VTFImageFormat.NONE,
+                    thumbnail_size=thumb,
+                )
+                out.seek(0)
+                out.write(header.pack())
+                out.write(thumb_data)
+        if count:
+            os.replace(part, output_file)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        close = getattr(frames, "close", None)
+        if close is not None:
+            close()
+        if os.path.exists(part):
+            os.remove(part)
+    logger.debug(f"[animated-vtf] {os.path.basename(output_file)}: {count} кадров, "
+                 f"мипов {mips}, потоков {jobs}")
+    return count
@@ -81,6 +81,8 @@ class BuildContext:
     # (текстура/материал не найдены → в игре будет фиолет). Показываются после
     # сборки, чтобы пользователь не искал причину «успешного» но битого мода.
     warnings: List[str] = field(default_factory=list)
+    # Справка для итогового сообщения (сводка видеопамяти и т.п.) — не проблемы
+    notes: List[str] = field(default_factory=list)
 
     def warn(self, message: str) -> None:
         """Добавляет предупприждение пользователю (без дублей) + лог."""
@@ -88,6 +90,11 @@ class BuildContext:
             self.warnings.append(message)
         logger.warning(f"[BUILD WARN] {message}")
 
+    def note(self, message: str) -> None:
+        """Добавляет строку справки в итоговое сообщение о сборке (без дублей)."""
+        if message not in self.notes:
+            self.notes.append(message)
+
     @property
     def vpkroot_dir(self) -> Path:
         """Корень VPK для упаковки"""
@@ -10,7 +10,7 @@ BuildWorker → build_with_progress (и дублировались в build_kwar
 """
 
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -50,3 +50,6 @@ class BuildRequest:
     # {material: path} BLU-слотов из цветного переключателя — для рук: нейтральный
     # материал с синей текстурой делается командным (red=база, blue=вариант).
     panel_blu_textures: Optional[Dict[str, Any]] = None
+    # Доп. варианты текстур (texture_variants.TextureVariant): модель
+    # собирается один раз, на каждый вариант — свой VPK с суффиксом.
+    texture_variants: Optional[List[Any]] = None
@@ -1,3 +1,5 @@
+import threading
+import time
 from PySide6.QtCore import Signal, QMutex, QWaitCondition
 from typing import Optional, Tuple
 from src.services.base_worker import StandardWorker
@@ -5,6 +7,7 @@ from src.services.vpk_service import VPKService
 from src.services.build_request import BuildRequest
 from src.shared.logging_config import get_logger
 from src.data.translations import TRANSLATIONS
+from src.shared.constants import ToolTimeouts
 
 logger = get_logger(__name__)
 
@@ -21,13 +24,19 @@ class BuildWorker(StandardWorker):
     request_extra_model = Signal(str, str)    # (smd_name, weapon_key) - запрос доп. модели (shell и т.д.)
     texture_mismatch_warning = Signal(str)    # (warning_message) — предупреждение о несовпадении текстур
 
-    def __init__(self, request: Optional[BuildRequest] = None, parent=None, **legacy_kwargs):
+    def __init__(self, request: Optional[BuildRequest] = None, parent=None,
+                 prefetch_done: Optional[threading.Event] = None, **legacy_kwargs):
         """
         request — все параметры сборки (см. BuildRequest). Для совместимости
         со старым стилем вызова по kwargs (BuildWorker(image_path=..., mode=...))
         request можно не передавать — тогда он соберётся из kwargs.
+
+        prefetch_done — событие идущего прогрева декомпила этой же модели
+        (DecompilePrefetcher.claim_for_build): сборка ждёт его и берёт
+        результат из кэша вместо второго запуска Crowbar.
         """
         super().__init__(parent)
+        self.prefetch_done = prefetch_done
         if request is None:
             request = BuildRequest(**legacy_kwargs)
         self.request = request
@@ -50,9 +59,19 @@ class BuildWorker(StandardWorker):
         self._texture_mismatch_condition = QWaitCondition()
         self._texture_mismatch_result = _SENTINEL  # True = continue, False/None = cancel
 
+    def _wait_prefetch(self) -> None:
+        """Ждёт присоединённый прогрев (не дольше таймаута декомпиляции, с отменой)."""
+        if self.prefetch_done is None:
+            return
+        deadline = time.monotonic() + ToolTimeouts.DECOMPILE
+        while not self.prefetch_done.wait(0.2):
+            if self.isInterruptionRequested() or time.monotonic() > deadline:
+                return
+
     def work(self) -> Tuple[bool, str]:
         r = self.request
         t = TRANSLATIONS.get(r.language, TRANSLATIONS['en'])
+        self._wait_prefetch()
         success, message, cancelled = VPKService.build_with_progress(
             r,
             model_file_callback=self._request_model_file_callback if (r.replace_model_enabled and not r.replace_model_path) else None,
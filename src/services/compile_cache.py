@@ -0,0 +1,189 @@
+"""
+Кэш результатов studiomdl.
+
+При пересборке мода, где поменялась только текстура, пропатченный QC и все
+SMD побайтно совпадают с прошлой сборкой — а studiomdl всё равно запускается
+заново. Кэш хранит готовые .mdl/.vvd/.vtx/.phy по ключу из содержимого входов:
+
+  ключ = sha1(версия кэша + путь/mtime studiomdl + текст финального QC
+              + каждый SMD/VTA/QCI, на который QC ссылается)
+
+Основной и дополнительные body находятся через extract_main_body_smd /
+extract_extra_body_smds; остальные ссылки (анимации, коллизия, flex VTA,
+$include) — по кавычкам в QC, включая вложенные .qci. Поменялся любой байт
+любого входа → другой ключ → честная компиляция.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from src.services import disk_lru
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_CACHE_DIR = Path(os.path.expanduser("~")) / ".tf2skingen_cache" / "compiled"
+_META_FILENAME = "_compile_meta.json"
+_CACHE_VERSION = 1
+# Сколько последних компиляций держим (старые по времени использования удаляются)
+_MAX_ENTRIES = 64
+
+_MODEL_EXTS = ('.mdl', '.vvd', '.vtx', '.phy')
+_RE_QC_FILE_REF = re.compile(r'"([^"]+\.(?:smd|vta|qci|dmx))"', re.IGNORECASE)
+
+
+def get_cache_dir() -> Path:
+    """Возвращает папку кэша, создаёт если нет."""
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return _CACHE_DIR
+
+
+def _hash_file(h, path: str) -> None:
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+
+
+def _referenced_files(qc_path: str, weapon_key: str) -> List[str]:
+    """Все существующие файлы, которые QC (и его $include) передаёт studiomdl."""
+    from src.services.model_build_service import ModelBuildService
+
+    found: List[str] = []
+    seen = set()
+
+    def _add(path: Optional[str]) -> None:
+        if not path:
+            return
+        norm = os.path.normcase(os.path.abspath(path))
+        if norm in seen or not os.path.isfile(path):
+            return
+        seen.add(norm)
+        found.append(path)
+
+    _add(ModelBuildService.extract_main_body_smd(qc_path, weapon_key))
+    for extra in ModelBuildService.extract_extra_body_smds(qc_path, weapon_key):
+        _add(extra)
+
+    pending = [qc_path]
+    visited = set()
+    while pending:
+        current = pending.pop()
+        if current in visited:
+            continue
+        visited.add(current)
+        try:
+            with open(current, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+        except OSError:
+            continue
+        base_dir = os.path.dirname(current)
+        for ref in _RE_QC_FILE_REF.findall(content):
+            full = os.path.join(base_dir, ref.replace("\\", "/"))
+            _add(full)
+            if ref.lower().endswith(".qci") and os.path.isfile(full):
+                pending.append(full)
+    return found
+
+
+def compute_key(qc_path: str, studiomdl_exe: str, weapon_key: str) -> Optional[str]:
+    """
+    Ключ кэша для компиляции qc_path. None — если входы прочитать не удалось
+    (тогда кэш просто не используется).
+    """
+    try:
+        h = hashlib.sha1()
+        h.update(f"v{_CACHE_VERSION}|".encode("utf-8"))
+        exe = os.path.abspath(studiomdl_exe)
+        try:
+            exe_mtime = f"{os.path.getmtime(exe):.0f}"
+        except OSError:
+            exe_mtime = "0"
+        h.update(f"{exe.lower()}|{exe_mtime}|".encode("utf-8"))
+        _hash_file(h, qc_path)
+        qc_dir = os.path.dirname(os.path.abspath(qc_path))
+        for ref in _referenced_files(qc_path, weapon_key):
+            rel = os.path.relpath(os.path.abspath(ref), qc_dir).replace("\\", "/").lower()
+            h.update(f"|{rel}|".encode("utf-8"))
+            _hash_file(h, ref)
+        return h.hexdigest()
+    except Exception as e:
+        logger.warning(f"Не удалось вычислить ключ кэша компиляции: {e}")
+        return None
+
+
+def restore(key: str, out_dir: str) -> Optional[List[str]]:
+    """
+    Копирует закэшированные файлы модели в out_dir.
+
+    Returns:
+        Имена скопированных файлов или None при промахе.
+    """
+    try:
+        entry_dir = get_cache_dir() / key
+        meta_file = entry_dir / _META_FILENAME
+        if not meta_file.exists():
+            return None
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        files = meta.get("files") or []
+        if meta.get("version") != _CACHE_VERSION or not any(n.lower().endswith(".mdl") for n in files):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        if not all((entry_dir / name).is_file() for name in files):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        os.makedirs(out_dir, exist_ok=True)
+        for name in files:
+            shutil.copy2(entry_dir / name, os.path.join(out_dir, name))
+        # Время использования — для вытеснения старых записей
+        os.utime(meta_file)
+        logger.info(f"✓ Кэш компиляции: {meta.get('model', key)} — studiomdl пропущен")
+        return list(files)
+    except Exception as e:
+        logger.warning(f"Ошибка при чтении кэша компиляции: {e}")
+        return None
+
+
+def save(key: str, out_dir: str, file_names: Iterable[str], model: str = "") -> bool:
+    """Сохраняет файлы модели (.mdl/.vvd/.vtx/.phy) из out_dir под ключом key."""
+    try:
+        names = [n for n in file_names if n.lower().endswith(_MODEL_EXTS)]
+        if not any(n.lower().endswith(".mdl") for n in names):
+            return False
+        entry_dir = get_cache_dir() / key
+        tmp_dir = entry_dir.with_name(f"{key}.tmp{os.getpid()}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for name in names:
+            shutil.copy2(os.path.join(out_dir, name), tmp_dir / name)
+        with open(tmp_dir / _META_FILENAME, "w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "model": model, "files": names}, f, indent=2)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        _trim()
+        return True
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить кэш компиляции: {e}")
+        return False
+
+
+def _trim(max_entries: int = _MAX_ENTRIES) -> None:
+    """Оставляет max_entries самых недавно использованных записей."""
+    disk_lru.trim(get_cache_dir(), _META_FILENAME, max_entries=max_entries,
+                  label="кэша компиляции")
+
+
+def clear_cache() -> int:
+    """Удаляет весь кэш компиляции. Возвращает число удалённых записей."""
+    return disk_lru.clear(get_cache_dir(), label="кэша компиляции")
+
+
+def get_cache_size_mb() -> float:
+    """Размер кэша в МБ."""
+    return disk_lru.size_mb(get_cache_dir())
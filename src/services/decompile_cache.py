@@ -15,9 +15,11 @@ import hashlib
 import json
 import os
 import shutil
+import tempfile
 from pathlib import Path
 from typing import Optional
 
+from src.services import disk_lru
 from src.shared.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -160,16 +162,18 @@ def save_to_cache(
     Returns:
         Путь к папке записи кэша, или None при ошибке.
     """
+    tmp_dir = None
     try:
         key = _cache_key(weapon_key, vpk_path, mdl_rel_path)
         entry_dir = get_cache_dir() / key
 
         _purge_stale_entries(weapon_key, mdl_rel_path, keep_key=key)
 
-        if entry_dir.exists():
-            shutil.rmtree(entry_dir)
-
-        shutil.copytree(decompile_dir, entry_dir)
+        # Пишем во временную папку и подменяем одним os.replace: параллельная
+        # запись того же ключа (прогрев и сборка) не удалит запись, которую
+        # другая сторона в этот момент копирует
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f"{key}.", dir=get_cache_dir()))
+        shutil.copytree(decompile_dir, tmp_dir, dirs_exist_ok=True)
 
         # Имя QC
         qc_name = None
@@ -186,15 +190,37 @@ def save_to_cache(
             "vpk_mtime": _vpk_mtime(vpk_path),
             "qc_filename": qc_name,
         }
-        with open(_meta_path(entry_dir), "w", encoding="utf-8") as f:
+        with open(_meta_path(tmp_dir), "w", encoding="utf-8") as f:
             json.dump(meta, f, indent=2)
 
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Запись уже есть: целая — равноценна нашей, битая — заменяем
+            if not _entry_complete(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+
         logger.info(f"✓ Кэш декомпила сохранён: {weapon_key}")
         return str(entry_dir)
 
     except Exception as e:
         logger.warning(f"Не удалось сохранить кэш декомпила: {e}")
         return None
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _entry_complete(entry_dir: Path) -> bool:
+    """Запись текущей версии с QC на месте."""
+    try:
+        with open(_meta_path(entry_dir), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    qc_name = meta.get("qc_filename")
+    return meta.get("version") == _CACHE_VERSION and bool(qc_name) and (entry_dir / qc_name).exists()
 
 
 def restore_from_cache(cache_dir: str, target_dir: str) -> str:
@@ -312,12 +338,4 @@ def clear_cache(weapon_key: Optional[str] = None) -> int:
 
 def get_cache_size_mb() -> float:
     """Размер кэша в МБ."""
-    try:
-        total = sum(
-            f.stat().st_size
-            for f in get_cache_dir().rglob("*")
-            if f.is_file()
-        )
-        return total / (1024 * 1024)
-    except Exception:
-        return 0.0
+    return disk_lru.size_mb(get_cache_dir())
@@ -0,0 +1,294 @@
+"""
+Фоновый прогрев кэша декомпиляции при выборе модели.
+
+extract_file_set + Crowbar — самая долгая часть сборки (15-40 сек), а запускается
+она только по кнопке «Собрать». Пока пользователь выбирает текстуру и крутит
+настройки, модель уже известна — прогреваем кэш заранее:
+
+  • при выборе оружия/шапки/персонажа в MainWindow/HatsPanel ставится цель
+    (и, опционально, соседи по списку оружия);
+  • воркер с низким приоритетом находит MDL тем же путём, что и сборка
+    (VPKService._build_mdl_search_paths/_find_existing_mdl), извлекает,
+    декомпилирует, чистит LOD и кладёт результат в decompile_cache под тем же
+    ключом — сборка получает cache hit;
+  • Crowbar прогрева идёт в фоновой полосе очереди (ToolLane.BACKGROUND,
+    один слот) — сборка в свою очередь за ним не встаёт;
+  • смена выбора отменяет текущий прогрев — запущенный Crowbar убивается;
+  • «Собрать» (claim_for_build): прогрев той же модели доводится до конца и
+    сборка ждёт его вместо второго Crowbar, остальные прогревы отменяются.
+
+Ошибки прогрева только логируются: сборка потом просто пойдёт обычным путём.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+from src.services import decompile_cache
+from src.services.base_worker import BaseWorker
+from src.services.model_build_service import ModelBuildService
+from src.services.tf2_paths import TF2Paths
+from src.services.tf2_vpk_extract_service import TF2VPKExtractService
+from src.services.tool_runner import ToolLane
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Пауза после смены выбора: пролистывание списка не должно дёргать Crowbar
+_DEBOUNCE_MS = 600
+
+
+class PrefetchStatus:
+    """Итог прогрева одной цели."""
+    CACHED = "cached"        # кэш уже был
+    DONE = "done"            # извлекли и декомпилировали
+    SKIPPED = "skipped"      # режим без модели / нет TF2 / нет Crowbar
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class PrefetchTarget:
+    """Что прогревать: режим сборки и (для шапок) путь MDL из items_game."""
+    mode: str
+    hat_mdl_path: Optional[str] = None
+
+
+def _is_model_mode(mode: Optional[str]) -> bool:
+    """Режимы, для которых сборка декомпилирует модель."""
+    if not mode or mode == "custom":
+        return False
+    from src.data.weapons import SPECIAL_MODES
+    from src.data.player_characters import SPY_MASK_MODE_KEY
+    return mode not in SPECIAL_MODES.values() and mode != SPY_MASK_MODE_KEY
+
+
+def resolve_target(target: PrefetchTarget, tf2_root: str) -> Tuple[Optional[str], List[str]]:
+    """
+    weapon_key и кандидаты путей MDL — ровно как в VPKService.build_vpk,
+    иначе ключ кэша не совпадёт со сборкой.
+
+    Returns:
+        (weapon_key, paths_to_try); (None, []) — прогревать нечего.
+    """
+    from src.data.translations import TRANSLATIONS
+    from src.services.vpk_service import VPKService
+
+    weapon_key, error = VPKService._resolve_weapon_key(target.mode, target.hat_mdl_path)
+    if error or not weapon_key:
+        return None, []
+    paths, error = VPKService._build_mdl_search_paths(
+        target.mode, weapon_key, target.hat_mdl_path, TRANSLATIONS['en'], tf2_root
+    )
+    if error:
+        return None, []
+    return weapon_key, paths
+
+
+def prefetch_model(
+    target: PrefetchTarget,
+    tf2_root: str,
+    should_cancel: Callable[[], bool] = lambda: False,
+) -> str:
+    """
+    Прогревает кэш декомпиляции для одной цели. Никогда не бросает.
+
+    Returns:
+        Одно из значений PrefetchStatus.
+    """
+    if not _is_model_mode(target.mode) or not tf2_root:
+        return PrefetchStatus.SKIPPED
+    extract_dir = decompile_dir = None
+    try:
+        crowbar_exists, _ = TF2Paths.check_crowbar()
+        if not crowbar_exists:
+            return PrefetchStatus.SKIPPED
+        _studiomdl, misc_vpk, _tf_dir = TF2Paths.resolve(tf2_root)
+
+        weapon_key, paths_to_try = resolve_target(target, tf2_root)
+        if not weapon_key:
+            return PrefetchStatus.SKIPPED
+
+        found_rel = None
+        for path in paths_to_try:
+            if should_cancel():
+                return PrefetchStatus.CANCELLED
+            try:
+                if TF2VPKExtractService.check_mdl_exists(misc_vpk, path):
+                    found_rel = path
+                    break
+            except Exception:
+                continue
+        if not found_rel:
+            return PrefetchStatus.FAILED
+
+        # Шапка с %s: сборка берёт реальный стем найденного MDL
+        if target.mode == "hat" and target.hat_mdl_path and "%s" in target.hat_mdl_path:
+            weapon_key = Path(found_rel).stem
+
+        if decompile_cache.get_cached_decompile(weapon_key, misc_vpk, found_rel):
+            return PrefetchStatus.CACHED
+        if should_cancel():
+            return PrefetchStatus.CANCELLED
+
+        extract_dir = tempfile.mkdtemp(prefix="tf2sg_prefetch_mdl_")
+        extracted = TF2VPKExtractService.extract_file_set(misc_vpk, found_rel, extract_dir)
+        mdl_file = next((f for f in extracted if f.endswith('.mdl')), None)
+        if not mdl_file:
+            return PrefetchStatus.FAILED
+        if should_cancel():
+            return PrefetchStatus.CANCELLED
+
+        decompile_dir = tempfile.mkdtemp(prefix="tf2sg_prefetch_decomp_")
+        ModelBuildService.decompile(
+            mdl_file, decompile_dir, os.path.abspath(TF2Paths.get_crowbar_path()),
+            cancel=should_cancel, lane=ToolLane.BACKGROUND,
+        )
+        # Как в сборке: LOD удаляются до кэширования
+        ModelBuildService.remove_lod_files(decompile_dir)
+        if not decompile_cache.save_to_cache(weapon_key, misc_vpk, found_rel, decompile_dir):
+            return PrefetchStatus.FAILED
+        logger.info(f"[PREFETCH] кэш декомпила прогрет: {weapon_key}")
+        return PrefetchStatus.DONE
+    except Exception as exc:
+        if should_cancel():
+            return PrefetchStatus.CANCELLED
+        logger.debug(f"[PREFETCH] {target.mode}: {exc}")
+        return PrefetchStatus.FAILED
+    finally:
+        for _d in (extract_dir, decompile_dir):
+            if _d:
+                shutil.rmtree(_d, ignore_errors=True)
+
+
+class DecompilePrefetchWorker(BaseWorker):
+    """Прогревает кэш для списка целей по порядку (первая — выбранная)."""
+
+    # (mode, PrefetchStatus)
+    prefetched = Signal(str, str)
+
+    def __init__(self, targets: Sequence[PrefetchTarget], tf2_root: str, parent=None):
+        super().__init__(parent)
+        self.targets = list(targets)
+        self.tf2_root = tf2_root
+        self._lock = threading.Lock()
+        self._current: Optional[PrefetchTarget] = None
+        self._current_done = threading.Event()
+        self._last_target = False
+
+    def join_current(self, target: PrefetchTarget) -> Optional[threading.Event]:
+        """
+        Если сейчас прогревается target — доводит его до конца (следующие цели
+        не берутся) и возвращает событие его завершения; иначе None.
+        """
+        with self._lock:
+            if self._current != target:
+                return None
+            self._last_target = True
+            return self._current_done
+
+    def run(self) -> None:
+        # Прогрев не должен отнимать CPU у UI и у идущей сборки
+        self.setPriority(QThread.Priority.LowestPriority)
+        for target in self.targets:
+            with self._lock:
+                if self._last_target or self.isInterruptionRequested():
+                    return
+                self._current = target
+                self._current_done = done = threading.Event()
+            try:
+                status = prefetch_model(target, self.tf2_root, self.isInterruptionRequested)
+            finally:
+                with self._lock:
+                    self._current = None
+                done.set()
+            self.prefetched.emit(target.mode, status)
+
+
+class DecompilePrefetcher(QObject):
+    """
+    Планировщик прогрева для окна: debounce выбора, один активный воркер,
+    отмена предыдущего при новом выборе.
+
+    Отменённый воркер не ждём: его Crowbar убивается через cancel-колбэк,
+    воркер выходит из текущего шага и удаляется сам.
+    """
+
+    def __init__(self, parent=None, debounce_ms: int = _DEBOUNCE_MS):
+        super().__init__(parent)
+        self._worker: Optional[DecompilePrefetchWorker] = None
+        self._retired: List[DecompilePrefetchWorker] = []
+        self._pending: Optional[Tuple[List[PrefetchTarget], str]] = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._start_pending)
+
+    def schedule(self, targets: Sequence[PrefetchTarget], tf2_root: str) -> None:
+        """Новый выбор: отменяет текущий прогрев и ставит новый после паузы."""
+        self.cancel()
+        targets = [t for t in targets if _is_model_mode(t.mode)]
+        if not targets or not tf2_root:
+            return
+        self._pending = (targets, tf2_root)
+        self._timer.start()
+
+    def cancel(self) -> None:
+        """Отменяет отложенный и текущий прогрев, не блокируя UI."""
+        self._timer.stop()
+        self._pending = None
+        if self._worker is not None:
+            self._worker.requestInterruption()
+            self._retired.append(self._worker)
+            self._worker = None
+
+    def claim_for_build(self, target: PrefetchTarget) -> Optional[threading.Event]:
+        """
+        Сборка target стартует: идущий прогрев той же модели присоединяется
+        (возвращается событие его завершения — сборка ждёт его перед
+        декомпиляцией), все остальные прогревы отменяются.
+        """
+        self._timer.stop()
+        self._pending = None
+        worker, self._worker = self._worker, None
+        joined = worker.join_current(target) if worker is not None else None
+        for retired in self._retired:
+            retired.requestInterruption()
+        if worker is not None:
+            if joined is None:
+                worker.requestInterruption()
+            # Присоединённый воркер завершится сам после этой цели
+            self._retired.append(worker)
+        return joined
+
+    def shutdown(self, timeout_ms: int = 2000) -> None:
+        """Остановка при закрытии окна — ждём воркеры, чтобы Qt их не уронил."""
+        self.cancel()
+        for worker in self._retired:
+            worker.stop(timeout_ms)
+
+    def is_active(self) -> bool:
+        return self._worker is not None and self._worker.isRunning()
+
+    def _start_pending(self) -> None:
+        if not self._pending:
+            return
+        targets, tf2_root = self._pending
+        self._pending = None
+        worker = DecompilePrefetchWorker(targets, tf2_root)
+        worker.finished.connect(lambda w=worker: self._on_worker_finished(w))
+        self._worker = worker
+        worker.start()
+
+    def _on_worker_finished(self, worker: DecompilePrefetchWorker) -> None:
+        if worker is self._worker:
+            self._worker = None
+        if worker in self._retired:
+            self._retired.remove(worker)
+        worker.deleteLater()
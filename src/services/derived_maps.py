@@ -0,0 +1,144 @@
+"""
+Карты материала, выводимые из базовой текстуры (режим «Авто из текстуры»).
+
+Все карты одного материала считаются из одних и тех же промежуточных данных:
+яркость, её авто-контраст и градиенты Собеля вычисляются один раз на
+(картинку, размер) и переиспользуются — в сборке через image_store.shared,
+так что phong, selfillum, envmapmask и нормаль не повторяют работу.
+
+Всё считается C-операциями Pillow (convert/filter/point/ImageMath) над
+целыми изображениями — без попиксельного Python:
+
+  • маски — яркость → autocontrast → порог таблицей point;
+  • phong  — RGBA: RGB = яркость, ALPHA = маска;
+  • нормаль — Собель по яркости, вектор (s·dx, s·dy, 1) нормируется, так что
+    Z честно падает на склонах (раньше B был константой 255), а s — сила
+    рельефа («Сила нормали» в диалоге карт).
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image, ImageFilter, ImageMath, ImageOps
+
+from src.data.material_maps import (
+    DEFAULT_NORMAL_STRENGTH, MAX_NORMAL_STRENGTH, MIN_NORMAL_STRENGTH,
+)
+from src.services import image_resize, image_store
+
+# Собель с запасом по диапазону: offset 128 ± Sx/8 не выходит за 0..255
+_SOBEL_X = ImageFilter.Kernel((3, 3), (-1, 0, 1, -2, 0, 2, -1, 0, 1), scale=8, offset=128)
+_SOBEL_Y = ImageFilter.Kernel((3, 3), (-1, -2, -1, 0, 0, 0, 1, 2, 1), scale=8, offset=128)
+
+
+def clamp_strength(value) -> float:
+    """Сила нормали из спецификации карты (строка из UI, число или None)."""
+    try:
+        strength = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_NORMAL_STRENGTH
+    return max(MIN_NORMAL_STRENGTH, min(MAX_NORMAL_STRENGTH, strength))
+
+
+def _threshold_table(threshold: int) -> list:
+    return [255 if p >= threshold else 0 for p in range(256)]
+
+
+def _image_math(fn: Callable, **images):
+    """ImageMath для Pillow >= 10.3 (lambda_eval) и старых версий (eval)."""
+    lambda_eval = getattr(ImageMath, "lambda_eval", None)
+    if lambda_eval is not None:
+        out = lambda_eval(lambda a: fn(a["float"], a["convert"], **{k: a[k] for k in images}),
+                          **images)
+    else:
+        names = ", ".join(images)
+        out = ImageMath.eval(f"fn(float, convert, {names})", fn=fn, **images)
+    if isinstance(out, tuple):
+        return tuple(getattr(o, "im", o) for o in out)
+    return getattr(out, "im", out)
+
+
+class DerivedMaps:
+    """Карты из одной базовой картинки; промежуточные данные считаются лениво и один раз."""
+
+    def __init__(self, base: Image.Image):
+        self._base = base
+        self._luma: Optional[Image.Image] = None
+        self._contrast: Optional[Image.Image] = None
+        self._slopes: Optional[Tuple[Image.Image, Image.Image]] = None
+        self._normals: Dict[float, Tuple[Image.Image, Image.Image, Image.Image]] = {}
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self._base.size
+
+    def luma(self, contrast: bool = True) -> Image.Image:
+        if self._luma is None:
+            self._luma = ImageOps.grayscale(self._base)
+        if not contrast:
+            return self._luma
+        if self._contrast is None:
+            self._contrast = ImageOps.autocontrast(self._luma)
+        return self._contrast
+
+    def mask(self, threshold: Optional[int] = None, contrast: bool = True) -> Image.Image:
+        """L-маска по яркости; с порогом — бинарная (ярче порога = 255)."""
+        gray = self.luma(contrast)
+        return gray if threshold is None else gray.point(_threshold_table(threshold))
+
+    def phong(self, threshold: Optional[int] = None, contrast: bool = True) -> Image.Image:
+        gray = self.luma(contrast)
+        return Image.merge("RGBA", (gray, gray, gray, self.mask(threshold, contrast)))
+
+    def normal(self, strength: float = DEFAULT_NORMAL_STRENGTH,
+               alpha: Optional[Image.Image] = None) -> Image.Image:
+        """
+        Карта нормалей (RGB; RGBA с alpha — напр. маской отражения).
+
+        Каналы: R/G — наклон по X/Y (как у прежней нормали), B — Z
+        нормированного вектора.
+        """
+        strength = clamp_strength(strength)
+        if strength not in self._normals:
+            if self._slopes is None:
+                gray = self.luma(contrast=False)
+                self._slopes = (gray.filter(_SOBEL_X), gray.filter(_SOBEL_Y))
+            # Сила 1.0 — тот же наклон на пологих склонах, что у прежней
+            # нормали (Kernel scale=2 ≈ 8·dh/dx), но без клиппинга
+            k = 8.0 * strength / 255.0
+
+            def _normalize(as_float, convert, sx, sy):
+                x = (as_float(sx) - 128) * k
+                y = (as_float(sy) - 128) * k
+                # Центр 128, как у прежней нормали: плоское место = (128, 128, 255)
+                scale = (x * x + y * y + 1) ** -0.5 * 127
+                return (convert(x * scale + 128, "L"),
+                        convert(y * scale + 128, "L"),
+                        convert(scale + 128, "L"))
+
+            self._normals[strength] = _image_math(
+                _normalize, sx=self._slopes[0], sy=self._slopes[1])
+        r, g, b = self._normals[strength]
+        if alpha is None:
+            return Image.merge("RGB", (r, g, b))
+        if alpha.mode != "L" or alpha.size != self.size:
+            alpha = image_resize.resize(alpha.convert("L"), self.size)
+        return Image.merge("RGBA", (r, g, b, alpha))
+
+    def build(self, kind: str, threshold: Optional[int] = None, contrast: bool = True,
+              normal_strength: float = DEFAULT_NORMAL_STRENGTH) -> Image.Image:
+        if kind == "phong":
+            return self.phong(threshold, contrast)
+        if kind in ("selfillum", "envmapmask"):
+            return self.mask(threshold, contrast)
+        if kind == "normal":
+            return self.normal(normal_strength)
+        return self.luma(contrast)
+
+
+def for_image(path: str, size: Optional[Tuple[int, int]]) -> DerivedMaps:
+    """DerivedMaps базовой картинки в размере size; в сборке — общий для всех карт."""
+    def _make() -> DerivedMaps:
+        return DerivedMaps(image_store.load_resized(path, "RGB", size, Image.LANCZOS))
+    return image_store.shared(("derived_maps",) + image_store.file_key(path)
+                              + (tuple(size) if size else None,), _make)
+
@@ -0,0 +1,117 @@
+"""
+Общая механика дисковых кэшей ~/.tf2skingen_cache/<имя>.
+
+Запись кэша — папка с meta-файлом; mtime meta-файла — время последнего
+использования (кэши обновляют его через os.utime на каждом попадании).
+Отсюда общее для compile_cache, mesh_cache и preview_texture_cache:
+
+  • trim — вытеснение давно не использованных записей сверх бюджета в
+    байтах или в числе записей;
+  • RunningSize — оценка размера кэша между полными обходами папки: при
+    записи новой записи обход нужен только, когда оценка вышла за бюджет;
+  • clear / size_mb — для кнопки очистки кэша в настройках.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def entry_bytes(entry: Path) -> int:
+    """Размер файлов записи (без вложенных папок)."""
+    with os.scandir(entry) as it:
+        return sum(f.stat().st_size for f in it if f.is_file())
+
+
+def _entries(cache_dir: Path, meta_filename: str) -> List[Tuple[float, Path, int]]:
+    """(время использования, папка, размер) записей — от самой давней."""
+    entries = []
+    for entry in cache_dir.iterdir():
+        meta_file = entry / meta_filename
+        if entry.is_dir() and meta_file.exists():
+            entries.append((meta_file.stat().st_mtime, entry, entry_bytes(entry)))
+    entries.sort(key=lambda e: e[0])
+    return entries
+
+
+def trim(
+    cache_dir: Path,
+    meta_filename: str,
+    max_bytes: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    label: str = "кэша",
+) -> Optional[int]:
+    """
+    Удаляет давно не использованные записи, пока кэш больше max_bytes
+    или записей больше max_entries.
+
+    Returns:
+        Размер оставшихся записей в байтах; None — если обход не удался.
+    """
+    try:
+        entries = _entries(cache_dir, meta_filename)
+        total = sum(size for _mtime, _entry, size in entries)
+        count = len(entries)
+        for _mtime, entry, size in entries:
+            over_bytes = max_bytes is not None and total > max_bytes
+            over_count = max_entries is not None and count > max_entries
+            if not over_bytes and not over_count:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            count -= 1
+        return total
+    except Exception as e:
+        logger.warning(f"Ошибка очистки {label}: {e}")
+        return None
+
+
+class RunningSize:
+    """
+    Оценка размера кэша между полными обходами папки.
+
+    Оценка ведётся в пределах процесса: параллельные процессы прогрева
+    пишут в тот же кэш, поэтому первый store в процессе всегда делает
+    полный обход, а дальше учитываются только свои записи.
+    """
+
+    def __init__(self):
+        self.bytes: Optional[int] = None
+
+    def needs_trim(self, written: int, max_bytes: int) -> bool:
+        """Учитывает новую запись; True — оценка вышла за бюджет, нужен trim."""
+        if self.bytes is None or self.bytes + written > max_bytes:
+            return True
+        self.bytes += written
+        return False
+
+    def reset(self, total: Optional[int] = None) -> None:
+        """Запоминает размер после полного обхода (None — размер неизвестен)."""
+        self.bytes = total
+
+
+def clear(cache_dir: Path, label: str = "кэша") -> int:
+    """Удаляет все записи кэша. Возвращает число удалённых записей."""
+    count = 0
+    try:
+        for entry in cache_dir.iterdir():
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+                count += 1
+    except Exception as e:
+        logger.warning(f"Ошибка при очистке {label}: {e}")
+    return count
+
+
+def size_mb(cache_dir: Path) -> float:
+    """Размер папки кэша в МБ."""
+    try:
+        total = sum(f.stat().st_size for f in cache_dir.rglob("*") if f.is_file())
+        return total / (1024 * 1024)
+    except Exception:
+        return 0.0
@@ -0,0 +1,278 @@
+"""
+Параллельная сборка моделей остальных классов мультиклассовой шапки.
+
+Для каждого класса цепочка extract → Crowbar → замена геометрии → патч QC →
+studiomdl занимает десятки секунд, а у шапки на 9 классов их 8. Классы друг от
+друга не зависят (у каждого своя папка hatcls_<wk>, свой кэш декомпила, свой
+$modelname в vpkroot), поэтому задачи идут в пуле процессов размером с число
+ядер.
+
+Функция задачи и её аргументы должны пиклиться (spawn на Windows), поэтому
+здесь только лёгкие импорты — без Qt и без vpk_service.
+"""
+
+import os
+import queue
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.services.decompile_cache import get_cached_decompile, restore_from_cache, save_to_cache
+from src.services.model_build_service import ModelBuildService
+from src.services.model_service import ModelService
+from src.services.smd_service import SMDService
+from src.services.tf2_vpk_extract_service import TF2VPKExtractService
+from src.shared.file_utils import ensure_directory_exists
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Очередь прогресса в дочернем процессе (ставится инициализатором пула)
+_progress_queue = None
+# Как часто родитель вычитывает прогресс, пока ждёт задачи (сек)
+_POLL_INTERVAL = 0.2
+_CRASHED = "процесс сборки упал"
+
+
+@dataclass(frozen=True)
+class HatClassJob:
+    """Сборка модели одного класса. Только строки/флаги — передаётся в процесс."""
+    mdl_rel: str
+    label: str
+    cls_root: str
+    vpkroot_dir: str
+    replace_model_smd_path: str
+    keep_user_materials: bool
+    tf2_misc_vpk: str
+    studiomdl_exe: str
+    crowbar_exe: str
+    tf_dir: str
+
+    @property
+    def weapon_key(self) -> str:
+        return Path(self.mdl_rel).stem
+
+
+@dataclass(frozen=True)
+class HatClassResult:
+    """Итог задачи: ok=False — класс останется с оригинальной игровой моделью."""
+    mdl_rel: str
+    label: str
+    ok: bool
+    message: str = ""
+
+
+class _CallbackQueue:
+    """Подмена очереди прогресса, когда задача идёт в текущем процессе."""
+
+    def __init__(self, callback: Callable[[str, str], None]):
+        self._callback = callback
+
+    def put_nowait(self, item) -> None:
+        self._callback(*item)
+
+
+def _init_worker(progress_queue) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _report(job: HatClassJob, stage: str) -> None:
+    if _progress_queue is not None:
+        try:
+            _progress_queue.put_nowait((job.label, stage))
+        except Exception:
+            pass
+
+
+def build_class_model(job: HatClassJob) -> HatClassResult:
+    """
+    Декомпилирует MDL класса, вставляет геометрию пользователя (скелет — класса,
+    иначе bonemerge съедет), компилирует и кладёт файлы по $modelname класса.
+
+    Никогда не бросает: ошибка одного класса не должна валить остальные.
+    """
+    wk = job.weapon_key
+    cls_root = Path(job.cls_root)
+    extract_d = cls_root / "extract"
+    decomp_d = cls_root / "decompile"
+    comp_d = cls_root / "compile"
+    try:
+        for _d in (extract_d, decomp_d, comp_d):
+            ensure_directory_exists(_d)
+
+        # QC: из кэша декомпила или свежая декомпиляция.
+        cached = get_cached_decompile(wk, job.tf2_misc_vpk, job.mdl_rel)
+        if cached:
+            qc_p = restore_from_cache(cached, str(decomp_d))
+        else:
+            _report(job, "extract")
+            extracted = TF2VPKExtractService.extract_file_set(
+                job.tf2_misc_vpk, job.mdl_rel, str(extract_d)
+            )
+            mdl_file = next((f for f in extracted if f.endswith('.mdl')), None)
+            if not mdl_file:
+                return HatClassResult(job.mdl_rel, job.label, False, "MDL не извлёкся")
+            _report(job, "decompile")
+            qc_p = ModelBuildService.decompile(mdl_file, str(decomp_d), job.crowbar_exe)
+            ModelBuildService.remove_lod_files(str(decomp_d))
+            save_to_cache(wk, job.tf2_misc_vpk, job.mdl_rel, str(decomp_d))
+
+        if not qc_p or not os.path.exists(qc_p):
+            return HatClassResult(job.mdl_rel, job.label, False, "QC не найден")
+
+        ref_smd = ModelBuildService.extract_main_body_smd(qc_p, wk)
+        if not ref_smd:
+            ref_smd = SMDService.find_reference_smd(str(decomp_d), wk)
+        if not ref_smd:
+            return HatClassResult(job.mdl_rel, job.label, False, "reference SMD не найден")
+
+        _report(job, "replace")
+        SMDService.replace_model_sections(
+            job.replace_model_smd_path, ref_smd, ref_smd,
+            keep_user_materials=job.keep_user_materials,
+        )
+
+        # Патчим cdmaterials под console\ (как основная модель) — чтобы
+        # модель класса нашла нашу текстуру по тому же пути.
+        _cdmat = ModelBuildService.extract_cdmaterials_path_from_qc(qc_p)
+        ModelBuildService.patch_qc_file(qc_p, wk, _cdmat)
+
+        _report(job, "compile")
+        ModelBuildService.compile(qc_p, str(comp_d), job.studiomdl_exe, job.tf_dir)
+
+        _sub = type('SubCtx', (), {'compile_dir': comp_d, 'vpkroot_dir': Path(job.vpkroot_dir)})()
+        ModelService.copy_compiled_models_to_vpkroot(_sub, qc_p)
+        _report(job, "done")
+        return HatClassResult(job.mdl_rel, job.label, True)
+    except Exception as exc:
+        return HatClassResult(
+            job.mdl_rel, job.label, False, f"{exc}\n{traceback.format_exc()}"
+        )
+
+
+class HatClassModelService:
+    """Запуск задач сборки моделей классов с ограниченным параллелизмом."""
+
+    @staticmethod
+    def default_workers(job_count: int) -> int:
+        return max(1, min(job_count, os.cpu_count() or 1))
+
+    @staticmethod
+    def run_jobs(
+        jobs: List[HatClassJob],
+        on_progress: Optional[Callable[[str, str], None]] = None,
+        max_workers: Optional[int] = None,
+        task_fn: Callable[[HatClassJob], HatClassResult] = build_class_model,
+    ) -> List[HatClassResult]:
+        """
+        Выполняет задачи в пуле процессов и возвращает результаты в порядке jobs.
+
+        on_progress(label, stage) вызывается в вызывающем потоке по мере того,
+        как дочерние процессы проходят этапы (extract/decompile/replace/
+        compile/done или failed).
+
+        Одна задача (или max_workers=1) выполняется в текущем процессе — поднимать
+        пул ради неё дороже самой экономии. В пуле одновременно не больше
+        max_workers задач: процесс, упавший на задаче (нативный сбой
+        Crowbar/studiomdl), ломает пул — задачи, бывшие в работе, получают
+        ok=False, пул создаётся заново для остальных. В текущий процесс
+        задачи из пула не переносятся.
+        """
+        if not jobs:
+            return []
+        workers = max_workers or HatClassModelService.default_workers(len(jobs))
+
+        def _notify(label: str, stage: str) -> None:
+            if on_progress:
+                try:
+                    on_progress(label, stage)
+                except Exception:
+                    pass
+
+        results: Dict[str, HatClassResult] = {}
+
+        def _record(job: HatClassJob, result: HatClassResult) -> None:
+            if not result.ok:
+                _notify(job.label, "failed")
+            results[job.mdl_rel] = result
+
+        if workers <= 1 or len(jobs) == 1:
+            _init_worker(_CallbackQueue(_notify))
+            try:
+                for job in jobs:
+                    _notify(job.label, "start")
+                    _record(job, task_fn(job))
+            finally:
+                _init_worker(None)
+            return [results[j.mdl_rel] for j in jobs]
+
+        import multiprocessing
+        mp_ctx = multiprocessing.get_context("spawn")
+        progress_queue = mp_ctx.Queue()
+
+        def _drain() -> None:
+            while True:
+                try:
+                    label, stage = progress_queue.get_nowait()
+                except queue.Empty:
+                    return
+                _notify(label, stage)
+
+        waiting = list(jobs)
+        pending: Dict = {}
+        pool: Optional[ProcessPoolExecutor] = None
+
+        def _drop_pool() -> None:
+            nonlocal pool
+            for job in pending.values():
+                _record(job, HatClassResult(job.mdl_rel, job.label, False, _CRASHED))
+            pending.clear()
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = None
+
+        try:
+            while waiting or pending:
+                if pool is None:
+                    pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=mp_ctx,
+                        initializer=_init_worker,
+                        initargs=(progress_queue,),
+                    )
+                try:
+                    while waiting and len(pending) < workers:
+                        pending[pool.submit(task_fn, waiting[0])] = waiting[0]
+                        _notify(waiting.pop(0).label, "start")
+                except BrokenProcessPool:
+                    _drop_pool()
+                    continue
+                done, _ = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                _drain()
+                broken = False
+                for fut in done:
+                    job = pending.pop(fut)
+                    try:
+                        result = fut.result()
+                    except BrokenProcessPool:
+                        result, broken = HatClassResult(job.mdl_rel, job.label, False, _CRASHED), True
+                    except Exception as exc:
+                        result = HatClassResult(job.mdl_rel, job.label, False, str(exc))
+                    _record(job, result)
+                if broken:
+                    logger.warning("[HAT MULTI] процесс сборки класса упал, пул пересоздаётся")
+                    _drop_pool()
+        except OSError as exc:
+            logger.error(f"[HAT MULTI] пул процессов недоступен: {exc}")
+            for job in list(pending.values()) + waiting:
+                _record(job, HatClassResult(job.mdl_rel, job.label, False, str(exc)))
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+            _drain()
+            progress_queue.close()
+
+        return [results[j.mdl_rel] for j in jobs]
@@ -0,0 +1,309 @@
+"""
+Миниатюры шапок для списка косметики.
+
+Полная цепочка текстуры шапки (HatTextureExtractWorker) идёт через Crowbar —
+для иконки в списке это слишком долго. Миниатюре хватает заголовка MDL:
+
+  • из studiohdr_t читаются имена текстур и папки $cdmaterials (MDL берётся
+    прямо из tf2_misc_dir.vpk, без извлечения и декомпиляции);
+  • дальше та же цепочка, что у 3D-превью: VMT → $baseTexture → VTF
+    (Preview3DWorker._find_vmt_content_in_vpk / _find_vtf_for_basetexture);
+  • первый кадр VTF уменьшается до THUMB_SIZE и ложится в дисковый кэш
+    ~/.tf2skingen_cache/hat_thumbs (ключ — MDL + путь и mtime VPK, как у
+    decompile_cache: обновление игры инвалидирует кэш само);
+  • «текстуры нет» тоже запоминается (файл .none), чтобы не искать заново.
+
+HatThumbnailLoader рендерит только то, что запросили видимые строки списка:
+каждая новая пачка запросов вытесняет старую очередь воркера.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+
+from src.services.base_worker import BaseWorker
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_THUMB_DIR = Path(os.path.expanduser("~")) / ".tf2skingen_cache" / "hat_thumbs"
+# Поднимать при изменении размера/способа рендера — старые миниатюры не подойдут
+_THUMB_VERSION = 1
+THUMB_SIZE = 40
+
+_MISS_SUFFIX = ".none"
+# Пауза сбора запросов от отрисовки: при прокрутке рендерим только то, где остановились
+_BATCH_MS = 120
+
+# studiohdr_t: numtextures, textureindex, numcdtextures, cdtextureindex
+_STUDIO_TEXTURES_OFFSET = 204
+_STUDIO_TEXTURE_SIZE = 64      # sizeof(mstudiotexture_t)
+_MAX_REFS = 256
+
+
+def _vpk_paths(tf2_root: str) -> Tuple[str, str]:
+    tf_dir = os.path.join(tf2_root, "tf")
+    return (os.path.join(tf_dir, "tf2_misc_dir.vpk"),
+            os.path.join(tf_dir, "tf2_textures_dir.vpk"))
+
+
+def _read_cstr(data: bytes, offset: int) -> str:
+    if offset < 0 or offset >= len(data):
+        return ""
+    end = data.find(b"\0", offset)
+    return data[offset:end if end >= 0 else len(data)].decode("latin-1")
+
+
+def mdl_texture_refs(data: bytes) -> Tuple[List[str], List[str]]:
+    """
+    ($cdmaterials, имена текстур) из заголовка MDL.
+
+    Пути нормализованы: нижний регистр, прямые слеши, без крайних слешей.
+    Битый/чужой файл → ([], []).
+    """
+    if len(data) < _STUDIO_TEXTURES_OFFSET + 16 or data[:4] != b"IDST":
+        return [], []
+    numtex, texindex, numcd, cdindex = struct.unpack_from("<4i", data, _STUDIO_TEXTURES_OFFSET)
+    if not (0 <= numtex <= _MAX_REFS and 0 <= numcd <= _MAX_REFS):
+        return [], []
+
+    def _norm(s: str) -> str:
+        return s.replace("\\", "/").strip("/").lower()
+
+    names: List[str] = []
+    for i in range(numtex):
+        base = texindex + i * _STUDIO_TEXTURE_SIZE
+        if base < 0 or base + 4 > len(data):
+            break
+        (name_off,) = struct.unpack_from("<i", data, base)
+        name = _norm(_read_cstr(data, base + name_off))
+        if name:
+            names.append(name)
+    cdmaterials: List[str] = []
+    for i in range(numcd):
+        pos = cdindex + i * 4
+        if pos < 0 or pos + 4 > len(data):
+            break
+        (off,) = struct.unpack_from("<i", data, pos)
+        cdmaterials.append(_norm(_read_cstr(data, off)))
+    return cdmaterials, names
+
+
+def _cache_base(mdl_path: str, misc_vpk: str) -> Path:
+    try:
+        mtime = f"{os.path.getmtime(misc_vpk):.0f}"
+    except OSError:
+        mtime = "0"
+    raw = f"{_THUMB_VERSION}|{THUMB_SIZE}|{mdl_path.lower()}|{misc_vpk}|{mtime}"
+    return _THUMB_DIR / hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def cached_thumbnail(mdl_path: str, tf2_root: str) -> Optional[str]:
+    """
+    Миниатюра из дискового кэша.
+
+    Returns:
+        путь к PNG; "" — уже известно, что миниатюры нет; None — ещё не рендерили.
+    """
+    base = _cache_base(mdl_path, _vpk_paths(tf2_root)[0])
+    png = base.with_suffix(".png")
+    if png.exists():
+        return str(png)
+    if base.with_suffix(_MISS_SUFFIX).exists():
+        return ""
+    return None
+
+
+def _find_basetexture_vtf(mdl_data: bytes, paks: list) -> Optional[bytes]:
+    """MDL → первая текстура с найденным VMT и VTF → байты VTF."""
+    from src.services.preview_3d_worker import Preview3DWorker
+
+    cdmaterials, names = mdl_texture_refs(mdl_data)
+    for name in names:
+        for pak in paks:
+            vmt_info = Preview3DWorker._find_vmt_content_in_vpk(pak, cdmaterials, name)
+            if not vmt_info:
+                continue
+            base = Preview3DWorker._parse_basetexture_from_vmt(vmt_info[1])
+            if not base:
+                continue
+            for pak2 in paks:
+                data = Preview3DWorker._find_vtf_for_basetexture(pak2, base)
+                if data:
+                    return data
+    return None
+
+
+def render_thumbnail(mdl_path: str, tf2_root: str, paks: list) -> str:
+    """
+    Рендерит миниатюру шапки в дисковый кэш (paks — открытые misc/textures VPK).
+
+    Returns:
+        путь к PNG или "" (текстура не найдена / не декодировалась).
+        Никогда не бросает исключений.
+    """
+    from src.services import vtf_preview_service as vps
+
+    base = _cache_base(mdl_path, _vpk_paths(tf2_root)[0])
+    try:
+        _THUMB_DIR.mkdir(parents=True, exist_ok=True)
+        mdl_data = vps.read_from_vpks(paks, mdl_path.replace("\\", "/").lower())
+        vtf_data = _find_basetexture_vtf(mdl_data, paks) if mdl_data else None
+        if not vtf_data:
+            # Текстуры в игре нет — запоминаем, чтобы не искать при каждом показе
+            base.with_suffix(_MISS_SUFFIX).touch()
+            return ""
+        from PIL import Image
+
+        from src.services import image_resize
+
+        full_png = vps.vtf_bytes_to_png(vtf_data, str(base) + ".full.png", str(_THUMB_DIR))
+        if not full_png:
+            return ""
+        try:
+            with Image.open(full_png) as img:
+                thumb = image_resize.thumbnail(img.convert("RGBA"), (THUMB_SIZE, THUMB_SIZE))
+            out = base.with_suffix(".png")
+            thumb.save(out)
+        finally:
+            os.remove(full_png)
+        return str(out)
+    except Exception as exc:
+        # Ошибку окружения (нет VTFLib и т.п.) в кэш не пишем — пусть повторится
+        logger.debug(f"[thumbs] миниатюра {mdl_path} не построилась: {exc}")
+        return ""
+
+
+class HatThumbnailWorker(BaseWorker):
+    """Рендерит миниатюры из очереди; очередь можно заменить на ходу (set_queue)."""
+
+    # (mdl_path, png_path | "")
+    ready = Signal(str, str)
+
+    def __init__(self, tf2_root: str, mdl_paths: Sequence[str], parent=None):
+        super().__init__(parent)
+        self.tf2_root = tf2_root
+        self._lock = threading.Lock()
+        self._queue: List[str] = list(mdl_paths)
+
+    def set_queue(self, mdl_paths: Sequence[str]) -> None:
+        """Новая пачка видимых строк вытесняет ещё не обработанные."""
+        with self._lock:
+            self._queue = list(mdl_paths)
+
+    def _next(self) -> Optional[str]:
+        with self._lock:
+            return self._queue.pop(0) if self._queue else None
+
+    def run(self) -> None:
+        from src.services import vtf_preview_service as vps
+
+        self.setPriority(QThread.Priority.LowPriority)
+        paks = vps.open_vpks(list(_vpk_paths(self.tf2_root)))
+        try:
+            while not self.isInterruptionRequested():
+                mdl_path = self._next()
+                if mdl_path is None:
+                    return
+                png = render_thumbnail(mdl_path, self.tf2_root, paks) if paks else ""
+                self.ready.emit(mdl_path, png)
+        finally:
+            for pak in paks:
+                try:
+                    pak.close()
+                except Exception:
+                    pass
+
+
+class HatThumbnailLoader(QObject):
+    """
+    Миниатюры для списка шапок: память → диск → фоновый рендер.
+
+    thumbnail() вызывается из отрисовки строки — то есть только для видимых
+    строк; промахи собираются в пачку и уходят одному воркеру.
+    """
+
+    # (mdl_path, png_path | "")
+    thumbnail_ready = Signal(str, str)
+
+    def __init__(self, parent=None, batch_ms: int = _BATCH_MS):
+        super().__init__(parent)
+        self._tf2_root = ""
+        self._known: Dict[str, str] = {}    # mdl → png | ""
+        self._wanted: List[str] = []
+        self._inflight: List[str] = []     # последняя пачка, отданная воркеру
+        self._worker: Optional[HatThumbnailWorker] = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(batch_ms)
+        self._timer.timeout.connect(self._start_pending)
+
+    def set_tf2_root(self, tf2_root: str) -> None:
+        if tf2_root != self._tf2_root:
+            self.cancel()
+            self._tf2_root = tf2_root
+            self._known.clear()
+
+    def thumbnail(self, mdl_path: str) -> Optional[str]:
+        """Путь к PNG, "" (миниатюры нет) или None — тогда рендер уже поставлен в очередь."""
+        if not mdl_path or not self._tf2_root:
+            return ""
+        if mdl_path in self._known:
+            return self._known[mdl_path]
+        cached = cached_thumbnail(mdl_path, self._tf2_root)
+        if cached is not None:
+            self._known[mdl_path] = cached
+            return cached
+        if mdl_path not in self._wanted:
+            self._wanted.append(mdl_path)
+            if not self._timer.isActive():
+                self._timer.start()
+        return None
+
+    def cancel(self) -> None:
+        self._timer.stop()
+        self._wanted = []
+        self._inflight = []
+        if self._worker is not None:
+            self._worker.set_queue([])
+
+    def shutdown(self, timeout_ms: int = 2000) -> None:
+        self.cancel()
+        if self._worker is not None:
+            self._worker.stop(timeout_ms)
+
+    def _start_pending(self) -> None:
+        batch, self._wanted = self._wanted, []
+        batch = [m for m in batch if m not in self._known]
+        if not batch:
+            return
+        self._inflight = batch
+        if self._worker is not None and self._worker.isRunning():
+            self._worker.set_queue(batch)
+            return
+        self._start_worker(batch)
+
+    def _start_worker(self, batch: List[str]) -> None:
+        worker = HatThumbnailWorker(self._tf2_root, batch)
+        worker.ready.connect(self._on_ready)
+        worker.finished.connect(lambda w=worker: self._on_worker_finished(w))
+        self._worker = worker
+        worker.start()
+
+    def _on_ready(self, mdl_path: str, png: str) -> None:
+        self._known[mdl_path] = png
+        self.thumbnail_ready.emit(mdl_path, png)
+
+    def _on_worker_finished(self, worker: HatThumbnailWorker) -> None:
+        if worker is self._worker:
+            self._worker = None
+        worker.deleteLater()
+        # Пачка могла прийти, когда воркер уже выходил из цикла
+        left = [m for m in self._inflight if m not in self._known]
+        if left and self._worker is None:
+            self._start_worker(left)
@@ -0,0 +1,111 @@
+"""
+Ресайз изображений: фильтр по назначению, reduce и потоки для больших картинок.
+
+Всё на Pillow, без GPU. Назначение (purpose) выбирает фильтр и «зазор»
+reduce:
+
+  • FINAL   — текстуры в VTF: сначала Image.reduce в целое число раз
+    (быстрое усреднение блоков), затем короткий LANCZOS до точного размера.
+    При reducing_gap=3 результат на глаз не отличим от честного LANCZOS
+    по всей картинке (так же делает Pillow-SIMD / resize(reducing_gap=…)).
+  • PREVIEW — превью и миниатюры: reduce как можно сильнее и BILINEAR —
+    в разы быстрее LANCZOS, для экрана качества хватает.
+
+Картинки от TILE_MIN_PIXELS ресемплируются полосами в пуле потоков
+(Pillow отпускает GIL внутри resize). Полоса считается через resize(box=…)
+по тем же исходным строкам, что и цельная картинка, поэтому швов нет —
+отличие от ресайза целиком не больше 1 уровня из-за округления весов.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+
+class ResizeSpec(NamedTuple):
+    resample: int
+    reducing_gap: Optional[float]   # None — без reduce
+
+
+FINAL = "final"
+PREVIEW = "preview"
+PURPOSES = {
+    FINAL: ResizeSpec(Image.LANCZOS, 3.0),
+    PREVIEW: ResizeSpec(Image.BILINEAR, 1.0),
+}
+
+# От этого размера (исходного или итогового) ресемплируем полосами в потоках
+TILE_MIN_PIXELS = 2048 * 2048
+_MIN_STRIP_ROWS = 64
+# Режимы, которые умеют reduce и ресемплинг по box без палитры
+_FAST_MODES = {"L", "LA", "La", "RGB", "RGBA", "RGBa", "RGBX", "I", "F"}
+
+
+def default_jobs() -> int:
+    return min(8, os.cpu_count() or 1)
+
+
+def fit_size(size: Tuple[int, int], box: Tuple[int, int]) -> Tuple[int, int]:
+    """Размер, вписанный в box с сохранением пропорций (как Image.thumbnail, но без увеличения)."""
+    width, height = size
+    scale = min(1.0, box[0] / width, box[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _reduce(img: Image.Image, size: Tuple[int, int], gap: Optional[float]) -> Image.Image:
+    """Image.reduce в целое число раз, пока до size остаётся не меньше gap."""
+    if not gap:
+        return img
+    factor_x = max(1, int(img.width / size[0] / gap))
+    factor_y = max(1, int(img.height / size[1] / gap))
+    if factor_x == 1 and factor_y == 1:
+        return img
+    return img.reduce((factor_x, factor_y))
+
+
+def _resample(img: Image.Image, size: Tuple[int, int], resample: int, jobs: int) -> Image.Image:
+    width, height = size
+    strips = min(jobs * 2, height // _MIN_STRIP_ROWS)
+    large = max(img.width * img.height, width * height) >= TILE_MIN_PIXELS
+    if jobs <= 1 or strips < 2 or not large:
+        return img.resize(size, resample)
+    bounds = [height * i // strips for i in range(strips + 1)]
+    scale = img.height / height
+
+    def _strip(rows: Tuple[int, int]) -> Image.Image:
+        top, bottom = rows
+        return img.resize((width, bottom - top), resample,
+                          box=(0, top * scale, img.width, bottom * scale))
+
+    out = Image.new(img.mode, size)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for top, part in zip(bounds, pool.map(_strip, zip(bounds, bounds[1:]))):
+            out.paste(part, (0, top))
+    return out
+
+
+def resize(img: Image.Image, size: Tuple[int, int], resample: Optional[int] = None,
+           purpose: str = FINAL, jobs: Optional[int] = None) -> Image.Image:
+    """
+    Новый Image размера size (исходный не меняется).
+
+    resample — явный фильтр Pillow; по умолчанию — фильтр назначения purpose.
+    """
+    size = (int(size[0]), int(size[1]))
+    spec = PURPOSES[purpose]
+    resample = spec.resample if resample is None else resample
+    if img.size == size:
+        return img.copy()
+    if img.mode not in _FAST_MODES or resample == Image.NEAREST:
+        return img.resize(size, resample)
+    img = _reduce(img, size, spec.reducing_gap)
+    if img.size == size:
+        return img
+    return _resample(img, size, resample, default_jobs() if jobs is None else jobs)
+
+
+def thumbnail(img: Image.Image, box: Tuple[int, int]) -> Image.Image:
+    """Миниатюра, вписанная в box, по быстрому пути превью."""
+    return resize(img, fit_size(img.size, box), purpose=PREVIEW)
@@ -0,0 +1,42 @@
+"""
+Запись картинок по назначению: насколько сжимать зависит от того, кто прочитает файл.
+
+Конвейер пишет много промежуточных PNG, которые через мгновение читает
+VTFCmd или наш же код (process_image → create_vtf, карты из derive_*,
+кадры превью). Сжатие zlib по умолчанию (compress_level=6) — основная
+цена такого файла: RGBA 2048² пишется ~3.5 с против ~0.4 с без сжатия.
+
+  • HANDOFF — передача внутри сборки (VTFCmd, image_store, варианты):
+    PNG без сжатия. Файл в ~3 раза больше, зато запись и чтение
+    быстрее всех PNG-вариантов;
+  • VIEWER  — кадры для карточек и 3D-превью (уходят в WebEngine через
+    base64): быстрое сжатие compress_level=1, размер почти как у обычного PNG;
+  • EXPORT  — файлы, которые получает пользователь: обычное сжатие.
+
+Контейнер остаётся PNG: имена и расширения промежуточных файлов знают
+VTFCmd (имя VTF берётся из имени входа), image_store и texture_variants,
+а несжатый PNG для них прозрачен. Другие форматы (TGA, JPEG) пишутся как есть.
+"""
+
+from pathlib import Path
+from typing import Union
+
+from PIL import Image
+
+HANDOFF = "handoff"
+VIEWER = "viewer"
+EXPORT = "export"
+PNG_COMPRESS_LEVELS = {
+    HANDOFF: 0,
+    VIEWER: 1,
+    EXPORT: 6,
+}
+
+
+def save(img: Image.Image, path: Union[str, Path], purpose: str = HANDOFF, **params) -> None:
+    """img.save(path) с уровнем сжатия PNG по назначению (явный compress_level важнее)."""
+    level = PNG_COMPRESS_LEVELS[purpose]
+    fmt = params.get("format")
+    if (fmt or "").upper() == "PNG" or (not fmt and str(path).lower().endswith(".png")):
+        params.setdefault("compress_level", level)
+    img.save(path, **params)
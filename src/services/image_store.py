@@ -0,0 +1,232 @@
+"""
+Декодирование исходных изображений один раз на сборку.
+
+За одну сборку одна и та же базовая картинка открывается и ресайзится
+много раз: главный VTF (process_image), карты phong/selfillum/envmapmask
+(derive_effect_map), нормаль с маской (make_normal_with_alpha), авто-нормаль
+(_ensure_derived_normal), BLU и доп. материалы с общей картинкой. Для PNG
+2048² каждый такой заход — полное декодирование + LANCZOS.
+
+ImageStore живёт в пределах одной сборки (VPKService.build_vpk помечен
+@per_build) и хранит:
+
+  • декодированный источник — по (путь, размер файла, mtime);
+  • результат convert + resize — по (источник, режим, размер, фильтр);
+  • уже записанный PNG того же результата — повторный process_image копирует
+    файл вместо кодирования, пока файл существует.
+
+Возвращаемые Image общие для всех потребителей: их нельзя менять на месте
+(paste/putpixel и т.п.) — только строить новые (convert/filter/merge).
+Вне сборки функции модуля просто декодируют файл, как раньше.
+"""
+
+import functools
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, Tuple, TypeVar
+
+from PIL import Image
+
+from src.services import image_resize, image_save
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Бюджет памяти хранилища: ~30 картинок RGBA 2048² — с запасом на сборку
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+
+T = TypeVar("T")
+
+_current: ContextVar[Optional["ImageStore"]] = ContextVar("image_store", default=None)
+
+
+def file_key(path: str) -> tuple:
+    """(абсолютный путь, размер, mtime_ns) — ключ версии файла."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def _same_file(key: tuple) -> bool:
+    try:
+        return file_key(key[0]) == key
+    except OSError:
+        return False
+
+
+def _image_bytes(img: Image.Image) -> int:
+    return img.width * img.height * max(1, len(img.getbands()))
+
+
+def _decode(path: str) -> Image.Image:
+    # Первый кадр анимации — как у Image.open(path).convert(...)
+    with Image.open(path) as img:
+        img.load()
+        return img.copy()
+
+
+def _convert_resize(src: Image.Image, mode: Optional[str], size: Optional[Tuple[int, int]],
+                    resample: Optional[int]) -> Image.Image:
+    img = src.convert(mode) if mode and src.mode != mode else src
+    if size and tuple(size) != img.size:
+        # Явный фильтр — через image_resize (reduce + потоки для больших картинок)
+        img = img.resize(tuple(size)) if resample is None else image_resize.resize(img, size, resample)
+    elif img is src:
+        # Без конвертации и ресайза отдаём копию: источник и результат
+        # не должны делить один объект (их вытесняют из кэша независимо)
+        img = src.copy()
+    return img
+
+
+class ImageStore:
+    """LRU-кэш декодированных и отресайзенных изображений одной сборки."""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._images: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._pngs: dict = {}
+        self._shared: dict = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.decodes = 0
+        self.hits = 0
+
+    def _get(self, key: tuple) -> Optional[Image.Image]:
+        img = self._images.get(key)
+        if img is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+        return img
+
+    def _put(self, key: tuple, img: Image.Image) -> None:
+        size = _image_bytes(img)
+        if size > self.budget_bytes:
+            return
+        self._images[key] = img
+        self._bytes += size
+        while self._bytes > self.budget_bytes and self._images:
+            _old_key, old = self._images.popitem(last=False)
+            self._bytes -= _image_bytes(old)
+
+    def source(self, path: str) -> Image.Image:
+        """Декодированный файл в исходном режиме (первый кадр)."""
+        key = ("src",) + file_key(path)
+        with self._lock:
+            img = self._get(key)
+            if img is None:
+                img = _decode(path)
+                self.decodes += 1
+                self._put(key, img)
+            return img
+
+    def resized(self, path: str, mode: Optional[str], size: Optional[Tuple[int, int]],
+                resample: Optional[int] = None) -> Image.Image:
+        """convert(mode) + resize(size, resample); resample=None — фильтр Pillow по умолчанию."""
+        key = ("img",) + file_key(path) + (mode, tuple(size) if size else None, resample)
+        with self._lock:
+            img = self._get(key)
+            if img is None:
+                img = _convert_resize(self.source(path), mode, size, resample)
+                self._put(key, img)
+            return img
+
+    def save_png(self, img_key: tuple, img: Image.Image, output_path: str) -> None:
+        """Пишет img в output_path; тот же результат, записанный ранее, копируется."""
+        with self._lock:
+            previous = self._pngs.get(img_key)
+            target = os.path.abspath(output_path)
+            # Копируем, только если прежний файл не удалён и не перезаписан
+            if previous and previous[0] != target and _same_file(previous):
+                shutil.copyfile(previous[0], output_path)
+                self.hits += 1
+                return
+            image_save.save(img, output_path)
+            if os.path.splitext(output_path)[1].lower() == ".png":
+                self._pngs[img_key] = file_key(output_path)
+
+    def shared(self, key: tuple, factory: Callable[[], T]) -> T:
+        """
+        Произвольный объект, построенный из картинок сборки (напр. DerivedMaps).
+        В бюджет памяти не входит: таких объектов единицы на материал.
+        """
+        with self._lock:
+            if key not in self._shared:
+                self._shared[key] = factory()
+            else:
+                self.hits += 1
+            return self._shared[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._pngs.clear()
+            self._shared.clear()
+            self._bytes = 0
+
+
+def current() -> Optional[ImageStore]:
+    """Хранилище активной сборки или None."""
+    return _current.get()
+
+
+@contextmanager
+def build_scope(budget_bytes: int = DEFAULT_BUDGET_BYTES) -> Iterator[ImageStore]:
+    """Активирует хранилище на время сборки; вложенный вызов переиспользует внешнее."""
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    store = ImageStore(budget_bytes)
+    token = _current.set(store)
+    try:
+        yield store
+    finally:
+        _current.reset(token)
+        if store.decodes or store.hits:
+            logger.debug(f"[images] декодировано {store.decodes}, повторных использований {store.hits}")
+        store.clear()
+
+
+def per_build(fn):
+    """Декоратор: весь вызов fn идёт с активным ImageStore."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with build_scope():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def open_source(path: str) -> Image.Image:
+    """Декодированный файл: из хранилища сборки либо напрямую."""
+    store = _current.get()
+    return store.source(path) if store is not None else _decode(path)
+
+
+def load_resized(path: str, mode: Optional[str], size: Optional[Tuple[int, int]],
+                 resample: Optional[int] = None) -> Image.Image:
+    """Image.open(path).convert(mode).resize(size, resample) с учётом хранилища."""
+    store = _current.get()
+    if store is not None:
+        return store.resized(path, mode, size, resample)
+    return _convert_resize(_decode(path), mode, size, resample)
+
+
+def shared(key: tuple, factory: Callable[[], T]) -> T:
+    """factory() один раз на сборку по key; вне сборки — каждый раз заново."""
+    store = _current.get()
+    return store.shared(key, factory) if store is not None else factory()
+
+
+def save_resized_png(path: str, mode: Optional[str], size: Optional[Tuple[int, int]],
+                     output_path: str, resample: Optional[int] = None) -> None:
+    """load_resized + save; внутри сборки одинаковый результат кодируется один раз."""
+    store = _current.get()
+    img = load_resized(path, mode, size, resample)
+    if store is None:
+        image_save.save(img, output_path)
+        return
+    key = file_key(path) + (mode, tuple(size) if size else None, resample)
+    store.save_png(key, img, output_path)
@@ -4,11 +4,13 @@
 
 import os
 import shutil
+import struct
+import zlib
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional, Callable
 from src.shared.logging_config import get_logger
 from src.shared.constants import DirectoryPaths
-from src.shared.file_utils import ensure_directory_exists, copy_file_safe
+from src.shared.file_utils import ensure_directory_exists, copy_file_safe, safe_remove
 from src.shared.validators import sanitize_path
 
 logger = get_logger(__name__)
@@ -21,6 +23,33 @@ except ImportError:
     vpk = None
 
 
+# Заголовок VPK v1: сигнатура, версия, длина дерева каталога
+_VPK_SIGNATURE = 0x55aa1234
+_VPK_HEADER = struct.Struct("<3I")
+# Метаданные записи каталога: crc32, preload_length, archive_index,
+# archive_offset, file_length, terminator
+_VPK_ENTRY = struct.Struct("<IHHIIH")
+# archive_index для данных, лежащих в самом _dir.vpk (одиночный архив)
+_VPK_EMBEDDED_INDEX = 0x7fff
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class ConflictPolicy:
+    """
+    Что делать, если один и тот же путь есть в нескольких исходных VPK.
+
+    FIRST_WINS — остаётся файл из первого архива в списке (именно его игра
+    видела бы при старом слиянии: переименованные копии она не грузит);
+    LAST_WINS — файл из последнего архива перекрывает предыдущие;
+    RENAME — оставляем оба, дубликат получает суффикс _1, _2, ...
+    """
+    FIRST_WINS = "first_wins"
+    LAST_WINS = "last_wins"
+    RENAME = "rename"
+
+    ALL = (FIRST_WINS, LAST_WINS, RENAME)
+
+
 class MergeVPKService:
     """Сервис для объединения VPK файлов"""
     
@@ -121,7 +150,9 @@ class MergeVPKService:
         output_filename: str,
         export_folder: str = "export",
         language: str = "en",
-        should_cancel: Optional[Callable[[], bool]] = None
+        should_cancel: Optional[Callable[[], bool]] = None,
+        streaming: bool = False,
+        conflict_policy: str = ConflictPolicy.FIRST_WINS,
     ) -> Tuple[bool, str]:
         """
         Объединяет несколько VPK файлов в один
@@ -131,10 +162,23 @@ class MergeVPKService:
             output_filename: Имя выходного VPK файла
             export_folder: Папка для экспорта
             language: Язык для сообщений об ошибках
+            streaming: True — потоковое слияние без распаковки
+                (merge_vpk_files_streaming); False — распаковка + vpk.exe
+            conflict_policy: Политика конфликтов для потокового режима
             
         Returns:
             Tuple[success, message]
         """
+        if streaming:
+            return MergeVPKService.merge_vpk_files_streaming(
+                vpk_files,
+                output_filename,
+                export_folder,
+                language,
+                conflict_policy=conflict_policy,
+                should_cancel=should_cancel,
+            )
+
         from src.data.translations import TRANSLATIONS
         t = TRANSLATIONS.get(language, TRANSLATIONS['en'])
         
@@ -250,6 +294,234 @@ class MergeVPKService:
                 except Exception:
                     pass
     
+    @staticmethod
+    def merge_vpk_files_streaming(
+        vpk_files: List[Path],
+        output_filename: str,
+        export_folder: str = "export",
+        language: str = "en",
+        conflict_policy: str = ConflictPolicy.FIRST_WINS,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> Tuple[bool, str]:
+        """
+        Объединяет VPK файлы потоково, без промежуточной распаковки и vpk.exe
+
+        Каталог выходного архива строится по записям исходных VPK (без чтения
+        данных), после чего байты каждой записи копируются чанками прямо из
+        исходного архива в выходной — один проход по данным вместо трёх
+        (распаковка → копия в vpkroot → упаковка vpk.exe).
+
+        Args:
+            vpk_files: Список путей к VPK файлам для объединения
+            output_filename: Имя выходного VPK файла
+            export_folder: Папка для экспорта
+            language: Язык для сообщений об ошибках
+            conflict_policy: Политика разрешения конфликтов путей (ConflictPolicy)
+            should_cancel: Колбэк проверки отмены
+
+        Returns:
+            Tuple[success, message]
+        """
+        from src.data.translations import TRANSLATIONS
+        t = TRANSLATIONS.get(language, TRANSLATIONS['en'])
+        cancelled_msg = t.get('merge_cancelled', 'Объединение отменено пользователем')
+
+        if not VPK_AVAILABLE:
+            return False, t.get('vpk_library_not_available', 'VPK library not available')
+
+        if not vpk_files:
+            return False, t.get('no_vpk_files_selected', 'No VPK files selected')
+
+        if conflict_policy not in ConflictPolicy.ALL:
+            raise ValueError(f"Неизвестная политика конфликтов: {conflict_policy}")
+
+        for vpk_file in vpk_files:
+            if not vpk_file.exists():
+                return False, t.get('vpk_file_not_found', 'VPK file not found: {path}').format(path=vpk_file)
+
+        export_folder_path = ensure_directory_exists(export_folder)
+        final_output = export_folder_path / output_filename
+        part_output = export_folder_path / f".{output_filename}.part"
+
+        try:
+            if should_cancel and should_cancel():
+                return False, cancelled_msg
+
+            logger.info(f"Потоковое объединение {len(vpk_files)} VPK файлов (политика: {conflict_policy})")
+            sources = []
+            for vpk_file in vpk_files:
+                try:
+                    sources.append(vpk.open(str(vpk_file)))
+                except Exception as e:
+                    logger.error(f"Ошибка при чтении каталога {vpk_file.name}: {e}", exc_info=True)
+                    return False, t.get('error_extracting_vpk', 'Error extracting VPK: {file}').format(file=vpk_file.name)
+
+            entries = MergeVPKService._collect_stream_entries(sources, conflict_policy)
+
+            if should_cancel and should_cancel():
+                return False, cancelled_msg
+
+            written = MergeVPKService._write_vpk_streaming(entries, part_output, should_cancel)
+            if not written:
+                return False, cancelled_msg
+
+            os.replace(part_output, final_output)
+            logger.info(f"VPK успешно создан: {final_output} ({len(entries)} файлов)")
+            success_msg = t.get('merge_vpk_success', 'VPK files successfully merged: {path}').format(path=final_output)
+            return True, success_msg
+
+        except Exception as e:
+            logger.error(f"Ошибка при потоковом объединении VPK: {e}", exc_info=True)
+            return False, t.get('error_merging_vpk', 'Error merging VPK files: {error}').format(error=str(e))
+        finally:
+            safe_remove(part_output)
+
+    @staticmethod
+    def _collect_stream_entries(sources: list, conflict_policy: str) -> Dict[str, tuple]:
+        """
+        Строит каталог выходного архива по записям исходных VPK
+
+        Сравнение путей регистронезависимое: движок Source ищет файлы
+        без учёта регистра, поэтому Models/A.mdl и models/a.mdl — конфликт.
+
+        Args:
+            sources: Открытые архивы vpk.VPK в порядке объединения
+            conflict_policy: Политика разрешения конфликтов (ConflictPolicy)
+
+        Returns:
+            Словарь {путь в выходном архиве: (архив, исходный путь, метаданные)}
+            в порядке добавления
+        """
+        entries: Dict[str, tuple] = {}
+        # нижний регистр → фактический ключ в entries
+        taken: Dict[str, str] = {}
+
+        for archive in sources:
+            for file_path, metadata in archive.items():
+                out_path = file_path.replace('\\', '/')
+                key = out_path.lower()
+                existing = taken.get(key)
+                if existing is not None:
+                    if conflict_policy == ConflictPolicy.FIRST_WINS:
+                        logger.debug(f"Конфликт {out_path}: оставлен файл из первого архива")
+                        continue
+                    if conflict_policy == ConflictPolicy.LAST_WINS:
+                        logger.debug(f"Конфликт {out_path}: файл заменён версией из {archive.vpk_path}")
+                        del entries[existing]
+                    else:
+                        out_path = MergeVPKService._unique_entry_path(out_path, taken)
+                        key = out_path.lower()
+                        logger.debug(f"Файл {file_path} уже существует, переименован в {out_path}")
+                taken[key] = out_path
+                entries[out_path] = (archive, file_path, metadata)
+
+        return entries
+
+    @staticmethod
+    def _unique_entry_path(file_path: str, taken: Dict[str, str]) -> str:
+        """Подбирает свободное имя dir/name_N.ext — как _merge_directory для файлов на диске"""
+        directory, _, filename = file_path.rpartition('/')
+        stem, dot, ext = filename.rpartition('.')
+        if not dot:
+            stem, ext = filename, ''
+        counter = 1
+        while True:
+            new_name = f"{stem}_{counter}.{ext}" if dot else f"{stem}_{counter}"
+            candidate = f"{directory}/{new_name}" if directory else new_name
+            if candidate.lower() not in taken:
+                return candidate
+            counter += 1
+
+    @staticmethod
+    def _write_vpk_streaming(
+        entries: Dict[str, tuple],
+        output_path: Path,
+        should_cancel: Optional[Callable[[], bool]] = None,
+    ) -> bool:
+        """
+        Пишет одиночный VPK v1 (данные встроены в сам файл)
+
+        Длины всех записей известны из метаданных исходных архивов, поэтому
+        каталог со смещениями пишется сразу, а данные следом копируются
+        чанками. CRC32 считается по ходу копирования и дописывается в каталог
+        в конце — исходным CRC не доверяем.
+
+        Returns:
+            True если архив записан, False если операция отменена
+        """
+        # ext → dir → [(name, out_path)]: формат каталога VPK
+        tree: Dict[str, Dict[str, List[Tuple[str, str]]]] = {}
+        for out_path in entries:
+            directory, _, filename = out_path.rpartition('/')
+            name, dot, ext = filename.rpartition('.')
+            if not dot:
+                name, ext = filename, ''
+            tree.setdefault(ext or ' ', {}).setdefault(directory or ' ', []).append((name, out_path))
+
+        tree_length = 1
+        for ext, dirs in tree.items():
+            tree_length += len(ext.encode('utf-8')) + 1
+            for directory, files in dirs.items():
+                tree_length += len(directory.encode('utf-8')) + 1
+                for name, _ in files:
+                    tree_length += len(name.encode('utf-8')) + 1 + _VPK_ENTRY.size
+                tree_length += 1
+            tree_length += 1
+
+        data_start = _VPK_HEADER.size + tree_length
+        # out_path → позиция метаданных записи в файле (для дописывания CRC)
+        meta_positions: Dict[str, int] = {}
+
+        with open(output_path, 'wb') as out:
+            out.write(_VPK_HEADER.pack(_VPK_SIGNATURE, 1, tree_length))
+
+            data_offset = 0
+            for ext, dirs in tree.items():
+                out.write(ext.encode('utf-8') + b'\x00')
+                for directory, files in dirs.items():
+                    out.write(directory.encode('utf-8') + b'\x00')
+                    for name, out_path in files:
+                        _archive, _src_path, metadata = entries[out_path]
+                        length = metadata[2] + metadata[5]  # preload_length + file_length
+                        out.write(name.encode('utf-8') + b'\x00')
+                        meta_positions[out_path] = out.tell()
+                        out.write(_VPK_ENTRY.pack(0, 0, _VPK_EMBEDDED_INDEX, data_offset, length, 0xffff))
+                        data_offset += length
+                    out.write(b'\x00')
+                out.write(b'\x00')
+            out.write(b'\x00')
+
+            if out.tell() != data_start:
+                raise ValueError("Размер каталога VPK не совпал с расчётным")
+
+            # Данные пишутся в том же порядке, в каком шли смещения в каталоге
+            checksums: Dict[str, int] = {}
+            for ext, dirs in tree.items():
+                for directory, files in dirs.items():
+                    for _name, out_path in files:
+                        if should_cancel and should_cancel():
+                            return False
+                        archive, src_path, metadata = entries[out_path]
+                        expected = metadata[2] + metadata[5]
+                        checksum = 0
+                        copied = 0
+                        with archive.get_vpkfile_instance(src_path, metadata) as src:
+                            for chunk in iter(lambda: src.read(_STREAM_CHUNK_SIZE), b''):
+                                checksum = zlib.crc32(chunk, checksum)
+                                out.write(chunk)
+                                copied += len(chunk)
+                        if copied != expected:
+                            raise ValueError(
+                                f"{src_path} в {archive.vpk_path}: прочитано {copied} байт из {expected}"
+                            )
+                        checksums[out_path] = checksum
+
+            for out_path, checksum in checksums.items():
+                out.seek(meta_positions[out_path])
+                out.write(struct.pack("<I", checksum & 0xffffffff))
+
+        return True
+
     @staticmethod
     def _merge_directory(source_dir: Path, target_dir: Path):
         """
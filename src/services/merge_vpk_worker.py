@@ -5,7 +5,7 @@
 from typing import Tuple
 
 from src.services.base_worker import StandardWorker
-from src.services.merge_vpk_service import MergeVPKService
+from src.services.merge_vpk_service import ConflictPolicy, MergeVPKService
 from src.data.translations import TRANSLATIONS
 
 
@@ -17,22 +17,26 @@ class MergeVpkWorker(StandardWorker):
     progress(int, str), error(str).
     """
 
-    def __init__(self, vpk_files, filename, export_folder, language: str = "en", parent=None):
+    def __init__(self, vpk_files, filename, export_folder, language: str = "en",
+                 conflict_policy: str = ConflictPolicy.FIRST_WINS, parent=None):
         super().__init__(parent)
         self.vpk_files = vpk_files
         self.filename = filename
         self.export_folder = export_folder
         self.language = language
+        self.conflict_policy = conflict_policy
         self.t = TRANSLATIONS.get(language, TRANSLATIONS["en"])
 
     def work(self) -> Tuple[bool, str]:
-        self.progress.emit(10, self.t.get("merge_vpk_extracting", "Извлечение файлов..."))
+        self.progress.emit(10, self.t.get("merge_vpk_streaming", "Объединение архивов..."))
         success, message = MergeVPKService.merge_vpk_files(
             self.vpk_files,
             self.filename,
             self.export_folder,
             self.language,
             should_cancel=self.isInterruptionRequested,
+            streaming=True,
+            conflict_policy=self.conflict_policy,
         )
         if self.isInterruptionRequested():
             success = False
@@ -0,0 +1,164 @@
+"""
+Кэш конвертации SMD → OBJ для 3D Preview.
+
+SmdToObjService.convert разбирает текстовый SMD (у персонажей — десятки МБ)
+на каждое открытие 3D-превью. SMD лежат в decompile_cache и не меняются,
+поэтому OBJ + MTL кэшируются на диске:
+
+  • ключ — версия формата, путь/размер/mtime каждого SMD (основной и
+    bodygroup), фильтр материалов, ось и имя OBJ: новый декомпил (другой
+    mtime) или другие параметры дают другой ключ;
+  • запись пишется во временную папку и переименовывается целиком —
+    параллельные процессы прогрева (prewarm_service) не видят половинок;
+  • на cache hit OBJ/MTL копируются в папку превью, как после конвертации;
+  • кэш ограничен бюджетом _MAX_BYTES: когда оценка размера выходит за
+    него, удаляются давно не использованные (disk_lru). Ключ зависит от
+    mtime SMD, так что после нового декомпила старые записи больше не
+    читаются и уходят первыми.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.services import disk_lru
+from src.services.smd_to_obj_service import SmdToObjService
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_CACHE_DIR = Path(os.path.expanduser("~")) / ".tf2skingen_cache" / "meshes"
+_META_FILENAME = "_mesh_meta.json"
+_CACHE_VERSION = 1
+# Бюджет кэша на диске. OBJ оружия — единицы МБ, персонажа — десятки;
+# полный прогрев каталога помещается целиком
+_MAX_BYTES = 2 * 1024 * 1024 * 1024
+# Оценка размера кэша: прогрев пишет сотни записей, полный обход папки
+# нужен только при выходе за бюджет
+_size = disk_lru.RunningSize()
+
+
+def get_cache_dir() -> Path:
+    """Возвращает папку кэша, создаёт если нет."""
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return _CACHE_DIR
+
+
+def _file_sig(path: str) -> list:
+    try:
+        st = os.stat(path)
+        return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+    except OSError:
+        return [os.path.abspath(path), -1, 0]
+
+
+def _cache_key(smd_path: str, obj_stem: str, include_mats: Optional[set],
+               extra_smd_paths: Optional[list], source_zup: bool) -> str:
+    raw = json.dumps([
+        _CACHE_VERSION,
+        _file_sig(smd_path),
+        [_file_sig(p) for p in (extra_smd_paths or []) if os.path.exists(p)],
+        sorted(include_mats) if include_mats is not None else None,
+        bool(source_zup),
+        obj_stem,
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def _restore(entry_dir: Path, obj_path: str, obj_stem: str) -> Optional[List[str]]:
+    """Копирует запись в папку obj_path; None — записи нет или она битая."""
+    try:
+        with open(entry_dir / _META_FILENAME, "r", encoding="utf-8") as f:
+            mat_names = json.load(f)["mat_names"]
+        obj_dir = os.path.dirname(obj_path)
+        shutil.copyfile(entry_dir / f"{obj_stem}.obj", obj_path)
+        shutil.copyfile(entry_dir / f"{obj_stem}.mtl", os.path.join(obj_dir, f"{obj_stem}.mtl"))
+        # Время использования — для вытеснения старых записей
+        os.utime(entry_dir / _META_FILENAME)
+        return list(mat_names)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _save(entry_dir: Path, obj_path: str, obj_stem: str, mat_names: List[str]) -> int:
+    """Атомарно кладёт запись; возвращает число записанных байт (0 — запись уже была)."""
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f"{entry_dir.name}.", dir=entry_dir.parent))
+    try:
+        shutil.copyfile(obj_path, tmp_dir / f"{obj_stem}.obj")
+        shutil.copyfile(os.path.join(os.path.dirname(obj_path), f"{obj_stem}.mtl"),
+                        tmp_dir / f"{obj_stem}.mtl")
+        with open(tmp_dir / _META_FILENAME, "w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "mat_names": mat_names}, f)
+        written = disk_lru.entry_bytes(tmp_dir)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Запись уже положил другой процесс — она равноценна нашей
+            written = 0
+        return written
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def convert_cached(
+    smd_path: str,
+    obj_path: str,
+    include_mats: Optional[set] = None,
+    extra_smd_paths: Optional[list] = None,
+    source_zup: bool = True,
+) -> Tuple[bool, List[str]]:
+    """SmdToObjService.convert с дисковым кэшем; сигнатура и результат те же."""
+    obj_stem = os.path.splitext(os.path.basename(obj_path))[0]
+    try:
+        entry_dir = get_cache_dir() / _cache_key(
+            smd_path, obj_stem, include_mats, extra_smd_paths, source_zup)
+    except OSError as e:
+        logger.debug(f"Кэш мешей недоступен: {e}")
+        entry_dir = None
+
+    if entry_dir is not None and entry_dir.exists():
+        mat_names = _restore(entry_dir, obj_path, obj_stem)
+        if mat_names is not None:
+            logger.debug(f"Кэш мешей: {os.path.basename(smd_path)}")
+            return True, mat_names
+
+    ok, mat_names = SmdToObjService.convert(
+        smd_path, obj_path,
+        include_mats=include_mats,
+        extra_smd_paths=extra_smd_paths,
+        source_zup=source_zup,
+    )
+    if ok and entry_dir is not None:
+        try:
+            _note_stored(_save(entry_dir, obj_path, obj_stem, mat_names))
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить кэш меша: {e}")
+    return ok, mat_names
+
+
+def _note_stored(written: int) -> None:
+    """Учитывает новую запись; чистит кэш, когда оценка размера вышла за бюджет."""
+    if _size.needs_trim(written, _MAX_BYTES):
+        _trim()
+
+
+def _trim(max_bytes: Optional[int] = None) -> None:
+    """Удаляет давно не использованные записи, пока кэш больше max_bytes."""
+    max_bytes = _MAX_BYTES if max_bytes is None else max_bytes
+    _size.reset(disk_lru.trim(get_cache_dir(), _META_FILENAME, max_bytes=max_bytes,
+                              label="кэша мешей"))
+
+
+def clear_cache() -> int:
+    """Очищает кэш; возвращает количество удалённых записей."""
+    _size.reset()
+    return disk_lru.clear(get_cache_dir(), label="кэша мешей")
+
+
+def get_cache_size_mb() -> float:
+    """Размер кэша в МБ."""
+    return disk_lru.size_mb(get_cache_dir())
@@ -6,10 +6,9 @@
 import os
 import re
 import shutil
-import subprocess
-from typing import List, Optional
-from src.services import qc_skin_parser
-from src.shared.constants import ToolTimeouts
+from typing import Callable, List, Optional
+from src.services import compile_cache, qc_skin_parser
+from src.services.tool_runner import ToolLane, ToolName, ToolRunnerService
 from src.shared.logging_config import get_logger
 
 # Предкомпилированные regex — создаются один раз при импорте модуля
@@ -30,7 +29,9 @@ class ModelBuildService:
     def decompile(
         mdl_path: str,
         out_dir: str,
-        crowbar_decomp_exe: str
+        crowbar_decomp_exe: str,
+        cancel: Optional[Callable[[], bool]] = None,
+        lane: str = ToolLane.DEFAULT,
     ) -> str:
         """
         Декомпилирует .mdl в QC через Crowbar.
@@ -41,7 +42,8 @@ class ModelBuildService:
         Args:
             mdl_path: Путь к .mdl файлу
             out_dir: Куда складывать результат
-            qc_path: Не используется, оставлен для совместимости (legacy код)
+            cancel: Колбэк отмены — True убивает запущенный Crowbar
+            lane: Полоса очереди Crowbar (ToolLane.BACKGROUND — фоновый прогрев)
             
         Returns:
             Путь к созданному QC файлу
@@ -58,22 +60,22 @@ class ModelBuildService:
         os.makedirs(out_dir, exist_ok=True)
         
         # Запускаем Crowbar. Формат команды может отличаться в зависимости от версии, но обычно работает так
-        try:
-            result = subprocess.run(
-                [
-                    os.path.abspath(crowbar_decomp_exe),
-                    "-p", os.path.abspath(mdl_path),
-                    "-o", os.path.abspath(out_dir)
-                ],
-                capture_output=True,
-                text=True,
-                cwd=os.path.dirname(crowbar_decomp_exe),
-                creationflags=subprocess.CREATE_NO_WINDOW,
-                timeout=ToolTimeouts.DECOMPILE,
-            )
-        except subprocess.TimeoutExpired:
+        result = ToolRunnerService.run(
+            ToolName.CROWBAR,
+            [
+                os.path.abspath(crowbar_decomp_exe),
+                "-p", os.path.abspath(mdl_path),
+                "-o", os.path.abspath(out_dir)
+            ],
+            cwd=os.path.dirname(crowbar_decomp_exe),
+            cancel=cancel,
+            lane=lane,
+        )
+        if result.cancelled:
+            raise RuntimeError(f"Decompilation cancelled: {os.path.basename(mdl_path)}")
+        if result.timed_out:
             raise RuntimeError(
-                f"Decompilation timed out after {ToolTimeouts.DECOMPILE}s: "
+                f"Decompilation timed out after {result.timeout}s: "
                 f"Crowbar завис на модели {os.path.basename(mdl_path)}"
             )
 
@@ -777,18 +779,23 @@ class ModelBuildService:
         qc_path: str,
         out_dir: str,
         studiomdl_exe: str,
-        game_dir_or_gameinfo: str
+        game_dir_or_gameinfo: str,
+        use_cache: bool = True,
     ) -> None:
         """
         Компилирует QC файл в .mdl через studiomdl.
         
         studiomdl - это официальный компилятор Source, без него никак.
+        Если QC и все SMD/VTA, на которые он ссылается, побайтно совпадают с
+        прошлой компиляцией — готовые файлы берутся из compile_cache, и
+        studiomdl не запускается (типичная пересборка с новой текстурой).
         
         Args:
             qc_path: Путь к QC файлу
             out_dir: Директория для выходных файлов
             studiomdl_exe: Путь к studiomdl.exe
             game_dir_or_gameinfo: Путь к папке игры или gameinfo.txt
+            use_cache: False — всегда компилировать заново
             
         Raises:
             RuntimeError: Если компил не удался (обычно значит что-то не так с QC или путями)
@@ -800,6 +807,16 @@ class ModelBuildService:
             raise FileNotFoundError(f"studiomdl.exe not found: {studiomdl_exe}")
         
         os.makedirs(out_dir, exist_ok=True)
+
+        cache_key = None
+        if use_cache:
+            _modelname = ModelBuildService.extract_modelname_path(qc_path)
+            _model_key = os.path.splitext(os.path.basename(
+                (_modelname or qc_path).replace('\\', '/')
+            ))[0]
+            cache_key = compile_cache.compute_key(qc_path, studiomdl_exe, _model_key)
+            if cache_key and compile_cache.restore(cache_key, out_dir):
+                return
         
         # Определяем это папка игры или gameinfo.txt
         if os.path.isdir(game_dir_or_gameinfo):
@@ -807,46 +824,31 @@ class ModelBuildService:
         else:
             game_arg = "-gameinfo"
         
+        # Без -quiet: вывод захватывается один раз и нужен для диагностики,
+        # повторный запуск ради него больше не делаем.
         cmd = [
             os.path.abspath(studiomdl_exe),
             game_arg, os.path.abspath(game_dir_or_gameinfo),
             "-nop4",
             "-nopack",
-            "-quiet",           # Подавляем вывод прогресса — studiomdl тратит время на буферизацию stdout
             os.path.abspath(qc_path)
         ]
         
-        # Запускаем без capture_output на happy path — быстрее, т.к. нет буферизации stdout/stderr
-        try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                cwd=os.path.dirname(studiomdl_exe),
-                creationflags=subprocess.CREATE_NO_WINDOW,
-                timeout=ToolTimeouts.COMPILE,
-            )
-        except subprocess.TimeoutExpired:
+        result = ToolRunnerService.run(
+            ToolName.STUDIOMDL, cmd, cwd=os.path.dirname(studiomdl_exe),
+        )
+        if result.timed_out:
             raise RuntimeError(
-                f"Compilation timed out after {ToolTimeouts.COMPILE}s: "
+                f"Compilation timed out after {result.timeout}s: "
                 f"studiomdl завис на {os.path.basename(qc_path)}"
             )
 
         if result.returncode != 0:
-            # На ошибке — перезапускаем с захватом stdout для диагностики
-            result2 = subprocess.run(
-                [c for c in cmd if c != "-quiet"],
-                capture_output=True,
-                text=True,
-                cwd=os.path.dirname(studiomdl_exe),
-                creationflags=subprocess.CREATE_NO_WINDOW,
-                timeout=ToolTimeouts.COMPILE,
-            )
             raise RuntimeError(
                 f"Compilation failed:\n"
                 f"Command: {' '.join([studiomdl_exe, game_arg, game_dir_or_gameinfo, '-nop4', '-nopack', qc_path])}\n"
-                f"STDOUT: {result2.stdout}\n"
-                f"STDERR: {result2.stderr}"
+                f"STDOUT: {result.stdout}\n"
+                f"STDERR: {result.stderr}"
             )
 
         
@@ -924,3 +926,6 @@ class ModelBuildService:
                 f"STDERR: {result.stderr}"
             )
 
+        if cache_key:
+            compile_cache.save(cache_key, out_dir, copied_files, model=qc_basename)
+
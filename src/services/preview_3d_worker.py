@@ -84,13 +84,19 @@ class Preview3DWorker(BaseWorker):
         textures_vpk_path: str,
         lang: str = 'en',
         parent=None,
+        preview_dir: Optional[str] = None,
     ):
+        """
+        preview_dir — папка для OBJ и PNG превью, которой владеет вызывающий
+        (прогрев удаляет её сам); по умолчанию — новый mkdtemp, его остатки
+        убирает temp_janitor.
+        """
         super().__init__(parent)
         self.weapon_key        = weapon_key
         self.mode              = mode
         self.misc_vpk_path     = misc_vpk_path
         self.textures_vpk_path = textures_vpk_path
-        self._preview_dir: Optional[str] = None
+        self._preview_dir: Optional[str] = preview_dir
         self._decomp_dir:  Optional[str] = None  # папка с декомпилированными QC/SMD
         self._hat_decomp_dir: Optional[str] = None  # алиас для режима hat
         self._p = self._PROGRESS.get(lang, self._PROGRESS['en'])
@@ -99,7 +105,8 @@ class Preview3DWorker(BaseWorker):
 
     def run(self) -> None:
         try:
-            self._preview_dir = tempfile.mkdtemp(prefix="tf2sg_3d_")
+            if not self._preview_dir:
+                self._preview_dir = tempfile.mkdtemp(prefix="tf2sg_3d_")
 
             # ── 1. SMD ────────────────────────────────────────────────────── #
             self.progress.emit(self._p['searching'])
@@ -117,7 +124,7 @@ class Preview3DWorker(BaseWorker):
             # ── 2. OBJ ────────────────────────────────────────────────────── #
             self.progress.emit(self._p['converting'])
             obj_path = os.path.join(self._preview_dir, "model.obj")
-            from src.services.smd_to_obj_service import SmdToObjService
+            from src.services import mesh_cache
             from src.data.player_hands import HAND_MODE_KEYS
 
             # Ищем bodygroup SMDs в той же папке (например c_righthand_bodygroup.smd)
@@ -149,7 +156,7 @@ class Preview3DWorker(BaseWorker):
                         f"({_all_mats}) — показываю всю модель"
                     )
 
-            ok, mat_names = SmdToObjService.convert(
+            ok, mat_names = mesh_cache.convert_cached(
                 smd_path, obj_path,
                 include_mats=_include_mats,
                 extra_smd_paths=bodygroup_smds,
@@ -917,9 +924,10 @@ class Preview3DWorker(BaseWorker):
         """Создаёт пустой прозрачный PNG-плейсхолдер (для слота без оригинала)."""
         try:
             from PIL import Image
+            from src.services import image_save
             img = Image.new("RGBA", (256, 256), (0, 0, 0, 0))
             png_path = os.path.join(self._preview_dir, f"{name}.png")
-            img.save(png_path)
+            image_save.save(img, png_path, image_save.VIEWER)
             return png_path
         except Exception as exc:
             logger.debug(f"[3D] Не удалось создать плейсхолдер для {name}: {exc}")
@@ -1147,9 +1155,8 @@ class Preview3DWorker(BaseWorker):
                     continue
 
                 # ── Декодируем все кадры из VTF ───────────────────────────── #
-                from src.services import vtf_preview_service as _vps
-                frame_paths = _vps.vtf_bytes_to_frame_pngs(
-                    vtf_data, self._preview_dir, "texture_blu")
+                from src.services import preview_texture_cache
+                frame_paths = preview_texture_cache.get_frames(vtf_data, "texture_blu")
                 if not frame_paths:
                     continue
 
@@ -1321,12 +1328,11 @@ class Preview3DWorker(BaseWorker):
 
     def _vtf_data_to_png(self, vtf_data: bytes, name: str) -> Optional[str]:
         """
-        Сохраняет VTF-байты как PNG в preview_dir.
-        Возвращает путь к PNG или None при ошибке.
+        Первый кадр VTF-байтов из кэша превью текстур (декодирует при промахе).
+        Возвращает путь к кадру или None при ошибке.
         """
-        from src.services import vtf_preview_service as _vps
-        return _vps.vtf_bytes_to_png(
-            vtf_data, os.path.join(self._preview_dir, f"{name}.png"), self._preview_dir)
+        from src.services import preview_texture_cache
+        return preview_texture_cache.get_first_frame(vtf_data, name)
 
     def _extract_hat_textures_via_qc_vmt(
         self, decomp_dir: str, mat_names: list
@@ -1502,9 +1508,8 @@ class Preview3DWorker(BaseWorker):
                 )
                 return [], 0.0
 
-            from src.services import vtf_preview_service as _vps
-            frame_paths = _vps.vtf_bytes_to_frame_pngs(
-                vtf_data, self._preview_dir, "hat_tex")
+            from src.services import preview_texture_cache
+            frame_paths = preview_texture_cache.get_frames(vtf_data, "hat_tex")
             return frame_paths, 0.0
 
         except Exception as exc:
@@ -1602,9 +1607,8 @@ class Preview3DWorker(BaseWorker):
                 logger.warning(f"Текстура для {self.weapon_key} не найдена в VPK")
                 return [], 0.0
 
-            from src.services import vtf_preview_service as _vps
-            frame_paths = _vps.vtf_bytes_to_frame_pngs(
-                vtf_data, self._preview_dir, "texture")
+            from src.services import preview_texture_cache
+            frame_paths = preview_texture_cache.get_frames(vtf_data, "texture")
 
             # Framerate из VMT
             framerate = 0.0
@@ -1724,9 +1728,8 @@ class Preview3DWorker(BaseWorker):
             if not vtf_data:
                 return [], 0.0
 
-            from src.services import vtf_preview_service as _vps
-            frame_paths = _vps.vtf_bytes_to_frame_pngs(
-                vtf_data, self._preview_dir, "texture_blu")
+            from src.services import preview_texture_cache
+            frame_paths = preview_texture_cache.get_frames(vtf_data, "texture_blu")
             if not frame_paths:
                 return [], 0.0
 
@@ -0,0 +1,199 @@
+"""
+Постоянный кэш декодированных текстур превью.
+
+Каждое открытие 3D-превью, смена RED/BLU, карточка мода и список текстур
+шпиона заново гоняли одни и те же игровые VTF через VTFLib и писали
+полноразмерные PNG во временную папку, которая потом не использовалась.
+Кэш хранит кадры уже декодированными:
+
+  ~/.tf2skingen_cache/preview_textures/<ключ>/000.webp, 001.webp, …
+
+  • ключ — blake2b от байтов VTF (+ версия кэша и размер превью). Места
+    поиска текстуры у превью десятки (стандартные пути, QC, VMT, мод), и
+    почти везде на руках только байты; чтение файла из VPK стоит
+    миллисекунды, декодирование — сотни. Ключ по содержимому заодно
+    инвалидируется сам: обновилась игра или мод — другие байты, другой ключ;
+  • кадры уменьшаются до PREVIEW_MAX_SIZE по быстрому пути image_resize
+    (PREVIEW) и пишутся в WebP — его читают и Qt, и WebEngine 3D-превью;
+  • одна запись — один VTF со всеми кадрами анимации; ограничение — бюджет
+    _MAX_BYTES на диске (а не число записей: одна цель прогрева даёт RED,
+    BLU и каждый материал отдельной записью), сверх него удаляются давно
+    не использованные.
+
+Прогрев (prewarm_service) проходит путь Preview3DWorker, поэтому заполняет
+и этот кэш.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.services import disk_lru
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_CACHE_DIR = Path(os.path.expanduser("~")) / ".tf2skingen_cache" / "preview_textures"
+_META_FILENAME = "_preview_meta.json"
+_CACHE_VERSION = 1
+# Бюджет кэша на диске: сверх него удаляются давно не использованные записи.
+# Полный прогрев каталога (~300 целей × RED/BLU/материалы, WebP ≤1024²)
+# занимает сотни МБ и помещается целиком
+_MAX_BYTES = 1536 * 1024 * 1024
+# Оценка размера кэша: полный обход папки в _trim нужен только при выходе за
+# бюджет, иначе прогрев из тысяч записей обходил бы её после каждой
+_size = disk_lru.RunningSize()
+
+# Большая сторона кадра в кэше: больше экран превью всё равно не показывает
+PREVIEW_MAX_SIZE = 1024
+FRAME_EXT = ".webp"
+_WEBP_QUALITY = 90
+
+
+def get_cache_dir() -> Path:
+    """Возвращает папку кэша, создаёт если нет."""
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return _CACHE_DIR
+
+
+def cache_key(data: bytes) -> str:
+    """Ключ записи по содержимому VTF."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"v{_CACHE_VERSION}|{PREVIEW_MAX_SIZE}|".encode("utf-8"))
+    h.update(data)
+    return h.hexdigest()
+
+
+def decode_vtf(data: bytes) -> Tuple[List[bytes], int, int]:
+    """Все кадры VTF в RGBA через VTFLib: (кадры, ширина, высота)."""
+    from src.services.vtflib_wrapper import VTFLib
+
+    fd, tmp_vtf = tempfile.mkstemp(suffix=".vtf", prefix="_preview_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return VTFLib.read_vtf_all_frames(tmp_vtf)
+    finally:
+        try:
+            os.remove(tmp_vtf)
+        except OSError:
+            pass
+
+
+def lookup(key: str) -> Optional[List[str]]:
+    """Пути кадров записи key или None при промахе."""
+    try:
+        entry_dir = get_cache_dir() / key
+        meta_file = entry_dir / _META_FILENAME
+        if not meta_file.exists():
+            # Папка без meta — обрывок записи, мешал бы сохранить новую
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        files = meta.get("files") or []
+        paths = [entry_dir / name for name in files]
+        if meta.get("version") != _CACHE_VERSION or not paths or not all(p.is_file() for p in paths):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        # Время использования — для вытеснения старых записей
+        os.utime(meta_file)
+        return [str(p) for p in paths]
+    except Exception as e:
+        logger.debug(f"Ошибка чтения кэша превью текстур: {e}")
+        return None
+
+
+def store(key: str, frames: List[bytes], width: int, height: int) -> List[str]:
+    """Сохраняет RGBA-кадры под ключом key в размере превью. Возвращает пути кадров."""
+    from PIL import Image
+
+    from src.services import image_resize
+
+    entry_dir = get_cache_dir() / key
+    tmp_dir = entry_dir.with_name(f"{key}.tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    names = []
+    size = image_resize.fit_size((width, height), (PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE))
+    for i, rgba in enumerate(frames):
+        img = Image.frombytes("RGBA", (width, height), rgba)
+        if img.size != size:
+            img = image_resize.resize(img, size, purpose=image_resize.PREVIEW)
+        name = f"{i:03d}{FRAME_EXT}"
+        img.save(tmp_dir / name, quality=_WEBP_QUALITY)
+        names.append(name)
+    with open(tmp_dir / _META_FILENAME, "w", encoding="utf-8") as f:
+        json.dump({"version": _CACHE_VERSION, "size": list(size), "files": names}, f)
+    written = disk_lru.entry_bytes(tmp_dir)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Ту же текстуру уже сохранил другой процесс (прогрев): записи по
+        # одному ключу равноценны, чужую не трогаем — её могут читать
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        written = 0
+    _note_stored(written)
+    return [str(entry_dir / name) for name in names]
+
+
+def get_frames(data: Optional[bytes], label: str = "") -> List[str]:
+    """
+    Кадры превью VTF (пути к WebP в кэше, по порядку).
+
+    Промах — декодирует VTF и сохраняет кадры. Пустой список при пустых
+    данных или ошибке декодирования. label — только для лога.
+    """
+    if not data:
+        return []
+    key = cache_key(data)
+    cached = lookup(key)
+    if cached is not None:
+        logger.debug(f"[VTF] кэш превью: {label or key[:12]} ({len(cached)} кадр.)")
+        return cached
+    try:
+        frames, width, height = decode_vtf(data)
+    except Exception as exc:
+        logger.warning(f"[VTF] декодирование не удалось ({label or key[:12]}): {exc}")
+        return []
+    if not frames:
+        return []
+    try:
+        return store(key, frames, width, height)
+    except Exception as exc:
+        logger.warning(f"Не удалось сохранить кэш превью текстур: {exc}")
+        return []
+
+
+def get_first_frame(data: Optional[bytes], label: str = "") -> Optional[str]:
+    """Первый кадр превью VTF или None."""
+    frames = get_frames(data, label)
+    return frames[0] if frames else None
+
+
+def _note_stored(written: int) -> None:
+    """Учитывает новую запись; чистит кэш, когда оценка размера вышла за бюджет."""
+    if _size.needs_trim(written, _MAX_BYTES):
+        _trim()
+
+
+def _trim(max_bytes: Optional[int] = None) -> None:
+    """Удаляет давно не использованные записи, пока кэш больше max_bytes."""
+    max_bytes = _MAX_BYTES if max_bytes is None else max_bytes
+    _size.reset(disk_lru.trim(get_cache_dir(), _META_FILENAME, max_bytes=max_bytes,
+                              label="кэша превью текстур"))
+
+
+def clear_cache() -> int:
+    """Удаляет весь кэш превью текстур. Возвращает число удалённых записей."""
+    _size.reset()
+    return disk_lru.clear(get_cache_dir(), label="кэша превью текстур")
+
+
+def get_cache_size_mb() -> float:
+    """Размер кэша в МБ."""
+    return disk_lru.size_mb(get_cache_dir())
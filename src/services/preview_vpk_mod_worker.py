@@ -415,29 +415,9 @@ class PreviewVpkModWorker(BaseWorker):
         return out
 
     def _vtf_bytes_first_frame_png(self, vtf_data: bytes, key: str) -> Optional[str]:
-        """Сохраняет первый кадр VTF в уникальный PNG (для превью карточки)."""
-        import re as _re
-        safe = _re.sub(r'[^A-Za-z0-9_.-]', '_', key)
-        tmp_vtf = os.path.join(self._preview_dir, f"_card_{safe}.vtf")
-        try:
-            with open(tmp_vtf, "wb") as f:
-                f.write(vtf_data)
-            from src.services.vtflib_wrapper import VTFLib
-            from PIL import Image
-            all_frames, w, h = VTFLib.read_vtf_all_frames(tmp_vtf)
-            if not all_frames:
-                return None
-            out = os.path.join(self._preview_dir, f"_card_{safe}.png")
-            Image.frombytes("RGBA", (w, h), all_frames[0]).save(out)
-            return out
-        except Exception:
-            return None
-        finally:
-            try:
-                if os.path.exists(tmp_vtf):
-                    os.remove(tmp_vtf)
-            except Exception:
-                pass
+        """Первый кадр VTF из кэша превью текстур (для превью карточки)."""
+        from src.services import preview_texture_cache
+        return preview_texture_cache.get_first_frame(vtf_data, key)
 
     # ── MDL: декомпиляция из пользовательского VPK ───────────────────────── #
 
@@ -873,25 +853,9 @@ class PreviewVpkModWorker(BaseWorker):
         if not vtf_data:
             return [], 0.0
 
-        # Сохраняем с уникальным именем чтобы не конфликтовать с RED кадрами
         try:
-            from src.services.vtflib_wrapper import VTFLib
-            from PIL import Image
-
-            vtf_file = os.path.join(self._preview_dir, "_tmp_blu_mod.vtf")
-            with open(vtf_file, "wb") as f:
-                f.write(vtf_data)
-
-            all_frames, w, h = VTFLib.read_vtf_all_frames(vtf_file)
-            os.remove(vtf_file)
-
-            frame_paths: list[str] = []
-            for i, rgba in enumerate(all_frames):
-                img  = Image.frombytes("RGBA", (w, h), rgba)
-                name = f"texture_blu_{i:03d}.png" if len(all_frames) > 1 else "texture_blu.png"
-                path = os.path.join(self._preview_dir, name)
-                img.save(path)
-                frame_paths.append(path)
+            from src.services import preview_texture_cache
+            frame_paths = preview_texture_cache.get_frames(vtf_data, "texture_blu")
 
             fps = red_framerate if len(frame_paths) > 1 else 0.0
             return frame_paths, fps
@@ -906,27 +870,12 @@ class PreviewVpkModWorker(BaseWorker):
         self, vtf_data: bytes, framerate: float = 15.0
     ) -> tuple:
         """
-        Конвертирует VTF байты в PNG файлы (по одному на кадр).
+        Кадры VTF из кэша превью текстур (по одному файлу на кадр).
         Возвращает (frame_paths: list[str], framerate: float).
         """
         try:
-            vtf_file = os.path.join(self._preview_dir, "_tmp_mod.vtf")
-            with open(vtf_file, "wb") as f:
-                f.write(vtf_data)
-
-            from src.services.vtflib_wrapper import VTFLib
-            from PIL import Image
-
-            all_frames, w, h = VTFLib.read_vtf_all_frames(vtf_file)
-            os.remove(vtf_file)
-
-            frame_paths: list[str] = []
-            for i, rgba in enumerate(all_frames):
-                img  = Image.frombytes("RGBA", (w, h), rgba)
-                name = f"texture_{i:03d}.png" if len(all_frames) > 1 else "texture.png"
-                path = os.path.join(self._preview_dir, name)
-                img.save(path)
-                frame_paths.append(path)
+            from src.services import preview_texture_cache
+            frame_paths = preview_texture_cache.get_frames(vtf_data, "texture")
 
             if len(frame_paths) > 1:
                 logger.info(
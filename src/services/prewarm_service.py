@@ -0,0 +1,338 @@
+"""
+Прогрев кэшей превью для всего каталога моделей.
+
+Первое открытие 3D-превью модели стоит извлечения из VPK, Crowbar и разбора
+SMD (секунды-десятки секунд). Прогрев проходит каталог заранее — из
+настроек («Прогреть кэш моделей») или из командной строки
+(main.py --prewarm [--classes scout spy] [--jobs N] [--restart]):
+
+  • цель — то же, что открывает превью: оружие всех классов, тела и руки
+    персонажей, снаряды, пикапы и реквизит насмешек (без дублей weapon_key);
+  • каждая цель в отдельном процессе пула: prefetch_model кладёт декомпил под
+    ключом сборки, затем Preview3DWorker.run() без окна проходит путь превью —
+    декомпил превью, mesh_cache (SMD → OBJ) и декодирование текстур;
+  • после каждой цели в PREWARM_STATE пишется контрольная точка: прерванный
+    прогрев продолжается с места остановки, пока не сменилась установка TF2
+    (сигнатура — путь и mtime misc VPK) или не передан restart.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from PySide6.QtCore import QThread, Signal
+
+from src.services.base_worker import BaseWorker
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PREWARM_STATE = Path(os.path.expanduser("~")) / ".tf2skingen_cache" / "prewarm_state.json"
+
+_POLL_INTERVAL = 0.2
+_CRASHED = "процесс прогрева упал"
+
+
+@dataclass(frozen=True)
+class PrewarmTarget:
+    """Одна модель каталога: аргументы Preview3DWorker."""
+    label: str        # "weapon/Scout/c_bat" — ключ контрольной точки
+    weapon_key: str
+    mode: str
+
+
+@dataclass(frozen=True)
+class PrewarmResult:
+    label: str
+    ok: bool
+    message: str = ""
+    seconds: float = 0.0
+
+
+def catalog_targets(classes: Optional[Sequence[str]] = None) -> List[PrewarmTarget]:
+    """
+    Цели прогрева в порядке каталога.
+
+    classes — имена классов из TF2_WEAPONS без учёта регистра ("scout",
+    "all-class"); фильтр касается оружия, тел и рук. Снаряды, пикапы и
+    реквизит насмешек не привязаны к классу и берутся только без фильтра.
+    """
+    from src.data.pickups import PICKUP_MODE_PREFIX, PICKUPS
+    from src.data.player_characters import PLAYER_CHARACTERS
+    from src.data.player_hands import HAND_MODES
+    from src.data.projectiles import PROJECTILE_MODE_PREFIX, PROJECTILES
+    from src.data.taunt_props import TAUNT_PROP_MODE_PREFIX, TAUNT_PROPS
+    from src.data.weapons import TF2_WEAPONS
+
+    wanted = {c.lower() for c in classes} if classes else None
+
+    def _class_ok(cls: str) -> bool:
+        return wanted is None or cls.lower() in wanted
+
+    out: List[PrewarmTarget] = []
+    for cls, slots in TF2_WEAPONS.items():
+        if not _class_ok(cls):
+            continue
+        for slot, items in slots.items():
+            if slot in ("Hands", "PlayerSkin"):
+                continue
+            for wkey in items:
+                out.append(PrewarmTarget(f"weapon/{cls}/{wkey}", wkey, f"{cls.lower()}_{wkey}"))
+    for key, data in PLAYER_CHARACTERS.items():
+        if _class_ok(key.split("_", 1)[0]) and data.get("mdl_path"):
+            out.append(PrewarmTarget(f"body/{key}", data["mdl_path"], key))
+    for key, data in HAND_MODES.items():
+        if _class_ok(key.split("_", 1)[0]) and data.get("arm_model"):
+            out.append(PrewarmTarget(f"hands/{key}", data["arm_model"], key))
+    if wanted is None:
+        for prefix, keys, kind in ((PROJECTILE_MODE_PREFIX, PROJECTILES, "projectile"),
+                                   (PICKUP_MODE_PREFIX, PICKUPS, "pickup"),
+                                   (TAUNT_PROP_MODE_PREFIX, TAUNT_PROPS, "taunt")):
+            for key in keys:
+                out.append(PrewarmTarget(f"{kind}/{key}", key, f"{prefix}{key}"))
+
+    # Одно оружие у нескольких классов — одна и та же модель
+    seen, unique = set(), []
+    for target in out:
+        if target.weapon_key in seen:
+            continue
+        seen.add(target.weapon_key)
+        unique.append(target)
+    return unique
+
+
+def known_classes() -> List[str]:
+    from src.data.weapons import TF2_WEAPONS
+    return [cls.lower() for cls in TF2_WEAPONS]
+
+
+def prewarm_one(target: PrewarmTarget, tf2_root: str) -> PrewarmResult:
+    """Прогревает одну модель (выполняется в дочернем процессе). Никогда не бросает."""
+    started = time.perf_counter()
+    # Результат прогрева — кэши; файлы превью удаляются сразу
+    preview_dir = tempfile.mkdtemp(prefix="tf2sg_3d_")
+    try:
+        from src.services.decompile_prefetch import PrefetchTarget, prefetch_model
+        from src.services.preview_3d_worker import Preview3DWorker
+        from src.services.tf2_paths import TF2Paths
+
+        prefetch_model(PrefetchTarget(target.mode), tf2_root)
+
+        _studiomdl, misc_vpk, _tf_dir = TF2Paths.resolve(tf2_root)
+        textures_vpk = TF2Paths.resolve_textures_vpk(tf2_root) or ""
+        worker = Preview3DWorker(target.weapon_key, target.mode, misc_vpk, textures_vpk,
+                                 preview_dir=preview_dir)
+        errors: List[str] = []
+        worker.failed.connect(errors.append)
+        worker.run()   # без потока: сигналы доходят синхронно
+        return PrewarmResult(target.label, not errors, errors[0] if errors else "",
+                             time.perf_counter() - started)
+    except Exception as exc:
+        return PrewarmResult(target.label, False, str(exc), time.perf_counter() - started)
+    finally:
+        shutil.rmtree(preview_dir, ignore_errors=True)
+
+
+def tf2_signature(tf2_root: str) -> str:
+    """Сигнатура установки: прогрев после обновления TF2 начинается заново."""
+    try:
+        from src.services.tf2_paths import TF2Paths
+        _studiomdl, misc_vpk, _tf_dir = TF2Paths.resolve(tf2_root)
+        return f"{os.path.abspath(misc_vpk)}|{os.stat(misc_vpk).st_mtime_ns}"
+    except (OSError, FileNotFoundError):
+        return os.path.abspath(tf2_root)
+
+
+def load_state(path: Path, signature: str) -> Dict[str, bool]:
+    """Завершённые цели {label: ok} из контрольной точки той же установки."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("signature") != signature:
+        return {}
+    done = data.get("done")
+    return {str(k): bool(v) for k, v in done.items()} if isinstance(done, dict) else {}
+
+
+def save_state(path: Path, signature: str, done: Dict[str, bool]) -> None:
+    """Атомарная запись контрольной точки (tmp + os.replace)."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "done": done}, f)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning(f"[prewarm] контрольная точка не записана: {exc}")
+
+
+def default_jobs() -> int:
+    # Crowbar и разбор SMD грузят и диск, и CPU: половина ядер не душит UI
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _run_in_pool(
+    todo: Sequence[PrewarmTarget],
+    tf2_root: str,
+    workers: int,
+    worker_fn: Callable[[PrewarmTarget, str], PrewarmResult],
+    record: Callable[[PrewarmResult], None],
+    should_cancel: Callable[[], bool],
+) -> None:
+    """
+    Цели — только в дочерних процессах, не больше workers одновременно.
+
+    Процесс, упавший на цели (нативный сбой Crowbar/VTFLib через ctypes),
+    ломает пул: цели, бывшие в работе, засчитываются упавшими, пул
+    создаётся заново. В вызывающем процессе (из UI — процессе приложения)
+    цели не выполняются никогда.
+    """
+    import multiprocessing
+    mp_ctx = multiprocessing.get_context("spawn")
+    queue = list(todo)
+    pending: Dict = {}
+    pool: Optional[ProcessPoolExecutor] = None
+
+    def _drop_pool() -> None:
+        nonlocal pool
+        for target in pending.values():
+            record(PrewarmResult(target.label, False, _CRASHED))
+        pending.clear()
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = None
+
+    try:
+        while (queue or pending) and not should_cancel():
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_ctx)
+            try:
+                while queue and len(pending) < workers:
+                    pending[pool.submit(worker_fn, queue[0], tf2_root)] = queue[0]
+                    queue.pop(0)
+            except BrokenProcessPool:
+                _drop_pool()
+                continue
+            done, _ = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            broken = False
+            for fut in done:
+                target = pending.pop(fut)
+                try:
+                    result = fut.result()
+                except BrokenProcessPool:
+                    result, broken = PrewarmResult(target.label, False, _CRASHED), True
+                except Exception as exc:
+                    result = PrewarmResult(target.label, False, str(exc))
+                record(result)
+            if broken:
+                logger.warning("[prewarm] процесс прогрева упал, пул пересоздаётся")
+                _drop_pool()
+    except OSError as exc:
+        logger.error(f"[prewarm] пул процессов недоступен: {exc}")
+    finally:
+        if pool is not None:
+            # При отмене не ждём запущенные цели: процессы доработают сами,
+            # их кэш останется, а контрольная точка повторит цели позже
+            pool.shutdown(wait=not should_cancel(), cancel_futures=True)
+
+
+def run_prewarm(
+    tf2_root: str,
+    targets: Sequence[PrewarmTarget],
+    jobs: Optional[int] = None,
+    restart: bool = False,
+    on_progress: Optional[Callable[[int, int, PrewarmResult], None]] = None,
+    should_cancel: Callable[[], bool] = lambda: False,
+    state_path: Path = PREWARM_STATE,
+    worker_fn: Callable[[PrewarmTarget, str], PrewarmResult] = prewarm_one,
+    in_process: bool = False,
+) -> Dict[str, int]:
+    """
+    Прогревает targets, пропуская уже пройденные по контрольной точке.
+
+    Цели выполняются в пуле процессов (см. _run_in_pool), даже при jobs=1;
+    in_process=True — последовательно в этом процессе (для тестов).
+
+    on_progress(done, total, result) вызывается в вызывающем потоке после
+    каждой цели. При отмене функция возвращается сразу, не дожидаясь уже
+    запущенных целей: их и остальные подхватит следующий запуск.
+
+    Returns:
+        {"total", "skipped", "ok", "failed", "remaining"}; remaining — цели,
+        до которых не дошли из-за отмены.
+    """
+    signature = tf2_signature(tf2_root)
+    state = {} if restart else load_state(state_path, signature)
+    # Упавшие цели (False) повторяются: причина могла уйти (TF2 докачался)
+    todo = [t for t in targets if not state.get(t.label)]
+    skipped = len(targets) - len(todo)
+    total = len(targets)
+    counts = {"total": total, "skipped": skipped, "ok": 0, "failed": 0}
+    attempted = set()
+    save_state(state_path, signature, state)
+
+    def _record(result: PrewarmResult) -> None:
+        state[result.label] = result.ok
+        attempted.add(result.label)
+        counts["ok" if result.ok else "failed"] += 1
+        save_state(state_path, signature, state)
+        if not result.ok:
+            logger.info(f"[prewarm] {result.label}: {result.message}")
+        if on_progress:
+            try:
+                on_progress(skipped + counts["ok"] + counts["failed"], total, result)
+            except Exception:
+                pass
+
+    workers = min(jobs or default_jobs(), max(1, len(todo)))
+    if in_process:
+        for target in todo:
+            if should_cancel():
+                break
+            _record(worker_fn(target, tf2_root))
+    else:
+        _run_in_pool(todo, tf2_root, workers, worker_fn, _record, should_cancel)
+
+    counts["remaining"] = len(todo) - len(attempted)
+    return counts
+
+
+class PrewarmWorker(BaseWorker):
+    """Прогрев каталога из UI: пул процессов + прогресс по целям."""
+
+    # (пройдено, всего, label последней цели)
+    progress = Signal(int, int, str)
+    # итог run_prewarm
+    done = Signal(object)
+
+    def __init__(self, tf2_root: str, classes: Optional[Sequence[str]] = None,
+                 jobs: Optional[int] = None, restart: bool = False, parent=None):
+        super().__init__(parent)
+        self.tf2_root = tf2_root
+        self.classes = list(classes) if classes else None
+        self.jobs = jobs
+        self.restart = restart
+
+    def run(self) -> None:
+        self.setPriority(QThread.Priority.LowPriority)
+        try:
+            counts = run_prewarm(
+                self.tf2_root,
+                catalog_targets(self.classes),
+                jobs=self.jobs,
+                restart=self.restart,
+                on_progress=lambda n, total, r: self.progress.emit(n, total, r.label),
+                should_cancel=self.isInterruptionRequested,
+            )
+        except Exception as exc:
+            logger.error(f"[prewarm] {exc}", exc_info=True)
+            counts = {"error": str(exc)}
+        self.done.emit(counts)
@@ -0,0 +1,234 @@
+"""
+Фоновая уборка устаревших временных папок.
+
+Раньше main._cleanup_stale_temp синхронно делал shutil.rmtree всех
+tools/temp/build_* до показа сплэша: после упавших или debug-сборок
+(BuildContext.cleanup в debug-режиме ничего не удаляет) там бывают гигабайты,
+и старт ждал удаления.
+
+Теперь уборка идёт в TempJanitorWorker после первой отрисовки окна:
+
+  • кандидаты — build_*/merge_* в tools/temp, созданные до запуска уборки,
+    и остатки mkdtemp превью-воркеров (tf2sg_3d_*, tf2sg_vpkmod_*,
+    tf2sg_custom_* и прочие tf2sg_*) в системном temp старше
+    SYSTEM_TEMP_MIN_AGE — свежие могут принадлежать другому экземпляру;
+  • сначала каждый кандидат атомарно переименовывается в корзину на том же
+    диске (tools/temp/.trash, <temp>/.tf2sg_trash) — имя освобождается сразу,
+    а занятую другим процессом папку Windows переименовать не даст;
+  • потом корзина удаляется поштучно с низким приоритетом ввода-вывода,
+    с проверкой прерывания: недоудалённое доберёт следующий запуск.
+
+Итог (освобождённые байты) окно сохраняет в конфиг — его показывает диалог
+настроек (см. cleanup_report).
+"""
+
+import ctypes
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import QThread, Signal
+
+from src.services.base_worker import BaseWorker
+from src.shared.constants import DirectoryPaths
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BUILD_PREFIXES = ("build_", "merge_")
+SYSTEM_TEMP_PREFIX = "tf2sg_"
+SYSTEM_TEMP_MIN_AGE = 6 * 3600
+BUILD_TRASH = ".trash"
+SYSTEM_TRASH = ".tf2sg_trash"
+
+# Ключ конфига с итогом уборки: {"last_bytes", "last_items", "total_bytes", "at"}
+CONFIG_KEY = "temp_cleanup"
+
+# ioprio_set: номер syscall по архитектуре Linux; класс IDLE
+_IOPRIO_SYSCALL = {"x86_64": 251, "aarch64": 30, "i686": 289, "armv7l": 314}
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+
+def lower_io_priority() -> bool:
+    """Фоновый приоритет ввода-вывода для текущего потока (best effort)."""
+    try:
+        if sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                                   _THREAD_MODE_BACKGROUND_BEGIN))
+        if sys.platform.startswith("linux"):
+            nr = _IOPRIO_SYSCALL.get(platform.machine())
+            if nr is None:
+                return False
+            libc = ctypes.CDLL(None, use_errno=True)
+            # IOPRIO_WHO_PROCESS + who=0 — вызывающий поток
+            return libc.syscall(nr, 1, 0, _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT) == 0
+    except (AttributeError, OSError):
+        pass
+    return False
+
+
+def find_stale(build_temp: Path, system_temp: Path, cutoff: float,
+               min_age: float = SYSTEM_TEMP_MIN_AGE) -> List[Path]:
+    """
+    Кандидаты на удаление.
+
+    build_temp: build_*/merge_* с mtime раньше cutoff (созданы до уборки).
+    system_temp: tf2sg_* старше min_age секунд относительно cutoff.
+    """
+    found: List[Path] = []
+    for root, prefixes, limit in ((build_temp, BUILD_PREFIXES, cutoff),
+                                  (system_temp, (SYSTEM_TEMP_PREFIX,), cutoff - min_age)):
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.startswith(prefixes):
+                continue
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime < limit:
+                    found.append(Path(entry.path))
+            except OSError:
+                continue
+    return found
+
+
+def move_to_trash(path: Path, trash_dir: Path) -> Optional[Path]:
+    """Атомарно переносит path в trash_dir; None — занято или уже удалено."""
+    try:
+        trash_dir.mkdir(parents=True, exist_ok=True)
+        target = trash_dir / f"{path.name}.{uuid.uuid4().hex[:8]}"
+        os.replace(path, target)
+        return target
+    except OSError as exc:
+        logger.debug(f"[janitor] {path} не перенесён в корзину: {exc}")
+        return None
+
+
+def delete_tree(path: Path, should_stop: Callable[[], bool] = lambda: False) -> Tuple[int, bool]:
+    """
+    Удаляет файл или дерево снизу вверх.
+
+    Returns:
+        (освобождено байт, удалено ли целиком) — при прерывании/ошибке
+        остаток остаётся в корзине до следующего запуска.
+    """
+    freed = 0
+    try:
+        if path.is_symlink() or path.is_file():
+            size = path.lstat().st_size
+            path.unlink()
+            return size, True
+    except OSError:
+        return 0, False
+
+    complete = True
+    for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+        if should_stop():
+            return freed, False
+        for name in filenames:
+            fp = os.path.join(dirpath, name)
+            try:
+                size = os.lstat(fp).st_size
+                os.unlink(fp)
+                freed += size
+            except OSError:
+                complete = False
+        for name in dirnames:
+            dp = os.path.join(dirpath, name)
+            try:
+                if os.path.islink(dp):
+                    os.unlink(dp)
+                else:
+                    os.rmdir(dp)
+            except OSError:
+                complete = False
+    try:
+        os.rmdir(path)
+    except OSError:
+        complete = False
+    return freed, complete
+
+
+def format_bytes(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def merge_report(previous: Optional[dict], freed: int, items: int, at: str) -> dict:
+    """Новая запись CONFIG_KEY: итог последней уборки + накопленный объём."""
+    total = int((previous or {}).get("total_bytes", 0)) + freed
+    return {"last_bytes": freed, "last_items": items, "total_bytes": total, "at": at}
+
+
+def cleanup_report(t: dict, report: Optional[dict]) -> str:
+    """Строка для диалога настроек."""
+    if not report:
+        return t.get("temp_cleanup_none", "Temp cleanup: nothing reclaimed yet")
+    return t.get(
+        "temp_cleanup_report",
+        "Temp cleanup at last start: {last} ({items} items), {total} in total",
+    ).format(last=format_bytes(report.get("last_bytes", 0)),
+             items=report.get("last_items", 0),
+             total=format_bytes(report.get("total_bytes", 0)))
+
+
+class TempJanitorWorker(BaseWorker):
+    """Переносит устаревшие temp-папки в корзину и удаляет её в фоне."""
+
+    # (освобождено байт, удалено объектов)
+    cleaned = Signal(object, int)
+
+    def __init__(self, build_temp: Optional[Path] = None, system_temp: Optional[Path] = None,
+                 cutoff: Optional[float] = None, parent=None):
+        super().__init__(parent)
+        self.build_temp = Path(build_temp or DirectoryPaths.BASE_TEMP_DIR)
+        self.system_temp = Path(system_temp or tempfile.gettempdir())
+        self.cutoff = time.time() if cutoff is None else cutoff
+
+    def _trash_dirs(self) -> Sequence[Tuple[Path, Path]]:
+        """(корень, его корзина) — корзина на том же диске, что и корень."""
+        return ((self.build_temp, self.build_temp / BUILD_TRASH),
+                (self.system_temp, self.system_temp / SYSTEM_TRASH))
+
+    def run(self) -> None:
+        self.setPriority(QThread.Priority.IdlePriority)
+        lower_io_priority()
+
+        for path in find_stale(self.build_temp, self.system_temp, self.cutoff):
+            trash = dict(self._trash_dirs()).get(path.parent)
+            if trash is not None:
+                move_to_trash(path, trash)
+
+        freed, items = 0, 0
+        for _root, trash in self._trash_dirs():
+            try:
+                leftovers = list(trash.iterdir())
+            except OSError:
+                continue
+            for item in leftovers:
+                if self.isInterruptionRequested():
+                    break
+                size, complete = delete_tree(item, self.isInterruptionRequested)
+                freed += size
+                items += int(complete)
+            try:
+                trash.rmdir()
+            except OSError:
+                pass
+
+        if freed or items:
+            logger.info(f"Очищено {items} старых temp-объектов ({format_bytes(freed)})")
+        self.cleaned.emit(freed, items)
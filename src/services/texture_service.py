@@ -1,11 +1,12 @@
 import os
 import shutil
-import subprocess
 from pathlib import Path
 from typing import List, Tuple, Optional
-from PIL import Image, ImageOps, ImageFilter
-from src.shared.constants import ToolPaths, ToolTimeouts
+from PIL import Image
+from src.shared.constants import ToolPaths
 from src.shared.logging_config import get_logger
+from src.services import animated_vtf, derived_maps, image_save, image_store, texture_variants, vtf_file
+from src.services.tool_runner import ToolName, ToolRunnerService
 from src.services.vtflib_wrapper import VTFLib, VTFImageFormat, VTFImageFlags
 
 logger = get_logger(__name__)
@@ -46,28 +47,9 @@ class TextureService:
                    (блестит/светится только то, что ярче). None → плавно.
         contrast:  авто-контраст яркости (растягивает динамику).
         """
-        img = Image.open(base_image_path).convert("RGB")
-        if size:
-            img = img.resize(size, Image.LANCZOS)
-        gray = ImageOps.grayscale(img)
-        if contrast:
-            gray = ImageOps.autocontrast(gray)
-
-        def _mask(src):
-            if threshold is None:
-                return src
-            return src.point(lambda p: 255 if p >= threshold else 0)
-
-        if kind == "phong":
-            out = Image.merge("RGBA", (gray, gray, gray, _mask(gray)))
-        elif kind == "selfillum":
-            out = _mask(gray).convert("L")
-        elif kind == "envmapmask":
-            # Маска отражения кубмапа: светлое/металл (или ярче порога) блестит сильнее.
-            out = _mask(gray).convert("L")
-        else:
-            out = gray
-        out.save(out_png_path)
+        # Яркость/контраст общие для всех карт материала (derived_maps)
+        out = derived_maps.for_image(base_image_path, size).build(kind, threshold, contrast)
+        image_save.save(out, out_png_path)
         logger.info(f"Карта '{kind}' выведена из базовой текстуры: {out_png_path}")
         return out_png_path
 
@@ -77,6 +59,7 @@ class TextureService:
         mask_png_path: str,
         out_png_path: str,
         size: Tuple[int, int],
+        strength: float = derived_maps.DEFAULT_NORMAL_STRENGTH,
     ) -> str:
         """
         Строит карту нормалей из базовой текстуры (Sobel по яркости) и кладёт
@@ -87,31 +70,36 @@ class TextureService:
         из альфы нормали ($normalmapalphaenvmapmask). Нормаль приближённая (как и
         любая «нормаль из диффуза»), но направление здесь некритично — важна альфа.
         """
-        base = Image.open(base_image_path).convert("RGB")
-        if size:
-            base = base.resize(size, Image.LANCZOS)
-        gray = ImageOps.grayscale(base)
-        sx = ImageFilter.Kernel((3, 3), (-1, 0, 1, -2, 0, 2, -1, 0, 1), scale=2, offset=128)
-        sy = ImageFilter.Kernel((3, 3), (-1, -2, -1, 0, 0, 0, 1, 2, 1), scale=2, offset=128)
-        r = gray.filter(sx)                      # наклон по X
-        g = gray.filter(sy)                      # наклон по Y
-        b = Image.new("L", gray.size, 255)       # Z вверх (приближённо)
-        mask = Image.open(mask_png_path).convert("L").resize(gray.size, Image.LANCZOS)
-        Image.merge("RGBA", (r, g, b, mask)).save(out_png_path)
+        with Image.open(mask_png_path) as mask:
+            normal = derived_maps.for_image(base_image_path, size).normal(strength, alpha=mask)
+        image_save.save(normal, out_png_path)
         logger.info(f"Нормаль с маской отражения в альфе: {out_png_path}")
         return out_png_path
 
+    @staticmethod
+    def derive_normal_map(
+        base_image_path: str,
+        out_png_path: str,
+        size: Tuple[int, int],
+        strength: float = derived_maps.DEFAULT_NORMAL_STRENGTH,
+    ) -> str:
+        """Карта нормалей (RGB) из яркости базовой текстуры — для авто-нормали phong/rim."""
+        image_save.save(derived_maps.for_image(base_image_path, size).normal(strength), out_png_path)
+        logger.info(f"Нормаль выведена из базовой текстуры: {out_png_path}")
+        return out_png_path
+
     @staticmethod
     def process_image(input_path: str, output_path: str, size: Tuple[int, int]) -> None:
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Изображение не найдено: {input_path}")
-        img = Image.open(input_path)
+        # Источник декодируется один раз на сборку (image_store); повторная
+        # обработка того же файла в тот же размер копирует уже записанный PNG
+        img = image_store.open_source(input_path)
         has_alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
-        if has_alpha:
-            img = img.convert("RGBA").resize(size)
-        else:
-            img = img.convert("RGB").resize(size)
-        img.save(output_path)
+        mode = "RGBA" if has_alpha else "RGB"
+        # Итоговая текстура: reduce + LANCZOS (image_resize, назначение FINAL)
+        image_store.save_resized_png(input_path, mode, size, output_path, Image.LANCZOS)
+        texture_variants.record_png(str(output_path), input_path, mode)
 
     @staticmethod
     def is_animated_image(input_path: str) -> bool:
@@ -121,38 +109,6 @@ class TextureService:
         except Exception:
             return False
 
-    @staticmethod
-    def _extract_animation_frames_rgba(
-        input_path: str,
-        size: Tuple[int, int],
-        max_frames: int = 512,
-    ) -> Tuple[list[bytes], Optional[int]]:
-        frames: list[bytes] = []
-        fps: Optional[int] = None
-
-        with Image.open(input_path) as img:
-            n_frames = int(getattr(img, "n_frames", 1))
-            if n_frames <= 1:
-                frame = img.convert("RGBA").resize(size)
-                frames.append(frame.tobytes())
-                return frames, None
-
-            duration_ms = None
-            try:
-                duration_ms = int(img.info.get("duration", 0)) if isinstance(img.info, dict) else None
-            except Exception:
-                duration_ms = None
-            if duration_ms and duration_ms > 0:
-                fps = max(1, min(240, int(round(1000 / duration_ms))))
-
-            count = min(n_frames, max_frames)
-            for i in range(count):
-                img.seek(i)
-                frame = img.convert("RGBA").resize(size)
-                frames.append(frame.tobytes())
-
-        return frames, fps
-
     @staticmethod
     def _map_format_to_vtflib(format_type: str, has_alpha: bool) -> int:
         vtf_format = TextureService._FORMAT_ALIASES.get(format_type, format_type).upper()
@@ -207,6 +163,43 @@ class TextureService:
 
         return result
 
+    @staticmethod
+    def analyze_animation(
+        input_path: str,
+        size: Tuple[int, int],
+        format_type: str,
+        flags: List[str],
+        options: dict = None,
+    ) -> Tuple[animated_vtf.AnimationPlan, int, int]:
+        """
+        Анализ анимации перед сборкой VTF.
+
+        Одинаковые кадры подряд склеиваются, задержки сводятся к одному FPS,
+        опция anim_budget_mb ограничивает размер VTF (снижением FPS),
+        anim_max_fps — потолок FPS (варианты текстур держат FPS основной сборки).
+
+        Returns:
+            (план, размер VTF по плану, размер VTF из всех исходных кадров) в байтах.
+        """
+        options = options or {}
+        dest_format = TextureService._map_format_to_vtflib(format_type, has_alpha=True)
+        vtf_flags = TextureService._map_flags_to_vtflib(flags, options)
+        mipmaps = not vtf_flags & VTFImageFlags.NOMIP
+        thumbnail = not options.get("nothumbnail", False)
+        width, height = size
+        frame_bytes = sum(vtf_file.level_sizes(
+            width, height, dest_format, vtf_file.mip_count(width, height) if mipmaps else 1))
+        try:
+            budget_bytes = int(float(options.get("anim_budget_mb") or 0) * 1024 * 1024)
+        except (TypeError, ValueError):
+            budget_bytes = 0
+        max_fps = int(options.get("anim_max_fps") or animated_vtf.MAX_FPS)
+        plan = animated_vtf.plan_animation(input_path, max_fps=max_fps, frame_bytes=frame_bytes,
+                                           budget_bytes=budget_bytes)
+        planned = vtf_file.vtf_size(width, height, dest_format, len(plan.frames), mipmaps, thumbnail)
+        source = vtf_file.vtf_size(width, height, dest_format, plan.source_frames, mipmaps, thumbnail)
+        return plan, planned, source
+
     @staticmethod
     def create_animated_vtf(
         input_path: str,
@@ -219,31 +212,37 @@ class TextureService:
         if options is None:
             options = {}
 
-        frames, fps = TextureService._extract_animation_frames_rgba(input_path, size)
-        if not frames:
-            raise RuntimeError("No frames extracted")
-
-        if len(frames) > 1 and fps is None:
-            fps = 30
-
-        has_alpha = True
         if options.get("normal", False):
             raise RuntimeError("Animated normal maps are not supported")
 
-        dest_format = TextureService._map_format_to_vtflib(format_type, has_alpha=has_alpha)
+        plan, planned_bytes, source_bytes = TextureService.analyze_animation(
+            input_path, size, format_type, flags, options)
+        if not plan.frames:
+            raise RuntimeError("No frames extracted")
+        logger.info(
+            f"Анимация {Path(input_path).name}: {plan.summary()}; VTF "
+            f"{planned_bytes / 1048576:.1f} МБ (без анализа {source_bytes / 1048576:.1f} МБ)"
+        )
+
+        # Кадры идут из декодера прямо в файл: в памяти только те, что сжимаются
+        dest_format = TextureService._map_format_to_vtflib(format_type, has_alpha=True)
         vtf_flags = TextureService._map_flags_to_vtflib(flags, options)
-        generate_thumbnail = not options.get("nothumbnail", False)
-
-        VTFLib.create_animated_vtf(
-            frames_rgba8888=frames,
-            width=size[0],
-            height=size[1],
-            dest_format=dest_format,
-            flags=vtf_flags,
-            output_file=output_file,
-            generate_thumbnail=generate_thumbnail,
+        animated_vtf.write_animated_vtf(
+            output_file,
+            animated_vtf.iter_frames(input_path, indices=plan.frames),
+            size,
+            dest_format,
+            vtf_flags,
+            VTFLib.convert_from_rgba8888,
+            thumbnail=not options.get("nothumbnail", False),
+            mipmaps=not vtf_flags & VTFImageFlags.NOMIP,
+            mip_filter=options.get("mfilter") or animated_vtf.DEFAULT_MIP_FILTER,
+            srgb_mips=options.get("srgb_mips", True),
+            frame_count=len(plan.frames),
         )
-        return fps
+        texture_variants.record_animated(input_path, output_file, size, format_type, flags,
+                                         options, plan.fps)
+        return plan.fps
 
     @staticmethod
     def parse_vtf_flags_and_options(flags: List[str]) -> Tuple[List[str], dict]:
@@ -346,6 +345,7 @@ class TextureService:
     def create_vtf(png_path: str, output_path: str, format_type: str, flags: List[str], options: dict = None) -> None:
         if options is None:
             options = {}
+        texture_variants.record_vtf(png_path, output_path, format_type, flags, options)
         vtf_format = TextureService._FORMAT_ALIASES.get(format_type, format_type)
         has_alpha = False
         try:
@@ -368,6 +368,8 @@ class TextureService:
             vtf_args.append("-nothumbnail")
         if options.get("noreflectivity", False):
             vtf_args.append("-noreflectivity")
+        if str(options.get("mfilter", "")).upper() in animated_vtf.MIP_FILTERS:
+            vtf_args.extend(["-mfilter", str(options["mfilter"]).upper()])
         if options.get("gamma", False):
             vtf_args.append("-gamma")
             if "gcorrection" in options:
@@ -417,14 +419,11 @@ class TextureService:
         # Без check=True: при ненулевом коде формируем информативное исключение
         # с выводом VTFCmd, а не сырой CalledProcessError.
         from src.shared.exceptions import VTFCreationError
-        try:
-            result = subprocess.run(vtf_args, capture_output=True, text=True,
-                                    creationflags=subprocess.CREATE_NO_WINDOW,
-                                    timeout=ToolTimeouts.VTF)
-        except subprocess.TimeoutExpired:
+        result = ToolRunnerService.run(ToolName.VTFCMD, vtf_args)
+        if result.timed_out:
             raise VTFCreationError(
                 ' '.join(vtf_args), "",
-                f"VTFCmd timed out after {ToolTimeouts.VTF}s"
+                f"VTFCmd timed out after {result.timeout}s"
             )
         if result.returncode != 0:
             raise VTFCreationError(' '.join(vtf_args), result.stdout, result.stderr)
@@ -0,0 +1,344 @@
+"""
+Несколько вариантов текстур мода (напр. «lite» 512² и «HQ» 2048²) за одну сборку.
+
+Модель (извлечение, декомпиляция, патч QC, компиляция) от размера и формата
+текстур не зависит, поэтому конвейер VPKService.build_vpk проходит один раз —
+в самом большом из вариантов. Пока он идёт, RenderLog запоминает каждый
+рендер текстуры:
+
+  • process_image → create_vtf: исходник, режим и PNG (источник уже
+    декодирован в image_store сборки);
+  • прочие create_vtf (карты, нормали): копия PNG без потерь;
+  • create_animated_vtf: исходный GIF/APNG и итоговый FPS.
+
+После упаковки первого VPK каждый следующий вариант перерисовывает эти
+текстуры прямо в vpkroot — размер масштабируется пропорционально (с учётом
+пер-материальных размеров), формат сборки заменяется форматом варианта — и
+пакуется в свой VPK с суффиксом. Копии VTF (BLU = RED, варианты стилей)
+находятся по содержимому и обновляются вместе с оригиналом; VTF, которые
+не рендерились (готовые VTF пользователя, оригиналы игры), не меняются.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from src.services import image_resize, image_save, image_store
+from src.shared.constants import DirectoryPaths
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class TextureVariant(NamedTuple):
+    suffix: str                 # "" — основной VPK без суффикса
+    size: Tuple[int, int]
+    format_type: str
+
+
+class _VTFRender(NamedTuple):
+    png_path: Optional[Path]    # копия PNG без потерь (None, если есть source)
+    source: Optional[tuple]     # (путь исходника, режим) — если PNG из process_image
+    output_dir: Path
+    vtf_path: Path
+    size: Tuple[int, int]
+    format_type: str
+    flags: Tuple[str, ...]
+    options: dict
+
+
+class _AnimatedRender(NamedTuple):
+    input_path: str
+    vtf_path: Path
+    size: Tuple[int, int]
+    format_type: str
+    flags: Tuple[str, ...]
+    options: dict
+    fps: Optional[int]
+
+
+def from_config(entries, default_format: str = "DXT1") -> List[TextureVariant]:
+    """
+    Доп. варианты из конфига: [{"suffix": "lite", "size": 512, "format": "DXT1"}, ...].
+
+    size — число (квадрат) или [w, h]; format по умолчанию — формат сборки.
+    Некорректные записи и повторы суффикса пропускаются с предупреждением.
+    """
+    variants: List[TextureVariant] = []
+    seen = {""}
+    for entry in entries or ():
+        try:
+            suffix = str(entry.get("suffix", "")).strip()
+            size = entry.get("size")
+            size = (int(size), int(size)) if isinstance(size, (int, float, str)) else tuple(
+                int(v) for v in size)
+            if len(size) != 2 or min(size) <= 0:
+                raise ValueError(f"size {size}")
+            fmt = str(entry.get("format") or default_format)
+        except (AttributeError, TypeError, ValueError) as exc:
+            logger.warning(f"[VARIANTS] пропущен вариант {entry!r}: {exc}")
+            continue
+        if suffix in seen:
+            logger.warning(f"[VARIANTS] пропущен вариант без суффикса или с повтором: {entry!r}")
+            continue
+        seen.add(suffix)
+        variants.append(TextureVariant(suffix, size, fmt))
+    return variants
+
+
+def parse_spec(text: str) -> List[dict]:
+    """
+    Строка поля настроек → записи конфига для from_config.
+
+    "lite:512, hq:2048x1024:DXT5" → [{"suffix": "lite", "size": 512},
+    {"suffix": "hq", "size": [2048, 1024], "format": "DXT5"}].
+    Некорректные элементы пропускаются с предупреждением.
+    """
+    entries = []
+    for item in text.replace(";", ",").split(","):
+        parts = [p.strip() for p in item.split(":")]
+        if not parts[0]:
+            continue
+        try:
+            if len(parts) not in (2, 3):
+                raise ValueError("ожидается суффикс:размер[:формат]")
+            dims = [int(v) for v in parts[1].lower().split("x")]
+            if len(dims) not in (1, 2) or min(dims) <= 0:
+                raise ValueError(f"размер {parts[1]!r}")
+        except ValueError as exc:
+            logger.warning(f"[VARIANTS] пропущен вариант {item.strip()!r}: {exc}")
+            continue
+        entry = {"suffix": parts[0], "size": dims[0] if len(dims) == 1 else dims}
+        if len(parts) == 3 and parts[2]:
+            entry["format"] = parts[2].upper()
+        entries.append(entry)
+    return entries
+
+
+def format_spec(entries) -> str:
+    """Записи конфига → строка поля настроек (обратное parse_spec)."""
+    items = []
+    for entry in entries or ():
+        if not isinstance(entry, dict) or not entry.get("suffix") or not entry.get("size"):
+            continue
+        size = entry["size"]
+        size = "x".join(str(v) for v in size) if isinstance(size, (list, tuple)) else str(size)
+        item = f"{entry['suffix']}:{size}"
+        if entry.get("format"):
+            item += f":{entry['format']}"
+        items.append(item)
+    return ", ".join(items)
+
+
+def plan(primary: TextureVariant, extras: Sequence[TextureVariant]) -> List[TextureVariant]:
+    """Все варианты сборки, самый большой первым: его и рендерит конвейер, остальные — уменьшение."""
+    variants = [primary] + [v for v in extras if v.suffix != primary.suffix]
+    return sorted(variants, key=lambda v: v.size[0] * v.size[1], reverse=True)
+
+
+def vpk_filename(filename: str, suffix: str) -> str:
+    """my_mod.vpk + lite → my_mod_lite.vpk."""
+    if not suffix:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}_{suffix}{ext or '.vpk'}"
+
+
+def scaled_size(size: Tuple[int, int], base: Tuple[int, int],
+                target: Tuple[int, int]) -> Tuple[int, int]:
+    """Размер текстуры size в варианте target, если сборка рендерилась в base."""
+    return (max(1, round(size[0] * target[0] / base[0])),
+            max(1, round(size[1] * target[1] / base[1])))
+
+
+def _digest(path: Path) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+class RenderLog:
+    """Журнал рендеров текстур одной сборки (в пределах recording())."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.renders: List[object] = []
+        self._pngs: Dict[str, tuple] = {}
+        self._copies: Optional[Dict[Path, List[Path]]] = None
+
+    def add_png(self, png_path: str, source_path: str, mode: Optional[str]) -> None:
+        """process_image записал PNG из исходника — сам PNG хранить не нужно."""
+        self._pngs[os.path.abspath(png_path)] = (image_store.file_key(png_path), source_path, mode)
+
+    @staticmethod
+    def _unchanged(key: tuple) -> bool:
+        try:
+            return image_store.file_key(key[0]) == key
+        except OSError:
+            return False
+
+    def add_vtf(self, png_path: str, output_dir: str, format_type: str,
+                flags: Sequence[str], options: Optional[dict]) -> None:
+        png = Path(png_path)
+        known = self._pngs.get(os.path.abspath(png_path))
+        source = None
+        kept = None
+        with Image.open(png) as img:
+            size = img.size
+        if known and self._unchanged(known[0]):
+            source = known[1:]
+        else:
+            kept = self.directory / str(len(self.renders)) / png.name
+            kept.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(png, kept)
+        self.renders.append(_VTFRender(
+            kept, source, Path(output_dir), Path(output_dir) / f"{png.stem}.vtf", size,
+            format_type, tuple(flags or ()), dict(options or {})))
+
+    def add_animated(self, input_path: str, output_file: str, size: Tuple[int, int],
+                     format_type: str, flags: Sequence[str], options: Optional[dict],
+                     fps: Optional[int]) -> None:
+        self.renders.append(_AnimatedRender(
+            input_path, Path(output_file), tuple(size), format_type, tuple(flags or ()),
+            dict(options or {}), fps))
+
+    def _latest(self) -> list:
+        """Последний рендер каждого VTF (перезаписанные раньше не нужны)."""
+        latest = {}
+        for render in self.renders:
+            latest.pop(render.vtf_path, None)
+            latest[render.vtf_path] = render
+        return list(latest.values())
+
+    def _index_copies(self, root: Path) -> Dict[Path, List[Path]]:
+        """Файлы под root, побайтно совпадающие с отрендеренными VTF (копии BLU/стилей)."""
+        rendered = {r.vtf_path.resolve() for r in self.renders if r.vtf_path.exists()}
+        by_digest: Dict[bytes, List[Path]] = {}
+        for path in root.rglob("*.vtf"):
+            by_digest.setdefault(_digest(path), []).append(path.resolve())
+        copies = {}
+        for vtf in rendered:
+            same = by_digest.get(_digest(vtf), [])
+            copies[vtf] = [p for p in same if p != vtf and p not in rendered]
+        return copies
+
+    def render_variant(
+        self,
+        vpkroot: Path,
+        base: TextureVariant,
+        variant: TextureVariant,
+        create_vtf: Callable[..., None],
+        create_animated: Callable[..., Optional[int]],
+    ) -> int:
+        """
+        Перерисовывает записанные текстуры под variant поверх vpkroot.
+
+        create_vtf(png, output_dir, format, flags, options) и
+        create_animated(input, output_file, size, format, flags, options) —
+        те же кодировщики, что у сборки. Возвращает число текстур.
+        """
+        if self._copies is None:
+            self._copies = self._index_copies(Path(vpkroot))
+        # Только текстуры, чьи VTF дожили до упаковки (временные — удалены)
+        renders = [r for r in self._latest() if r.vtf_path.resolve() in self._copies]
+        token = _current.set(None)
+        try:
+            for index, render in enumerate(renders):
+                fmt = variant.format_type if render.format_type == base.format_type else render.format_type
+                size = scaled_size(render.size, base.size, variant.size)
+                if isinstance(render, _AnimatedRender):
+                    options = dict(render.options)
+                    # FPS уже записан в VMT: вариант обязан совпасть по времени
+                    options.pop("anim_budget_mb", None)
+                    if render.fps:
+                        options["anim_max_fps"] = render.fps
+                    create_animated(render.input_path, str(render.vtf_path), size, fmt,
+                                    list(render.flags), options)
+                else:
+                    work = self.directory / "variant" / str(index)
+                    work.mkdir(parents=True, exist_ok=True)
+                    png = work / render.vtf_path.with_suffix(".png").name
+                    if render.source is not None:
+                        image_store.save_resized_png(render.source[0], render.source[1], size,
+                                                     str(png), Image.LANCZOS)
+                    else:
+                        with Image.open(render.png_path) as img:
+                            image_save.save(image_resize.resize(img, size), png)
+                    create_vtf(str(png), str(render.output_dir), fmt, list(render.flags),
+                               dict(render.options))
+                    png.unlink()
+                for copy in self._copies[render.vtf_path.resolve()]:
+                    shutil.copyfile(render.vtf_path, copy)
+        finally:
+            _current.reset(token)
+        logger.info(f"[VARIANTS] {variant.suffix or 'основной'}: {len(renders)} текстур "
+                    f"в {variant.size[0]}x{variant.size[1]} {variant.format_type}")
+        return len(renders)
+
+
+_current: ContextVar[Optional[RenderLog]] = ContextVar("texture_variants", default=None)
+
+
+def current() -> Optional[RenderLog]:
+    """Журнал активной сборки с вариантами или None."""
+    return _current.get()
+
+
+@contextmanager
+def recording() -> Iterator[RenderLog]:
+    """Записывает рендеры текстур на время сборки; копии PNG удаляются по выходу."""
+    DirectoryPaths.BASE_TEMP_DIR.mkdir(parents=True, exist_ok=True)
+    directory = Path(tempfile.mkdtemp(prefix="variants_", dir=DirectoryPaths.BASE_TEMP_DIR))
+    log = RenderLog(directory)
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def per_build(fn):
+    """Декоратор build_vpk: запись рендеров, только если запрошены variants."""
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # variants может прийти и позиционно — берём его по сигнатуре fn
+        bound = signature.bind_partial(*args, **kwargs).arguments
+        if not bound.get("variants", kwargs.get("variants")):
+            return fn(*args, **kwargs)
+        with recording():
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def record_png(png_path: str, source_path: str, mode: Optional[str]) -> None:
+    log = _current.get()
+    if log is not None:
+        log.add_png(png_path, source_path, mode)
+
+
+def record_vtf(png_path: str, output_dir: str, format_type: str,
+               flags: Sequence[str], options: Optional[dict]) -> None:
+    log = _current.get()
+    if log is not None:
+        log.add_vtf(png_path, output_dir, format_type, flags, options)
+
+
+def record_animated(input_path: str, output_file: str, size: Tuple[int, int], format_type: str,
+                    flags: Sequence[str], options: Optional[dict], fps: Optional[int]) -> None:
+    log = _current.get()
+    if log is not None:
+        log.add_animated(input_path, output_file, size, format_type, flags, options, fps)
@@ -0,0 +1,314 @@
+"""
+Единая точка запуска внешних инструментов (Crowbar, studiomdl, VTFCmd).
+
+Раньше каждый сервис сам вызывал subprocess.run со своим таймаутом, а
+studiomdl при ошибке запускался второй раз без -quiet — только чтобы увидеть
+вывод. Теперь все вызовы идут через очередь ToolRunnerService:
+
+  • у каждого инструмента свой пул потоков — постоянная очередь задач с
+    ограничением одновременных запусков (studiomdl пишет в общую папку игры,
+    десяток параллельных VTFCmd только толкаются за диск);
+  • таймаут берётся из ToolTimeouts по имени инструмента, а не в каждом
+    месте вызова;
+  • stdout/stderr захватываются один раз и остаются в ToolResult для
+    диагностики — повторный запуск не нужен;
+  • длительность каждого вызова пишется в историю (timings/stats);
+  • фоновые задачи (прогрев кэша) идут в отдельной полосе ToolLane.BACKGROUND
+    с одним слотом — не занимают очередь, в которой ждёт сборка; запуск с
+    cancel-колбэком опрашивает его и убивает процесс при отмене.
+
+Ограничение действует в пределах процесса: пулы процессов (сборка моделей
+классов шапки) получают по своему экземпляру очереди.
+
+Путь к инструменту с расширением .py запускается текущим интерпретатором —
+так в тестах вместо .exe подставляется локальная заглушка и вся цепочка
+работает на Linux.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+from src.shared.constants import ToolTimeouts
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ToolName:
+    """Имена инструментов — ключи таймаутов, лимитов и статистики."""
+    CROWBAR = "crowbar"
+    STUDIOMDL = "studiomdl"
+    VTFCMD = "vtfcmd"
+
+
+class ToolLane:
+    """Полосы очереди: у каждой свои потоки и свой лимит одновременных запусков."""
+    DEFAULT = ""
+    BACKGROUND = "background"
+
+
+# Таймауты по инструменту (секунды)
+_TOOL_TIMEOUTS: Dict[str, int] = {
+    ToolName.CROWBAR: ToolTimeouts.DECOMPILE,
+    ToolName.STUDIOMDL: ToolTimeouts.COMPILE,
+    ToolName.VTFCMD: ToolTimeouts.VTF,
+}
+
+# Сколько запусков одного инструмента может идти одновременно
+_TOOL_CONCURRENCY: Dict[str, int] = {
+    ToolName.CROWBAR: max(1, min(4, os.cpu_count() or 1)),
+    ToolName.STUDIOMDL: max(1, min(4, os.cpu_count() or 1)),
+    ToolName.VTFCMD: max(1, min(8, os.cpu_count() or 1)),
+}
+
+# Лимит запусков в неосновных полосах (на инструмент)
+_LANE_CONCURRENCY: Dict[str, int] = {
+    ToolLane.BACKGROUND: 1,
+}
+
+# Как часто запуск с cancel-колбэком проверяет отмену, секунды
+_CANCEL_POLL_INTERVAL = 0.2
+
+# Сколько последних вызовов помнит история таймингов
+_HISTORY_SIZE = 200
+
+# На Windows не показываем консольное окно инструмента; на других ОС флага нет
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+@dataclass
+class ToolResult:
+    """Итог одного запуска: вывод захвачен один раз и хранится для диагностики."""
+    tool: str
+    args: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    timeout: Optional[float] = None
+    timed_out: bool = False
+    cancelled: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and not self.cancelled and self.returncode == 0
+
+    @property
+    def command(self) -> str:
+        return ' '.join(self.args)
+
+
+class ToolRunnerService:
+    """Очередь запусков внешних инструментов с лимитами и замером времени."""
+
+    _lock = threading.Lock()
+    _executors: Dict[str, ThreadPoolExecutor] = {}
+    _history: Deque[ToolResult] = deque(maxlen=_HISTORY_SIZE)
+
+    @staticmethod
+    def get_timeout(tool: str) -> Optional[float]:
+        return _TOOL_TIMEOUTS.get(tool)
+
+    @staticmethod
+    def get_concurrency(tool: str, lane: str = ToolLane.DEFAULT) -> int:
+        if lane != ToolLane.DEFAULT:
+            return min(_LANE_CONCURRENCY.get(lane, 1), _TOOL_CONCURRENCY.get(tool, 1))
+        return _TOOL_CONCURRENCY.get(tool, 1)
+
+    @staticmethod
+    def _executor(tool: str, lane: str = ToolLane.DEFAULT) -> ThreadPoolExecutor:
+        name = f"{tool}-{lane}" if lane else tool
+        with ToolRunnerService._lock:
+            executor = ToolRunnerService._executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=ToolRunnerService.get_concurrency(tool, lane),
+                    thread_name_prefix=f"tool-{name}",
+                )
+                ToolRunnerService._executors[name] = executor
+            return executor
+
+    @staticmethod
+    def _launch_args(args: List[str]) -> List[str]:
+        """Заглушка-скрипт (.py) запускается текущим интерпретатором."""
+        if args and str(args[0]).lower().endswith('.py'):
+            return [sys.executable] + [str(a) for a in args]
+        return [str(a) for a in args]
+
+    @staticmethod
+    def _execute_cancellable(tool: str, args: List[str], cwd: Optional[str],
+                             timeout: Optional[float], cancel: Callable[[], bool]) -> ToolResult:
+        """Как subprocess.run, но с опросом cancel(): при отмене процесс убивается."""
+        started = time.perf_counter()
+        timed_out = cancelled = False
+        if cancel():
+            return ToolResult(tool=tool, args=list(args), returncode=-1, stdout="", stderr="",
+                              duration=0.0, timeout=timeout, cancelled=True)
+        proc = subprocess.Popen(
+            ToolRunnerService._launch_args(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            cwd=cwd,
+            creationflags=_CREATION_FLAGS,
+        )
+        while True:
+            wait = _CANCEL_POLL_INTERVAL
+            if timeout is not None:
+                wait = max(0.0, min(wait, started + timeout - time.perf_counter()))
+            try:
+                stdout, stderr = proc.communicate(timeout=wait)
+                break
+            except subprocess.TimeoutExpired:
+                timed_out = timeout is not None and time.perf_counter() - started >= timeout
+                cancelled = not timed_out and cancel()
+                if timed_out or cancelled:
+                    proc.kill()
+                    stdout, stderr = proc.communicate()
+                    break
+        return ToolResult(
+            tool=tool,
+            args=list(args),
+            returncode=-1 if timed_out or cancelled else proc.returncode,
+            stdout=stdout or "",
+            stderr=stderr or "",
+            duration=time.perf_counter() - started,
+            timeout=timeout,
+            timed_out=timed_out,
+            cancelled=cancelled,
+        )
+
+    @staticmethod
+    def _execute(tool: str, args: List[str], cwd: Optional[str], timeout: Optional[float],
+                 cancel: Optional[Callable[[], bool]] = None) -> ToolResult:
+        if cancel is not None:
+            result = ToolRunnerService._execute_cancellable(tool, args, cwd, timeout, cancel)
+            ToolRunnerService._record(result)
+            return result
+        started = time.perf_counter()
+        try:
+            completed = subprocess.run(
+                ToolRunnerService._launch_args(args),
+                capture_output=True,
+                text=True,
+                errors="replace",
+                cwd=cwd,
+                creationflags=_CREATION_FLAGS,
+                timeout=timeout,
+            )
+            result = ToolResult(
+                tool=tool,
+                args=list(args),
+                returncode=completed.returncode,
+                stdout=completed.stdout or "",
+                stderr=completed.stderr or "",
+                duration=time.perf_counter() - started,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired as exc:
+            result = ToolResult(
+                tool=tool,
+                args=list(args),
+                returncode=-1,
+                stdout=ToolRunnerService._as_text(exc.stdout),
+                stderr=ToolRunnerService._as_text(exc.stderr),
+                duration=time.perf_counter() - started,
+                timeout=timeout,
+                timed_out=True,
+            )
+        ToolRunnerService._record(result)
+        return result
+
+    @staticmethod
+    def _record(result: ToolResult) -> None:
+        with ToolRunnerService._lock:
+            ToolRunnerService._history.append(result)
+        logger.debug(
+            f"[TOOL] {result.tool}: код {result.returncode}, {result.duration:.2f}s"
+            + (" (таймаут)" if result.timed_out else "")
+            + (" (отменён)" if result.cancelled else "")
+        )
+
+    @staticmethod
+    def _as_text(data) -> str:
+        if data is None:
+            return ""
+        if isinstance(data, bytes):
+            return data.decode(errors="replace")
+        return data
+
+    @staticmethod
+    def submit(
+        tool: str,
+        args: List[str],
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cancel: Optional[Callable[[], bool]] = None,
+        lane: str = ToolLane.DEFAULT,
+    ) -> "Future[ToolResult]":
+        """
+        Ставит запуск в очередь инструмента. Таймаут по умолчанию — из ToolTimeouts.
+
+        cancel — колбэк отмены: проверяется перед стартом и во время работы,
+        True убивает процесс (ToolResult.cancelled). lane — полоса очереди
+        (ToolLane.BACKGROUND — для фоновых задач, не мешающих сборке).
+
+        Future никогда не завершается исключением из-за ненулевого кода,
+        таймаута или отмены — это видно по ToolResult.ok / timed_out / cancelled.
+        """
+        if timeout is None:
+            timeout = ToolRunnerService.get_timeout(tool)
+        return ToolRunnerService._executor(tool, lane).submit(
+            ToolRunnerService._execute, tool, list(args), cwd, timeout, cancel
+        )
+
+    @staticmethod
+    def run(
+        tool: str,
+        args: List[str],
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cancel: Optional[Callable[[], bool]] = None,
+        lane: str = ToolLane.DEFAULT,
+    ) -> ToolResult:
+        """Синхронный запуск через очередь инструмента (ждёт свободный слот)."""
+        return ToolRunnerService.submit(
+            tool, args, cwd=cwd, timeout=timeout, cancel=cancel, lane=lane
+        ).result()
+
+    @staticmethod
+    def timings(tool: Optional[str] = None) -> List[ToolResult]:
+        """Последние запуски (все или одного инструмента), от старых к новым."""
+        with ToolRunnerService._lock:
+            history = list(ToolRunnerService._history)
+        return [r for r in history if tool is None or r.tool == tool]
+
+    @staticmethod
+    def stats() -> Dict[str, dict]:
+        """Сводка по истории: {tool: {count, failed, total, max}} (секунды)."""
+        summary: Dict[str, dict] = {}
+        for r in ToolRunnerService.timings():
+            s = summary.setdefault(r.tool, {"count": 0, "failed": 0, "total": 0.0, "max": 0.0})
+            s["count"] += 1
+            s["failed"] += 0 if r.ok else 1
+            s["total"] += r.duration
+            s["max"] = max(s["max"], r.duration)
+        return summary
+
+    @staticmethod
+    def reset() -> None:
+        """Останавливает очереди и чистит историю (для тестов и выхода из приложения)."""
+        with ToolRunnerService._lock:
+            executors = list(ToolRunnerService._executors.values())
+            ToolRunnerService._executors.clear()
+            ToolRunnerService._history.clear()
+        for executor in executors:
+            executor.shutdown(wait=False)
@@ -11,6 +11,7 @@ from .build_context import BuildContext, TextureBuildContext
 from .vmt_service import VMTService
 from .build_service import BuildService
 from .texture_service import TextureService
+from . import derived_maps, image_store, texture_variants, vram_report
 from .packaging_service import PackagingService
 from .model_service import ModelService
 from .tf2_vpk_extract_service import TF2VPKExtractService
@@ -479,6 +480,12 @@ class VPKService:
         # материале вместе с отражением активен эффект с нормалью (rim/phong) и
         # нормаль генерим МЫ — печём маску отражения в альфу нормали и используем
         # $normalmapalphaenvmapmask. Тогда обе фичи работают одновременно.
+        # «Сила нормали» — одна на материал: у карт с авто-нормалью (phong / rim
+        # light) диалог держит её поля одинаковыми, берём первое заданное
+        normal_strength = derived_maps.clamp_strength(next(
+            (spec.get("normal_strength") for spec in material_maps.values()
+             if isinstance(spec, dict) and spec.get("normal_strength") not in (None, "")),
+            None))
         envmask_combined = False
         envmask_spec = material_maps.get("envmapmask")
         if envmask_spec and base_image_path and os.path.isfile(base_image_path):
@@ -515,7 +522,7 @@ class VPKService:
                     if ok_mask:
                         envmask_combined = VPKService._ensure_normal_with_envmask(
                             base_image_path, mask_png, vtf_output_path, mat,
-                            vmt_path, patched_cdmaterials_path, size)
+                            vmt_path, patched_cdmaterials_path, size, normal_strength)
                         if mask_png.exists():
                             mask_png.unlink()
             elif real_normal:
@@ -554,7 +561,7 @@ class VPKService:
                     if "$bumpmap" not in _vmt_txt:
                         VPKService._ensure_derived_normal(
                             base_image_path, vtf_output_path, mat, vmt_path,
-                            patched_cdmaterials_path, size, is_normal_map,
+                            patched_cdmaterials_path, size, is_normal_map, normal_strength,
                         )
                 VMTService.add_material_map_params(
                     str(vmt_path), patched_cdmaterials_path, None, None, extra
@@ -611,7 +618,7 @@ class VPKService:
                 if cfg.get("derive_auto_normal") and not params_only:
                     VPKService._ensure_derived_normal(
                         base_image_path, vtf_output_path, mat, vmt_path,
-                        patched_cdmaterials_path, size, is_normal_map,
+                        patched_cdmaterials_path, size, is_normal_map, normal_strength,
                     )
 
             VMTService.add_material_map_params(
@@ -628,6 +635,7 @@ class VPKService:
         vmt_path: Path,
         patched_cdmaterials_path: str,
         size: Tuple[int, int],
+        normal_strength: float = derived_maps.DEFAULT_NORMAL_STRENGTH,
     ) -> bool:
         """
         Создаёт {mat}_normal.vtf, у которого RGB — нормаль из базы, а АЛЬФА —
@@ -640,7 +648,7 @@ class VPKService:
         try:
             norm_png = vtf_output_path / f"{mat}_normal.png"
             TextureService.make_normal_with_alpha(
-                base_image_path, str(mask_png), str(norm_png), size)
+                base_image_path, str(mask_png), str(norm_png), size, normal_strength)
             # DXT5 — сохраняет альфу (маску). Не -normal: RGB уже нормаль.
             VPKService._create_vtf(str(norm_png), str(vtf_output_path), "DXT5", [], {})
             if norm_png.exists():
@@ -667,21 +675,23 @@ class VPKService:
         patched_cdmaterials_path: str,
         size: Tuple[int, int],
         is_normal_map: bool,
+        normal_strength: float = derived_maps.DEFAULT_NORMAL_STRENGTH,
     ) -> None:
         """
         Гарантирует наличие карты нормалей для phong (без неё блик не считается).
 
         Если normal уже сгенерирован (галочка Normal Map) или файл уже есть —
         ничего не делает. Иначе строит {texture}_normal.vtf из базовой текстуры
-        (VTFCmd -normal, формат DXT5) и прописывает $bumpmap в VMT.
+        (derived_maps: Собель с нормированным Z и заданной силой, формат DXT5)
+        и прописывает $bumpmap в VMT.
         """
         normal_vtf = vtf_output_path / f"{texture_filename}_normal.vtf"
         if is_normal_map or normal_vtf.exists():
             return
         try:
             norm_png = vtf_output_path / f"{texture_filename}_normal.png"
-            VPKService._process_image(base_image_path, str(norm_png), size)
-            VPKService._create_vtf(str(norm_png), str(vtf_output_path), "DXT5", [], {"normal": True})
+            TextureService.derive_normal_map(base_image_path, str(norm_png), size, normal_strength)
+            VPKService._create_vtf(str(norm_png), str(vtf_output_path), "DXT5", [], {})
             if norm_png.exists():
                 norm_png.unlink()
             if normal_vtf.exists():
@@ -1129,6 +1139,7 @@ class VPKService:
             с произвольными путями; основной режим — выбор классов в UI);
           • иначе — legacy %s-шаблон в hat_mdl_path, раскрытый по всем классам.
 
+        Классы независимы и собираются параллельно (HatClassModelService).
         Ошибки одного класса не валят сборку — этот класс просто останется с
         оригинальной игровой моделью.
         """
@@ -1140,9 +1151,6 @@ class VPKService:
 
         import re as _re
         from src.services.tf2_paths import build_hat_mdl_candidates
-        from src.services.decompile_cache import (
-            get_cached_decompile, restore_from_cache, save_to_cache,
-        )
 
         _cls_pat = _re.compile(
             r'_(heavy|scout|soldier|pyro|demoman|engineer|medic|sniper|spy)\.mdl$',
@@ -1193,66 +1201,42 @@ class VPKService:
             f"{[(_cls_of(p) or Path(p).stem) for p in to_build]}"
         )
 
-        for mdl_rel in to_build:
-            cls = _cls_of(mdl_rel)
-            wk = Path(mdl_rel).stem
-            try:
-                _lbl = cls or wk
-                emit_sub(-1, f"Class model: {_lbl}..." if language == "en"
-                         else f"Модель класса: {_lbl}...")
-                cls_root = ctx.temp_dir / f"hatcls_{wk}"
-                extract_d = cls_root / "extract"
-                decomp_d = cls_root / "decompile"
-                comp_d = cls_root / "compile"
-                for _d in (extract_d, decomp_d, comp_d):
-                    ensure_directory_exists(_d)
-
-                # QC: из кэша декомпила или свежая декомпиляция.
-                cached = get_cached_decompile(wk, tf2_misc_vpk, mdl_rel)
-                if cached:
-                    qc_p = restore_from_cache(cached, str(decomp_d))
-                else:
-                    extracted = TF2VPKExtractService.extract_file_set(
-                        tf2_misc_vpk, mdl_rel, str(extract_d)
-                    )
-                    mdl_file = next((f for f in extracted if f.endswith('.mdl')), None)
-                    if not mdl_file:
-                        logger.warning(f"[HAT MULTI] {cls}: MDL не извлёкся")
-                        continue
-                    qc_p = ModelBuildService.decompile(mdl_file, str(decomp_d), crowbar_exe)
-                    ModelBuildService.remove_lod_files(str(decomp_d))
-                    save_to_cache(wk, tf2_misc_vpk, mdl_rel, str(decomp_d))
-
-                if not qc_p or not os.path.exists(qc_p):
-                    logger.warning(f"[HAT MULTI] {cls}: QC не найден")
-                    continue
-
-                # Вставляем геометрию пользователя в reference SMD ЭТОГО класса
-                # (скелет/кости — класса, иначе bonemerge съедет).
-                ref_smd = VPKService._find_decompiled_reference_smd(qc_p, wk, decomp_d)
-                if not ref_smd:
-                    logger.warning(f"[HAT MULTI] {cls}: reference SMD не найден — пропуск")
-                    continue
-                SMDService.replace_model_sections(
-                    replace_model_smd_path, ref_smd, ref_smd,
-                    keep_user_materials=keep_user_materials,
-                )
-
-                # Патчим cdmaterials под console\ (как основная модель) — чтобы
-                # модель класса нашла нашу текстуру по тому же пути.
-                _cdmat = ModelBuildService.extract_cdmaterials_path_from_qc(qc_p)
-                ModelBuildService.patch_qc_file(qc_p, wk, _cdmat)
-
-                ModelBuildService.compile(qc_p, str(comp_d), studiomdl_exe, tf_dir)
+        from src.services.hat_class_model_service import HatClassJob, HatClassModelService
+
+        jobs = [
+            HatClassJob(
+                mdl_rel=mdl_rel,
+                label=_cls_of(mdl_rel) or Path(mdl_rel).stem,
+                cls_root=str(ctx.temp_dir / f"hatcls_{Path(mdl_rel).stem}"),
+                vpkroot_dir=str(ctx.vpkroot_dir),
+                replace_model_smd_path=replace_model_smd_path,
+                keep_user_materials=keep_user_materials,
+                tf2_misc_vpk=tf2_misc_vpk,
+                studiomdl_exe=studiomdl_exe,
+                crowbar_exe=crowbar_exe,
+                tf_dir=tf_dir,
+            )
+            for mdl_rel in to_build
+        ]
+        finished: list = []
+
+        def _on_class_progress(label: str, stage: str) -> None:
+            if stage in ("done", "failed"):
+                finished.append(label)
+            emit_sub(
+                int(len(finished) * 100 / len(jobs)),
+                f"Class model: {label} ({stage}) [{len(finished)}/{len(jobs)}]" if language == "en"
+                else f"Модель класса: {label} ({stage}) [{len(finished)}/{len(jobs)}]",
+            )
 
-                # Копируем скомпилированные файлы в VPK по $modelname этого класса.
-                _sub = type('SubCtx', (), {'compile_dir': comp_d, 'vpkroot_dir': ctx.vpkroot_dir})()
-                VPKService._copy_compiled_models_to_vpkroot(_sub, qc_p)
-                logger.info(f"[HAT MULTI] модель класса {cls} собрана и добавлена в мод")
-            except Exception as exc:
+        # Классы независимы — собираем параллельно (пул процессов по числу ядер)
+        for result in HatClassModelService.run_jobs(jobs, on_progress=_on_class_progress):
+            if result.ok:
+                logger.info(f"[HAT MULTI] модель класса {result.label} собрана и добавлена в мод")
+            else:
                 logger.warning(
-                    f"[HAT MULTI] класс {cls}: ошибка сборки модели — класс останется "
-                    f"с оригинальной моделью: {exc}", exc_info=True
+                    f"[HAT MULTI] класс {result.label}: ошибка сборки модели — класс останется "
+                    f"с оригинальной моделью: {result.message}"
                 )
 
     @staticmethod
@@ -1582,6 +1566,7 @@ class VPKService:
                 custom_qc_text=custom_qc_text,
                 isolate_shoulders=isolate_shoulders,
                 panel_blu_textures=panel_blu_textures,
+                variants=r.texture_variants,
                 progress_callback=progress_callback,
                 cancel_callback=cancel_callback,
             )
@@ -1743,6 +1728,8 @@ class VPKService:
         ctx.cleanup(on_error=False, keep_on_error=False, debug_mode=debug_mode)
 
         success_message = t.get('vpk_success', 'VPK successfully created: {path}').format(path=vpk_path)
+        if ctx.notes:
+            success_message += "\n\n" + "\n".join(ctx.notes)
         # Показываем накопленные предупреждения (напр. не найденную игровую
         # текстуру) — иначе пользователь узнает о фиолете только в игре.
         if ctx.warnings:
@@ -1783,6 +1770,8 @@ class VPKService:
         return (mode.split('_', 1)[1] if '_' in mode else mode), None
 
     @staticmethod
+    @image_store.per_build
+    @texture_variants.per_build
     def build_vpk(
         image_path: str,
         mode: str,
@@ -1822,11 +1811,16 @@ class VPKService:
         custom_qc_text: Optional[str] = None,  # отредактированный пользователем QC («готовая» модель)
         isolate_shoulders: bool = False,  # руки: изолировать плечи/тело вьюмодели (переименование материала)
         panel_blu_textures: Optional[dict] = None,  # {mat: path} BLU-слотов (руки: промоушен нейтральных в командные)
+        variants: Optional[list] = None,  # доп. варианты текстур (TextureVariant) — по VPK на каждый
     ) -> Tuple[bool, str]:
         """
         Главная функция: делает из картинки VPK файл.
         Возвращает (success, message); при ошибке message содержит описание.
         Здесь весь конвейер: модель → текстуры → компиляция → упаковка.
+
+        С variants конвейер идёт один раз в самом большом варианте, а
+        остальные перерисовывают только текстуры и пакуются в свои VPK
+        (см. texture_variants).
         """
         from src.data.translations import TRANSLATIONS
         t = TRANSLATIONS.get(language, TRANSLATIONS['en'])
@@ -1849,6 +1843,12 @@ class VPKService:
             logger.info("Сборка отменена пользователем")
             return False, t.get('build_cancelled', 'Build cancelled by user')
 
+        # Маски шпиона собираются отдельным путём — без вариантов
+        variant_plan = texture_variants.plan(
+            texture_variants.TextureVariant("", tuple(size), format_type),
+            () if mode == SPY_MASK_MODE_KEY else (variants or ()))
+        size, format_type = variant_plan[0].size, variant_plan[0].format_type
+
         ctx = None
         try:
             # Проверяем что все на месте, иначе потом будет больно (валидация параметров)
@@ -2978,6 +2978,11 @@ class VPKService:
             if is_cancelled():
                 return cancelled_result(ctx)
             emit_progress(80, t.get('build_packing', 'Creating VPK file...'))
+            # Отчёт о видеопамяти: превышения бюджетов — в ctx.warnings, таблица —
+            # рядом с VPK, сводка — в итоговое сообщение (vram_report.publish)
+            vram = vram_report.report_build(
+                ctx, vtf_options, language,
+                (variant_plan[0].suffix or "main") if len(variant_plan) > 1 else "")
             emit_sub(-1, "Packing VPK..." if language == "en" else "Упаковка VPK...")
             # Логируем все файлы в VPK root (для отладки, чтобы видеть какие файлы идут в мод)
             if ctx.vpkroot_dir.exists():
@@ -2988,10 +2993,29 @@ class VPKService:
                         vpkroot_files.append(rel)
                 logger.info(f"[VPK CONTENTS] Files going into VPK ({len(vpkroot_files)} total):\n" +
                             "\n".join(f"  {f}" for f in vpkroot_files))
-            vpk_path = VPKService._create_vpk_file(ctx, filename, export_folder, language)
+            vpk_paths = [VPKService._create_vpk_file(
+                ctx, texture_variants.vpk_filename(filename, variant_plan[0].suffix),
+                export_folder, language)]
+            vram_report.publish(ctx, vram, vpk_paths[0], language)
+
+            # Остальные варианты: модель и VMT уже в vpkroot — перерисовываем
+            # только текстуры и пакуем каждый вариант в свой VPK
+            renders = texture_variants.current()
+            for _vi, _variant in enumerate(variant_plan[1:], start=2):
+                if is_cancelled():
+                    return cancelled_result(ctx)
+                emit_sub(-1, (f"Texture variant {_vi}/{len(variant_plan)}..." if language == "en"
+                              else f"Вариант текстур {_vi}/{len(variant_plan)}..."))
+                renders.render_variant(ctx.vpkroot_dir, variant_plan[0], _variant,
+                                       VPKService._create_vtf, TextureService.create_animated_vtf)
+                _vram = vram_report.report_build(ctx, vtf_options, language, _variant.suffix or "main")
+                vpk_paths.append(VPKService._create_vpk_file(
+                    ctx, texture_variants.vpk_filename(filename, _variant.suffix),
+                    export_folder, language))
+                vram_report.publish(ctx, _vram, vpk_paths[-1], language)
 
             success_message = VPKService._finalize_build_success(
-                ctx, vpk_path, vmt_to_delete, language, debug_mode, t
+                ctx, "\n".join(vpk_paths), vmt_to_delete, language, debug_mode, t
             )
             return True, success_message
             
@@ -3103,10 +3127,12 @@ class VPKService:
                 return False, t.get('error_no_textures', 'No mask textures were provided.')
 
             # Пакуем VPK
+            vram = vram_report.report_build(ctx, vtf_options, language)
             vpk_path = VPKService._create_vpk_file(ctx, filename, export_folder, language)
+            vram_report.publish(ctx, vram, vpk_path, language)
             ctx.cleanup(on_error=False, keep_on_error=keep_temp_on_error, debug_mode=debug_mode)
             logger.info(f"VPK масок шпиона готов: {vpk_path}")
-            return True, vpk_path
+            return True, "\n\n".join([vpk_path] + ctx.notes)
 
         except Exception as exc:
             logger.error(f"_build_spy_masks_vpk: {exc}", exc_info=True)
@@ -0,0 +1,269 @@
+"""
+Отчёт о видеопамяти готового мода: что каждая VTF стоит в игре.
+
+Перед упаковкой VPK проходим по vpkroot, читаем заголовки всех *.vtf
+(vtf_file.read_header — без VTFLib.dll) и считаем для каждой текстуры
+размер, формат, число мипов и кадров, байты на диске и точный объём
+данных в видеопамяти (все кадры × все мипы × грани кубмапы; заголовок и
+миниатюра в VRAM не попадают). Итог сравнивается с бюджетами из конфига
+(vram_budget_mb — на мод, vram_texture_budget_mb — на текстуру; 0 —
+без ограничения), к превышениям прилагаются подсказки: сжать в DXT1/DXT5,
+уменьшить вдвое, сократить кадры анимации. Таблица по текстурам
+сохраняется рядом с готовым VPK (<мод>_vram.txt), сводка попадает в
+итоговое сообщение о сборке.
+"""
+
+import os
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from src.services import vtf_file
+from src.services.vtf_file import VTFImageFlags, VTFImageFormat
+from src.shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Отчёт лежит рядом с VPK: <имя мода>_vram.txt
+REPORT_SUFFIX = "_vram.txt"
+DEFAULT_MOD_BUDGET_MB = 64
+DEFAULT_TEXTURE_BUDGET_MB = 16
+# Больше этой стороны предлагаем уменьшить вдвое, даже если сжатие уже есть
+HALVE_ABOVE = 1024
+_MB = 1024 * 1024
+
+
+class TextureInfo(NamedTuple):
+    path: str               # путь относительно vpkroot, через «/»
+    width: int
+    height: int
+    image_format: int
+    mipmaps: int
+    frames: int
+    faces: int
+    file_bytes: int
+    vram_bytes: int
+
+    @property
+    def format_name(self) -> str:
+        return vtf_file.format_name(self.image_format)
+
+    def data_size(self, image_format: Optional[int] = None, scale: int = 1,
+                  frames: Optional[int] = None) -> int:
+        """Объём данных в VRAM при другом формате / стороне, делённой на scale / числе кадров."""
+        fmt = self.image_format if image_format is None else image_format
+        width, height = max(1, self.width // scale), max(1, self.height // scale)
+        mips = min(self.mipmaps, vtf_file.mip_count(width, height))
+        per_frame = sum(vtf_file.level_sizes(width, height, fmt, mips))
+        return per_frame * (self.frames if frames is None else frames) * self.faces
+
+
+class Suggestion(NamedTuple):
+    key: str                # "dxt1" | "dxt5" | "halve" | "frames"
+    vram_bytes: int         # объём VRAM после изменения
+
+
+def inspect_vtf(path: Path, root: Optional[Path] = None) -> Optional[TextureInfo]:
+    """Параметры одной VTF; None, если заголовок не читается или формат неизвестен."""
+    try:
+        header = vtf_file.read_header(str(path))
+        file_bytes = path.stat().st_size
+    except (OSError, ValueError) as exc:
+        logger.warning(f"VRAM: не удалось прочитать {path.name}: {exc}")
+        return None
+    if header.image_format not in vtf_file.FORMATS:
+        logger.warning(f"VRAM: неизвестный формат {header.image_format} в {path.name}")
+        return None
+    rel = path.relative_to(root).as_posix() if root else path.name
+    info = TextureInfo(
+        path=rel,
+        width=header.width,
+        height=header.height,
+        image_format=header.image_format,
+        mipmaps=max(1, header.mipmap_count),
+        frames=max(1, header.frames),
+        faces=6 if header.flags & VTFImageFlags.ENVMAP else 1,
+        file_bytes=file_bytes,
+        vram_bytes=0,
+    )
+    return info._replace(vram_bytes=info.data_size())
+
+
+def suggestions(info: TextureInfo) -> List[Suggestion]:
+    """Способы уменьшить текстуру, от самого выгодного."""
+    out: List[Suggestion] = []
+    if not vtf_file.FORMATS[info.image_format].block_bytes:
+        has_alpha = vtf_file.FORMATS[info.image_format].alpha_bits > 0
+        target = VTFImageFormat.DXT5 if has_alpha else VTFImageFormat.DXT1
+        out.append(Suggestion("dxt5" if has_alpha else "dxt1", info.data_size(target)))
+    if max(info.width, info.height) > HALVE_ABOVE:
+        out.append(Suggestion("halve", info.data_size(scale=2)))
+    if info.frames > 1:
+        out.append(Suggestion("frames", info.data_size(frames=(info.frames + 1) // 2)))
+    return sorted(out, key=lambda s: s.vram_bytes)
+
+
+_SUGGESTION_TEXT = {
+    "en": {
+        "dxt1": "switch to DXT1",
+        "dxt5": "switch to DXT5",
+        "halve": "halve the size",
+        "frames": "halve the frame count (or set an animated texture budget)",
+    },
+    "ru": {
+        "dxt1": "сжать в DXT1",
+        "dxt5": "сжать в DXT5",
+        "halve": "уменьшить размер вдвое",
+        "frames": "сократить кадры вдвое (или задать бюджет анимации)",
+    },
+}
+
+
+def _mb(size: int) -> str:
+    return f"{size / _MB:.1f}"
+
+
+def describe_suggestions(info: TextureInfo, language: str = "en") -> str:
+    texts = _SUGGESTION_TEXT.get(language, _SUGGESTION_TEXT["en"])
+    unit = "МБ" if language == "ru" else "MB"
+    return "; ".join(f"{texts[s.key]} → {_mb(s.vram_bytes)} {unit}" for s in suggestions(info))
+
+
+class VRAMReport(NamedTuple):
+    textures: List[TextureInfo]
+    mod_budget_mb: float = DEFAULT_MOD_BUDGET_MB
+    texture_budget_mb: float = DEFAULT_TEXTURE_BUDGET_MB
+
+    @property
+    def vram_bytes(self) -> int:
+        return sum(t.vram_bytes for t in self.textures)
+
+    @property
+    def file_bytes(self) -> int:
+        return sum(t.file_bytes for t in self.textures)
+
+    def over_texture_budget(self) -> List[TextureInfo]:
+        if not self.texture_budget_mb:
+            return []
+        limit = self.texture_budget_mb * _MB
+        return [t for t in self.textures if t.vram_bytes > limit]
+
+    def over_mod_budget(self) -> bool:
+        return bool(self.mod_budget_mb) and self.vram_bytes > self.mod_budget_mb * _MB
+
+    def summary(self, language: str = "en") -> str:
+        if language == "ru":
+            return (f"Текстур: {len(self.textures)}, видеопамять {_mb(self.vram_bytes)} МБ, "
+                    f"на диске {_mb(self.file_bytes)} МБ")
+        return (f"Textures: {len(self.textures)}, VRAM {_mb(self.vram_bytes)} MB, "
+                f"on disk {_mb(self.file_bytes)} MB")
+
+    def warnings(self, language: str = "en") -> List[str]:
+        """Предупреждения о превышении бюджетов — с подсказками, как уложиться."""
+        out = []
+        ru = language == "ru"
+        for t in self.over_texture_budget():
+            hint = describe_suggestions(t, language)
+            if ru:
+                msg = (f"Текстура {t.path} ({t.width}×{t.height} {t.format_name}, "
+                       f"кадров: {t.frames}) занимает {_mb(t.vram_bytes)} МБ видеопамяти "
+                       f"при бюджете {self.texture_budget_mb:g} МБ")
+            else:
+                msg = (f"Texture {t.path} ({t.width}×{t.height} {t.format_name}, "
+                       f"{t.frames} frame(s)) takes {_mb(t.vram_bytes)} MB of VRAM, "
+                       f"budget is {self.texture_budget_mb:g} MB")
+            out.append(f"{msg}: {hint}" if hint else msg)
+        if self.over_mod_budget():
+            if ru:
+                out.append(f"Мод занимает {_mb(self.vram_bytes)} МБ видеопамяти при бюджете "
+                           f"{self.mod_budget_mb:g} МБ — см. *{REPORT_SUFFIX} рядом с VPK")
+            else:
+                out.append(f"The mod takes {_mb(self.vram_bytes)} MB of VRAM, budget is "
+                           f"{self.mod_budget_mb:g} MB — see *{REPORT_SUFFIX} next to the VPK")
+        return out
+
+    def format_text(self) -> str:
+        """Таблица для логов сборки: текстуры от самой тяжёлой."""
+        rows = sorted(self.textures, key=lambda t: t.vram_bytes, reverse=True)
+        lines = [
+            f"{'VRAM MB':>8} {'disk MB':>8} {'size':>11} {'format':<16} {'mips':>4} {'frames':>6}  path",
+        ]
+        for t in rows:
+            lines.append(
+                f"{_mb(t.vram_bytes):>8} {_mb(t.file_bytes):>8} {f'{t.width}x{t.height}':>11} "
+                f"{t.format_name:<16} {t.mipmaps:>4} {t.frames:>6}  {t.path}"
+            )
+        lines.append("")
+        lines.append(self.summary("en"))
+        budgets = [f"mod {self.mod_budget_mb:g} MB" if self.mod_budget_mb else "mod: no limit",
+                   f"texture {self.texture_budget_mb:g} MB" if self.texture_budget_mb
+                   else "texture: no limit"]
+        lines.append("Budgets: " + ", ".join(budgets))
+        for warning in self.warnings("en"):
+            lines.append(f"! {warning}")
+        over = self.over_texture_budget()
+        for t in rows:
+            hint = describe_suggestions(t)
+            if hint and t not in over:
+                lines.append(f"  {t.path}: {hint}")
+        return "\n".join(lines) + "\n"
+
+
+def scan(root: Path, mod_budget_mb: float = DEFAULT_MOD_BUDGET_MB,
+         texture_budget_mb: float = DEFAULT_TEXTURE_BUDGET_MB) -> VRAMReport:
+    """Отчёт по всем VTF под root."""
+    textures = []
+    for dirpath, _dirs, files in os.walk(root):
+        for name in sorted(files):
+            if name.lower().endswith(".vtf"):
+                info = inspect_vtf(Path(dirpath) / name, root)
+                if info is not None:
+                    textures.append(info)
+    return VRAMReport(textures, float(mod_budget_mb or 0), float(texture_budget_mb or 0))
+
+
+def report_build(ctx, options: Optional[dict] = None, language: str = "en",
+                 variant: str = "") -> VRAMReport:
+    """
+    Отчёт по vpkroot сборки: таблица — в лог, превышения бюджетов — в
+    ctx.warn (они попадут в итоговое сообщение). Файл отчёта и сводку
+    добавляет publish, когда VPK уже в папке экспорта.
+
+    Бюджеты — options['vram_budget_mb'] / options['vram_texture_budget_mb'].
+    variant — суффикс варианта текстур (texture_variants): пометка в логе
+    и предупреждениях.
+    """
+    options = options or {}
+    report = scan(ctx.vpkroot_dir,
+                  options.get("vram_budget_mb", DEFAULT_MOD_BUDGET_MB),
+                  options.get("vram_texture_budget_mb", DEFAULT_TEXTURE_BUDGET_MB))
+    logger.info(f"[VRAM{' ' + variant if variant else ''}] {report.summary()}\n{report.format_text()}")
+    for warning in report.warnings(language):
+        ctx.warn(f"[{variant}] {warning}" if variant else warning)
+    return report
+
+
+def report_path(vpk_path: str) -> Path:
+    """Файл отчёта рядом с VPK: my_mod.vpk → my_mod_vram.txt."""
+    vpk = Path(vpk_path)
+    return vpk.with_name(f"{vpk.stem}{REPORT_SUFFIX}")
+
+
+def publish(ctx, report: VRAMReport, vpk_path: str, language: str = "en") -> Optional[Path]:
+    """
+    Пишет таблицу рядом с готовым VPK (temp-папка сборки удаляется) и
+    добавляет сводку в ctx.note — в итоговое сообщение о сборке.
+    """
+    path: Optional[Path] = report_path(vpk_path)
+    try:
+        path.write_text(report.format_text(), encoding="utf-8")
+    except OSError as exc:
+        logger.warning(f"VRAM: не удалось записать отчёт: {exc}")
+        path = None
+    name = Path(vpk_path).name
+    if language == "ru":
+        note = f"{name}: {report.summary('ru')}"
+        ctx.note(note + (f"\nОтчёт по текстурам: {path}" if path else ""))
+    else:
+        note = f"{name}: {report.summary('en')}"
+        ctx.note(note + (f"\nTexture report: {path}" if path else ""))
+    return path
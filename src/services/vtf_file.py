@@ -0,0 +1,214 @@
+"""
+Формат VTF: константы, размеры данных и заголовок версии 7.2.
+
+Модуль не зависит от VTFLib.dll: по нему можно посчитать размеры кадров
+и записать контейнер VTF потоково (animated_vtf), а сжатие кадров делает
+VTFLib.convert_from_rgba8888. Раскладка файла 7.2:
+
+  заголовок (80 байт) → миниатюра (lowres, обычно DXT1 16×16)
+  → данные: мипы от меньшего к большему, в каждом — кадры по порядку.
+"""
+
+import struct
+from typing import List, NamedTuple, Tuple
+
+
+class VTFImageFormat:
+    RGBA8888 = 0
+    ABGR8888 = 1
+    RGB888 = 2
+    BGR888 = 3
+    RGB565 = 4
+    I8 = 5
+    IA88 = 6
+    P8 = 7
+    A8 = 8
+    RGB888_BLUESCREEN = 9
+    BGR888_BLUESCREEN = 10
+    ARGB8888 = 11
+    BGRA8888 = 12
+    DXT1 = 13
+    DXT3 = 14
+    DXT5 = 15
+    BGRX8888 = 16
+    BGR565 = 17
+    BGRX5551 = 18
+    BGRA4444 = 19
+    DXT1_ONEBITALPHA = 20
+    BGRA5551 = 21
+    UV88 = 22
+    UVWQ8888 = 23
+    RGBA16161616F = 24
+    RGBA16161616 = 25
+    UVLX8888 = 26
+    R32F = 27
+    RGB323232F = 28
+    RGBA32323232F = 29
+
+    NONE = -1
+
+
+class VTFImageFlags:
+    POINTSAMPLE = 0x00000001
+    TRILINEAR = 0x00000002
+    CLAMPS = 0x00000004
+    CLAMPT = 0x00000008
+    ANISOTROPIC = 0x00000010
+    SRGB = 0x00000040
+    NORMAL = 0x00000080
+    NOMIP = 0x00000100
+    NOLOD = 0x00000200
+    ONEBITALPHA = 0x00001000
+    EIGHTBITALPHA = 0x00002000
+    ENVMAP = 0x00004000
+    NODEBUGOVERRIDE = 0x00020000
+    SINGLECOPY = 0x00040000
+    NODEPTHBUFFER = 0x00800000
+    CLAMPU = 0x02000000
+    VERTEXTEXTURE = 0x04000000
+    SSBUMP = 0x08000000
+    BORDER = 0x20000000
+
+
+class FormatInfo(NamedTuple):
+    bits_per_pixel: int
+    alpha_bits: int
+    block_bytes: int = 0    # для DXT — байт на блок 4×4, иначе 0
+
+
+_F = VTFImageFormat
+FORMATS = {
+    _F.RGBA8888: FormatInfo(32, 8),
+    _F.ABGR8888: FormatInfo(32, 8),
+    _F.RGB888: FormatInfo(24, 0),
+    _F.BGR888: FormatInfo(24, 0),
+    _F.RGB565: FormatInfo(16, 0),
+    _F.I8: FormatInfo(8, 0),
+    _F.IA88: FormatInfo(16, 8),
+    _F.P8: FormatInfo(8, 0),
+    _F.A8: FormatInfo(8, 8),
+    _F.RGB888_BLUESCREEN: FormatInfo(24, 8),
+    _F.BGR888_BLUESCREEN: FormatInfo(24, 8),
+    _F.ARGB8888: FormatInfo(32, 8),
+    _F.BGRA8888: FormatInfo(32, 8),
+    _F.DXT1: FormatInfo(4, 0, 8),
+    _F.DXT3: FormatInfo(8, 4, 16),
+    _F.DXT5: FormatInfo(8, 8, 16),
+    _F.BGRX8888: FormatInfo(32, 0),
+    _F.BGR565: FormatInfo(16, 0),
+    _F.BGRX5551: FormatInfo(16, 0),
+    _F.BGRA4444: FormatInfo(16, 4),
+    _F.DXT1_ONEBITALPHA: FormatInfo(4, 1, 8),
+    _F.BGRA5551: FormatInfo(16, 1),
+    _F.UV88: FormatInfo(16, 0),
+    _F.UVWQ8888: FormatInfo(32, 0),
+    _F.RGBA16161616F: FormatInfo(64, 16),
+    _F.RGBA16161616: FormatInfo(64, 16),
+    _F.UVLX8888: FormatInfo(32, 0),
+    _F.R32F: FormatInfo(32, 0),
+    _F.RGB323232F: FormatInfo(96, 0),
+    _F.RGBA32323232F: FormatInfo(128, 32),
+}
+del _F
+
+VERSION = (7, 2)
+HEADER_SIZE = 80
+# signature, version[2], headerSize, width, height, flags, frames, firstFrame,
+# pad, reflectivity[3], pad, bumpmapScale, highResFormat, mipmapCount,
+# lowResFormat, lowResWidth, lowResHeight, depth (+ выравнивание до 80)
+_HEADER = struct.Struct("<4s2IIHHIHH4x3f4xfiBiBBH")
+_SIGNATURE = b"VTF\0"
+THUMBNAIL_FORMAT = VTFImageFormat.DXT1
+THUMBNAIL_MAX = 16
+
+
+class VTFHeader(NamedTuple):
+    width: int
+    height: int
+    flags: int
+    frames: int
+    image_format: int
+    mipmap_count: int = 1
+    reflectivity: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    thumbnail_format: int = VTFImageFormat.NONE
+    thumbnail_size: Tuple[int, int] = (0, 0)
+    bumpmap_scale: float = 1.0
+
+    def pack(self) -> bytes:
+        data = _HEADER.pack(
+            _SIGNATURE, VERSION[0], VERSION[1], HEADER_SIZE,
+            self.width, self.height, self.flags, self.frames, 0,
+            *self.reflectivity, self.bumpmap_scale,
+            self.image_format, self.mipmap_count,
+            self.thumbnail_format, self.thumbnail_size[0], self.thumbnail_size[1], 1,
+        )
+        return data.ljust(HEADER_SIZE, b"\0")
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "VTFHeader":
+        if len(data) < _HEADER.size:
+            raise ValueError("Not a VTF file")
+        (sig, _major, _minor, _hsize, width, height, flags, frames, _first,
+         r, g, b, bump, fmt, mips, thumb_fmt, thumb_w, thumb_h, _depth) = _HEADER.unpack_from(data)
+        if sig != _SIGNATURE:
+            raise ValueError("Not a VTF file")
+        return cls(width, height, flags, frames, fmt, mips, (r, g, b), thumb_fmt,
+                   (thumb_w, thumb_h), bump)
+
+
+def image_size(width: int, height: int, image_format: int) -> int:
+    """Байт на одно изображение (кадр одного мипа) в формате image_format."""
+    info = FORMATS[image_format]
+    if info.block_bytes:
+        return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * info.block_bytes
+    return width * height * info.bits_per_pixel // 8
+
+
+def mip_count(width: int, height: int) -> int:
+    """Число уровней до 1×1 включительно."""
+    count = 1
+    while width > 1 or height > 1:
+        width, height = max(1, width // 2), max(1, height // 2)
+        count += 1
+    return count
+
+
+def level_sizes(width: int, height: int, image_format: int, mips: int) -> List[int]:
+    """Байт на кадр для уровней 0..mips-1 (0 — полный размер)."""
+    return [image_size(max(1, width >> m), max(1, height >> m), image_format) for m in range(mips)]
+
+
+def vtf_size(width: int, height: int, image_format: int, frames: int = 1,
+             mipmaps: bool = True, thumbnail: bool = True) -> int:
+    """Размер файла VTF 7.2 без ресурсов — он же объём данных в видеопамяти."""
+    mips = mip_count(width, height) if mipmaps else 1
+    thumb = image_size(*thumbnail_size(width, height), THUMBNAIL_FORMAT) if thumbnail else 0
+    return HEADER_SIZE + thumb + frames * sum(level_sizes(width, height, image_format, mips))
+
+
+def format_name(image_format: int) -> str:
+    """Имя формата (как в VTFImageFormat) либо номер, если формат неизвестен."""
+    for name, value in vars(VTFImageFormat).items():
+        if value == image_format and not name.startswith("_"):
+            return name
+    return str(image_format)
+
+
+def alpha_flags(image_format: int) -> int:
+    """Флаг альфы, который VTFLib ставит по формату (ONEBITALPHA / EIGHTBITALPHA)."""
+    bits = FORMATS[image_format].alpha_bits
+    if bits == 1:
+        return VTFImageFlags.ONEBITALPHA
+    return VTFImageFlags.EIGHTBITALPHA if bits > 1 else 0
+
+
+def thumbnail_size(width: int, height: int) -> Tuple[int, int]:
+    """Размер миниатюры как у VTFLib: пополам, пока сторона больше 16."""
+    while width > THUMBNAIL_MAX or height > THUMBNAIL_MAX:
+        width, height = max(1, width // 2), max(1, height // 2)
+    return width, height
+
+
+def read_header(vtf_path: str) -> VTFHeader:
+    with open(vtf_path, "rb") as fh:
+        return VTFHeader.unpack(fh.read(HEADER_SIZE))
@@ -49,6 +49,7 @@ def vtf_bytes_to_png(data: Optional[bytes], out_png_path: str,
     if not data:
         return None
     from PIL import Image
+    from src.services import image_save
     from src.services.vtflib_wrapper import VTFLib
 
     tmp_dir = tmp_dir or os.path.dirname(out_png_path) or tempfile.gettempdir()
@@ -69,7 +70,7 @@ def vtf_bytes_to_png(data: Optional[bytes], out_png_path: str,
             pass
     if not frames:
         return None
-    Image.frombytes("RGBA", (w, h), frames[0]).save(out_png_path)
+    image_save.save(Image.frombytes("RGBA", (w, h), frames[0]), out_png_path, image_save.VIEWER)
     return out_png_path
 
 
@@ -83,6 +84,7 @@ def vtf_bytes_to_frame_pngs(data: Optional[bytes], out_dir: str, base_name: str,
     if not data:
         return []
     from PIL import Image
+    from src.services import image_save
     from src.services.vtflib_wrapper import VTFLib
 
     tmp_dir = tmp_dir or out_dir
@@ -108,6 +110,6 @@ def vtf_bytes_to_frame_pngs(data: Optional[bytes], out_dir: str, base_name: str,
     for i, rgba in enumerate(frames):
         name = f"{base_name}_{i:03d}.png" if multi else f"{base_name}.png"
         path = os.path.join(out_dir, name)
-        Image.frombytes("RGBA", (w, h), rgba).save(path)
+        image_save.save(Image.frombytes("RGBA", (w, h), rgba), path, image_save.VIEWER)
         paths.append(path)
     return paths
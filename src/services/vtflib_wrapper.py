@@ -1,67 +1,14 @@
 import os
-from ctypes import POINTER, c_char_p, c_float, c_int, c_uint, c_ubyte, c_void_p, pointer, windll
+from ctypes import POINTER, c_char_p, c_float, c_int, c_uint, c_ubyte, cast, pointer, windll
 from pathlib import Path
 from threading import Lock
 
+from src.services.vtf_file import VTFImageFlags, VTFImageFormat, format_name, image_size  # noqa: F401 — реэкспорт
 from src.shared.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-class VTFImageFormat:
-    RGBA8888 = 0
-    ABGR8888 = 1
-    RGB888 = 2
-    BGR888 = 3
-    RGB565 = 4
-    I8 = 5
-    IA88 = 6
-    P8 = 7
-    A8 = 8
-    RGB888_BLUESCREEN = 9
-    BGR888_BLUESCREEN = 10
-    ARGB8888 = 11
-    BGRA8888 = 12
-    DXT1 = 13
-    DXT3 = 14
-    DXT5 = 15
-    BGRX8888 = 16
-    BGR565 = 17
-    BGRX5551 = 18
-    BGRA4444 = 19
-    DXT1_ONEBITALPHA = 20
-    BGRA5551 = 21
-    UV88 = 22
-    UVWQ8888 = 23
-    RGBA16161616F = 24
-    RGBA16161616 = 25
-    UVLX8888 = 26
-    R32F = 27
-    RGB323232F = 28
-    RGBA32323232F = 29
-
-
-class VTFImageFlags:
-    POINTSAMPLE = 0x00000001
-    TRILINEAR = 0x00000002
-    CLAMPS = 0x00000004
-    CLAMPT = 0x00000008
-    ANISOTROPIC = 0x00000010
-    SRGB = 0x00000040
-    NORMAL = 0x00000080
-    NOMIP = 0x00000100
-    NOLOD = 0x00000200
-    ONEBITALPHA = 0x00001000
-    EIGHTBITALPHA = 0x00002000
-    NODEBUGOVERRIDE = 0x00020000
-    SINGLECOPY = 0x00040000
-    NODEPTHBUFFER = 0x00800000
-    CLAMPU = 0x02000000
-    VERTEXTEXTURE = 0x04000000
-    SSBUMP = 0x08000000
-    BORDER = 0x20000000
-
-
 class VTFLib:
     _lock = Lock()
     _initialized = False
@@ -180,87 +127,30 @@ class VTFLib:
         return err.decode("utf-8", errors="replace") if err else "VTFLib error"
 
     @classmethod
-    def create_animated_vtf(
-        cls,
-        frames_rgba8888: list[bytes],
-        width: int,
-        height: int,
-        dest_format: int,
-        flags: int,
-        output_file: str,
-        generate_thumbnail: bool = True,
-    ) -> None:
+    def convert_from_rgba8888(cls, rgba: bytes, width: int, height: int, dest_format: int) -> bytes:
+        """
+        Сжимает один кадр RGBA8888 в dest_format (DXT и т.п.).
+
+        DXT в VTFLib 1.3.2 идёт через nvDXTcompress, который пишет через
+        глобальный указатель выхода и глобальную последнюю ошибку, — вызовы
+        выполняются по одному под _lock (ctypes отпускает GIL).
+        """
         cls.initialize()
         dll = cls._load()
-
-        vlUInt = c_uint
-        vlByte = c_ubyte
-        vlBool = c_int
-
-        img_id = vlUInt(0)
-        if not dll.vlCreateImage(pointer(img_id)):
-            raise RuntimeError(cls._last_error())
-        try:
-            if not dll.vlBindImage(img_id.value):
-                raise RuntimeError(cls._last_error())
-
-            if not dll.vlImageCreate(
-                vlUInt(width),
-                vlUInt(height),
-                vlUInt(len(frames_rgba8888)),
-                vlUInt(1),
-                vlUInt(1),
+        if len(rgba) != width * height * 4:
+            raise ValueError("Frame size mismatch")
+        dest = bytearray(image_size(width, height, dest_format))
+        with cls._lock:
+            ok = bool(dll.vlImageConvertFromRGBA8888(
+                cast(rgba, POINTER(c_ubyte)),
+                (c_ubyte * len(dest)).from_buffer(dest),
+                c_uint(width),
+                c_uint(height),
                 c_int(dest_format),
-                vlBool(0),
-                vlBool(0),
-                vlBool(1),
-            ):
-                raise RuntimeError(cls._last_error())
-
-            if flags:
-                dll.vlImageSetFlags(vlUInt(flags))
-
-            keepalive_buffers: list[c_void_p] = []
-            for i, frame in enumerate(frames_rgba8888):
-                if len(frame) != width * height * 4:
-                    raise ValueError("Frame size mismatch")
-
-                src = (vlByte * len(frame)).from_buffer_copy(frame)
-                if dest_format == VTFImageFormat.RGBA8888:
-                    dll.vlImageSetData(vlUInt(i), vlUInt(0), vlUInt(0), vlUInt(0), src)
-                    keepalive_buffers.append(src)
-                    continue
-
-                dest_size = int(dll.vlImageComputeMipmapSize(vlUInt(width), vlUInt(height), vlUInt(1), vlUInt(0), c_int(dest_format)))
-                if dest_size <= 0:
-                    raise RuntimeError("Failed to compute dest buffer size")
-                dest = (vlByte * dest_size)()
-                ok = bool(dll.vlImageConvertFromRGBA8888(src, dest, vlUInt(width), vlUInt(height), c_int(dest_format)))
-                if not ok:
-                    raise RuntimeError(cls._last_error())
-                dll.vlImageSetData(vlUInt(i), vlUInt(0), vlUInt(0), vlUInt(0), dest)
-                keepalive_buffers.append(src)
-                keepalive_buffers.append(dest)
-
-            if generate_thumbnail:
-                try:
-                    dll.vlImageGenerateThumbnail()
-                except Exception:
-                    pass
-
-            out_bytes = str(Path(output_file)).encode("utf-8")
-            if not dll.vlImageSave(out_bytes):
+            ))
+            if not ok:
                 raise RuntimeError(cls._last_error())
-            _ = keepalive_buffers
-        finally:
-            try:
-                dll.vlImageDestroy()
-            except Exception:
-                pass
-            try:
-                dll.vlDeleteImage(img_id.value)
-            except Exception:
-                pass
+        return bytes(dest)
 
     @classmethod
     def read_vtf_all_frames(cls, vtf_path: str) -> tuple:
@@ -299,7 +189,7 @@ class VTFLib:
             vtf_flags   = int(dll.vlImageGetFlags())
             dest_size   = width * height * 4
 
-            _fmt_name = {v: k for k, v in vars(VTFImageFormat).items() if not k.startswith('_')}.get(src_format, str(src_format))
+            _fmt_name = format_name(src_format)
             _flag_names = [k for k, v in vars(VTFImageFlags).items()
                            if not k.startswith('_') and (vtf_flags & v)]
             logger.info(
@@ -0,0 +1,122 @@
+"""
+Профиль старта приложения (main.py --profile-startup).
+
+StartupProfiler перехватывает builtins.__import__ и строит дерево импортов:
+для каждого модуля, которого ещё не было в sys.modules, — полное время и
+«собственное» (без вложенных импортов). mark() отмечает фазы старта
+(QApplication, MainWindow(), первая отрисовка). report() пишет фазы и
+дерево импортов дороже min_ms в лог (без логгера — в stderr).
+
+Зависит только от стандартной библиотеки: ставится раньше всех импортов src.
+"""
+
+import builtins
+import importlib.util
+import sys
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("name", "start", "total", "children")
+
+    def __init__(self, name: str, start: float):
+        self.name = name
+        self.start = start
+        self.total = 0.0
+        self.children: List["_Node"] = []
+
+    @property
+    def self_time(self) -> float:
+        return self.total - sum(c.total for c in self.children)
+
+
+class StartupProfiler:
+    """Дерево импортов и фазы старта; один экземпляр на запуск."""
+
+    def __init__(self, min_ms: float = 5.0):
+        self.min_ms = min_ms
+        self._t0 = time.perf_counter()
+        self._root = _Node("<startup>", self._t0)
+        self._stack: List[_Node] = [self._root]
+        self._marks: List[Tuple[str, float]] = []
+        self._orig_import: Optional[Callable] = None
+
+    # ── Установка ────────────────────────────────────────────────────────── #
+
+    def install(self) -> "StartupProfiler":
+        if self._orig_import is None:
+            self._orig_import = builtins.__import__
+            builtins.__import__ = self._import
+        return self
+
+    def uninstall(self) -> None:
+        if self._orig_import is not None:
+            builtins.__import__ = self._orig_import
+            self._orig_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        orig = self._orig_import
+        full = name
+        if level:
+            try:
+                package = (globals or {}).get("__package__") or ""
+                full = importlib.util.resolve_name("." * level + name, package)
+            except (ImportError, ValueError):
+                full = name
+        if full in sys.modules:
+            # from pkg import sub — подмодуль грузится без повторного __import__
+            module = sys.modules[full]
+            subs = [f for f in (fromlist or ()) if f != "*" and not hasattr(module, f)
+                    and f"{full}.{f}" not in sys.modules]
+            if not subs:
+                return orig(name, globals, locals, fromlist, level)
+            full = f"{full}.{subs[0]}" if len(subs) == 1 else f"{full}.{{{','.join(subs)}}}"
+
+        node = _Node(full, time.perf_counter())
+        self._stack[-1].children.append(node)
+        self._stack.append(node)
+        try:
+            return orig(name, globals, locals, fromlist, level)
+        finally:
+            node.total = time.perf_counter() - node.start
+            self._stack.pop()
+
+    # ── Фазы ─────────────────────────────────────────────────────────────── #
+
+    def mark(self, label: str) -> float:
+        """Отмечает конец фазы; возвращает мс от старта профиля."""
+        elapsed = (time.perf_counter() - self._t0) * 1000.0
+        self._marks.append((label, elapsed))
+        return elapsed
+
+    # ── Отчёт ────────────────────────────────────────────────────────────── #
+
+    def _tree_lines(self, node: _Node, depth: int, out: List[str]) -> None:
+        for child in sorted(node.children, key=lambda c: c.total, reverse=True):
+            total_ms = child.total * 1000.0
+            if total_ms < self.min_ms:
+                continue
+            out.append(f"{total_ms:9.1f} {child.self_time * 1000.0:9.1f}  "
+                       f"{'  ' * depth}{child.name}")
+            self._tree_lines(child, depth + 1, out)
+
+    def format_report(self) -> str:
+        lines = ["Профиль старта (мс от запуска):"]
+        prev = 0.0
+        for label, at in self._marks:
+            lines.append(f"  {at:9.1f}  (+{at - prev:7.1f})  {label}")
+            prev = at
+        lines.append(f"Импорты дороже {self.min_ms:g} мс:")
+        lines.append(f"{'всего':>9} {'своё':>9}  модуль")
+        self._tree_lines(self._root, 0, lines)
+        return "\n".join(lines)
+
+    def report(self, logger=None) -> str:
+        """Отчёт в лог (если передан), иначе в stderr."""
+        text = self.format_report()
+        if logger is not None:
+            logger.info(text)
+        else:
+            print(text, file=sys.stderr)
+        return text
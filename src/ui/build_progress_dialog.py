@@ -227,7 +227,7 @@ class BuildProgressDialog(QDialog):
         self._phrase_idx = 0
         self._cancelled = False
 
-        config = AppConfig.load_config()
+        config = AppConfig.snapshot()
         self._colors = _theme_colors(config.get('theme', 'dark'))
 
         self._setup_ui()
@@ -27,10 +27,11 @@ _IMG_EXTS = {'.png', '.jpg', '.jpeg', '.bmp', '.tga', '.gif', '.vtf'}
 
 # ── Helpers ───────────────────────────────────────────────────────────────── #
 
-def _load_config() -> dict:
+def _load_config():
+    """Общий снимок конфига (только чтение, без копирования)."""
     try:
         from src.config.app_config import AppConfig
-        return AppConfig.load_config()
+        return AppConfig.snapshot()
     except Exception:
         return {}
 
@@ -2,22 +2,28 @@
 Панель выбора шапок/косметики TF2 с умным поиском.
 
 Загружает данные из items_game.txt (через hats_parser), кэширует,
-отображает список с live-поиском и фильтром по классу.
+отображает список с live-поиском и фильтром по классу. Список виртуальный
+(QListView + модель): рисуются только видимые строки, и только для них
+в фоне рендерятся миниатюры (hat_thumbnail_service).
 """
 
 from __future__ import annotations
 
 from typing import List, Optional
 
-from PySide6.QtCore import Qt, Signal, QThread, QTimer, QRect, QSize
-from PySide6.QtGui import QColor, QPainter, QFont, QFontMetrics
+from PySide6.QtCore import (
+    Qt, Signal, QThread, QTimer, QRect, QSize, QAbstractListModel, QModelIndex,
+)
+from PySide6.QtGui import QColor, QPainter, QFont, QFontMetrics, QPixmap, QPixmapCache
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
-    QPushButton, QListWidget, QListWidgetItem,
+    QPushButton, QListView,
     QStyledItemDelegate, QStyle,
 )
 
+from src.data.hat_search import HatSearchIndex
 from src.data.hats_parser import HatItem, parse_hats, get_items_game_path
+from src.services.hat_thumbnail_service import THUMB_SIZE, HatThumbnailLoader
 from src.shared.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -70,7 +76,7 @@ _I18N = {
 class _LoadWorker(QThread):
     """Фоновый поток для парсинга items_game.txt."""
     progress = Signal(int, str)
-    finished = Signal(object)   # List[HatItem] — object безопаснее для Python объектов при cross-thread
+    finished = Signal(object)   # HatSearchIndex — object безопаснее для Python объектов при cross-thread
     error    = Signal(str)
 
     def __init__(self, tf2_root: str, language: str, force: bool = False):
@@ -87,20 +93,124 @@ class _LoadWorker(QThread):
                 force_reparse=self._force,
                 progress_cb=self.progress.emit,
             )
-            self.finished.emit(items)
+            # Индекс поиска строится здесь же, а не в UI-потоке
+            self.finished.emit(HatSearchIndex(items))
         except Exception as e:
             logger.error(f"Ошибка загрузки шапок: {e}", exc_info=True)
             self.error.emit(str(e))
 
 
+# ── Модель списка ─────────────────────────────────────────────────────────── #
+
+_ROW_HEIGHT = 52
+
+
+class _HatListModel(QAbstractListModel):
+    """
+    Результаты поиска для QListView: список HatItem + необязательная
+    служебная строка-аккордеон с классами под выбранной шапкой.
+
+    Новый запрос меняет только список ссылок — без тысяч QListWidgetItem.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hats: List[HatItem] = []
+        self._dropdown_row = -1     # строка аккордеона (-1 — нет)
+        self._dropdown_height = 0
+
+    def set_hats(self, hats: List[HatItem]) -> None:
+        self.beginResetModel()
+        self._hats = hats
+        self._dropdown_row = -1
+        self.endResetModel()
+
+    def hat_at(self, row: int) -> Optional[HatItem]:
+        if row < 0 or row == self._dropdown_row:
+            return None
+        if self._dropdown_row >= 0 and row > self._dropdown_row:
+            row -= 1
+        return self._hats[row] if row < len(self._hats) else None
+
+    def dropdown_row(self) -> int:
+        return self._dropdown_row
+
+    def insert_dropdown(self, row: int, height: int) -> None:
+        """Вставляет строку-аккордеон на позицию row."""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._dropdown_row = row
+        self._dropdown_height = height
+        self.endInsertRows()
+
+    def remove_dropdown(self) -> None:
+        row = self._dropdown_row
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._dropdown_row = -1
+        self.endRemoveRows()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._hats) + (1 if self._dropdown_row >= 0 else 0)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.row() == self._dropdown_row:
+            if role == Qt.ItemDataRole.SizeHintRole:
+                return QSize(0, self._dropdown_height)
+            return None
+        hat = self.hat_at(index.row())
+        if hat is None:
+            return None
+        if role == Qt.ItemDataRole.UserRole:
+            return hat
+        if role == Qt.ItemDataRole.DisplayRole:
+            return hat.name                       # текст как fallback
+        if role == Qt.ItemDataRole.SizeHintRole:
+            return QSize(0, _ROW_HEIGHT)
+        return None
+
+    def flags(self, index):
+        if index.isValid() and index.row() == self._dropdown_row:
+            return Qt.ItemFlag.NoItemFlags        # не выбирается, не реагирует на клик
+        return super().flags(index)
+
+
 # ── Делегат отрисовки ─────────────────────────────────────────────────────── #
 
+def _thumb_mdl(hat: HatItem) -> str:
+    """MDL для миниатюры: у %s-шаблона берём модель первого класса."""
+    if "%s" in hat.mdl_path and hat.per_class_models:
+        return next(iter(hat.per_class_models.values()))
+    return hat.mdl_path
+
+
 class _HatDelegate(QStyledItemDelegate):
-    """Рисует каждый элемент шапки: название + классы."""
+    """Рисует каждый элемент шапки: миниатюра + название + классы."""
 
-    def __init__(self, accent: str, parent=None):
+    def __init__(self, accent: str, thumbs: HatThumbnailLoader, parent=None):
         super().__init__(parent)
         self._accent = accent
+        self._thumbs = thumbs
+
+    def _thumb_pixmap(self, hat: HatItem) -> Optional[QPixmap]:
+        """Миниатюра из QPixmapCache (LRU) или с диска; None — ещё рендерится/нет."""
+        mdl = _thumb_mdl(hat)
+        key = f"hat_thumb:{mdl}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        path = self._thumbs.thumbnail(mdl)
+        if not path:
+            return None
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return None
+        QPixmapCache.insert(key, pixmap)
+        return pixmap
 
     def paint(self, painter: QPainter, option, index) -> None:
         hat: Optional[HatItem] = index.data(Qt.ItemDataRole.UserRole)
@@ -129,6 +239,22 @@ class _HatDelegate(QStyledItemDelegate):
         pad_l = 18 if is_selected else 14
         pad_t = 7
 
+        # Миниатюра (или пустая рамка, пока рендерится / если текстуры нет)
+        thumb_rect = QRect(rect.x() + pad_l, rect.y() + (rect.height() - THUMB_SIZE) // 2,
+                           THUMB_SIZE, THUMB_SIZE)
+        pixmap = self._thumb_pixmap(hat)
+        if pixmap is not None:
+            scaled = pixmap.size().scaled(THUMB_SIZE, THUMB_SIZE, Qt.AspectRatioMode.KeepAspectRatio)
+            painter.drawPixmap(
+                QRect(thumb_rect.x() + (THUMB_SIZE - scaled.width()) // 2,
+                      thumb_rect.y() + (THUMB_SIZE - scaled.height()) // 2,
+                      scaled.width(), scaled.height()),
+                pixmap,
+            )
+        else:
+            painter.fillRect(thumb_rect, QColor("#ffffff08"))
+        pad_l += THUMB_SIZE + 10
+
         # Название
         name_font = QFont()
         name_font.setPointSize(10)
@@ -154,7 +280,9 @@ class _HatDelegate(QStyledItemDelegate):
         painter.restore()
 
     def sizeHint(self, option, index) -> QSize:
-        return QSize(0, 52)
+        # У строки-аккордеона своя высота (SizeHintRole модели)
+        hint = index.data(Qt.ItemDataRole.SizeHintRole)
+        return hint if isinstance(hint, QSize) else QSize(0, _ROW_HEIGHT)
 
 
 # ── Главная панель ────────────────────────────────────────────────────────── #
@@ -177,13 +305,13 @@ class HatsPanel(QWidget):
         self._t             = _I18N[self._language]
         self._accent        = self._get_accent()
         self._all_hats: List[HatItem] = []
+        self._search_index = HatSearchIndex([])
         self._class_filter  = "all"
         self._load_worker: Optional[_LoadWorker] = None
         self._selected_hat: Optional[HatItem]    = None
 
         # Состояние выпадающего списка классов (мультиклассовые шапки).
         # Раскрыт максимум у одной шапки за раз.
-        self._dropdown_item: Optional[QListWidgetItem] = None
         self._dropdown_hat: Optional[HatItem]          = None
         self._class_chip_btns: dict = {}      # класс → QPushButton-чип
         self._selected_classes: dict = {}     # класс → отмечен (bool)
@@ -202,7 +330,7 @@ class HatsPanel(QWidget):
     def _get_accent() -> str:
         try:
             from src.config.app_config import AppConfig
-            return "#4a90e2" if AppConfig.load_config().get("theme") == "blue" else "#ff6b35"
+            return "#4a90e2" if AppConfig.snapshot().get("theme") == "blue" else "#ff6b35"
         except Exception:
             return "#ff6b35"
 
@@ -325,30 +453,39 @@ class HatsPanel(QWidget):
         lay.addWidget(class_outer)
 
         # Список шапок
-        self._list = QListWidget()
+        self._model = _HatListModel(self)
+        self._thumbs = HatThumbnailLoader(self)
+        # Готовая миниатюра — перерисовываем только видимую область
+        self._thumbs.thumbnail_ready.connect(lambda *_: self._list.viewport().update())
+        self._list = QListView()
+        self._list.setModel(self._model)
         self._list.setMouseTracking(True)   # нужно для State_MouseOver в делегате
-        self._list.setItemDelegate(_HatDelegate(self._accent, self._list))
+        self._list.setItemDelegate(_HatDelegate(self._accent, self._thumbs, self._list))
+        # Строки разной высоты (аккордеон) — uniformItemSizes нельзя; раскладка
+        # пачками, чтобы несколько тысяч строк не считались разом
+        self._list.setLayoutMode(QListView.LayoutMode.Batched)
+        self._list.setBatchSize(100)
         self._list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background: transparent;
                 border: 1px solid #1a1a1a;
                 border-radius: 4px;
                 outline: none;
             }
-            QListWidget::item {
+            QListView::item {
                 background: transparent;
                 border: none;
                 padding: 0;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background: transparent;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background: transparent;
             }
         """)
         self._list.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self._list.currentItemChanged.connect(self._on_item_changed)
+        self._list.selectionModel().currentChanged.connect(self._on_item_changed)
         lay.addWidget(self._list, 1)
 
         # Статусная строка
@@ -439,6 +576,8 @@ class HatsPanel(QWidget):
         if self._load_worker and self._load_worker.isRunning():
             return
 
+        self._thumbs.set_tf2_root(tf2_root)
+
         self._show_placeholder(self._t["loading"])
         self._load_worker = _LoadWorker(tf2_root, self._language, force)
         self._load_worker.progress.connect(self._on_load_progress)
@@ -449,14 +588,15 @@ class HatsPanel(QWidget):
     def _force_reload(self) -> None:
         """Принудительная перезагрузка (игнорирует кэш)."""
         from src.config.app_config import AppConfig
-        tf2_root = AppConfig.load_config().get("tf2_game_folder", "")
+        tf2_root = AppConfig.snapshot().tf2_game_folder
         self.load_hats(tf2_root, force=True)
 
     def _on_load_progress(self, pct: int, msg: str) -> None:
         self._show_placeholder(f"{msg} ({pct}%)")
 
-    def _on_load_finished(self, items: object) -> None:
-        self._all_hats = list(items) if items else []
+    def _on_load_finished(self, index: HatSearchIndex) -> None:
+        self._search_index = index
+        self._all_hats = index.hats
         logger.info(f"Шапки загружены: {len(self._all_hats)} предметов")
         self._show_list()
         self._apply_filter()
@@ -467,39 +607,29 @@ class HatsPanel(QWidget):
     # ── Фильтрация ────────────────────────────────────────────────────────── #
 
     def _apply_filter(self) -> None:
-        query      = self._search_input.text().strip().lower()
-        words      = query.split() if query else []
+        query      = self._search_input.text().strip()
         cls_filter = self._class_filter
 
-        # Блокируем сигналы списка во время перестройки, чтобы не слать hat_deselected
-        # при каждом clear() во время набора текста в поиске
-        self._list.blockSignals(True)
-        # Выпадающий список классов уничтожается вместе с clear() — сбрасываем ссылки.
-        self._dropdown_item = None
+        # Блокируем сигналы выбора во время перестройки, чтобы не слать hat_deselected
+        # при каждом сбросе модели во время набора текста в поиске
+        selection = self._list.selectionModel()
+        selection.blockSignals(True)
+        # Строка-аккордеон классов исчезает вместе со сбросом модели — сбрасываем ссылки.
         self._dropdown_hat = None
         self._class_chip_btns = {}
         self._selected_classes = {}
-        self._list.clear()
 
-        matched = [h for h in self._all_hats if h.matches(words, cls_filter)]
+        # Индекс сам сортирует по релевантности, если есть запрос
+        matched = self._search_index.search(query, cls_filter)
+        self._model.set_hats(matched)
 
-        # Сортировка по релевантности когда есть запрос
-        if words:
-            matched.sort(key=lambda h: (h.relevance(words), h.name.lower()))
-
-        for hat in matched:
-            item = QListWidgetItem(hat.name)              # текст как fallback
-            item.setData(Qt.ItemDataRole.UserRole, hat)   # основные данные для делегата
-            item.setSizeHint(QSize(0, 52))
-            self._list.addItem(item)
-
-        self._list.blockSignals(False)
+        selection.blockSignals(False)
 
         count = len(matched)
         self._status_lbl.setText(self._t["n_items"].format(n=count))
 
         # Если нет результатов при активном поиске — показываем подсказку
-        if count == 0 and (words or cls_filter != "all"):
+        if count == 0 and (query or cls_filter != "all"):
             self._show_no_results()
         elif not self._list.isVisible():
             self._show_list()
@@ -517,20 +647,21 @@ class HatsPanel(QWidget):
         # При любой смене выбора убираем прежний выпадающий список классов.
         self._remove_dropdown()
 
-        if current is None:
+        if not current.isValid():
             self._selected_hat = None
             self.hat_deselected.emit()
             return
+        # current — не постоянный индекс: после удаления аккордеона берём заново
+        current = self._list.currentIndex()
         hat: HatItem = current.data(Qt.ItemDataRole.UserRole)
         if not hat:
-            return  # служебный item (например, сам dropdown) — игнорируем
+            return  # служебная строка (например, сам dropdown) — игнорируем
         self._selected_hat = hat
         self.hat_selected.emit(hat.mdl_path, hat.name)
 
         # Мультиклассовая шапка → раскрываем под ней список классов.
         if self._is_multiclass(hat):
-            row = self._list.row(current)
-            self._inject_dropdown(row, hat)
+            self._inject_dropdown(current.row(), hat)
 
     # ── Выпадающий список классов (мультиклассовые шапки) ─────────────────── #
 
@@ -540,20 +671,18 @@ class HatsPanel(QWidget):
         return bool(hat) and len(getattr(hat, "per_class_models", {}) or {}) > 1
 
     def _remove_dropdown(self) -> None:
-        """Удаляет инъецированный item-аккордеон с чекбоксами классов."""
-        if self._dropdown_item is not None:
-            row = self._list.row(self._dropdown_item)
-            if row >= 0:
-                self._list.blockSignals(True)
-                self._list.takeItem(row)
-                self._list.blockSignals(False)
-        self._dropdown_item = None
+        """Удаляет вставленную строку-аккордеон с чекбоксами классов."""
+        if self._model.dropdown_row() >= 0:
+            selection = self._list.selectionModel()
+            selection.blockSignals(True)
+            self._model.remove_dropdown()     # виджет строки удаляется вместе с ней
+            selection.blockSignals(False)
         self._dropdown_hat = None
         self._class_chip_btns = {}
         self._selected_classes = {}
 
     def _inject_dropdown(self, row: int, hat: HatItem) -> None:
-        """Вставляет под строкой row item с чекбоксами классов (все отмечены)."""
+        """Вставляет под строкой row строку с чекбоксами классов (все отмечены)."""
         self._dropdown_hat = hat
         self._selected_classes = {cls: True for cls in hat.per_class_models}
 
@@ -566,15 +695,11 @@ class HatsPanel(QWidget):
         height = 6 + 16 + 6 + rows * 20 + max(0, rows - 1) * 4 + 9
         widget.setFixedHeight(height)
 
-        item = QListWidgetItem()
-        item.setFlags(Qt.ItemFlag.NoItemFlags)   # не выбирается, не реагирует на клик
-        item.setSizeHint(QSize(self._list.viewport().width(), height))
-
-        self._list.blockSignals(True)
-        self._list.insertItem(row + 1, item)
-        self._list.setItemWidget(item, widget)
-        self._list.blockSignals(False)
-        self._dropdown_item = item
+        selection = self._list.selectionModel()
+        selection.blockSignals(True)
+        self._model.insert_dropdown(row + 1, height)
+        self._list.setIndexWidget(self._model.index(row + 1), widget)
+        selection.blockSignals(False)
 
     def _build_class_dropdown_widget(self, hat: HatItem) -> QWidget:
         """Виджет-контейнер: заголовок + сетка чипов-классов (3 в ряд)."""
@@ -671,3 +796,7 @@ class HatsPanel(QWidget):
         self._t = _I18N[self._language]
         self._search_input.setPlaceholderText(self._t["search_hint"])
         self._refresh_btn.setToolTip(self._t["refresh"])
+
+    def shutdown(self) -> None:
+        """Остановка фонового рендера миниатюр при закрытии окна."""
+        self._thumbs.shutdown()
@@ -15,8 +15,6 @@ from PySide6.QtGui import QDesktopServices, QMouseEvent, QIcon
 from src.ui.preview_panel import PreviewPanel
 from src.ui.progress_mixin import ProgressDialogMixin
 from src.ui.settings_panel import SettingsPanel
-from src.ui.vmt_editor import VMTEditorDialog
-from src.ui.settings_dialog import SettingsDialog
 from src.data.translations import TRANSLATIONS
 from src.data.weapons import (
     TF2_WEAPONS, TF2_CLASSES, WEAPON_SLOT_TYPES, SPECIAL_MODES,
@@ -25,7 +23,6 @@ from src.data.weapons import (
 from src.shared.logging_config import get_logger
 from src.ui.error_handler import ErrorHandler
 from src.shared.validators import validate_vpk_filename
-from src.services.update_checker import UpdateChecker
 
 logger = get_logger(__name__)
 
@@ -94,7 +91,7 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         super().__init__()
         from src.config.app_config import AppConfig
         from src.core.app_factory import AppFactory
-        self.config = AppConfig.load_config()
+        self.config = AppConfig.snapshot()
         self.language = self.config.get('language') or 'en'
         self.t = TRANSLATIONS[self.language]
         self.setWindowTitle("TF2 Skin Generator")
@@ -111,14 +108,25 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         self.current_weapon_type = None
         self.current_weapon = None
         self.mode = None
+
+        # Прогрев кэша декомпиляции по выбору модели (до init_ui: сигналы
+        # выбора могут сработать уже при построении комбобоксов)
+        from src.services.decompile_prefetch import DecompilePrefetcher
+        self._decompile_prefetcher = DecompilePrefetcher(self)
         
         self.setAcceptDrops(True)
 
         self.init_ui()
         self.setup_connections()
 
-        # Запускаем проверку обновлений в фоне (не блокирует UI)
-        self._start_update_check()
+        # Снимок конфига, язык и тема следуют за сохранениями конфига —
+        # кто бы их ни сделал (диалог настроек, панель, фоновые воркеры)
+        from src.config.config_signals import config_signals
+        config_signals().changed.connect(self._on_config_changed)
+
+        # 3D-превью (QtWebEngine) и проверка обновлений (urllib) — после
+        # первой отрисовки окна, см. showEvent/_deferred_startup
+        self._startup_done = False
 
         # Восстанавливаем геометрию окна из конфига
         saved_geom = self.config.get('window_geometry')
@@ -292,8 +300,41 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
 
         return banner
 
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        if not self._startup_done:
+            self._startup_done = True
+            from PySide6.QtCore import QTimer
+            QTimer.singleShot(0, self._deferred_startup)
+
+    def _deferred_startup(self) -> None:
+        """Тяжёлая часть старта — когда окно уже нарисовано."""
+        self.preview_panel.materialize_3d()
+        # Проверка обновлений в фоне (не блокирует UI)
+        self._start_update_check()
+        self._start_temp_janitor()
+
+    def _start_temp_janitor(self) -> None:
+        """Фоновая уборка старых temp-папок (сборки, превью-воркеры)."""
+        from src.services.temp_janitor import TempJanitorWorker
+        self._temp_janitor = TempJanitorWorker()
+        self._temp_janitor.cleaned.connect(self._on_temp_cleaned)
+        self._temp_janitor.start()
+
+    def _on_temp_cleaned(self, freed: int, items: int) -> None:
+        """Сохраняет итог уборки — его показывает диалог настроек."""
+        if not freed and not items:
+            return
+        from datetime import datetime
+        from src.config.app_config import AppConfig
+        from src.services.temp_janitor import CONFIG_KEY, merge_report
+        AppConfig.set(CONFIG_KEY, merge_report(
+            AppConfig.get(CONFIG_KEY), int(freed), items,
+            datetime.now().isoformat(timespec="seconds")))
+
     def _start_update_check(self) -> None:
         """Запускает фоновую проверку обновлений."""
+        from src.services.update_checker import UpdateChecker
         self._update_checker = UpdateChecker()
         self._update_checker.update_available.connect(self._on_update_available)
         self._update_checker.start()
@@ -321,7 +362,6 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
             QPushButton, QWidget, QStackedWidget,
         )
         from src.utils.themes import get_modern_styles
-        from src.ui.hats_panel import HatsPanel
 
         container = QWidget()
         layout = QVBoxLayout(container)
@@ -496,11 +536,8 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         hats_page_layout = QVBoxLayout(hats_page)
         hats_page_layout.setContentsMargins(0, 8, 0, 0)
         hats_page_layout.setSpacing(0)
-
-        self.hats_panel = HatsPanel(hats_page, language=self.language)
-        self.hats_panel.hat_selected.connect(self._on_hat_selected)
-        self.hats_panel.hat_deselected.connect(self._on_hat_deselected)
-        hats_page_layout.addWidget(self.hats_panel)
+        # Сама панель шапок создаётся при первом открытии вкладки (_ensure_hats_panel)
+        self._hats_page = hats_page
 
         self._left_stack.addWidget(weapons_page)   # index 0
         self._left_stack.addWidget(hats_page)      # index 1
@@ -518,10 +555,20 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
     def _get_accent_color(self) -> str:
         try:
             from src.config.app_config import AppConfig
-            return "#4a90e2" if AppConfig.load_config().get("theme") == "blue" else "#ff6b35"
+            return "#4a90e2" if AppConfig.snapshot().get("theme") == "blue" else "#ff6b35"
         except Exception:
             return "#ff6b35"
 
+    def _ensure_hats_panel(self):
+        """Создаёт панель шапок при первом обращении."""
+        if not hasattr(self, 'hats_panel'):
+            from src.ui.hats_panel import HatsPanel
+            self.hats_panel = HatsPanel(self._hats_page, language=self.language)
+            self.hats_panel.hat_selected.connect(self._on_hat_selected)
+            self.hats_panel.hat_deselected.connect(self._on_hat_deselected)
+            self._hats_page.layout().addWidget(self.hats_panel)
+        return self.hats_panel
+
     def _switch_tab(self, index: int) -> None:
         """Переключает вкладку Weapons / Hats."""
         self._current_tab = index
@@ -564,8 +611,8 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         if index == 1:
             # Загружаем шапки если ещё не загружены
             from src.config.app_config import AppConfig
-            tf2_root = AppConfig.load_config().get("tf2_game_folder", "")
-            self.hats_panel.load_hats(tf2_root)
+            tf2_root = AppConfig.snapshot().tf2_game_folder
+            self._ensure_hats_panel().load_hats(tf2_root)
             # Сбрасываем weapons mode
             self.mode = None
             self._hat_mdl_path = None
@@ -592,8 +639,10 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         # Обновляем 3D preview и сводку
         self._update_hat_3d_preview()
         self.update_preview_info()
+        self._schedule_decompile_prefetch()
 
     def _on_hat_deselected(self) -> None:
+        self._decompile_prefetcher.cancel()
         self._hat_mdl_path = None
         self._hat_display_name = ""
         self.mode = None
@@ -1163,6 +1212,46 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         # Обновляем резюме в превью
         self.update_preview_info()
 
+        self._schedule_decompile_prefetch()
+
+    def _schedule_decompile_prefetch(self) -> None:
+        """
+        Ставит прогрев кэша декомпиляции для текущего выбора (и соседних
+        пунктов списка оружия) — к нажатию «Собрать» Crowbar уже отработал.
+        """
+        from src.config.app_config import AppConfig
+        from src.services.decompile_prefetch import PrefetchTarget
+
+        if not AppConfig.get('prefetch_decompile', True) or not self.mode:
+            self._decompile_prefetcher.cancel()
+            return
+        tf2_root = self.settings_panel.get_settings().get('tf2_game_folder', '') \
+            if hasattr(self, 'settings_panel') else ''
+
+        if self.mode == "hat":
+            targets = [PrefetchTarget("hat", getattr(self, '_hat_mdl_path', None))]
+        else:
+            targets = [PrefetchTarget(self.mode)]
+            if self._current_category == 'weapon' and self.current_class:
+                targets += [
+                    PrefetchTarget(f"{self.current_class.lower()}_{key}")
+                    for key in self._neighbor_weapon_keys()
+                ]
+        self._decompile_prefetcher.schedule(targets, tf2_root)
+
+    def _neighbor_weapon_keys(self) -> list:
+        """Ключи оружия рядом с выбранным в комбобоксе (вероятный следующий выбор)."""
+        combo = getattr(self, 'weapon_combo', None)
+        if combo is None:
+            return []
+        keys = []
+        row = combo.currentIndex()
+        for i in (row + 1, row - 1):
+            text = combo.itemText(i) if 0 <= i < combo.count() else ''
+            if '(' in text:
+                keys.append(text.split('(')[-1].rstrip(')').strip())
+        return keys
+
     def _resolve_3d_weapon_key(self) -> Optional[str]:
         """
         weapon_key для 3D Preview по текущему режиму, либо None если показывать нечего.
@@ -1326,12 +1415,13 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         """Обработка изменения языка из настроек"""
         lang_code = 'ru' if index == 0 else 'en'
         
-        # Сохраняем в конфиг
+        # Сохраняем в конфиг: язык применит _on_config_changed
         from src.config.app_config import AppConfig
         AppConfig.set("language", lang_code)
-        
-        # Используем единый метод для установки языка
-        self.set_language(lang_code)
+
+        # Конфиг не сохранился — всё равно переключаем язык в этой сессии
+        if self.language != lang_code:
+            self.set_language(lang_code)
 
     def dropEvent(self, event) -> None:
         urls = event.mimeData().urls()
@@ -1611,6 +1701,7 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
 
     def open_vmt_editor(self, path: str, weapon_key: str = "", display_name: str = "") -> None:
         """Открывает редактор VMT файла"""
+        from src.ui.vmt_editor import VMTEditorDialog
         dialog = VMTEditorDialog(self, path, weapon_key, self.t, display_name=display_name)
         dialog.exec()
 
@@ -1985,10 +2076,17 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
                     self.preview_panel.get_blu_slot_image_paths()
                     if hasattr(self, 'preview_panel') else None
                 ),
+                texture_variants=settings.get('texture_variants'),
             )
+            # Прогрев этой же модели сборка дожидается, остальные отменяются:
+            # их Crowbar не должен занимать диск и очередь во время сборки
+            from src.services.decompile_prefetch import PrefetchTarget
+            _prefetch_done = self._decompile_prefetcher.claim_for_build(PrefetchTarget(
+                self.mode, hat_mdl_path_for_build if self.mode == "hat" else None))
+
             # Без parent=self ! Если дать parent=self, Qt станет владельцем
             # и не удалит старый воркер при замене, и сигналы будут дублироваться.
-            self._build_worker = BuildWorker(request=_request)
+            self._build_worker = BuildWorker(request=_request, prefetch_done=_prefetch_done)
             
             # Подключаем сигналы
             self._build_worker.finished.connect(self._on_build_finished)
@@ -2589,7 +2687,7 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
 
         export_folder = settings.get('export_folder', 'export')
         from src.config.app_config import AppConfig
-        export_format = AppConfig.load_config().get('export_image_format', 'PNG')
+        export_format = AppConfig.snapshot().get('export_image_format', 'PNG')
 
         if self._worker_busy('_extract_worker', 'extract_already_running',
                              'Extraction is already in progress.'):
@@ -2672,8 +2770,7 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         # Получаем папку экспорта и формат
         export_folder = settings.get('export_folder', 'export')
         from src.config.app_config import AppConfig
-        config = AppConfig.load_config()
-        export_format = config.get('export_image_format', 'PNG')
+        export_format = AppConfig.snapshot().get('export_image_format', 'PNG')
 
         # Проверяем, не запущено ли уже извлечение
         if self._worker_busy('_extract_worker', 'extract_already_running',
@@ -2817,6 +2914,7 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         
         # Получаем выбранные файлы
         selected_files = dialog.get_selected_files()
+        conflict_policy = dialog.get_conflict_policy()
         if not selected_files:
             ErrorHandler.show_warning(self, self.t.get('no_vpk_files_selected', 'No VPK files selected'), self.t['error'])
             return
@@ -2862,7 +2960,8 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
         
         # Выполняем объединение в отдельном потоке
         from src.services.merge_vpk_worker import MergeVpkWorker
-        self._merge_worker = MergeVpkWorker(selected_files, filename, export_folder, self.language)
+        self._merge_worker = MergeVpkWorker(selected_files, filename, export_folder, self.language,
+                                            conflict_policy=conflict_policy)
         self._merge_worker.finished.connect(self._on_merge_finished)
         self._merge_worker.progress.connect(self._on_merge_progress)
 
@@ -2908,6 +3007,11 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
                     obj.stop(2000)
                 except Exception:
                     pass
+        self._decompile_prefetcher.shutdown()
+        if hasattr(self, 'settings_panel'):
+            self.settings_panel.shutdown_prewarm()
+        if hasattr(self, 'hats_panel'):
+            self.hats_panel.shutdown()
 
         from src.config.app_config import AppConfig
         geom_b64 = self.saveGeometry().toBase64().data().decode()
@@ -2916,9 +3020,22 @@ class MainWindow(QMainWindow, ProgressDialogMixin):
 
     def open_settings_dialog(self) -> None:
         """Открывает диалог настроек"""
+        from src.ui.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self)
         dialog.exec()
 
+    def _on_config_changed(self, snapshot, keys) -> None:
+        """Обновляет снимок конфига и применяет изменившиеся язык и тему."""
+        self.config = snapshot
+        if "language" in keys and snapshot.language in TRANSLATIONS and snapshot.language != self.language:
+            self.set_language(snapshot.language)
+        if "theme" in keys:
+            from PySide6.QtWidgets import QApplication
+            from src.utils.themes import apply_theme
+            app = QApplication.instance()
+            if app:
+                apply_theme(app, snapshot.theme)
+
     def set_language(self, lang):
         self.language = lang
         self.t = TRANSLATIONS[lang]
@@ -15,7 +15,10 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QDoubleValidator, QColor
 
-from src.data.material_maps import MATERIAL_MAPS, MAP_DISPLAY_ORDER
+from src.data.material_maps import (
+    MATERIAL_MAPS, MAP_DISPLAY_ORDER,
+    DEFAULT_NORMAL_STRENGTH, MAX_NORMAL_STRENGTH, MIN_NORMAL_STRENGTH,
+)
 
 _IMG_FILTER = "Images (*.png *.jpg *.jpeg *.bmp *.tga *.tiff *.webp);;All Files (*)"
 
@@ -180,6 +183,7 @@ class MaterialMapsDialog(QDialog):
             else:
                 grid.addWidget(card, i // 2, i % 2, Qt.AlignTop)
         content.addLayout(grid)
+        self._link_normal_strength()
 
         content.addSpacing(2)
 
@@ -304,6 +308,22 @@ class MaterialMapsDialog(QDialog):
             cell.addWidget(threshold_edit)
             params_row.addLayout(cell)
 
+        # Сила рельефа нормали, которую сборка выводит из базы (phong / rim light)
+        normal_edit = None
+        if cfg.get('derive_auto_normal'):
+            cell = QHBoxLayout()
+            cell.setSpacing(6)
+            cell.addWidget(self._field_label(self.t.get('map_normal_strength', 'Normal strength')))
+            normal_edit = QLineEdit(str(saved.get('normal_strength', '')))
+            normal_edit.setPlaceholderText(str(DEFAULT_NORMAL_STRENGTH))
+            normal_edit.setToolTip(self.t.get('map_normal_strength_tip', ''))
+            normal_edit.setValidator(QDoubleValidator(
+                MIN_NORMAL_STRENGTH, MAX_NORMAL_STRENGTH, 2, normal_edit))
+            normal_edit.setFixedWidth(64)
+            normal_edit.setMinimumHeight(28)
+            cell.addWidget(normal_edit)
+            params_row.addLayout(cell)
+
         for param in cfg.get('numeric', ()):
             label_key = 'map_' + param.lstrip('$').lower()
             cell = QHBoxLayout()
@@ -327,7 +347,7 @@ class MaterialMapsDialog(QDialog):
             params_row.addLayout(cell)
 
         params_row.addStretch()
-        if cfg.get('derive_kind') or cfg.get('numeric'):
+        if cfg.get('derive_kind') or cfg.get('numeric') or normal_edit is not None:
             lay.addLayout(params_row)
 
         # Доступность тела + режим auto/file
@@ -348,6 +368,9 @@ class MaterialMapsDialog(QDialog):
                         wdg.setEnabled(on and not auto)
             if threshold_edit is not None:
                 threshold_edit.setEnabled(on and auto)
+            if normal_edit is not None:
+                # Нормаль выводится только в авто-режиме (у rim light — всегда)
+                normal_edit.setEnabled(on and (auto or vmt_only))
 
         cb.toggled.connect(lambda _=None: _sync())
         if auto_cb:
@@ -356,10 +379,28 @@ class MaterialMapsDialog(QDialog):
 
         self._rows[map_id] = {
             'cb': cb, 'auto': auto_cb, 'path': path_edit,
-            'threshold': threshold_edit, 'numeric': numeric,
+            'threshold': threshold_edit, 'normal_strength': normal_edit,
+            'numeric': numeric,
         }
         return card
 
+    def _link_normal_strength(self) -> None:
+        """
+        «Сила нормали» одна на материал: phong и rim light используют одну
+        выведенную из базы нормаль, поэтому поля в их карточках связаны.
+        """
+        edits = [row['normal_strength'] for row in self._rows.values() if row['normal_strength']]
+        # Из старого конфига с разными значениями — то, что взяла бы сборка (первое)
+        shared = next((e.text() for e in edits if e.text().strip()), '')
+        for edit in edits:
+            edit.setText(shared)
+            others = [o for o in edits if o is not edit]
+
+            def _mirror(text, others=others):
+                for other in others:
+                    other.setText(text)
+            edit.textEdited.connect(_mirror)
+
     def _browse(self, edit: QLineEdit) -> None:
         path, _ = QFileDialog.getOpenFileName(
             self, self.t.get('map_select', 'Select map image'), '', _IMG_FILTER)
@@ -394,6 +435,9 @@ class MaterialMapsDialog(QDialog):
                         continue
                     entry = {'image': img}
 
+            strength = row['normal_strength'].text().strip() if row['normal_strength'] else ''
+            if strength and (entry.get('derive') or entry.get('enabled')):
+                entry['normal_strength'] = strength
             for param, w in row['numeric'].items():
                 val = w.currentData() if isinstance(w, QComboBox) else w.text().strip()
                 if val:
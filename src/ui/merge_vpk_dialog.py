@@ -7,12 +7,13 @@ from typing import List
 
 from PySide6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QLabel, QCheckBox,
-    QPushButton, QScrollArea, QWidget,
+    QPushButton, QScrollArea, QWidget, QComboBox,
 )
 from PySide6.QtCore import Qt
 
 from src.data.translations import TRANSLATIONS
 from src.config.app_config import AppConfig
+from src.services.merge_vpk_service import ConflictPolicy
 from src.shared.logging_config import get_logger
 from src.ui.styled_dialog import StyledDialog
 
@@ -26,7 +27,7 @@ class MergeVPKDialog(StyledDialog):
         if parent and hasattr(parent, 't'):
             self.t = parent.t
         else:
-            config = AppConfig.load_config()
+            config = AppConfig.snapshot()
             lang = config.get('language') or 'en'
             self.t = TRANSLATIONS[lang]
 
@@ -107,6 +108,26 @@ class MergeVPKDialog(StyledDialog):
         sel_row.addStretch()
         body.addLayout(sel_row)
 
+        # Политика конфликтов: что делать с одинаковыми путями в разных модах
+        policy_row = QHBoxLayout()
+        policy_row.setSpacing(8)
+        policy_row.addWidget(self.label(self.t.get('merge_conflict_policy', 'When files collide:'), size=11,
+                                        color=c['text_sub']))
+        self.policy_combo = QComboBox()
+        self.policy_combo.setFixedHeight(28)
+        self.policy_combo.setStyleSheet(f"""
+            QComboBox {{
+                background: rgba(255,255,255,0.03); color: {c['text']};
+                border: 1px solid {c['border']}; border-radius: 3px;
+                font-size: 11px; padding: 0 8px;
+            }}
+            QComboBox:hover {{ border-color: {c['border_h']}; }}
+        """)
+        for policy in ConflictPolicy.ALL:
+            self.policy_combo.addItem(self.t.get(f'merge_conflict_{policy}', policy), policy)
+        policy_row.addWidget(self.policy_combo, 1)
+        body.addLayout(policy_row)
+
         root.addLayout(body)
 
         # ── Футер ─────────────────────────────────────────────────────── #
@@ -126,7 +147,7 @@ class MergeVPKDialog(StyledDialog):
         self.resize(500, 460)
 
     def load_vpk_files(self):
-        config = AppConfig.load_config()
+        config = AppConfig.snapshot()
         export_path = Path(config.get('export_folder', 'export'))
         c = self._c
 
@@ -185,6 +206,9 @@ class MergeVPKDialog(StyledDialog):
         for cb in self.checkboxes:
             cb.setChecked(False)
 
+    def get_conflict_policy(self) -> str:
+        return self.policy_combo.currentData() or ConflictPolicy.FIRST_WINS
+
     def get_selected_files(self) -> List[Path]:
         return [
             self.vpk_files_list[i]
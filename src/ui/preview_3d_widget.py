@@ -9,9 +9,15 @@
   - Texture:     data URL (base64-encoded PNG)
 
 Это гарантирует работу без CORS-проблем и file:// ограничений Chromium.
+
+Импорт QtWebEngine и запуск Chromium — самая тяжёлая часть старта окна,
+поэтому панель превью создаёт виджет отложенно (Preview3DWidget.create(...,
+deferred=True)): сразу — пустой контейнер, а QWebEngineView — в materialize()
+после первого показа окна. Вызовы API до этого копятся и проигрываются.
 """
 
 import base64
+import importlib.util
 import json
 import os
 from typing import Optional
@@ -82,6 +88,16 @@ def is_webengine_available() -> bool:
     return _WEBENGINE_AVAILABLE
 
 
+def webengine_installed() -> bool:
+    """Есть ли PySide6-WebEngine — без импорта самого модуля (дёшево на старте)."""
+    if _WEBENGINE_AVAILABLE is not None:
+        return _WEBENGINE_AVAILABLE
+    try:
+        return importlib.util.find_spec("PySide6.QtWebEngineWidgets") is not None
+    except (ImportError, ValueError):
+        return False
+
+
 class Preview3DWidget:
     """
     Фабрика: возвращает реальный QWebEngineView (если доступен)
@@ -95,7 +111,13 @@ class Preview3DWidget:
     """
 
     @staticmethod
-    def create(parent=None):
+    def create(parent=None, deferred: bool = False):
+        if deferred:
+            return _Deferred3DWidget(parent)
+        return Preview3DWidget._create_now(parent)
+
+    @staticmethod
+    def _create_now(parent=None):
         if is_webengine_available() and os.path.exists(_HTML_PATH):
             return _Real3DWidget(parent)
         else:
@@ -107,6 +129,8 @@ class Preview3DWidget:
 class _Real3DWidget:
     """QWebEngineView с Three.js viewer."""
 
+    available = True
+
     def __init__(self, parent=None):
         from PySide6.QtCore import QUrl
         from PySide6.QtWebEngineWidgets import QWebEngineView
@@ -386,6 +410,7 @@ class _Fallback3DWidget:
     """QLabel-заглушка когда PySide6-WebEngine не установлен."""
 
     _bridge = None   # нет JS-моста в fallback-режиме
+    available = False
 
     def __init__(self, parent=None):
         from PySide6.QtWidgets import QLabel
@@ -428,6 +453,90 @@ class _Fallback3DWidget:
     def reset(self): pass
 
 
+# ── Отложенное создание ──────────────────────────────────────────────────── #
+
+# Публичный API виджета: вызовы до materialize() копятся и проигрываются
+_DEFERRED_METHODS = frozenset({
+    "set_language", "show_prompt", "load_model_files", "apply_material_map",
+    "set_editable_mesh_names", "update_texture_file", "update_animated_texture_files",
+    "load_crithit_scene", "load_crithit_scene_with_model", "update_crithit_texture",
+    "show_loading", "show_error", "reset",
+})
+
+
+class _Deferred3DWidget:
+    """
+    Контейнер под 3D-виджет: реальный (или заглушка) создаётся в materialize().
+
+    До этого методы API (_DEFERRED_METHODS) запоминаются по порядку, а
+    _bridge — None; подписки на мост — через on_ready().
+    """
+
+    def __init__(self, parent=None):
+        from PySide6.QtWidgets import QVBoxLayout, QWidget
+        self._container = QWidget(parent)
+        self._layout = QVBoxLayout(self._container)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._real = None
+        self._calls: list = []
+        self._ready_callbacks: list = []
+
+    @property
+    def qt_widget(self):
+        return self._container
+
+    @property
+    def _bridge(self):
+        return getattr(self._real, "_bridge", None)
+
+    def setParent(self, parent): self._container.setParent(parent)
+    def show(self): self._container.show()
+    def hide(self): self._container.hide()
+    def setSizePolicy(self, *a): self._container.setSizePolicy(*a)
+    def setMinimumHeight(self, h): self._container.setMinimumHeight(h)
+    def setMinimumWidth(self, w): self._container.setMinimumWidth(w)
+
+    def is_materialized(self) -> bool:
+        return self._real is not None
+
+    def on_ready(self, callback) -> None:
+        """callback(widget) — сразу, если виджет уже создан, иначе после materialize()."""
+        if self._real is not None:
+            callback(self._real)
+        else:
+            self._ready_callbacks.append(callback)
+
+    def materialize(self):
+        """Создаёт реальный виджет (один раз) и проигрывает накопленные вызовы."""
+        if self._real is not None:
+            return self._real
+        try:
+            real = Preview3DWidget._create_now(self._container)
+        except ImportError as exc:
+            logger.warning(f"3D Preview недоступен: {exc}")
+            real = _Fallback3DWidget(self._container)
+        self._real = real
+        self._layout.addWidget(real.qt_widget)
+        calls, self._calls = self._calls, []
+        for name, args, kwargs in calls:
+            getattr(real, name)(*args, **kwargs)
+        callbacks, self._ready_callbacks = self._ready_callbacks, []
+        for callback in callbacks:
+            callback(real)
+        return real
+
+    def __getattr__(self, name):
+        if name not in _DEFERRED_METHODS:
+            raise AttributeError(name)
+
+        def _call(*args, **kwargs):
+            if self._real is not None:
+                return getattr(self._real, name)(*args, **kwargs)
+            self._calls.append((name, args, kwargs))
+            return None
+        return _call
+
+
 # ── Утилита ──────────────────────────────────────────────────────────────── #
 
 def _file_to_data_url(path: str) -> str:
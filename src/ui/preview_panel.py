@@ -64,9 +64,10 @@ def _vtf_to_temp_png(vtf_path: str) -> Optional[str]:
     try:
         from src.services.vtflib_wrapper import VTFLib
         from PIL import Image
+        from src.services import image_save
         rgba, w, h = VTFLib.read_vtf_as_rgba(vtf_path)
         png = str(get_temp_file_path(prefix='tf2_vtf_', suffix='.png'))
-        Image.frombytes("RGBA", (w, h), rgba).save(png)
+        image_save.save(Image.frombytes("RGBA", (w, h), rgba), png, image_save.VIEWER)
         return png
     except Exception as exc:
         logger.warning(f"VTF→PNG для карточки не удался ({vtf_path}): {exc}")
@@ -377,13 +378,12 @@ class _SpyMaskVtfWorker(QThread):
         self._dir = out_dir
 
     def run(self):
-        from src.services import vtf_preview_service as vps
+        from src.services import preview_texture_cache, vtf_preview_service as vps
         os.makedirs(self._dir, exist_ok=True)
         paks = vps.open_vpks(self._vpks)
         for vtf in self._names:
             data = vps.read_from_vpks(paks, f"materials/models/player/spy/{vtf}.vtf")
-            png = vps.vtf_bytes_to_png(
-                data, os.path.join(self._dir, f"{vtf}.png"), self._dir)
+            png = preview_texture_cache.get_first_frame(data, vtf)
             if png:
                 self.one.emit(vtf, png)
 
@@ -521,7 +521,7 @@ class PreviewPanel(QWidget):
         # ── i18n ──────────────────────────────────────────────────────────── #
         from src.config.app_config import AppConfig
         from src.data.translations import TRANSLATIONS
-        config = AppConfig.load_config()
+        config = AppConfig.snapshot()
         self._lang = config.get('language') or 'en'
         self.t = TRANSLATIONS[self._lang]
 
@@ -877,9 +877,10 @@ class PreviewPanel(QWidget):
         return panel
 
     def _init_3d_widget(self) -> None:
-        from src.ui.preview_3d_widget import Preview3DWidget, is_webengine_available
-        self._3d_available = is_webengine_available()
-        self._3d_widget = Preview3DWidget.create(self)
+        from src.ui.preview_3d_widget import Preview3DWidget, webengine_installed
+        # Сам QWebEngineView создаётся в materialize_3d() — после показа окна
+        self._3d_available = webengine_installed()
+        self._3d_widget = Preview3DWidget.create(self, deferred=True)
         self._3d_widget.set_language(self._lang)
 
         qt_w = self._3d_widget.qt_widget
@@ -889,8 +890,15 @@ class PreviewPanel(QWidget):
 
         self.page_3d = qt_w
         self.view_stack.addWidget(self.page_3d)
+        self._3d_widget.on_ready(self._on_3d_widget_ready)
 
-        bridge = getattr(self._3d_widget, '_bridge', None)
+    def materialize_3d(self) -> None:
+        """Создаёт WebEngine-виджет 3D (вызывается окном после первого показа)."""
+        self._3d_widget.materialize()
+
+    def _on_3d_widget_ready(self, widget) -> None:
+        self._3d_available = widget.available
+        bridge = getattr(widget, '_bridge', None)
         if bridge is not None:
             try:
                 bridge.texture_dropped.connect(self._on_3d_texture_dropped)
@@ -3128,6 +3136,7 @@ class PreviewPanel(QWidget):
         rendered = False
 
         try:
+            from src.services import image_save
             from src.services.vtflib_wrapper import VTFLib
             from PIL import Image
             from PySide6.QtGui import QImage
@@ -3137,7 +3146,7 @@ class PreviewPanel(QWidget):
             if not qimg.isNull():
                 rendered = True
                 png_for_3d = str(get_temp_file_path(prefix='tf2_3d_', suffix='.png'))
-                Image.frombytes("RGBA", (w, h), rgba).save(png_for_3d)
+                image_save.save(Image.frombytes("RGBA", (w, h), rgba), png_for_3d, image_save.VIEWER)
                 self.image_path = png_for_3d
 
                 # Сохраняем под активной командой
@@ -3425,6 +3434,7 @@ class PreviewPanel(QWidget):
 
         try:
             from PIL import Image
+            from src.services import image_save
 
             gif = Image.open(gif_path)
             n = getattr(gif, 'n_frames', 1)
@@ -3441,7 +3451,7 @@ class PreviewPanel(QWidget):
             for i in range(n):
                 gif.seek(i)
                 tmp = str(get_temp_file_path(prefix=f'tf2_gif{i}_', suffix='.png'))
-                gif.convert('RGBA').save(tmp)
+                image_save.save(gif.convert('RGBA'), tmp, image_save.VIEWER)
                 frames.append(tmp)
 
             self._gif_cache[gif_path] = (frames, fps)
@@ -3611,12 +3621,13 @@ class PreviewPanel(QWidget):
     @staticmethod
     def _convert_model_vtf(vtf_path: str) -> str:
         try:
+            from src.services import image_save
             from src.services.vtflib_wrapper import VTFLib
             from PIL import Image
             rgba, w, h = VTFLib.read_vtf_as_rgba(vtf_path)
             img = Image.frombytes("RGBA", (w, h), rgba)
             png = str(get_temp_file_path(prefix='tf2_model_tex_', suffix='.png'))
-            img.save(png)
+            image_save.save(img, png, image_save.VIEWER)
             return png
         except Exception as exc:
             logger.warning(f"VTF→PNG модели: {exc}")
@@ -283,6 +283,22 @@ class SettingsDialog(StyledDialog):
         self.theme_combo.addItem(self.t.get('theme_dark', 'Dark'), "dark")
         self.theme_combo.addItem(self.t.get('theme_blue', 'Blue'), "blue")
         lay.addLayout(_pref_row(self.t.get('theme_label', 'Theme'), self.theme_combo))
+        lay.addSpacing(14)
+
+        # Доп. варианты текстур: по VPK на каждый за одну сборку (texture_variants)
+        lay.addWidget(_field_label(self.t.get('texture_variants_label', 'Extra texture variants')))
+        lay.addSpacing(4)
+        variants_hint = QLabel(self.t.get(
+            'texture_variants_hint',
+            'suffix:size[:format], comma separated. Each variant is packed into '
+            'its own VPK (my_mod_lite.vpk) in the same build. Empty = off.'))
+        variants_hint.setWordWrap(True)
+        variants_hint.setStyleSheet(
+            f"color: {_TEXT_DIM}; font-size: 10.5px; background: transparent; border: none;")
+        lay.addWidget(variants_hint)
+        lay.addSpacing(5)
+        self.texture_variants_edit = _line_edit("lite:512, hq:2048:DXT5")
+        lay.addWidget(self.texture_variants_edit)
 
         lay.addSpacing(22)
         lay.addWidget(_divider())
@@ -300,6 +316,14 @@ class SettingsDialog(StyledDialog):
         self.debug_mode_checkbox = QCheckBox(self.t.get('debug_mode', 'Debug mode'))
         self.debug_mode_checkbox.setStyleSheet(_CHECK_STYLE)
         lay.addWidget(self.debug_mode_checkbox)
+        lay.addSpacing(8)
+
+        from src.services.temp_janitor import CONFIG_KEY, cleanup_report
+        self.temp_cleanup_label = QLabel(cleanup_report(self.t, self.config.get(CONFIG_KEY)))
+        self.temp_cleanup_label.setWordWrap(True)
+        self.temp_cleanup_label.setStyleSheet(
+            f"color: {_TEXT_DIM}; font-size: 10.5px; background: transparent; border: none;")
+        lay.addWidget(self.temp_cleanup_label)
 
         lay.addSpacing(14)
 
@@ -418,6 +442,10 @@ class SettingsDialog(StyledDialog):
         patterns = self.config.get("material_blacklist", []) or []
         self.blacklist_edit.setPlainText("\n".join(str(p) for p in patterns))
 
+        from src.services import texture_variants
+        self.texture_variants_edit.setText(
+            texture_variants.format_spec(self.config.get("texture_variants", [])))
+
     def save_settings(self):
         self.config["tf2_game_folder"]  = self.tf2_game_path.text().strip()
         self.config["export_folder"]    = self.export_folder_path.text().strip() or "export"
@@ -436,20 +464,13 @@ class SettingsDialog(StyledDialog):
                 seen.add(p.lower())
                 patterns.append(p)
         self.config["material_blacklist"] = patterns
+        from src.services import texture_variants
+        self.config["texture_variants"] = texture_variants.parse_spec(
+            self.texture_variants_edit.text())
 
+        # Язык и тему применяет главное окно по сигналу изменения конфига
         AppConfig.save_config(self.config)
 
-        # Применяем язык
-        if hasattr(self.parent(), 'change_language_from_combo'):
-            self.parent().change_language_from_combo(self.language_combo.currentIndex())
-
-        # Применяем тему
-        from src.utils.themes import apply_theme
-        from PySide6.QtWidgets import QApplication
-        app = QApplication.instance()
-        if app:
-            apply_theme(app, self.config["theme"])
-
         self.accept()
 
     def open_support_link(self):
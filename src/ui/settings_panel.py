@@ -2,6 +2,8 @@
 Панель настроек - Минималистичный дизайн
 """
 
+import os
+
 from PySide6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QComboBox,
     QPushButton, QLineEdit, QRadioButton, QCheckBox, QButtonGroup,
@@ -120,7 +122,7 @@ class SettingsPanel(QWidget):
         if parent and hasattr(parent, 't'):
             self.t = parent.t
         else:
-            config = AppConfig.load_config()
+            config = AppConfig.snapshot()
             current_lang = config.get('language') or 'en'
             self.t = TRANSLATIONS[current_lang]
 
@@ -546,6 +548,16 @@ class SettingsPanel(QWidget):
         )
         self.advanced_group.addWidget(self.clear_cache_button)
 
+        # Прогрев кэша превью для всего каталога (prewarm_service)
+        self._prewarm_worker = None
+        self.prewarm_button = QPushButton(self.t.get('prewarm_cache', 'Prewarm Model Cache'))
+        self.prewarm_button.setStyleSheet(self.styles['button_secondary'])
+        self.prewarm_button.setMinimumHeight(36)
+        self.prewarm_button.setMinimumWidth(0)
+        self.prewarm_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.prewarm_button.setToolTip(self.t.get('prewarm_cache_tooltip', ''))
+        self.advanced_group.addWidget(self.prewarm_button)
+
         # Добавляем accordion во второй контейнер
         advanced_container_layout.addWidget(self.advanced_group)
         
@@ -824,6 +836,8 @@ class SettingsPanel(QWidget):
             self.on_crit_hit_selected(self.parent.crit_hit_checkbox.isChecked())
         if hasattr(self, 'clear_cache_button'):
             self.clear_cache_button.clicked.connect(self._on_clear_cache_clicked)
+        if hasattr(self, 'prewarm_button'):
+            self.prewarm_button.clicked.connect(self._on_prewarm_clicked)
 
     def _refresh_material_maps_button(self) -> None:
         """Подсветка кнопки + счётчик, если карты заданы."""
@@ -1015,9 +1029,17 @@ class SettingsPanel(QWidget):
         
         # Получаем путь к TF2 и export folder из конфига
         from src.config.app_config import AppConfig
-        config = AppConfig.load_config()
+        from src.services import texture_variants
+        config = AppConfig.snapshot()
         tf2_path = config.get("tf2_game_folder", "")
         export_folder = config.get("export_folder", "export")
+        # Мипмапы — глобальная настройка конфига, а не пер-текстурная
+        options.setdefault('mfilter', config.mip_filter)
+        options.setdefault('srgb_mips', config.srgb_mips)
+        if config.animated_budget_mb:
+            options.setdefault('anim_budget_mb', config.animated_budget_mb)
+        options.setdefault('vram_budget_mb', config.vram_budget_mb)
+        options.setdefault('vram_texture_budget_mb', config.vram_texture_budget_mb)
         
         return {
             'size': size,
@@ -1029,7 +1051,8 @@ class SettingsPanel(QWidget):
             'tf2_game_folder': tf2_path,
             'export_folder': export_folder,
             'keep_temp_on_error': config.get('keep_temp_files', False),
-            'debug_mode': config.get('debug_mode', False)
+            'debug_mode': config.get('debug_mode', False),
+            'texture_variants': texture_variants.from_config(config.texture_variants, format_type),
         }
     
     def load_config(self):
@@ -1067,11 +1090,13 @@ class SettingsPanel(QWidget):
             self.parent.merge_vpk_files()
     
     def _on_clear_cache_clicked(self):
-        """Очищает кэш декомпилированных моделей с подтверждением"""
+        """Очищает кэш декомпилированных и скомпилированных моделей с подтверждением"""
+        from src.services import compile_cache, mesh_cache, preview_texture_cache
         from src.services.decompile_cache import clear_cache, get_cache_size_mb
         from PySide6.QtWidgets import QMessageBox
         
-        size_mb = get_cache_size_mb()
+        size_mb = (get_cache_size_mb() + compile_cache.get_cache_size_mb()
+                   + mesh_cache.get_cache_size_mb() + preview_texture_cache.get_cache_size_mb())
         size_str = f"{size_mb:.1f} MB" if size_mb >= 0.1 else "< 0.1 MB"
         
         msg = self.t.get(
@@ -1090,7 +1115,8 @@ class SettingsPanel(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            count = clear_cache()
+            count = (clear_cache() + compile_cache.clear_cache() + mesh_cache.clear_cache()
+                     + preview_texture_cache.clear_cache())
             ok_msg = self.t.get(
                 'clear_cache_done',
                 'Cache cleared. {count} entries removed.'
@@ -1101,6 +1127,70 @@ class SettingsPanel(QWidget):
                 ok_msg
             )
     
+    def _on_prewarm_clicked(self):
+        """Запускает прогрев кэша превью; повторное нажатие — остановка."""
+        from PySide6.QtWidgets import QMessageBox
+        from src.services import prewarm_service
+
+        title = self.t.get('prewarm_cache', 'Prewarm Model Cache')
+        if self._prewarm_worker is not None:
+            self._prewarm_worker.requestInterruption()
+            self.prewarm_button.setEnabled(False)
+            self.prewarm_button.setText(self.t.get('prewarm_stopping', 'Stopping prewarm...'))
+            return
+
+        tf2_root = self.get_settings().get('tf2_game_folder', '')
+        if not tf2_root or not os.path.isdir(tf2_root):
+            QMessageBox.warning(self, title, self.t.get(
+                'prewarm_no_tf2', 'Select the Team Fortress 2 folder first.'))
+            return
+
+        count = len(prewarm_service.catalog_targets())
+        reply = QMessageBox.question(
+            self, title,
+            self.t.get('prewarm_confirm', 'Prewarm the cache for {count} models?').format(count=count),
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        worker = prewarm_service.PrewarmWorker(tf2_root, parent=self)
+        worker.progress.connect(self._on_prewarm_progress)
+        worker.done.connect(self._on_prewarm_done)
+        worker.finished.connect(worker.deleteLater)
+        self._prewarm_worker = worker
+        self._on_prewarm_progress(0, count, '')
+        worker.start()
+
+    def shutdown_prewarm(self) -> None:
+        """Останавливает прогрев перед закрытием окна."""
+        if self._prewarm_worker is not None:
+            self._prewarm_worker.stop(2000)
+
+    def _on_prewarm_progress(self, done: int, total: int, _label: str) -> None:
+        if self._prewarm_worker is None or self._prewarm_worker.isInterruptionRequested():
+            return
+        self.prewarm_button.setText(self.t.get(
+            'prewarm_progress', 'Prewarming: {done}/{total} (click to stop)'
+        ).format(done=done, total=total))
+
+    def _on_prewarm_done(self, counts: dict) -> None:
+        from PySide6.QtWidgets import QMessageBox
+
+        self._prewarm_worker = None
+        self.prewarm_button.setEnabled(True)
+        self.prewarm_button.setText(self.t.get('prewarm_cache', 'Prewarm Model Cache'))
+        title = self.t.get('prewarm_cache', 'Prewarm Model Cache')
+        if 'error' in counts:
+            QMessageBox.warning(self, title, counts['error'])
+            return
+        QMessageBox.information(self, title, self.t.get(
+            'prewarm_done',
+            'Prewarm finished.\n\nWarmed: {ok}, failed: {failed}, '
+            'already done: {skipped}, remaining: {remaining}.'
+        ).format(**counts))
+
     def open_support_link(self):
         """Открывает ссылку поддержки"""
         if hasattr(self.parent, 'open_support_link'):
@@ -1175,6 +1265,9 @@ class SettingsPanel(QWidget):
         # Обновляем кнопку очистки кэша
         if hasattr(self, 'clear_cache_button'):
             self.clear_cache_button.setText(self.t.get('clear_decompile_cache', 'Clear Model Cache'))
+        if hasattr(self, 'prewarm_button') and self._prewarm_worker is None:
+            self.prewarm_button.setText(self.t.get('prewarm_cache', 'Prewarm Model Cache'))
+            self.prewarm_button.setToolTip(self.t.get('prewarm_cache_tooltip', ''))
         
         # Перезапускаем валидацию имени файла, если ошибка уже отображается
         if hasattr(self, 'filename_error') and self.filename_error.isVisible():
@@ -11,7 +11,7 @@ from __future__ import annotations
 from typing import Dict, List, Optional, Tuple
 
 from PySide6.QtCore import QPoint, Qt, QThread, Signal
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import (
     QCheckBox, QDialog, QFrame, QHBoxLayout,
     QLabel, QPushButton, QScrollArea, QSizePolicy, QVBoxLayout,
@@ -33,7 +33,7 @@ def _load_accent() -> str:
     """Возвращает цвет акцента текущей темы приложения."""
     try:
         from src.config.app_config import AppConfig
-        cfg = AppConfig.load_config()
+        cfg = AppConfig.snapshot()
         return "#4a90e2" if cfg.get("theme") == "blue" else "#ff6b35"
     except Exception:
         return "#ff6b35"
@@ -112,22 +112,12 @@ class _TextureLoader(QThread):
         except KeyError:
             return None
         try:
-            from src.services.vtflib_wrapper import VTFLib
-            import os, tempfile
-            with tempfile.NamedTemporaryFile(suffix=".vtf", delete=False) as f:
-                f.write(vtf_data)
-                tmp = f.name
-            try:
-                frames, w, h = VTFLib.read_vtf_all_frames(tmp)
-            finally:
-                try:
-                    os.unlink(tmp)
-                except OSError:
-                    pass
-            if not frames:
+            from src.services import preview_texture_cache
+            frame = preview_texture_cache.get_first_frame(vtf_data, vtf_name)
+            if not frame:
                 return None
-            img = QImage(frames[0], w, h, QImage.Format.Format_RGBA8888)
-            return QPixmap.fromImage(img)
+            pixmap = QPixmap(frame)
+            return None if pixmap.isNull() else pixmap
         except Exception as exc:
             logger.debug(f"[TextureLoader] Ошибка декодирования {vtf_name}: {exc}")
             return None
@@ -0,0 +1,35 @@
+"""
+Локальная заглушка внешнего инструмента (Crowbar/studiomdl/VTFCmd) для тестов.
+
+ToolRunnerService запускает .py-пути текущим интерпретатором, поэтому цепочку
+вызовов можно проверить на любой ОС. Поведение задаётся переменными окружения:
+
+  FAKE_TOOL_EXIT   — код возврата (по умолчанию 0)
+  FAKE_TOOL_SLEEP  — пауза перед выходом, секунды
+  FAKE_TOOL_STDOUT — текст для stdout (по умолчанию — аргументы)
+
+Если переданы «-p <mdl> -o <dir>» (как у Crowbar), в <dir> пишется <mdl>.qc.
+"""
+
+import os
+import sys
+import time
+
+
+def main(argv):
+    if "-p" in argv and "-o" in argv:
+        mdl = argv[argv.index("-p") + 1]
+        out_dir = argv[argv.index("-o") + 1]
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(mdl))[0]
+        with open(os.path.join(out_dir, f"{stem}.qc"), "w", encoding="utf-8") as f:
+            f.write(f'$modelname "fake/{stem}.mdl"\n')
+
+    time.sleep(float(os.environ.get("FAKE_TOOL_SLEEP", "0")))
+    sys.stdout.write(os.environ.get("FAKE_TOOL_STDOUT", " ".join(argv)))
+    sys.stderr.write("fake stderr")
+    return int(os.environ.get("FAKE_TOOL_EXIT", "0"))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,297 @@
+"""Тесты потоковой записи анимированных VTF."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+from src.services import animated_vtf, vtf_file
+from src.services.vtf_file import VTFImageFlags, VTFImageFormat
+
+
+class VTFFileTests(unittest.TestCase):
+    def test_header_roundtrip(self):
+        header = vtf_file.VTFHeader(64, 32, VTFImageFlags.CLAMPS, 3, VTFImageFormat.DXT5,
+                                    reflectivity=(0.25, 0.5, 0.75),
+                                    thumbnail_format=VTFImageFormat.DXT1, thumbnail_size=(16, 8))
+        data = header.pack()
+        self.assertEqual(len(data), vtf_file.HEADER_SIZE)
+        self.assertEqual(data[:4], b"VTF\0")
+        self.assertEqual(vtf_file.VTFHeader.unpack(data), header)
+
+    def test_sizes(self):
+        self.assertEqual(vtf_file.image_size(64, 64, VTFImageFormat.DXT1), 2048)
+        self.assertEqual(vtf_file.image_size(64, 64, VTFImageFormat.DXT5), 4096)
+        self.assertEqual(vtf_file.image_size(2, 2, VTFImageFormat.DXT5), 16)
+        self.assertEqual(vtf_file.image_size(4, 4, VTFImageFormat.BGR888), 48)
+        self.assertEqual(vtf_file.thumbnail_size(1024, 256), (16, 4))
+        self.assertEqual(vtf_file.thumbnail_size(8, 8), (8, 8))
+
+
+class MipChainTests(unittest.TestCase):
+    def setUp(self):
+        # Шахматка чёрное/белое: среднее в линейном пространстве ≈ 186 в sRGB
+        self.checker = Image.new("RGBA", (4, 4), (0, 0, 0, 255))
+        for x in range(4):
+            for y in range(4):
+                if (x + y) % 2:
+                    self.checker.putpixel((x, y), (255, 255, 255, 255))
+
+    def test_chain_sizes(self):
+        self.assertEqual(animated_vtf.mip_count(8, 2), 4)
+        self.assertEqual(animated_vtf.mip_count(1, 1), 1)
+        levels = animated_vtf.mip_chain(Image.new("RGBA", (8, 2)), 4)
+        self.assertEqual([lvl.size for lvl in levels], [(8, 2), (4, 1), (2, 1), (1, 1)])
+
+    def test_srgb_downsampling_keeps_brightness(self):
+        srgb = animated_vtf.mip_chain(self.checker, 3, Image.BOX, srgb=True)[-1].getpixel((0, 0))
+        naive = animated_vtf.mip_chain(self.checker, 3, Image.BOX, srgb=False)[-1].getpixel((0, 0))
+        self.assertAlmostEqual(srgb[0], 186, delta=2)
+        self.assertAlmostEqual(naive[0], 128, delta=1)
+        self.assertEqual(srgb[3], 255)
+
+    def test_filter_names(self):
+        self.assertEqual(animated_vtf.resample_filter("kaiser"), Image.LANCZOS)
+        self.assertEqual(animated_vtf.resample_filter("Triangle"), Image.BILINEAR)
+        self.assertEqual(animated_vtf.resample_filter("unknown"), Image.BOX)
+        self.assertEqual(animated_vtf.resample_filter(None), Image.BOX)
+
+
+class WriteAnimatedVTFTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.out = str(self.root / "anim.vtf")
+        self.lock = threading.Lock()
+        self.produced = 0
+        self.written = 0
+        self.max_in_flight = 0
+
+    def _compress(self, rgba, width, height, fmt):
+        with self.lock:
+            self.written += 1
+        return bytes(vtf_file.image_size(width, height, fmt))
+
+    def _frames(self, count, size=(8, 8)):
+        for i in range(count):
+            with self.lock:
+                self.produced += 1
+                self.max_in_flight = max(self.max_in_flight, self.produced - self.written)
+            yield Image.new("RGBA", size, (10 * i, 255 - i, 0, 255))
+
+    def test_frames_written_in_order(self):
+        count = animated_vtf.write_animated_vtf(
+            self.out, self._frames(5, (16, 16)), (8, 8), VTFImageFormat.RGBA8888,
+            VTFImageFlags.CLAMPS, self._compress, jobs=3)
+        self.assertEqual(count, 5)
+        header = vtf_file.read_header(self.out)
+        self.assertEqual((header.width, header.height, header.frames), (8, 8, 5))
+        self.assertEqual(header.flags, VTFImageFlags.CLAMPS | VTFImageFlags.EIGHTBITALPHA)
+        self.assertEqual(header.thumbnail_size, (8, 8))
+        self.assertGreater(header.reflectivity[1], header.reflectivity[2])
+
+        data = Path(self.out).read_bytes()
+        start = vtf_file.HEADER_SIZE + vtf_file.image_size(8, 8, VTFImageFormat.DXT1)
+        frame_size = 8 * 8 * 4
+        self.assertEqual(len(data), start + 5 * frame_size)
+        for i in range(5):
+            self.assertEqual(data[start + i * frame_size], 10 * i)
+
+    def test_memory_bounded_by_jobs(self):
+        count = animated_vtf.write_animated_vtf(
+            self.out, self._frames(40), (8, 8), VTFImageFormat.DXT5, 0, self._compress,
+            thumbnail=False, jobs=2)
+        self.assertEqual(count, 40)
+        self.assertLessEqual(self.max_in_flight, 2 * 2 + 1)
+        header = vtf_file.read_header(self.out)
+        self.assertEqual(header.thumbnail_format, VTFImageFormat.NONE)
+        self.assertEqual(os.path.getsize(self.out),
+                         vtf_file.HEADER_SIZE + 40 * vtf_file.image_size(8, 8, VTFImageFormat.DXT5))
+
+    def _exclusive_compressor(self):
+        """Компрессор, запоминающий число одновременных входов и все вызовы."""
+        active, peak, calls = [0], [0], []
+
+        def _exclusive(rgba, width, height, fmt):
+            with self.lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                calls.append((width, height, fmt))
+            time.sleep(0.002)
+            with self.lock:
+                active[0] -= 1
+            return bytes(vtf_file.image_size(width, height, fmt))
+        return _exclusive, peak, calls
+
+    def test_compressor_never_entered_concurrently(self):
+        compress, peak, _calls = self._exclusive_compressor()
+        count = animated_vtf.write_animated_vtf(
+            self.out, self._frames(12, (16, 16)), (8, 8), VTFImageFormat.DXT1, 0, compress,
+            thumbnail=False, jobs=4)
+        self.assertEqual(count, 12)
+        self.assertEqual(peak[0], 1)
+
+    def test_mips_and_thumbnail_compressed_one_at_a_time(self):
+        compress, peak, calls = self._exclusive_compressor()
+        count = animated_vtf.write_animated_vtf(
+            self.out, self._frames(6, (16, 16)), (8, 8), VTFImageFormat.DXT5, 0, compress,
+            jobs=4, mipmaps=True, frame_count=6)
+        self.assertEqual(count, 6)
+        self.assertEqual(peak[0], 1)
+        # 4 уровня на кадр + миниатюра DXT1
+        self.assertEqual(len(calls), 6 * 4 + 1)
+        self.assertIn((8, 8, vtf_file.THUMBNAIL_FORMAT), calls)
+
+    def test_no_frames_or_failure_leaves_no_file(self):
+        self.assertEqual(animated_vtf.write_animated_vtf(
+            self.out, iter(()), (8, 8), VTFImageFormat.DXT5, 0, self._compress), 0)
+
+        def _broken(rgba, width, height, fmt):
+            return b"short"
+
+        with self.assertRaises(RuntimeError):
+            animated_vtf.write_animated_vtf(self.out, self._frames(3), (8, 8),
+                                            VTFImageFormat.DXT5, 0, _broken, thumbnail=False)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_mipmapped_layout_smallest_level_first(self):
+        count = animated_vtf.write_animated_vtf(
+            self.out, self._frames(3), (8, 8), VTFImageFormat.RGBA8888, 0, self._compress,
+            thumbnail=False, mipmaps=True, frame_count=3)
+        self.assertEqual(count, 3)
+        header = vtf_file.read_header(self.out)
+        self.assertEqual(header.mipmap_count, 4)
+        data = Path(self.out).read_bytes()
+        level_sizes = [8 * 8 * 4, 4 * 4 * 4, 2 * 2 * 4, 1 * 1 * 4]
+        self.assertEqual(len(data), vtf_file.HEADER_SIZE + 3 * sum(level_sizes))
+        # Уровень 0 — в конце файла, кадры по порядку
+        start = len(data) - 3 * level_sizes[0]
+        for i in range(3):
+            self.assertEqual(data[start + i * level_sizes[0]], 10 * i)
+        # Уровень 1×1 — сразу после заголовка
+        self.assertEqual(data[vtf_file.HEADER_SIZE + 4:vtf_file.HEADER_SIZE + 8], bytes((10, 254, 0, 255)))
+
+    def test_mipmaps_require_exact_frame_count(self):
+        with self.assertRaises(ValueError):
+            animated_vtf.write_animated_vtf(self.out, self._frames(2), (8, 8),
+                                            VTFImageFormat.DXT5, 0, self._compress, mipmaps=True)
+        with self.assertRaises(RuntimeError):
+            animated_vtf.write_animated_vtf(self.out, self._frames(2), (8, 8), VTFImageFormat.DXT5,
+                                            0, self._compress, mipmaps=True, frame_count=3)
+        self.assertFalse(os.path.exists(self.out))
+
+    def test_iter_frames(self):
+        gif = str(self.root / "anim.gif")
+        first = Image.new("RGBA", (8, 8), (255, 0, 0, 255))
+        first.save(gif, save_all=True, duration=50, loop=0,
+                   append_images=[Image.new("RGBA", (8, 8), (0, 40 * i, 0, 255)) for i in range(1, 4)])
+        frames = list(animated_vtf.iter_frames(gif, max_frames=3))
+        self.assertEqual(len(frames), 3)
+        self.assertTrue(all(f.mode == "RGBA" for f in frames))
+
+
+class _FakeAnimation:
+    """Многокадровая картинка с повторами (Pillow склеивает их при сохранении GIF)."""
+
+    def __init__(self, colors, durations):
+        self.colors, self.durations, self.info = colors, durations, {}
+        self.index = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def seek(self, index):
+        if index >= len(self.colors):
+            raise EOFError
+        self.index = index
+        self.info = {"duration": self.durations[index]}
+
+    def convert(self, _mode):
+        return Image.new("RGBA", (4, 4), self.colors[self.index])
+
+
+class PlanAnimationTests(unittest.TestCase):
+    def _plan(self, colors, durations, **kwargs):
+        fake = _FakeAnimation(colors, durations)
+        with mock.patch.object(animated_vtf.Image, "open", return_value=fake):
+            return animated_vtf.plan_animation("anim.gif", **kwargs)
+
+    def test_identical_runs_collapse(self):
+        red, green = (255, 0, 0, 255), (0, 255, 0, 255)
+        plan = self._plan([red] * 5 + [green] * 5, [20] * 10)
+        self.assertEqual((plan.source_frames, plan.unique_frames), (10, 2))
+        self.assertEqual((plan.frames, plan.fps), ((0, 5), 10))
+
+    def test_single_unique_frame_is_static(self):
+        plan = self._plan([(1, 2, 3, 255)] * 4, [50] * 4)
+        self.assertEqual((plan.frames, plan.fps, plan.unique_frames), ((0,), None, 1))
+
+    def test_variable_delays_resampled_to_constant_rate(self):
+        colors = [(i * 40, 0, 0, 255) for i in range(3)]
+        plan = self._plan(colors, [100, 300, 0])
+        # Шаг — самая короткая задержка на сетке 10 мс (кадр без задержки — 1/30 с)
+        self.assertEqual(plan.fps, 33)
+        self.assertEqual(len(plan.frames), 14)
+        self.assertEqual(plan.frames.count(0), 3)
+        self.assertEqual(plan.frames.count(1), 10)
+        self.assertEqual(plan.frames[-1], 2)
+
+        even = self._plan(colors, [100, 300, 100])
+        self.assertEqual((even.fps, even.frames), (10, (0, 1, 1, 1, 2)))
+
+    def test_fast_animation_capped_by_fps_and_budget(self):
+        colors = [(i, 0, 0, 255) for i in range(120)]
+        plan = self._plan(colors, [10] * 120)
+        self.assertEqual(plan.fps, animated_vtf.MAX_FPS)
+        self.assertEqual(len(plan.frames), 72)
+        self.assertEqual(plan.frames[:3], (0, 2, 4))
+
+        budget = self._plan(colors, [10] * 120, frame_bytes=100, budget_bytes=2400)
+        self.assertLessEqual(len(budget.frames), 24)
+        self.assertEqual(budget.fps, 20)
+
+    def test_vtf_size(self):
+        self.assertEqual(vtf_file.vtf_size(4, 4, VTFImageFormat.DXT5, frames=2, mipmaps=True),
+                         vtf_file.HEADER_SIZE + 8 + 2 * 3 * 16)
+        self.assertEqual(vtf_file.vtf_size(8, 8, VTFImageFormat.RGBA8888, frames=1,
+                                           mipmaps=False, thumbnail=False),
+                         vtf_file.HEADER_SIZE + 256)
+
+    def test_repeated_frames_compressed_once(self):
+        gif = os.path.join(self._tmp_dir(), "anim.gif")
+        Image.new("RGBA", (8, 8), (255, 0, 0, 255)).save(
+            gif, save_all=True, duration=[300, 100], loop=0,
+            append_images=[Image.new("RGBA", (8, 8), (0, 255, 0, 255))])
+        plan = animated_vtf.plan_animation(gif)
+        self.assertEqual((plan.frames, plan.fps), ((0, 0, 0, 1), 10))
+        calls = []
+
+        def _compress(rgba, width, height, fmt):
+            calls.append((width, height))
+            return bytes(vtf_file.image_size(width, height, fmt))
+
+        out = os.path.join(self._tmp_dir(), "anim.vtf")
+        animated_vtf.write_animated_vtf(out, animated_vtf.iter_frames(gif, indices=plan.frames),
+                                        (8, 8), VTFImageFormat.DXT5, 0, _compress,
+                                        thumbnail=False, frame_count=len(plan.frames))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(vtf_file.read_header(out).frames, 4)
+
+    def _tmp_dir(self):
+        if not hasattr(self, "_tmp"):
+            self._tmp = tempfile.TemporaryDirectory()
+            self.addCleanup(self._tmp.cleanup)
+        return self._tmp.name
+
+
+if __name__ == "__main__":
+    unittest.main()
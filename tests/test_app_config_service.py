@@ -1,10 +1,14 @@
 import json
+import sys
 import tempfile
+import types
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from src.config.app_config import AppConfig
+import dataclasses
+
+from src.config.app_config import AppConfig, ConfigSnapshot
 
 
 class AppConfigServiceTests(unittest.TestCase):
@@ -115,5 +119,133 @@ class AppConfigServiceTests(unittest.TestCase):
             self.assertEqual(leftovers, [])
 
 
+def _setup_fake_pyside6():
+    qtcore = types.ModuleType("PySide6.QtCore")
+
+    class DummySignal:
+        def __init__(self, *args, **kwargs):
+            self.slots = []
+
+        def __get__(self, obj, objtype=None):
+            if obj is None:
+                return self
+            bound = obj.__dict__.get(id(self))
+            if bound is None:
+                bound = obj.__dict__[id(self)] = DummySignal()
+            return bound
+
+        def connect(self, slot):
+            self.slots.append(slot)
+
+        def emit(self, *args):
+            for slot in self.slots:
+                slot(*args)
+
+    class DummyObject:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    qtcore.QObject = DummyObject
+    qtcore.Signal = DummySignal
+    sys.modules["PySide6"] = types.ModuleType("PySide6")
+    sys.modules["PySide6.QtCore"] = qtcore
+
+
+class ConfigSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        AppConfig.invalidate_cache()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        config_dir = Path(self._tmp.name) / "config"
+        for attr, value in (("CONFIG_DIR", config_dir), ("CONFIG_FILE", config_dir / "app_config.json")):
+            patcher = patch.object(AppConfig, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(AppConfig.invalidate_cache)
+
+    def test_snapshot_is_shared_and_immutable(self):
+        AppConfig.save_config({"language": "ru", "material_blacklist": ["eye"], "theme": "blue"})
+        snap = AppConfig.snapshot()
+        self.assertIs(AppConfig.snapshot(), snap)
+        self.assertEqual(snap.language, "ru")
+        self.assertEqual(snap.material_blacklist, ("eye",))
+        self.assertEqual(snap.theme, "blue")
+        self.assertEqual(snap.export_folder, "export")          # из DEFAULT_CONFIG
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snap.language = "en"
+        with self.assertRaises(TypeError):
+            snap.values["language"] = "en"
+        # get()/load_config() по-прежнему отдают изменяемые копии
+        patterns = AppConfig.get("material_blacklist")
+        patterns.append("MUTATED")
+        self.assertEqual(AppConfig.snapshot().material_blacklist, ("eye",))
+
+    def test_save_replaces_snapshot_and_notifies(self):
+        AppConfig.save_config({"language": "ru"})
+        old = AppConfig.snapshot()
+        events = []
+        listener = lambda snap, keys: events.append((snap, keys))  # noqa: E731
+        AppConfig.add_listener(listener)
+        self.addCleanup(AppConfig.remove_listener, listener)
+
+        AppConfig.set("theme", "blue")
+        new = AppConfig.snapshot()
+        self.assertIsNot(new, old)
+        self.assertIsNone(old.get("theme"))                      # старый снимок не изменился
+        self.assertEqual(events, [(new, frozenset({"theme"}))])
+
+        AppConfig.set("theme", "blue")                           # без изменений — без оповещения
+        self.assertEqual(len(events), 1)
+
+    def test_qt_signals_follow_config(self):
+        _setup_fake_pyside6()
+        sys.modules.pop("src.config.config_signals", None)
+        from src.config.config_signals import ConfigSignals
+        AppConfig.snapshot()
+        signals = ConfigSignals()
+        self.addCleanup(signals.detach)
+        keys = []
+        signals.key_changed.connect(lambda key, value: keys.append((key, value)))
+        AppConfig.set("material_blacklist", ["a", "b"])
+        self.assertEqual(keys, [("material_blacklist", ("a", "b"))])
+
+    def test_from_dict_ignores_unknown_fields(self):
+        snap = ConfigSnapshot.from_dict({"language": "ru", "custom": {"x": [1]}})
+        self.assertEqual(snap.language, "ru")
+        self.assertEqual(snap.get("custom")["x"], (1,))
+        self.assertEqual(snap.to_dict()["custom"], {"x": [1]})
+
+    def test_snapshot_fields_match_default_config(self):
+        fields = {f.name for f in dataclasses.fields(ConfigSnapshot)} - {"values"}
+        self.assertEqual(fields, set(AppConfig.DEFAULT_CONFIG))
+        defaults = ConfigSnapshot()
+        snap = ConfigSnapshot.from_dict(AppConfig.DEFAULT_CONFIG)
+        for name in fields:
+            self.assertEqual(getattr(snap, name), getattr(defaults, name), name)
+
+    def test_from_dict_coerces_types(self):
+        with patch("src.config.app_config.logger") as log:
+            snap = ConfigSnapshot.from_dict({
+                "last_size": 1024,
+                "debug_mode": 1,
+                "vram_budget_mb": "128",
+                "srgb_mips": "no",
+                "material_blacklist": "decal*",
+                "window_geometry": None,
+                "language": "ru",
+            })
+        self.assertEqual(snap.last_size, "1024")
+        self.assertIs(snap.debug_mode, True)
+        self.assertEqual(snap.vram_budget_mb, 128.0)
+        # Неприводимое — значение по умолчанию, и в поле, и в get()
+        self.assertIs(snap.srgb_mips, True)
+        self.assertEqual(snap.material_blacklist, ())
+        self.assertEqual(snap.get("material_blacklist"), ())
+        self.assertEqual(snap.get("last_size"), "1024")
+        self.assertIsNone(snap.window_geometry)
+        self.assertEqual(snap.language, "ru")
+        self.assertEqual(log.warning.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
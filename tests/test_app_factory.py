@@ -135,7 +135,7 @@ class AppFactoryTests(unittest.TestCase):
         with patch.object(self.AppFactory, "get_icon_path", return_value=None):
             with patch.object(self.AppFactory, "setup_working_directory"):
                 with patch("src.utils.themes.apply_theme") as apply_theme:
-                    with patch.object(self.module.AppConfig, "load_config", return_value={"theme": "dark"}):
+                    with patch.object(self.module.AppConfig, "snapshot", return_value={"theme": "dark"}):
                         app = self.AppFactory.create_app(apply_theme=True)
         self.assertIsNotNone(app)
         apply_theme.assert_called()
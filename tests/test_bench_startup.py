@@ -0,0 +1,75 @@
+"""Тесты логики порогов бенчмарка старта (scripts/bench_startup.py)."""
+
+import argparse
+import importlib.util
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.config.app_config import AppConfig
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "bench_startup.py"
+_spec = importlib.util.spec_from_file_location("bench_startup", _SCRIPT)
+bench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench)
+
+
+class BenchStartupTests(unittest.TestCase):
+    def test_regression_needs_both_percent_and_slack(self):
+        thresholds = {"main_window_ms": (20.0, 20.0), "rss_mb": (10.0, 5.0)}
+        base = {"main_window_ms": 50.0, "rss_mb": 100.0}
+        # +40% но всего +20 мс — шум
+        self.assertEqual(bench.find_regressions({"main_window_ms": 70.0}, base, thresholds), [])
+        problems = bench.find_regressions({"main_window_ms": 80.0, "rss_mb": 111.0}, base, thresholds)
+        self.assertEqual(len(problems), 2)
+        self.assertTrue(problems[0].startswith("main_window_ms"))
+        # Без базы сравнивать не с чем
+        self.assertEqual(bench.find_regressions({"first_paint_ms": 900.0}, base, thresholds), [])
+
+    def test_baseline_is_median_of_recent_runs(self):
+        runs = [{"metrics": {"rss_mb": v}} for v in (500.0, 90.0, 100.0, 110.0)]
+        self.assertEqual(bench.baseline(runs, 3), {"rss_mb": 100.0})
+        self.assertEqual(bench.baseline(runs, 0), {})
+
+    def test_threshold_sources_override_in_order(self):
+        history = {"thresholds": {"rss_mb": [15.0, 7.0], "unknown": [1, 1]}}
+        name, value = bench.parse_threshold("rss_mb=30")
+        result = bench.effective_thresholds(history, {name: value})
+        self.assertEqual(result["rss_mb"], (30.0, 7.0))
+        self.assertNotIn("unknown", result)
+        self.assertEqual(result["main_window_ms"], bench.DEFAULT_THRESHOLDS["main_window_ms"])
+        self.assertEqual(bench.parse_threshold("first_paint_ms=5:1"), ("first_paint_ms", (5.0, 1.0)))
+        with self.assertRaises(argparse.ArgumentTypeError):
+            bench.parse_threshold("nope=5")
+
+    def test_history_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "history.json"
+            history = bench.load_history(path)
+            self.assertEqual(history, {"thresholds": {}, "runs": []})
+            history["runs"].append({"metrics": {"rss_mb": 1.0}})
+            bench.save_history(path, history)
+            self.assertEqual(bench.load_history(path)["runs"], [{"metrics": {"rss_mb": 1.0}}])
+
+    def test_window_measure_uses_config_copy(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            real = Path(tmp) / "real" / "app_config.json"
+            real.parent.mkdir()
+            real.write_text(json.dumps({"language": "ru"}), encoding="utf-8")
+            home = Path(tmp) / "home"
+            with patch.object(AppConfig, "CONFIG_DIR", real.parent), \
+                    patch.object(AppConfig, "CONFIG_FILE", real), \
+                    patch.object(Path, "home", return_value=home):
+                bench._isolate_config()
+                self.addCleanup(AppConfig.invalidate_cache)
+                self.assertEqual(AppConfig.CONFIG_FILE, home / "config" / "app_config.json")
+                self.assertEqual(AppConfig.get("language"), "ru")
+                AppConfig.set("temp_cleanup", {"freed": 1})
+            self.assertEqual(json.loads(real.read_text(encoding="utf-8")), {"language": "ru"})
+            self.assertIn("temp_cleanup", (home / "config" / "app_config.json").read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
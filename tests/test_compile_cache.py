@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.services import compile_cache as cc
+from src.services.model_build_service import ModelBuildService
+
+QC = '''$modelname "workshop_partner\\weapons\\c_models\\c_test\\c_test.mdl"
+$body "body" "c_test_reference.smd"
+$bodygroup "shell"
+{
+    studio "c_test_shell.smd"
+    blank
+}
+$sequence "idle" "c_test_anims\\idle.smd"
+'''
+
+
+class CompileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self._patch = patch.object(cc, "_CACHE_DIR", self.base / "cache")
+        self._patch.start()
+        self.src = self.base / "decompile"
+        (self.src / "c_test_anims").mkdir(parents=True)
+        self.qc = self.src / "c_test.qc"
+        self.qc.write_text(QC, encoding="utf-8")
+        (self.src / "c_test_reference.smd").write_text("ref", encoding="utf-8")
+        (self.src / "c_test_shell.smd").write_text("shell", encoding="utf-8")
+        (self.src / "c_test_anims" / "idle.smd").write_text("idle", encoding="utf-8")
+        self.studiomdl = self.base / "studiomdl.exe"
+        self.studiomdl.write_text("exe", encoding="utf-8")
+
+    def tearDown(self):
+        self._patch.stop()
+        self._tmp.cleanup()
+
+    def _key(self):
+        return cc.compute_key(str(self.qc), str(self.studiomdl), "c_test")
+
+    def test_key_depends_on_every_referenced_file(self):
+        key = self._key()
+        self.assertEqual(key, self._key())
+        for rel in ("c_test_reference.smd", "c_test_shell.smd", "c_test_anims/idle.smd", "c_test.qc"):
+            path = self.src / rel
+            original = path.read_bytes()
+            path.write_bytes(original + b" ")
+            self.assertNotEqual(key, self._key(), rel)
+            path.write_bytes(original)
+        self.assertEqual(key, self._key())
+
+    def test_save_and_restore_model_files(self):
+        compiled = self.base / "compiled"
+        compiled.mkdir()
+        for name in ("c_test.mdl", "c_test.vvd", "c_test.dx90.vtx", "c_test.log"):
+            (compiled / name).write_text(name, encoding="utf-8")
+        key = self._key()
+        self.assertTrue(cc.save(key, str(compiled), [p.name for p in compiled.iterdir()], model="c_test"))
+
+        out = self.base / "out"
+        restored = cc.restore(key, str(out))
+        self.assertEqual(sorted(restored), ["c_test.dx90.vtx", "c_test.mdl", "c_test.vvd"])
+        self.assertEqual((out / "c_test.mdl").read_text(encoding="utf-8"), "c_test.mdl")
+        self.assertIsNone(cc.restore("missing", str(out)))
+
+    def test_save_requires_mdl(self):
+        compiled = self.base / "compiled"
+        compiled.mkdir()
+        (compiled / "c_test.vvd").write_text("vvd", encoding="utf-8")
+        self.assertFalse(cc.save(self._key(), str(compiled), ["c_test.vvd"]))
+
+    def test_trim_keeps_newest_entries(self):
+        compiled = self.base / "compiled"
+        compiled.mkdir()
+        (compiled / "m.mdl").write_text("m", encoding="utf-8")
+        for i in range(3):
+            cc.save(f"k{i}", str(compiled), ["m.mdl"])
+        cc._trim(max_entries=2)
+        self.assertEqual(len([p for p in cc.get_cache_dir().iterdir() if p.is_dir()]), 2)
+        self.assertEqual(cc.clear_cache(), 2)
+
+    def test_second_compile_skips_studiomdl(self):
+        tf_dir = self.base / "tf"
+        model_dir = tf_dir / "models" / "workshop_partner" / "weapons" / "c_models" / "c_test"
+        model_dir.mkdir(parents=True)
+        (model_dir / "c_test.mdl").write_text("mdl", encoding="utf-8")
+        (model_dir / "c_test.vvd").write_text("vvd", encoding="utf-8")
+        ok = type("R", (), {"returncode": 0, "stdout": "", "stderr": ""})()
+        with patch("src.services.tool_runner.subprocess.run", return_value=ok) as run:
+            ModelBuildService.compile(str(self.qc), str(self.base / "out1"), str(self.studiomdl), str(tf_dir))
+            ModelBuildService.compile(str(self.qc), str(self.base / "out2"), str(self.studiomdl), str(tf_dir))
+        self.assertEqual(run.call_count, 1)
+        self.assertTrue((self.base / "out2" / "c_test.mdl").exists())
+        self.assertTrue((self.base / "out2" / "c_test.vvd").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -150,6 +150,25 @@ class DecompileCacheTests(unittest.TestCase):
         meta_path.write_text(json.dumps(meta), encoding="utf-8")
         self.assertIsNone(dc.get_cached_decompile("c_test", str(vpk), "models/c_test.mdl"))
 
+    def test_second_save_keeps_entry_being_read(self):
+        vpk = _make_vpk(self.base)
+        decomp = _make_decompile_dir(self.base)
+        saved = dc.save_to_cache("c_test", str(vpk), "models/c_test.mdl", str(decomp))
+        qc = Path(saved) / "weapon.qc"
+        inode = qc.stat().st_ino
+        # Параллельная запись того же ключа не трогает целую запись
+        self.assertEqual(dc.save_to_cache("c_test", str(vpk), "models/c_test.mdl", str(decomp)), saved)
+        self.assertEqual(qc.stat().st_ino, inode)
+        self.assertEqual([p.name for p in self.cache_dir.iterdir()], [Path(saved).name])
+
+    def test_save_replaces_broken_entry(self):
+        vpk = _make_vpk(self.base)
+        decomp = _make_decompile_dir(self.base)
+        saved = dc.save_to_cache("c_test", str(vpk), "models/c_test.mdl", str(decomp))
+        (Path(saved) / "weapon.qc").unlink()
+        dc.save_to_cache("c_test", str(vpk), "models/c_test.mdl", str(decomp))
+        self.assertEqual(dc.get_cached_decompile("c_test", str(vpk), "models/c_test.mdl"), saved)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,257 @@
+import importlib
+import sys
+import types
+import unittest
+from unittest.mock import MagicMock, patch
+
+
+def setup_fake_pyside6():
+    qtcore = types.ModuleType("PySide6.QtCore")
+    pyside = types.ModuleType("PySide6")
+
+    class DummySignal:
+        def __init__(self, *args, **kwargs):
+            self.calls = []
+            self.slots = []
+
+        def emit(self, *args, **kwargs):
+            self.calls.append((args, kwargs))
+
+        def connect(self, slot):
+            self.slots.append(slot)
+
+    class DummyThread:
+        class Priority:
+            LowestPriority = 0
+
+        def __init__(self, *args, **kwargs):
+            self._interrupted = False
+            self.started = False
+            self.finished = DummySignal()
+
+        def isInterruptionRequested(self):
+            return self._interrupted
+
+        def requestInterruption(self):
+            self._interrupted = True
+
+        def isRunning(self):
+            return False
+
+        def setPriority(self, _priority):
+            pass
+
+        def start(self):
+            self.started = True
+
+        def deleteLater(self):
+            pass
+
+    class DummyObject:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class DummyTimer:
+        def __init__(self, *args, **kwargs):
+            self.active = False
+            self.timeout = DummySignal()
+
+        def setSingleShot(self, _flag):
+            pass
+
+        def setInterval(self, _ms):
+            pass
+
+        def start(self):
+            self.active = True
+
+        def stop(self):
+            self.active = False
+
+    qtcore.QThread = DummyThread
+    qtcore.QObject = DummyObject
+    qtcore.QTimer = DummyTimer
+    qtcore.Signal = DummySignal
+    sys.modules["PySide6"] = pyside
+    sys.modules["PySide6.QtCore"] = qtcore
+
+
+P = "src.services.decompile_prefetch."
+
+
+class PrefetchModelTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.decompile_prefetch"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.decompile_prefetch")
+        self.Target = self.module.PrefetchTarget
+        self.Status = self.module.PrefetchStatus
+        patches = [
+            patch(P + "TF2Paths.check_crowbar", return_value=(True, None)),
+            patch(P + "TF2Paths.resolve", return_value=("studiomdl.exe", "misc.vpk", "tf")),
+            patch(P + "TF2Paths.get_crowbar_path", return_value="crowbar.exe"),
+            patch(P + "TF2VPKExtractService.check_mdl_exists", side_effect=lambda _v, p: p.endswith("b.mdl")),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _resolve(self, weapon_key="c_test"):
+        return patch(P + "resolve_target", return_value=(weapon_key, ["models/a.mdl", "models/b.mdl"]))
+
+    def test_special_modes_are_skipped(self):
+        for mode in ("critHIT", "spray", "custom", ""):
+            self.assertEqual(
+                self.module.prefetch_model(self.Target(mode), "tf2"), self.Status.SKIPPED
+            )
+
+    def test_cache_hit_skips_extract(self):
+        with self._resolve(), \
+                patch(P + "decompile_cache.get_cached_decompile", return_value="cache") as get_mock, \
+                patch(P + "TF2VPKExtractService.extract_file_set") as extract_mock:
+            status = self.module.prefetch_model(self.Target("scout_c_test"), "tf2")
+        self.assertEqual(status, self.Status.CACHED)
+        get_mock.assert_called_once_with("c_test", "misc.vpk", "models/b.mdl")
+        extract_mock.assert_not_called()
+
+    def test_miss_extracts_decompiles_and_saves_under_build_key(self):
+        with self._resolve(), \
+                patch(P + "decompile_cache.get_cached_decompile", return_value=None), \
+                patch(P + "TF2VPKExtractService.extract_file_set", return_value=["x/b.mdl"]), \
+                patch(P + "ModelBuildService.decompile") as decompile_mock, \
+                patch(P + "ModelBuildService.remove_lod_files") as lod_mock, \
+                patch(P + "decompile_cache.save_to_cache", return_value="entry") as save_mock:
+            status = self.module.prefetch_model(self.Target("scout_c_test"), "tf2")
+        self.assertEqual(status, self.Status.DONE)
+        decompile_mock.assert_called_once()
+        lod_mock.assert_called_once()
+        self.assertEqual(save_mock.call_args[0][:3], ("c_test", "misc.vpk", "models/b.mdl"))
+
+    def test_hat_placeholder_uses_found_stem(self):
+        with self._resolve("hat_%s"), \
+                patch(P + "decompile_cache.get_cached_decompile", return_value="cache") as get_mock:
+            self.module.prefetch_model(self.Target("hat", "models/hat_%s.mdl"), "tf2")
+        self.assertEqual(get_mock.call_args[0][0], "b")
+
+    def test_cancel_before_extract(self):
+        with self._resolve(), \
+                patch(P + "decompile_cache.get_cached_decompile", return_value=None), \
+                patch(P + "TF2VPKExtractService.extract_file_set") as extract_mock:
+            status = self.module.prefetch_model(
+                self.Target("scout_c_test"), "tf2", should_cancel=lambda: True
+            )
+        self.assertEqual(status, self.Status.CANCELLED)
+        extract_mock.assert_not_called()
+
+    def test_errors_are_not_raised(self):
+        with self._resolve(), \
+                patch(P + "decompile_cache.get_cached_decompile", side_effect=OSError("disk")):
+            status = self.module.prefetch_model(self.Target("scout_c_test"), "tf2")
+        self.assertEqual(status, self.Status.FAILED)
+
+
+class DecompilePrefetcherTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.decompile_prefetch"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.decompile_prefetch")
+
+    def test_new_selection_cancels_running_worker(self):
+        prefetcher = self.module.DecompilePrefetcher()
+        prefetcher.schedule([self.module.PrefetchTarget("scout_c_a")], "tf2")
+        prefetcher._start_pending()
+        first = prefetcher._worker
+        self.assertTrue(first.started)
+
+        prefetcher.schedule([self.module.PrefetchTarget("scout_c_b")], "tf2")
+        self.assertTrue(first.isInterruptionRequested())
+        self.assertIsNone(prefetcher._worker)
+        self.assertTrue(prefetcher._timer.active)
+
+        prefetcher._start_pending()
+        self.assertEqual(prefetcher._worker.targets[0].mode, "scout_c_b")
+
+    def test_non_model_selection_only_cancels(self):
+        prefetcher = self.module.DecompilePrefetcher()
+        prefetcher.schedule([self.module.PrefetchTarget("critHIT")], "tf2")
+        self.assertFalse(prefetcher._timer.active)
+
+    def test_worker_runs_targets_in_order_until_interrupted(self):
+        worker = self.module.DecompilePrefetchWorker(
+            [self.module.PrefetchTarget("scout_c_a"), self.module.PrefetchTarget("scout_c_b")], "tf2"
+        )
+        seen = []
+
+        def _fake_prefetch(target, _root, _cancel):
+            seen.append(target.mode)
+            worker.requestInterruption()
+            return self.module.PrefetchStatus.DONE
+
+        with patch(P + "prefetch_model", MagicMock(side_effect=_fake_prefetch)):
+            worker.run()
+        self.assertEqual(seen, ["scout_c_a"])
+        self.assertEqual(worker.prefetched.calls[0][0], ("scout_c_a", "done"))
+
+    def test_worker_join_finishes_current_target_only(self):
+        Target = self.module.PrefetchTarget
+        worker = self.module.DecompilePrefetchWorker([Target("scout_c_a"), Target("scout_c_b")], "tf2")
+        seen = []
+        joined = []
+
+        def _fake_prefetch(target, _root, _cancel):
+            seen.append(target.mode)
+            self.assertIsNone(worker.join_current(Target("scout_c_b")))
+            joined.append(worker.join_current(target))
+            self.assertFalse(joined[0].is_set())
+            return self.module.PrefetchStatus.DONE
+
+        with patch(P + "prefetch_model", MagicMock(side_effect=_fake_prefetch)):
+            worker.run()
+        self.assertEqual(seen, ["scout_c_a"])
+        self.assertTrue(joined[0].is_set())
+        self.assertFalse(worker.isInterruptionRequested())
+
+    def test_claim_for_build_joins_same_target_and_cancels_others(self):
+        Target = self.module.PrefetchTarget
+        prefetcher = self.module.DecompilePrefetcher()
+        prefetcher.schedule([Target("scout_c_a")], "tf2")
+        prefetcher._start_pending()
+        stale = prefetcher._worker
+        prefetcher.schedule([Target("scout_c_b")], "tf2")
+        prefetcher._start_pending()
+        current = prefetcher._worker
+        current._current = Target("scout_c_b")
+
+        done = prefetcher.claim_for_build(Target("scout_c_b"))
+        self.assertIs(done, current._current_done)
+        self.assertFalse(current.isInterruptionRequested())
+        self.assertTrue(stale.isInterruptionRequested())
+        self.assertIsNone(prefetcher._worker)
+
+        prefetcher.schedule([Target("scout_c_c")], "tf2")
+        prefetcher._start_pending()
+        other = prefetcher._worker
+        self.assertIsNone(prefetcher.claim_for_build(Target("scout_c_b")))
+        self.assertTrue(other.isInterruptionRequested())
+
+    def test_decompile_runs_in_background_lane_with_cancel(self):
+        cancel = MagicMock(return_value=False)
+        with patch(P + "resolve_target", return_value=("c_test", ["models/b.mdl"])), \
+                patch(P + "TF2Paths.check_crowbar", return_value=(True, None)), \
+                patch(P + "TF2Paths.resolve", return_value=("studiomdl.exe", "misc.vpk", "tf")), \
+                patch(P + "TF2Paths.get_crowbar_path", return_value="crowbar.exe"), \
+                patch(P + "TF2VPKExtractService.check_mdl_exists", return_value=True), \
+                patch(P + "decompile_cache.get_cached_decompile", return_value=None), \
+                patch(P + "TF2VPKExtractService.extract_file_set", return_value=["x/b.mdl"]), \
+                patch(P + "ModelBuildService.decompile", side_effect=RuntimeError("cancelled")) as dec:
+            cancel.side_effect = lambda: dec.called
+            status = self.module.prefetch_model(self.module.PrefetchTarget("scout_c_test"), "tf2", cancel)
+        self.assertEqual(status, self.module.PrefetchStatus.CANCELLED)
+        self.assertEqual(dec.call_args.kwargs["lane"], self.module.ToolLane.BACKGROUND)
+        self.assertIs(dec.call_args.kwargs["cancel"], cancel)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Тесты карт, выводимых из базовой текстуры."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from src.services import derived_maps, image_store
+
+
+class DerivedMapsTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.base = Path(self._tmp.name) / "base.png"
+        Image.frombytes("RGB", (32, 32), os.urandom(32 * 32 * 3)).save(self.base)
+
+    def test_masks_match_previous_pillow_pipeline(self):
+        gray = ImageOps.autocontrast(ImageOps.grayscale(Image.open(self.base).convert("RGB")))
+        mask = gray.point(lambda p: 255 if p >= 100 else 0)
+        maps = derived_maps.for_image(str(self.base), None)
+        self.assertEqual(maps.build("selfillum", 100).tobytes(), mask.tobytes())
+        self.assertEqual(maps.build("envmapmask").tobytes(), gray.tobytes())
+        self.assertEqual(maps.build("phong", 100).tobytes(),
+                         Image.merge("RGBA", (gray, gray, gray, mask)).tobytes())
+
+    def test_flat_image_gives_straight_normal(self):
+        maps = derived_maps.DerivedMaps(Image.new("RGB", (8, 8), (90, 90, 90)))
+        self.assertEqual(maps.normal().getpixel((4, 4)), (128, 128, 255))
+        rgba = maps.normal(alpha=Image.new("L", (4, 4), 77))
+        self.assertEqual(rgba.mode, "RGBA")
+        self.assertEqual(rgba.getpixel((4, 4))[3], 77)
+
+    def test_strength_tilts_normal_on_slopes(self):
+        ramp = Image.linear_gradient("L").resize((64, 64)).convert("RGB")
+        maps = derived_maps.DerivedMaps(ramp)
+        flat = maps.normal(0).getpixel((32, 32))
+        soft = maps.normal(1).getpixel((32, 32))
+        steep = maps.normal(5).getpixel((32, 32))
+        self.assertEqual(flat, (128, 128, 255))
+        self.assertNotEqual(soft[1], 128)
+        self.assertGreater(abs(steep[1] - 128), abs(soft[1] - 128))
+        self.assertLess(steep[2], soft[2])
+
+    def test_clamp_strength(self):
+        self.assertEqual(derived_maps.clamp_strength("2.5"), 2.5)
+        self.assertEqual(derived_maps.clamp_strength(""), derived_maps.DEFAULT_NORMAL_STRENGTH)
+        self.assertEqual(derived_maps.clamp_strength(None), derived_maps.DEFAULT_NORMAL_STRENGTH)
+        self.assertEqual(derived_maps.clamp_strength(-3), derived_maps.MIN_NORMAL_STRENGTH)
+        self.assertEqual(derived_maps.clamp_strength(1e9), derived_maps.MAX_NORMAL_STRENGTH)
+
+    def test_intermediates_shared_within_build(self):
+        with image_store.build_scope() as store:
+            a = derived_maps.for_image(str(self.base), (16, 16))
+            b = derived_maps.for_image(str(self.base), (16, 16))
+            self.assertIs(a, b)
+            self.assertIsNot(a, derived_maps.for_image(str(self.base), (8, 8)))
+            self.assertEqual(store.decodes, 1)
+        self.assertIsNot(derived_maps.for_image(str(self.base), (16, 16)),
+                         derived_maps.for_image(str(self.base), (16, 16)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Тесты общей механики дисковых кэшей."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.services import disk_lru
+
+_META = "_meta.json"
+
+
+class DiskLruTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cache = Path(self._tmp.name)
+
+    def _entry(self, name, size, used):
+        entry = self.cache / name
+        entry.mkdir()
+        (entry / "data").write_bytes(b"x" * size)
+        (entry / _META).write_text("{}", encoding="utf-8")
+        os.utime(entry / _META, (used, used))
+        return entry
+
+    def test_trim_by_bytes_and_entries_evicts_oldest(self):
+        old = self._entry("old", 100, 1_000_000)
+        mid = self._entry("mid", 100, 2_000_000)
+        new = self._entry("new", 100, 3_000_000)
+        # Папка без meta — не запись, её trim не трогает и не считает
+        (self.cache / "partial.tmp1").mkdir()
+        entry = disk_lru.entry_bytes(new)
+        self.assertEqual(disk_lru.trim(self.cache, _META, max_bytes=entry * 2), entry * 2)
+        self.assertFalse(old.exists())
+        self.assertEqual(disk_lru.trim(self.cache, _META, max_entries=1), entry)
+        self.assertFalse(mid.exists())
+        self.assertTrue(new.exists())
+        self.assertEqual(disk_lru.clear(self.cache), 2)
+        self.assertEqual(disk_lru.size_mb(self.cache), 0.0)
+
+    def test_trim_of_missing_dir_reports_unknown_size(self):
+        self.assertIsNone(disk_lru.trim(self.cache / "missing", _META, max_bytes=0))
+
+    def test_running_size_requests_trim_only_over_budget(self):
+        size = disk_lru.RunningSize()
+        self.assertTrue(size.needs_trim(10, 100))
+        size.reset(50)
+        self.assertFalse(size.needs_trim(30, 100))
+        self.assertEqual(size.bytes, 80)
+        self.assertTrue(size.needs_trim(30, 100))
+        size.reset()
+        self.assertTrue(size.needs_trim(0, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
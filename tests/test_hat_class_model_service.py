@@ -0,0 +1,114 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.services.hat_class_model_service import (
+    HatClassJob,
+    HatClassModelService,
+    HatClassResult,
+    build_class_model,
+)
+
+P = "src.services.hat_class_model_service."
+
+
+def _job(base: Path, mdl_rel: str, label: str) -> HatClassJob:
+    return HatClassJob(
+        mdl_rel=mdl_rel,
+        label=label,
+        cls_root=str(base / f"hatcls_{Path(mdl_rel).stem}"),
+        vpkroot_dir=str(base / "vpkroot"),
+        replace_model_smd_path=str(base / "user.smd"),
+        keep_user_materials=False,
+        tf2_misc_vpk=str(base / "missing_dir.vpk"),
+        studiomdl_exe="studiomdl.exe",
+        crowbar_exe="crowbar.exe",
+        tf_dir=str(base),
+    )
+
+
+class BuildClassModelTests(unittest.TestCase):
+    def test_success_reports_stages_in_order(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            job = _job(base, "models/player/items/heavy/hat_heavy.mdl", "heavy")
+            qc = base / "hat.qc"
+            qc.write_text("qc", encoding="utf-8")
+            stages = []
+            with patch(P + "get_cached_decompile", return_value="cache"), \
+                    patch(P + "restore_from_cache", return_value=str(qc)), \
+                    patch(P + "ModelBuildService.extract_main_body_smd", return_value="ref.smd"), \
+                    patch(P + "SMDService.replace_model_sections"), \
+                    patch(P + "ModelBuildService.extract_cdmaterials_path_from_qc", return_value="x"), \
+                    patch(P + "ModelBuildService.patch_qc_file"), \
+                    patch(P + "ModelBuildService.compile") as compile_mock, \
+                    patch(P + "ModelService.copy_compiled_models_to_vpkroot"):
+                results = HatClassModelService.run_jobs(
+                    [job], on_progress=lambda label, stage: stages.append((label, stage)),
+                )
+            self.assertTrue(results[0].ok)
+            compile_mock.assert_called_once()
+            self.assertEqual(
+                [s for _, s in stages], ["start", "replace", "compile", "done"],
+            )
+
+    def test_failure_is_returned_not_raised(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            job = _job(base, "models/player/items/spy/hat_spy.mdl", "spy")
+            with patch(P + "get_cached_decompile", return_value=None), \
+                    patch(P + "TF2VPKExtractService.extract_file_set", side_effect=RuntimeError("boom")):
+                result = build_class_model(job)
+            self.assertFalse(result.ok)
+            self.assertIn("boom", result.message)
+
+
+class RunJobsPoolTests(unittest.TestCase):
+    def test_failures_isolated_per_class_in_process_pool(self):
+        # Настоящий пул процессов: VPK нет, каждый класс падает сам по себе,
+        # результаты возвращаются в порядке задач.
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            jobs = [
+                _job(base, "models/player/items/scout/hat_scout.mdl", "scout"),
+                _job(base, "models/player/items/pyro/hat_pyro.mdl", "pyro"),
+            ]
+            stages = []
+            results = HatClassModelService.run_jobs(
+                jobs, on_progress=lambda label, stage: stages.append((label, stage)), max_workers=2,
+            )
+            self.assertEqual([r.label for r in results], ["scout", "pyro"])
+            self.assertTrue(all(not r.ok for r in results))
+            self.assertIn(("scout", "failed"), stages)
+            self.assertIn(("pyro", "failed"), stages)
+
+    def test_crashed_process_fails_in_flight_jobs_and_pool_is_recreated(self):
+        # Выполнись задача pyro в этом процессе — os._exit уронил бы сам тест
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            jobs = [_job(base, f"models/player/items/{c}/hat_{c}.mdl", c)
+                    for c in ("pyro", "scout", "heavy", "spy")]
+            results = HatClassModelService.run_jobs(jobs, max_workers=2, task_fn=_crash_on_pyro)
+        self.assertEqual([r.label for r in results], ["pyro", "scout", "heavy", "spy"])
+        # pyro упал, scout был в работе в том же пуле; новый пул доделал остальное
+        self.assertEqual([r.ok for r in results], [False, False, True, True])
+        self.assertEqual(results[0].message, results[1].message)
+
+    def test_default_workers_bounded_by_jobs(self):
+        self.assertEqual(HatClassModelService.default_workers(1), 1)
+        self.assertGreaterEqual(HatClassModelService.default_workers(64), 1)
+
+
+def _crash_on_pyro(job: HatClassJob) -> HatClassResult:
+    """Задача в дочернем процессе: pyro роняет процесс, как нативный сбой."""
+    if job.label == "pyro":
+        os._exit(3)
+    time.sleep(1.0)
+    return HatClassResult(job.mdl_rel, job.label, True)
+
+
+if __name__ == "__main__":
+    unittest.main()
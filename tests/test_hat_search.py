@@ -0,0 +1,66 @@
+"""Тесты поискового индекса вкладки шапок."""
+
+import unittest
+from unittest.mock import patch
+
+from src.data import hat_search
+from src.data.hat_search import HatSearchIndex
+from src.data.hats_parser import HatItem
+
+
+def _hat(defindex, name, classes, internal=""):
+    return HatItem(defindex, name, internal or name.lower().replace(" ", "_"),
+                   f"models/player/items/{defindex}.mdl", classes, "head")
+
+
+_ALL = ["scout", "soldier", "pyro", "demoman", "heavy", "engineer", "medic", "sniper", "spy"]
+
+HATS = [
+    _hat("1", "Bonk Helm", ["scout"]),
+    _hat("2", "Helm", ["soldier", "demoman"]),
+    _hat("3", "Team Captain", _ALL),
+    _hat("4", "Pyro's Beanie", ["pyro"], internal="pyro_hat"),
+    _hat("5", "Helmet of Doom", []),
+    _hat("6", "Old Guadalajara", ["scout", "spy"]),
+]
+
+
+class HatSearchIndexTests(unittest.TestCase):
+    def _old_search(self, query, cls):
+        words = query.lower().split()
+        matched = [h for h in HATS if h.matches(words, cls)]
+        if words:
+            matched.sort(key=lambda h: (h.relevance(words), h.name.lower()))
+        return matched
+
+    def test_same_results_as_hatitem_matches(self):
+        index = HatSearchIndex(HATS)
+        for cls in ("all", "scout", "soldier", "spy", "heavy"):
+            for query in ("", "helm", "HEL", "he", "o", "scout", "pyro hat", "team", "zzz", "helm of"):
+                with self.subTest(cls=cls, query=query):
+                    self.assertEqual(index.search(query, cls), self._old_search(query, cls))
+
+    def test_relevance_order(self):
+        index = HatSearchIndex(HATS)
+        self.assertEqual([h.name for h in index.search("helm")],
+                         ["Helm", "Helmet of Doom", "Bonk Helm"])
+
+    def test_extra_character_refines_previous_result(self):
+        index = HatSearchIndex(HATS)
+        index.search("hel", "all")
+        with patch.object(hat_search.HatSearchIndex, "_candidates") as candidates:
+            result = index.search("helm", "all")
+            candidates.assert_not_called()
+        self.assertEqual(len(result), 3)
+        # Стёртый символ или другой класс — полный поиск по индексу
+        with patch.object(hat_search.HatSearchIndex, "_candidates", return_value=[]) as candidates:
+            index.search("he", "all")
+            index.search("he", "scout")
+        self.assertEqual(candidates.call_count, 2)
+
+    def test_empty_index(self):
+        self.assertEqual(HatSearchIndex([]).search("helm", "scout"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
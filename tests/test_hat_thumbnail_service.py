@@ -0,0 +1,215 @@
+"""Тесты миниатюр шапок: заголовок MDL, цепочка VMT → VTF, дисковый кэш, очередь."""
+
+import importlib
+import struct
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+def setup_fake_pyside6():
+    qtcore = types.ModuleType("PySide6.QtCore")
+    pyside = types.ModuleType("PySide6")
+
+    class DummySignal:
+        def __init__(self, *args, **kwargs):
+            self.calls = []
+            self.slots = []
+
+        def emit(self, *args):
+            self.calls.append(args)
+            for slot in self.slots:
+                slot(*args)
+
+        def connect(self, slot):
+            self.slots.append(slot)
+
+    class DummyThread:
+        class Priority:
+            LowPriority = 0
+
+        def __init__(self, *args, **kwargs):
+            self._interrupted = False
+            self.started = False
+            self.finished = DummySignal()
+
+        def isInterruptionRequested(self):
+            return self._interrupted
+
+        def requestInterruption(self):
+            self._interrupted = True
+
+        def isRunning(self):
+            return self.started
+
+        def setPriority(self, _priority):
+            pass
+
+        def start(self):
+            self.started = True
+
+        def deleteLater(self):
+            pass
+
+    class DummyObject:
+        def __init__(self, *args, **kwargs):
+            pass
+
+    class DummyTimer:
+        def __init__(self, *args, **kwargs):
+            self.active = False
+            self.timeout = DummySignal()
+
+        def setSingleShot(self, _flag):
+            pass
+
+        def setInterval(self, _ms):
+            pass
+
+        def isActive(self):
+            return self.active
+
+        def start(self):
+            self.active = True
+
+        def stop(self):
+            self.active = False
+
+    qtcore.QThread = DummyThread
+    qtcore.QObject = DummyObject
+    qtcore.QTimer = DummyTimer
+    qtcore.Signal = DummySignal
+    sys.modules["PySide6"] = pyside
+    sys.modules["PySide6.QtCore"] = qtcore
+
+
+def _make_mdl(cdmaterials: str, texture: str) -> bytes:
+    """Минимальный studiohdr_t: одна текстура, одна папка $cdmaterials."""
+    data = bytearray(600)
+    data[:4] = b"IDST"
+    struct.pack_into("<4i", data, 204, 1, 300, 1, 400)
+    struct.pack_into("<i", data, 300, 200)          # sznameindex от начала mstudiotexture_t
+    struct.pack_into("<i", data, 400, 450)          # смещение строки $cdmaterials
+    data[450:450 + len(cdmaterials) + 1] = cdmaterials.encode() + b"\0"
+    data[500:500 + len(texture) + 1] = texture.encode() + b"\0"
+    return bytes(data)
+
+
+class _FakeEntry:
+    def __init__(self, data):
+        self._data = data
+
+    def read(self):
+        return self._data
+
+
+class _FakePak:
+    def __init__(self, files: dict):
+        self._files = files
+
+    def __getitem__(self, path):
+        if path in self._files:
+            return _FakeEntry(self._files[path])
+        raise KeyError(path)
+
+
+class HatThumbnailServiceTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.preview_3d_worker",
+                   "src.services.hat_thumbnail_service"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.hat_thumbnail_service")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(self.module, "_THUMB_DIR", Path(self._tmp.name) / "thumbs")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mdl = "models/player/items/scout/cap.mdl"
+        self.pak = _FakePak({
+            self.mdl: _make_mdl("models\\player\\items\\scout\\", "Cap_Red"),
+            "materials/models/player/items/scout/cap_red.vmt":
+                b'"VertexLitGeneric" { "$basetexture" "models/player/items/scout/cap_color" }',
+            "materials/models/player/items/scout/cap_color.vtf": b"VTF",
+        })
+
+    def test_mdl_texture_refs(self):
+        cdmaterials, names = self.module.mdl_texture_refs(self.pak[self.mdl].read())
+        self.assertEqual(cdmaterials, ["models/player/items/scout"])
+        self.assertEqual(names, ["cap_red"])
+        self.assertEqual(self.module.mdl_texture_refs(b"junk"), ([], []))
+
+    def test_render_follows_vmt_chain_and_caches_on_disk(self):
+        from PIL import Image
+
+        def _fake_decode(data, out_png, _tmp_dir=None):
+            self.assertEqual(data, b"VTF")
+            Image.new("RGBA", (256, 128), (255, 0, 0, 255)).save(out_png)
+            return out_png
+
+        self.assertIsNone(self.module.cached_thumbnail(self.mdl, self._tmp.name))
+        with patch("src.services.vtf_preview_service.vtf_bytes_to_png", side_effect=_fake_decode):
+            png = self.module.render_thumbnail(self.mdl, self._tmp.name, [self.pak])
+        self.assertTrue(png)
+        with Image.open(png) as img:
+            self.assertEqual(img.size, (self.module.THUMB_SIZE, self.module.THUMB_SIZE // 2))
+        self.assertEqual(self.module.cached_thumbnail(self.mdl, self._tmp.name), png)
+        # Временный полноразмерный PNG не остаётся в кэше
+        self.assertEqual(len(list((Path(self._tmp.name) / "thumbs").glob("*.full.png"))), 0)
+
+    def test_missing_texture_is_remembered(self):
+        missing = "models/player/items/scout/none.mdl"
+        self.assertEqual(self.module.render_thumbnail(missing, self._tmp.name, [self.pak]), "")
+        self.assertEqual(self.module.cached_thumbnail(missing, self._tmp.name), "")
+
+    def test_decode_error_is_not_cached(self):
+        with patch("src.services.vtf_preview_service.vtf_bytes_to_png", side_effect=OSError("no vtflib")):
+            self.assertEqual(self.module.render_thumbnail(self.mdl, self._tmp.name, [self.pak]), "")
+        self.assertIsNone(self.module.cached_thumbnail(self.mdl, self._tmp.name))
+
+
+class HatThumbnailLoaderTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.hat_thumbnail_service"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.hat_thumbnail_service")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        patcher = patch.object(self.module, "_THUMB_DIR", Path(self._tmp.name) / "thumbs")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_visible_batch_replaces_worker_queue(self):
+        loader = self.module.HatThumbnailLoader()
+        loader.set_tf2_root(self._tmp.name)
+        self.assertIsNone(loader.thumbnail("a.mdl"))
+        self.assertIsNone(loader.thumbnail("b.mdl"))
+        self.assertTrue(loader._timer.active)
+        loader._start_pending()
+        worker = loader._worker
+        self.assertEqual(worker._queue, ["a.mdl", "b.mdl"])
+
+        # Прокрутка: новая пачка видимых строк вытесняет старую очередь
+        loader.thumbnail("c.mdl")
+        loader._start_pending()
+        self.assertIs(loader._worker, worker)
+        self.assertEqual(worker._queue, ["c.mdl"])
+
+        loader._on_ready("c.mdl", "/thumbs/c.png")
+        self.assertEqual(loader.thumbnail("c.mdl"), "/thumbs/c.png")
+        self.assertEqual(loader.thumbnail_ready.calls[-1], ("c.mdl", "/thumbs/c.png"))
+
+    def test_worker_renders_queue_in_order(self):
+        worker = self.module.HatThumbnailWorker(self._tmp.name, ["a.mdl", "b.mdl"])
+        with patch("src.services.vtf_preview_service.open_vpks", return_value=[object()]), \
+                patch.object(self.module, "render_thumbnail", side_effect=lambda m, *_: m + ".png"):
+            worker.run()
+        self.assertEqual(worker.ready.calls, [("a.mdl", "a.mdl.png"), ("b.mdl", "b.mdl.png")])
+
+
+if __name__ == "__main__":
+    unittest.main()
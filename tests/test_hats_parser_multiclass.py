@@ -4,13 +4,26 @@ import unittest
 import tempfile
 from pathlib import Path
 
-from src.data import hats_parser
+from src.data import items_index
 from src.data.hats_parser import _extract_per_class_models, parse_hats
 
 
 _ITEMS_GAME = '''
 "items_game"
 {
+    "prefabs"
+    {
+        "prefab_hat"
+        {
+            "item_class" "tf_wearable"
+            "item_slot" "head"
+            "model_player" "models/player/items/engineer/PrefabHat.mdl"
+        }
+        "prefab_weapon"
+        {
+            "item_class" "tf_weapon_bat"
+        }
+    }
     "items"
     {
         "100"
@@ -61,6 +74,17 @@ _ITEMS_GAME = '''
                 "scout" "1"
             }
         }
+        "500"
+        {
+            "name" "prefab_only_hat"
+            "prefab" "prefab_hat"
+        }
+        "600"
+        {
+            "name" "prefab_weapon_with_model"
+            "prefab" "prefab_weapon"
+            "model_player" "models/player/items/scout/NotAHat.mdl"
+        }
         "400"
         {
             "name" "basename_template_hat"
@@ -106,12 +130,12 @@ class ParseHatsMulticlassTests(unittest.TestCase):
         items_dir.mkdir(parents=True)
         (items_dir / "items_game.txt").write_text(_ITEMS_GAME, encoding="utf-8")
         self.root = str(root)
-        # Изолируем кэш, чтобы не трогать реальный cache/.
-        self._cache_backup = hats_parser._CACHE_FILE
-        hats_parser._CACHE_FILE = root / "cache.json"
+        # Изолируем индекс, чтобы не трогать реальный cache/.
+        self._db_backup = items_index._DB_FILE
+        items_index._DB_FILE = root / "items_index.sqlite"
 
     def tearDown(self):
-        hats_parser._CACHE_FILE = self._cache_backup
+        items_index._DB_FILE = self._db_backup
         self._tmp.cleanup()
 
     def _by_name(self, items):
@@ -146,6 +170,14 @@ class ParseHatsMulticlassTests(unittest.TestCase):
         self.assertEqual(bn.per_class_models["spy"],
                          "models/player/items/all_class/basename_spy.mdl")
 
+    def test_fields_inherited_from_prefab(self):
+        by = self._by_name(parse_hats(self.root, language="en", force_reparse=True))
+        # Модель и слот только в префабе — шапка всё равно находится
+        self.assertEqual(by["prefab_only_hat"].mdl_path,
+                         "models/player/items/engineer/prefabhat.mdl")
+        # item_class из префаба — не косметика
+        self.assertNotIn("prefab_weapon_with_model", by)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+"""Тесты ресайза изображений по назначению."""
+
+import os
+import unittest
+from unittest import mock
+
+from PIL import Image, ImageChops
+
+from src.services import image_resize
+
+
+def _noise(size, mode="RGB"):
+    return Image.frombytes(mode, size, os.urandom(size[0] * size[1] * len(mode)))
+
+
+class ImageResizeTests(unittest.TestCase):
+    def test_small_factor_matches_plain_lanczos(self):
+        img = _noise((64, 32))
+        got = image_resize.resize(img, (40, 20))
+        self.assertEqual(got.tobytes(), img.resize((40, 20), Image.LANCZOS).tobytes())
+
+    def test_large_factor_reduces_first(self):
+        img = Image.new("RGB", (512, 512), (10, 200, 30))
+        with mock.patch.object(Image.Image, "reduce", autospec=True,
+                               side_effect=Image.Image.reduce) as reduce:
+            got = image_resize.resize(img, (32, 32))
+        reduce.assert_called_once_with(img, (5, 5))
+        self.assertEqual(got.size, (32, 32))
+        self.assertEqual(got.getpixel((16, 16)), (10, 200, 30))
+
+    def test_preview_uses_bilinear(self):
+        img = _noise((100, 100))
+        got = image_resize.resize(img, (50, 50), purpose=image_resize.PREVIEW)
+        self.assertEqual(got.tobytes(), img.reduce(2).tobytes())
+        odd = image_resize.resize(img, (30, 30), purpose=image_resize.PREVIEW)
+        self.assertEqual(odd.tobytes(), img.reduce(3).resize((30, 30), Image.BILINEAR).tobytes())
+
+    def test_tiled_resample_matches_whole_image(self):
+        img = _noise((700, 600))
+        with mock.patch.object(image_resize, "TILE_MIN_PIXELS", 1):
+            tiled = image_resize.resize(img, (300, 257), jobs=4)
+        whole = img.resize((300, 257), Image.LANCZOS)
+        self.assertEqual(tiled.size, whole.size)
+        self.assertLessEqual(max(hi for _lo, hi in ImageChops.difference(tiled, whole).getextrema()), 1)
+
+    def test_same_size_and_palette_images(self):
+        img = _noise((16, 16))
+        same = image_resize.resize(img, (16, 16))
+        self.assertIsNot(same, img)
+        self.assertEqual(same.tobytes(), img.tobytes())
+        pal = img.convert("P")
+        self.assertEqual(image_resize.resize(pal, (8, 8)).mode, "P")
+
+    def test_thumbnail_fits_box(self):
+        self.assertEqual(image_resize.fit_size((1024, 512), (64, 64)), (64, 32))
+        self.assertEqual(image_resize.fit_size((20, 10), (64, 64)), (20, 10))
+        self.assertEqual(image_resize.thumbnail(_noise((300, 100)), (64, 64)).size, (64, 21))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Тесты записи картинок по назначению (промежуточные PNG без сжатия)."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image, ImageChops
+
+from src.services import image_save, image_store
+
+
+class ImageSaveTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        self.img = Image.linear_gradient("L").resize((128, 128)).convert("RGBA")
+
+    def _sizes(self, ext, **params):
+        sizes = {}
+        for purpose in (image_save.HANDOFF, image_save.VIEWER, image_save.EXPORT):
+            path = self.dir / f"{purpose}{ext}"
+            image_save.save(self.img, path, purpose, **params)
+            with Image.open(path) as back:
+                self.assertIsNone(ImageChops.difference(back.convert("RGBA"), self.img).getbbox())
+            sizes[purpose] = path.stat().st_size
+        return sizes
+
+    def test_png_compression_by_purpose(self):
+        sizes = self._sizes(".png")
+        self.assertGreater(sizes[image_save.HANDOFF], 128 * 128 * 4)
+        self.assertLess(sizes[image_save.VIEWER], sizes[image_save.HANDOFF])
+        self.assertLessEqual(sizes[image_save.EXPORT], sizes[image_save.VIEWER])
+
+    def test_explicit_format_and_level(self):
+        path = self.dir / "out.bin"
+        image_save.save(self.img, path, image_save.HANDOFF, format="PNG")
+        self.assertGreater(path.stat().st_size, 128 * 128 * 4)
+        image_save.save(self.img, self.dir / "explicit.png", compress_level=9)
+        self.assertLess((self.dir / "explicit.png").stat().st_size, path.stat().st_size)
+
+    def test_other_formats_untouched(self):
+        sizes = self._sizes(".tga")
+        self.assertEqual(len(set(sizes.values())), 1)
+
+    def test_store_writes_handoff_png(self):
+        source = self.dir / "source.png"
+        self.img.save(source)
+        out = self.dir / "texture.png"
+        image_store.save_resized_png(str(source), "RGBA", (64, 64), str(out))
+        self.assertGreater(out.stat().st_size, 64 * 64 * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
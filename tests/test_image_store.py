@@ -0,0 +1,71 @@
+"""Тесты хранилища декодированных изображений сборки."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from src.services import image_store
+
+
+class ImageStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.base = self.root / "base.png"
+        Image.frombytes("RGBA", (64, 32), os.urandom(64 * 32 * 4)).save(self.base)
+
+    def test_results_match_direct_decode(self):
+        expected = Image.open(self.base).convert("RGB").resize((16, 16), Image.LANCZOS)
+        with image_store.build_scope():
+            got = image_store.load_resized(str(self.base), "RGB", (16, 16), Image.LANCZOS)
+        self.assertEqual(got.tobytes(), expected.tobytes())
+        outside = image_store.load_resized(str(self.base), "RGBA", (8, 8))
+        self.assertEqual(outside.tobytes(),
+                         Image.open(self.base).convert("RGBA").resize((8, 8)).tobytes())
+
+    def test_source_decoded_once_per_build(self):
+        with image_store.build_scope() as store:
+            a = image_store.load_resized(str(self.base), "RGB", (16, 16), Image.LANCZOS)
+            b = image_store.load_resized(str(self.base), "RGB", (16, 16), Image.LANCZOS)
+            image_store.load_resized(str(self.base), "RGBA", (32, 32))
+            with image_store.build_scope() as inner:
+                self.assertIs(inner, store)
+            self.assertIs(a, b)
+            self.assertEqual(store.decodes, 1)
+        self.assertIsNone(image_store.current())
+
+    def test_changed_file_is_decoded_again(self):
+        with image_store.build_scope() as store:
+            image_store.load_resized(str(self.base), "RGB", (16, 16))
+            Image.new("RGB", (64, 32), (255, 0, 0)).save(self.base)
+            os.utime(self.base, ns=(1, 1))
+            red = image_store.load_resized(str(self.base), "RGB", (16, 16))
+            self.assertEqual(red.getpixel((0, 0)), (255, 0, 0))
+            self.assertEqual(store.decodes, 2)
+
+    def test_same_png_is_copied_until_removed(self):
+        first, second, third = (str(self.root / f"{n}.png") for n in ("a", "b", "c"))
+        with image_store.build_scope() as store:
+            image_store.save_resized_png(str(self.base), "RGB", (16, 16), first)
+            image_store.save_resized_png(str(self.base), "RGB", (16, 16), second)
+            self.assertEqual(Path(first).read_bytes(), Path(second).read_bytes())
+            hits = store.hits
+            os.remove(first)
+            image_store.save_resized_png(str(self.base), "RGB", (16, 16), third)
+            self.assertEqual(store.hits, hits + 1)      # пиксели из кэша, PNG кодируется заново
+            self.assertEqual(Path(third).read_bytes(), Path(second).read_bytes())
+
+    def test_budget_evicts_least_recent(self):
+        store = image_store.ImageStore(budget_bytes=64 * 32 * 4 + 16 * 16 * 3)
+        store.resized(str(self.base), "RGB", (16, 16))
+        store.resized(str(self.base), "RGB", (8, 8))
+        self.assertLessEqual(store._bytes, store.budget_bytes)
+        self.assertEqual(len(store._images), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
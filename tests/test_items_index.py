@@ -0,0 +1,107 @@
+"""Тесты единого индекса items_game (SQLite)."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.data import items_index
+
+_ITEMS_GAME = '''
+"items_game"
+{
+    "prefabs"
+    {
+        "hat_base" { "item_class" "tf_wearable" "item_slot" "head" }
+    }
+    "items"
+    {
+        "10"
+        {
+            "name" "Cool Hat"
+            "prefab" "hat_base"
+            "item_name" "#TF_CoolHat"
+            "model_player" "models/player/items/scout/cool_hat.mdl"
+            "used_by_classes" { "scout" "1" }
+        }
+        "20"
+        {
+            "name" "The Bat"
+            "item_class" "tf_weapon_bat"
+            "item_slot" "melee"
+            "model_player" "models/weapons/c_models/c_bat.mdl"
+        }
+    }
+}
+'''
+
+
+class ItemsIndexTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        items_dir = root / "tf" / "scripts" / "items"
+        items_dir.mkdir(parents=True)
+        self.items_file = items_dir / "items_game.txt"
+        self.items_file.write_text(_ITEMS_GAME, encoding="utf-8")
+        res_dir = root / "tf" / "resource"
+        res_dir.mkdir(parents=True)
+        (res_dir / "tf_english.txt").write_text(
+            '"lang" { "Tokens" { "TF_CoolHat" "Cool Hat EN" } }', encoding="utf-16")
+        (res_dir / "tf_russian.txt").write_text(
+            '"lang" { "Tokens" { "TF_CoolHat" "Крутая шапка" } }', encoding="utf-16")
+        self.root = str(root)
+        self._db_backup = items_index._DB_FILE
+        items_index._DB_FILE = root / "items_index.sqlite"
+
+    def tearDown(self):
+        items_index._DB_FILE = self._db_backup
+        self._tmp.cleanup()
+
+    def test_one_parse_serves_hats_items_and_weapons(self):
+        with patch.object(items_index, "_build", wraps=items_index._build) as build:
+            hats = items_index.load_hats(self.root, "en")
+            self.assertEqual(items_index.weapon_model_path(self.root, "C_BAT"),
+                             "models/weapons/c_models/c_bat.mdl")
+            self.assertEqual(items_index.item_by_defindex(self.root, "20")["item_slot"], "melee")
+            self.assertEqual(items_index.items_by_name(self.root, "cool hat")[0]["defindex"], "10")
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual([h.name for h in hats], ["Cool Hat EN"])
+        self.assertEqual(hats[0].classes, ["scout"])
+
+    def test_names_are_per_language(self):
+        hat = items_index.hat_by_defindex(self.root, "10", language="ru")
+        self.assertEqual(hat.name, "Крутая шапка")
+        self.assertEqual(items_index.hat_by_defindex(self.root, "10", language="en").name,
+                         "Cool Hat EN")
+        self.assertIsNone(items_index.hat_by_defindex(self.root, "20"))
+
+    def test_game_update_rebuilds_index(self):
+        items_index.load_hats(self.root, "en")
+        self.items_file.write_text(
+            _ITEMS_GAME.replace("cool_hat.mdl", "cooler_hat.mdl"), encoding="utf-8")
+        st = self.items_file.stat()
+        os.utime(self.items_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        hats = items_index.load_hats(self.root, "en")
+        self.assertEqual(hats[0].mdl_path, "models/player/items/scout/cooler_hat.mdl")
+
+    def test_localization_update_refreshes_names(self):
+        self.assertEqual(items_index.hat_by_defindex(self.root, "10", language="ru").name,
+                         "Крутая шапка")
+        ru_file = Path(self.root) / "tf" / "resource" / "tf_russian.txt"
+        ru_file.write_text('"lang" { "Tokens" { "TF_CoolHat" "Новая шапка" } }', encoding="utf-16")
+        st = ru_file.stat()
+        os.utime(ru_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        with patch.object(items_index, "_build") as build:
+            self.assertEqual(items_index.hat_by_defindex(self.root, "10", language="ru").name,
+                             "Новая шапка")
+        build.assert_not_called()
+
+    def test_missing_items_game(self):
+        self.assertEqual(items_index.load_hats(str(Path(self.root) / "nope")), [])
+        self.assertIsNone(items_index.weapon_model_path(str(Path(self.root) / "nope"), "c_bat"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Тесты однопроходного парсера KeyValues и раскрытия префабов."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.data import items_index, weapon_model_index
+from src.data.keyvalues import KVNode, parse_keyvalues, resolve_prefabs
+
+
+class ParseKeyValuesTests(unittest.TestCase):
+    def test_nested_blocks_comments_and_conditionals(self):
+        root = parse_keyvalues('''
+            // комментарий
+            "Root"
+            {
+                "Name"   "value" [$WIN32]
+                unquoted  token
+                "block" { "inner" "1" }  // хвост
+                "dup" "first"
+                "dup" "second"
+            }
+        ''')
+        node = root.child("root")
+        self.assertIsInstance(node, KVNode)
+        self.assertEqual(node.get_str("NAME"), "value")
+        self.assertEqual(node.get_str("unquoted"), "token")
+        self.assertEqual(node.child("block").get_str("inner"), "1")
+        # Повторяющиеся ключи сохраняются, get() отдаёт первый
+        self.assertEqual(node.get_str("dup"), "first")
+        self.assertEqual([v for k, v in node if k == "dup"], ["first", "second"])
+        self.assertIsNone(node.get_str("block"))
+
+    def test_empty_values_bare_keys_and_unbalanced_braces(self):
+        root = parse_keyvalues('"a" { "k" "" bare { "x" "1" } b2 "v" } }')
+        node = root.child("a")
+        self.assertEqual(node.get_str("k"), "")
+        self.assertEqual(node.child("bare").get_str("x"), "1")
+        self.assertEqual(node.get_str("b2"), "v")
+
+    def test_iter_leaves_in_file_order(self):
+        root = parse_keyvalues('"a" { "x" "1" "b" { "y" "2" } "z" "3" }')
+        self.assertEqual(list(root.iter_leaves()), [("x", "1"), ("y", "2"), ("z", "3")])
+
+
+class ResolvePrefabsTests(unittest.TestCase):
+    def setUp(self):
+        self.root = parse_keyvalues('''
+            "prefabs"
+            {
+                "base"  { "item_class" "tf_wearable" "item_slot" "misc"
+                          "used_by_classes" { "scout" "1" } }
+                "hat"   { "prefab" "base" "item_slot" "head" }
+                "later" { "item_slot" "action" }
+                "loop"  { "prefab" "loop" "x" "1" }
+            }
+        ''')
+        self.prefabs = self.root.child("prefabs")
+
+    def test_nested_prefab_and_item_override(self):
+        item = parse_keyvalues('"i" { "prefab" "hat" "used_by_classes" { "spy" "1" } }').child("i")
+        resolved = resolve_prefabs(item, self.prefabs)
+        self.assertEqual(resolved.get_str("item_class"), "tf_wearable")
+        self.assertEqual(resolved.get_str("item_slot"), "head")
+        classes = resolved.child("used_by_classes")
+        self.assertEqual(classes.get_str("scout"), "1")
+        self.assertEqual(classes.get_str("spy"), "1")
+
+    def test_later_prefab_wins(self):
+        item = parse_keyvalues('"i" { "prefab" "hat later" }').child("i")
+        self.assertEqual(resolve_prefabs(item, self.prefabs).get_str("item_slot"), "action")
+
+    def test_cycle_and_missing_prefab_are_ignored(self):
+        item = parse_keyvalues('"i" { "prefab" "loop missing" }').child("i")
+        self.assertEqual(resolve_prefabs(item, self.prefabs).get_str("x"), "1")
+
+
+class WeaponModelIndexTests(unittest.TestCase):
+    def test_weapon_paths_from_items_and_prefabs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            items_dir = Path(tmp) / "tf" / "scripts" / "items"
+            items_dir.mkdir(parents=True)
+            (items_dir / "items_game.txt").write_text('''
+                "items_game"
+                {
+                    "prefabs" { "p" { "model_player" "models/weapons/c_models/c_bat.mdl" } }
+                    "items"
+                    {
+                        "1" { "model_player" "models\\workshop\\weapons\\c_items\\c_axe\\c_axe.mdl" }
+                        "2" { "model_player" "models/player/items/scout/hat.mdl" }
+                        "3" { "model_player_per_class" { "scout" "models/weapons/c_models/c_x.mdl" } }
+                    }
+                }
+            ''', encoding="utf-8")
+            backup = items_index._DB_FILE
+            items_index._DB_FILE = Path(tmp) / "items_index.sqlite"
+            weapon_model_index._MEM.clear()
+            try:
+                idx = weapon_model_index.weapon_model_index(tmp)
+            finally:
+                items_index._DB_FILE = backup
+                weapon_model_index._MEM.clear()
+        self.assertEqual(idx["c_bat"], "models/weapons/c_models/c_bat.mdl")
+        self.assertEqual(idx["c_axe"], "models/workshop/weapons/c_items/c_axe/c_axe.mdl")
+        self.assertNotIn("hat", idx)
+        # model_player_per_class — блок, а не путь: как и раньше, не индексируется
+        self.assertNotIn("c_x", idx)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""Тесты общего сервиса локализации TF2."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.data import localization
+
+_RU = '''"lang"
+{
+    "Language" "russian"
+    "Tokens"
+    {
+        "TF_CoolHat"            "Крутая шапка"
+        "[english]TF_CoolHat"   "Cool Hat"
+        "TF_Other"              "Другое"
+        "TF_Empty"              ""
+    }
+}
+'''
+
+
+class LocalizationTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.res = Path(self._tmp.name) / "tf" / "resource"
+        self.res.mkdir(parents=True)
+        self.ru_file = self.res / "tf_russian.txt"
+        self.ru_file.write_text(_RU, encoding="utf-16")
+        (self.res / "tf_english.txt").write_text(
+            '"lang" { "Tokens" { "TF_CoolHat" "Cool Hat" } }', encoding="utf-8")
+        self.root = self._tmp.name
+        localization.clear_cache()
+        self.addCleanup(localization.clear_cache)
+
+    def test_only_requested_tokens_case_insensitive(self):
+        names = localization.lookup_tokens(self.root, "ru", ["#tf_coolhat", "TF_EMPTY", "TF_Missing"])
+        self.assertEqual(names, {"tf_coolhat": "Крутая шапка", "tf_empty": ""})
+
+    def test_repeated_lookup_reads_file_once(self):
+        with patch.object(localization, "_scan", wraps=localization._scan) as scan:
+            localization.lookup_tokens(self.root, "ru", ["TF_CoolHat", "TF_Missing"])
+            localization.lookup_tokens(self.root, "ru", ["TF_CoolHat", "TF_Missing"])
+            self.assertEqual(scan.call_count, 1)
+            # Новый токен — проход только по нему
+            self.assertEqual(localization.lookup_tokens(self.root, "ru", ["TF_Other"]),
+                             {"tf_other": "Другое"})
+            self.assertEqual(scan.call_args[0][1], {"tf_other"})
+
+    def test_file_update_invalidates_cache(self):
+        localization.lookup_tokens(self.root, "ru", ["TF_CoolHat"])
+        old_signature = localization.signature(self.root, "ru")
+        self.ru_file.write_text(_RU.replace("Крутая шапка", "Новая шапка"), encoding="utf-16")
+        st = self.ru_file.stat()
+        os.utime(self.ru_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000_000))
+        self.assertNotEqual(localization.signature(self.root, "ru"), old_signature)
+        self.assertEqual(localization.lookup_tokens(self.root, "ru", ["TF_CoolHat"]),
+                         {"tf_coolhat": "Новая шапка"})
+
+    def test_english_fallback_and_utf8_file(self):
+        self.assertEqual(localization.localization_file(self.root, "de").name, "tf_english.txt")
+        self.assertEqual(localization.lookup_tokens(self.root, "en", ["TF_CoolHat"]),
+                         {"tf_coolhat": "Cool Hat"})
+        self.assertEqual(localization.lookup_tokens(str(Path(self.root) / "nope"), "en", ["x"]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,15 @@
 import unittest
 from unittest import mock
 
+from src.config.app_config import ConfigSnapshot
 from src.data import material_filter as mf
 
 
 def _with_user_patterns(patterns):
     """Контекст-менеджер: подменяет пользовательские паттерны блэклиста в конфиге."""
-    cfg = {"material_blacklist": patterns}
+    cfg = ConfigSnapshot.from_dict({"material_blacklist": patterns})
     return mock.patch(
-        "src.config.app_config.AppConfig.load_config",
+        "src.config.app_config.AppConfig.snapshot",
         staticmethod(lambda: cfg),
     )
 
@@ -68,8 +69,8 @@ class UserBlacklistTests(unittest.TestCase):
 
     def test_missing_config_key_safe(self):
         with mock.patch(
-            "src.config.app_config.AppConfig.load_config",
-            staticmethod(lambda: {}),
+            "src.config.app_config.AppConfig.snapshot",
+            staticmethod(lambda: ConfigSnapshot.from_dict({})),
         ):
             self.assertTrue(mf.is_editable_material("c_scattergun"))
             self.assertFalse(mf.is_editable_material("eyeball_l"))
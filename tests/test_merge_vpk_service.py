@@ -3,7 +3,9 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
-from src.services.merge_vpk_service import MergeVPKService
+import vpk
+
+from src.services.merge_vpk_service import ConflictPolicy, MergeVPKService
 from src.shared.exceptions import VPKCreationError
 
 
@@ -137,5 +139,83 @@ class MergeVpkServiceTests(unittest.TestCase):
                         MergeVPKService._create_vpk_from_directory(vpkroot, "out.vpk", export_folder=str(base))
 
 
+class StreamingMergeTests(unittest.TestCase):
+    """Потоковое слияние: настоящие VPK через библиотеку vpk, без vpk.exe."""
+
+    def _make_vpk(self, base: Path, name: str, files: dict) -> Path:
+        root = base / f"src_{name}"
+        for rel, data in files.items():
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        out = base / f"{name}.vpk"
+        vpk.new(str(root)).save(str(out))
+        return out
+
+    def _merge(self, base: Path, sources, policy):
+        export = base / "export"
+        ok, message = MergeVPKService.merge_vpk_files_streaming(
+            sources, "merged.vpk", export_folder=str(export), conflict_policy=policy,
+        )
+        self.assertTrue(ok, message)
+        return vpk.open(str(export / "merged.vpk"))
+
+    def _read_all(self, archive) -> dict:
+        result = {}
+        for path in archive:
+            entry = archive[path]
+            self.assertTrue(entry.verify(), path)
+            result[path] = entry.read()
+        return result
+
+    def test_merges_disjoint_archives(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            a = self._make_vpk(base, "a", {"models/a.mdl": b"mdl-a", "materials/a.vtf": b"x" * 5000})
+            b = self._make_vpk(base, "b", {"models/b.mdl": b"mdl-b", "root.txt": b"r"})
+            merged = self._read_all(self._merge(base, [a, b], ConflictPolicy.FIRST_WINS))
+            self.assertEqual(merged, {
+                "models/a.mdl": b"mdl-a",
+                "materials/a.vtf": b"x" * 5000,
+                "models/b.mdl": b"mdl-b",
+                "root.txt": b"r",
+            })
+            self.assertFalse(list((base / "export").glob("*.part")))
+
+    def test_conflict_policies(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            a = self._make_vpk(base, "a", {"models/same.mdl": b"first"})
+            b = self._make_vpk(base, "b", {"models/same.mdl": b"second"})
+
+            first = self._read_all(self._merge(base, [a, b], ConflictPolicy.FIRST_WINS))
+            self.assertEqual(first, {"models/same.mdl": b"first"})
+
+            last = self._read_all(self._merge(base, [a, b], ConflictPolicy.LAST_WINS))
+            self.assertEqual(last, {"models/same.mdl": b"second"})
+
+            renamed = self._read_all(self._merge(base, [a, b], ConflictPolicy.RENAME))
+            self.assertEqual(renamed, {"models/same.mdl": b"first", "models/same_1.mdl": b"second"})
+
+    def test_cancel_leaves_no_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            a = self._make_vpk(base, "a", {"models/a.mdl": b"a"})
+            export = base / "export"
+            ok, _msg = MergeVPKService.merge_vpk_files_streaming(
+                [a], "merged.vpk", export_folder=str(export), should_cancel=lambda: True,
+            )
+            self.assertFalse(ok)
+            self.assertEqual(list(export.iterdir()), [])
+
+    def test_merge_vpk_files_delegates_when_streaming(self):
+        with patch.object(MergeVPKService, "merge_vpk_files_streaming", return_value=(True, "ok")) as mock:
+            result = MergeVPKService.merge_vpk_files(
+                [Path("a.vpk")], "out.vpk", streaming=True, conflict_policy=ConflictPolicy.RENAME,
+            )
+        self.assertEqual(result, (True, "ok"))
+        self.assertEqual(mock.call_args.kwargs["conflict_policy"], ConflictPolicy.RENAME)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -53,6 +53,18 @@ class MergeVpkWorkerTests(unittest.TestCase):
         # стартовый (10%) и финальный (100%) прогресс
         self.assertGreaterEqual(worker.progress.emit.call_count, 2)
 
+    def test_uses_streaming_merge_with_policy(self):
+        worker = MergeVpkWorker(["a.vpk"], "out", "export", "en", conflict_policy="last_wins")
+        worker.finished.emit = Mock()
+        worker.progress.emit = Mock()
+        with patch(
+            "src.services.merge_vpk_worker.MergeVPKService.merge_vpk_files",
+            return_value=(True, "done"),
+        ) as merge:
+            worker.run()
+        self.assertTrue(merge.call_args.kwargs["streaming"])
+        self.assertEqual(merge.call_args.kwargs["conflict_policy"], "last_wins")
+
     def test_interruption_marks_cancelled(self):
         worker = self._make()
         worker._interrupted = True
@@ -4,10 +4,21 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+from src.services import compile_cache
 from src.services.model_build_service import ModelBuildService
 
 
 class ModelBuildServiceTests(unittest.TestCase):
+    def setUp(self):
+        # Кэш компиляции — во временную папку, чтобы тесты не видели друг друга
+        self._cache_tmp = tempfile.TemporaryDirectory()
+        self._cache_patch = patch.object(compile_cache, "_CACHE_DIR", Path(self._cache_tmp.name))
+        self._cache_patch.start()
+
+    def tearDown(self):
+        self._cache_patch.stop()
+        self._cache_tmp.cleanup()
+
     def test_decompile_missing_files(self):
         with tempfile.TemporaryDirectory() as tmp:
             base = Path(tmp)
@@ -29,7 +40,7 @@ class ModelBuildServiceTests(unittest.TestCase):
             def fake_run(*args, **kwargs):
                 (out_dir / "a.qc").write_text("$modelname \"weapons/a.mdl\"", encoding="utf-8")
                 return type("R", (), {"returncode": 0, "stdout": "", "stderr": ""})()
-            with patch("src.services.model_build_service.subprocess.run", side_effect=fake_run):
+            with patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
                 result = ModelBuildService.decompile(str(mdl), str(out_dir), str(crowbar))
             self.assertTrue(result.endswith(".qc"))
 
@@ -43,7 +54,7 @@ class ModelBuildServiceTests(unittest.TestCase):
             out_dir = base / "out"
             def fake_run(*args, **kwargs):
                 return type("R", (), {"returncode": 1, "stdout": "bad", "stderr": "err"})()
-            with patch("src.services.model_build_service.subprocess.run", side_effect=fake_run):
+            with patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
                 with self.assertRaises(RuntimeError):
                     ModelBuildService.decompile(str(mdl), str(out_dir), str(crowbar))
 
@@ -109,7 +120,7 @@ class ModelBuildServiceTests(unittest.TestCase):
             (model_dir / "c_test.vvd").write_text("vvd", encoding="utf-8")
             def fake_run(*args, **kwargs):
                 return type("R", (), {"returncode": 0, "stdout": "", "stderr": ""})()
-            with patch("src.services.model_build_service.subprocess.run", side_effect=fake_run):
+            with patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
                 ModelBuildService.compile(str(qc_path), str(out_dir), str(studiomdl), str(tf_dir))
             self.assertTrue((out_dir / "c_test.mdl").exists())
             self.assertTrue((out_dir / "c_test.vvd").exists())
@@ -117,9 +128,11 @@ class ModelBuildServiceTests(unittest.TestCase):
             for file_path in model_dir.iterdir():
                 file_path.unlink()
             (model_dir / "c_test.vvd").write_text("vvd", encoding="utf-8")
-            with patch("src.services.model_build_service.subprocess.run", side_effect=fake_run):
+            # Входы те же, что выше, — без use_cache=False результат пришёл бы из кэша
+            with patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
                 with self.assertRaises(RuntimeError):
-                    ModelBuildService.compile(str(qc_path), str(out_dir), str(studiomdl), str(tf_dir))
+                    ModelBuildService.compile(str(qc_path), str(out_dir), str(studiomdl), str(tf_dir),
+                                              use_cache=False)
 
     def test_patch_qc_file(self):
         content = "\n".join([
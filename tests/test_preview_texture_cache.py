@@ -0,0 +1,122 @@
+"""Тесты постоянного кэша декодированных текстур превью."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image
+
+from src.services import disk_lru
+from src.services import preview_texture_cache as ptc
+
+
+def _frames(count, width, height):
+    return [bytes([i * 40, 0, 0, 128]) * (width * height) for i in range(count)]
+
+
+class PreviewTextureCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.cache = Path(self._tmp.name) / "cache"
+        patcher = patch.object(ptc, "_CACHE_DIR", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        size = patch.object(ptc, "_size", disk_lru.RunningSize())
+        size.start()
+        self.addCleanup(size.stop)
+        self.decoded = []
+
+    def _decode(self, frames, width, height):
+        def decode(data):
+            self.decoded.append(data)
+            return frames, width, height
+        return patch.object(ptc, "decode_vtf", side_effect=decode)
+
+    def test_second_request_skips_decoding(self):
+        with self._decode(_frames(3, 8, 4), 8, 4):
+            first = ptc.get_frames(b"VTF-anim", "texture")
+            second = ptc.get_frames(b"VTF-anim", "texture_blu")
+        self.assertEqual(len(self.decoded), 1)
+        self.assertEqual(first, second)
+        self.assertEqual([Path(p).name for p in first], ["000.webp", "001.webp", "002.webp"])
+        with Image.open(first[1]) as img:
+            self.assertEqual(img.size, (8, 4))
+            self.assertEqual(img.mode, "RGBA")
+
+    def test_other_bytes_other_entry(self):
+        with self._decode(_frames(1, 4, 4), 4, 4):
+            red = ptc.get_first_frame(b"red")
+            blu = ptc.get_first_frame(b"blu")
+        self.assertNotEqual(Path(red).parent, Path(blu).parent)
+        self.assertEqual(len(self.decoded), 2)
+
+    def test_large_frames_downscaled(self):
+        with patch.object(ptc, "PREVIEW_MAX_SIZE", 16), self._decode(_frames(1, 64, 32), 64, 32):
+            (path,) = ptc.get_frames(b"big")
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (16, 8))
+
+    def test_missing_frame_invalidates_entry(self):
+        with self._decode(_frames(2, 4, 4), 4, 4):
+            paths = ptc.get_frames(b"anim")
+            Path(paths[1]).unlink()
+            self.assertEqual(ptc.get_frames(b"anim"), paths)
+        self.assertEqual(len(self.decoded), 2)
+
+    def test_failures_return_empty(self):
+        self.assertEqual(ptc.get_frames(None), [])
+        self.assertIsNone(ptc.get_first_frame(b""))
+        with patch.object(ptc, "decode_vtf", side_effect=RuntimeError("VTFLib")):
+            self.assertEqual(ptc.get_frames(b"broken"), [])
+        with self._decode([], 0, 0):
+            self.assertEqual(ptc.get_frames(b"empty"), [])
+        self.assertEqual(ptc.clear_cache(), 0)
+
+    def _fill(self, count):
+        """count записей по одному кадру 2×2, с возрастающим временем использования."""
+        with self._decode(_frames(1, 2, 2), 2, 2):
+            paths = [ptc.get_first_frame(f"tex{i}".encode()) for i in range(count)]
+        for i, path in enumerate(paths):
+            meta = Path(path).parent / ptc._META_FILENAME
+            os.utime(meta, (1_000_000 + i, 1_000_000 + i))
+        return [Path(p).parent for p in paths]
+
+    def test_trim_evicts_least_recently_used_over_budget(self):
+        entries = self._fill(4)
+        entry_bytes = disk_lru.entry_bytes(entries[0])
+        ptc._trim(max_bytes=entry_bytes * 2)
+        self.assertEqual(sorted(self.cache.iterdir()), sorted(entries[2:]))
+        self.assertEqual(ptc.clear_cache(), 2)
+
+    def test_store_trims_when_budget_reached(self):
+        entries = self._fill(2)
+        entry_bytes = disk_lru.entry_bytes(entries[0])
+        with patch.object(ptc, "_MAX_BYTES", entry_bytes * 2), self._decode(_frames(1, 2, 2), 2, 2):
+            newest = Path(ptc.get_first_frame(b"newest")).parent
+        self.assertEqual(sorted(self.cache.iterdir()), sorted([entries[1], newest]))
+
+    def test_prewarm_sized_fill_is_not_evicted(self):
+        # Полный прогрев: ~304 цели × (RED, BLU, пара материалов)
+        with patch.object(ptc, "_trim", wraps=ptc._trim) as trim:
+            entries = self._fill(304 * 4)
+        # Полный обход кэша — один раз, а не после каждой записи
+        self.assertEqual(trim.call_count, 1)
+        ptc._trim()
+        self.assertEqual(len(list(self.cache.iterdir())), len(entries))
+        # Реальный кадр 1024² в WebP — сотни КБ; весь прогрев в бюджете
+        self.assertLess(len(entries) * 400 * 1024, ptc._MAX_BYTES)
+
+    def test_concurrent_store_keeps_existing_entry(self):
+        with self._decode(_frames(1, 4, 4), 4, 4):
+            (path,) = ptc.get_frames(b"same")
+            inode = os.stat(path).st_ino
+            self.assertEqual(ptc.store(ptc.cache_key(b"same"), _frames(1, 4, 4), 4, 4), [path])
+        self.assertEqual(os.stat(path).st_ino, inode)
+        self.assertEqual(len(list(self.cache.iterdir())), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+"""Тесты прогрева кэшей превью и кэша SMD → OBJ."""
+
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+def setup_fake_pyside6():
+    qtcore = types.ModuleType("PySide6.QtCore")
+    pyside = types.ModuleType("PySide6")
+
+    class DummySignal:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def emit(self, *args):
+            pass
+
+        def connect(self, _slot):
+            pass
+
+    class DummyThread:
+        class Priority:
+            LowPriority = 0
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    qtcore.QThread = DummyThread
+    qtcore.Signal = DummySignal
+    sys.modules["PySide6"] = pyside
+    sys.modules["PySide6.QtCore"] = qtcore
+
+
+class CatalogTargetsTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.prewarm_service"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.prewarm_service")
+
+    def test_full_catalog_has_every_kind_without_duplicates(self):
+        targets = self.module.catalog_targets()
+        keys = [t.weapon_key for t in targets]
+        self.assertEqual(len(keys), len(set(keys)))
+        kinds = {t.label.split("/", 1)[0] for t in targets}
+        self.assertEqual(kinds, {"weapon", "body", "hands", "projectile", "pickup", "taunt"})
+        bat = next(t for t in targets if t.weapon_key == "c_bat")
+        self.assertEqual(bat.mode, "scout_c_bat")
+        body = next(t for t in targets if t.mode == "spy_body")
+        self.assertEqual(body.weapon_key, "models/player/spy.mdl")
+
+    def test_class_filter_limits_weapons_bodies_and_hands(self):
+        targets = self.module.catalog_targets(["Engineer"])
+        self.assertTrue(targets)
+        for t in targets:
+            self.assertTrue(t.mode.startswith("engineer_"), t)
+        self.assertIn("engineer_mech_hands", {t.mode for t in targets})
+
+
+class RunPrewarmTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.prewarm_service"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.prewarm_service")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.state = Path(self._tmp.name) / "prewarm_state.json"
+        self.targets = [self.module.PrewarmTarget(f"weapon/X/w{i}", f"w{i}", f"x_w{i}")
+                        for i in range(4)]
+        self.calls = []
+        self.fail = set()
+
+    def _worker(self, target, _root):
+        self.calls.append(target.label)
+        return self.module.PrewarmResult(target.label, target.label not in self.fail, "boom")
+
+    def _run(self, **kwargs):
+        return self.module.run_prewarm("/tf2", self.targets, jobs=1, state_path=self.state,
+                                       worker_fn=self._worker, in_process=True, **kwargs)
+
+    def test_interrupted_run_resumes_and_retries_failures(self):
+        self.fail = {"weapon/X/w1"}
+        seen = []
+
+        def _progress(done, total, result):
+            seen.append((done, total))
+
+        counts = self._run(on_progress=_progress, should_cancel=lambda: len(self.calls) >= 2)
+        self.assertEqual(counts, {"total": 4, "skipped": 0, "ok": 1, "failed": 1, "remaining": 2})
+        self.assertEqual(seen, [(1, 4), (2, 4)])
+        saved = json.loads(self.state.read_text(encoding="utf-8"))
+        self.assertEqual(saved["done"], {"weapon/X/w0": True, "weapon/X/w1": False})
+
+        self.calls.clear()
+        self.fail = set()
+        counts = self._run()
+        self.assertEqual(self.calls, ["weapon/X/w1", "weapon/X/w2", "weapon/X/w3"])
+        self.assertEqual(counts["skipped"], 1)
+        self.assertEqual(counts["ok"], 3)
+
+    def test_restart_and_new_install_ignore_checkpoint(self):
+        self._run()
+        self.calls.clear()
+        self._run()
+        self.assertEqual(self.calls, [])
+        self._run(restart=True)
+        self.assertEqual(len(self.calls), 4)
+
+        self.calls.clear()
+        with mock.patch.object(self.module, "tf2_signature", return_value="updated"):
+            self._run()
+        self.assertEqual(len(self.calls), 4)
+
+    def test_crashed_process_fails_target_and_pool_is_recreated(self):
+        # Выполнись w1 в этом процессе — os._exit уронил бы сам тест
+        counts = self.module.run_prewarm("/tf2", self.targets, jobs=1, state_path=self.state,
+                                         worker_fn=_crash_on_w1)
+        self.assertEqual(counts, {"total": 4, "skipped": 0, "ok": 3, "failed": 1, "remaining": 0})
+        saved = json.loads(self.state.read_text(encoding="utf-8"))["done"]
+        self.assertEqual(saved, {"weapon/X/w0": True, "weapon/X/w1": False,
+                                 "weapon/X/w2": True, "weapon/X/w3": True})
+
+
+def _crash_on_w1(target, _root):
+    """Цель прогрева в дочернем процессе; w1 роняет процесс, как нативный сбой."""
+    from src.services.prewarm_service import PrewarmResult
+    if target.weapon_key == "w1":
+        os._exit(3)
+    return PrewarmResult(target.label, True)
+
+
+class PrewarmOneTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.prewarm_service"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.prewarm_service")
+
+    def _fake_modules(self, error=""):
+        dirs = []
+
+        class FakeWorker:
+            def __init__(self, weapon_key, mode, misc_vpk, textures_vpk, preview_dir=None):
+                self.preview_dir = preview_dir
+                self.failed = mock.Mock()
+
+            def run(self):
+                dirs.append(self.preview_dir)
+                Path(self.preview_dir, "model.obj").write_text("o\n", encoding="utf-8")
+                if error:
+                    self.failed.connect.call_args[0][0](error)
+
+        worker_mod = types.ModuleType("src.services.preview_3d_worker")
+        worker_mod.Preview3DWorker = FakeWorker
+        prefetch_mod = types.ModuleType("src.services.decompile_prefetch")
+        prefetch_mod.PrefetchTarget = lambda mode: mode
+        prefetch_mod.prefetch_model = lambda target, root: None
+        paths_mod = types.ModuleType("src.services.tf2_paths")
+        paths_mod.TF2Paths = mock.Mock(**{"resolve.return_value": ("s", "misc.vpk", "tf"),
+                                          "resolve_textures_vpk.return_value": "tex.vpk"})
+        modules = {"src.services.preview_3d_worker": worker_mod,
+                   "src.services.decompile_prefetch": prefetch_mod,
+                   "src.services.tf2_paths": paths_mod}
+        return mock.patch.dict(sys.modules, modules), dirs
+
+    def test_preview_dir_is_owned_and_removed(self):
+        target = self.module.PrewarmTarget("weapon/c_bat", "c_bat", "scout_c_bat")
+        for error in ("", "not found"):
+            patcher, dirs = self._fake_modules(error)
+            with patcher:
+                result = self.module.prewarm_one(target, "/tf2")
+            self.assertEqual(result.ok, not error)
+            self.assertEqual(result.message, error)
+            self.assertEqual(len(dirs), 1)
+            self.assertTrue(os.path.basename(dirs[0]).startswith("tf2sg_3d_"))
+            self.assertFalse(os.path.exists(dirs[0]))
+
+
+class MeshCacheTests(unittest.TestCase):
+    def setUp(self):
+        sys.modules.pop("src.services.mesh_cache", None)
+        self.module = importlib.import_module("src.services.mesh_cache")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        patcher = mock.patch.object(self.module, "_CACHE_DIR", root / "cache")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.smd = root / "model.smd"
+        self.smd.write_text("version 1\n", encoding="utf-8")
+        self.conversions = 0
+
+    def _fake_convert(self, smd_path, obj_path, include_mats=None, extra_smd_paths=None,
+                      source_zup=True):
+        self.conversions += 1
+        Path(obj_path).write_text(f"o {self.conversions}\n", encoding="utf-8")
+        Path(obj_path).with_suffix(".mtl").write_text("newmtl a\n", encoding="utf-8")
+        return True, ["a"]
+
+    def _convert(self, out_dir: str, **kwargs):
+        os.makedirs(out_dir, exist_ok=True)
+        obj = os.path.join(out_dir, "model.obj")
+        with mock.patch.object(self.module.SmdToObjService, "convert", self._fake_convert):
+            return obj, self.module.convert_cached(str(self.smd), obj, **kwargs)
+
+    def test_second_conversion_comes_from_cache(self):
+        _obj, first = self._convert(os.path.join(self._tmp.name, "p1"))
+        obj, second = self._convert(os.path.join(self._tmp.name, "p2"))
+        self.assertEqual(first, second)
+        self.assertEqual(self.conversions, 1)
+        self.assertEqual(Path(obj).read_text(encoding="utf-8"), "o 1\n")
+        self.assertTrue(Path(obj).with_suffix(".mtl").exists())
+
+    def test_changed_smd_or_options_miss(self):
+        self._convert(os.path.join(self._tmp.name, "p1"))
+        self._convert(os.path.join(self._tmp.name, "p2"), source_zup=False)
+        self.assertEqual(self.conversions, 2)
+        self.smd.write_text("version 1\nnodes\n", encoding="utf-8")
+        self._convert(os.path.join(self._tmp.name, "p3"))
+        self.assertEqual(self.conversions, 3)
+        self.assertEqual(self.module.clear_cache(), 3)
+
+    def test_trim_evicts_least_recently_used(self):
+        cache = self.module.get_cache_dir()
+        self._convert(os.path.join(self._tmp.name, "p1"))
+        (old,) = cache.iterdir()
+        self._convert(os.path.join(self._tmp.name, "p2"), source_zup=False)
+        (recent,) = set(cache.iterdir()) - {old}
+        os.utime(old / self.module._META_FILENAME, (1_000_000, 1_000_000))
+        # Попадание в кэш освежает запись: теперь старее вторая
+        self._convert(os.path.join(self._tmp.name, "p3"))
+        self.assertEqual(self.conversions, 2)
+        os.utime(recent / self.module._META_FILENAME, (1_000_000, 1_000_000))
+        self.module._trim(max_bytes=self.module.disk_lru.entry_bytes(old))
+        self.assertEqual(list(cache.iterdir()), [old])
+
+    def test_store_rescans_cache_only_over_budget(self):
+        with mock.patch.object(self.module, "_trim", wraps=self.module._trim) as trim:
+            for i in range(4):
+                self._convert(os.path.join(self._tmp.name, f"p{i}"), include_mats={f"m{i}"})
+        self.assertEqual(self.conversions, 4)
+        # Полный обход — только первый (размер ещё неизвестен)
+        self.assertEqual(trim.call_count, 1)
+        entry = next(self.module.get_cache_dir().iterdir())
+        with mock.patch.object(self.module, "_MAX_BYTES", self.module.disk_lru.entry_bytes(entry) * 4):
+            self._convert(os.path.join(self._tmp.name, "p4"), include_mats={"m4"})
+        self.assertEqual(len(list(self.module.get_cache_dir().iterdir())), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
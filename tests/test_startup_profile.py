@@ -0,0 +1,140 @@
+"""Тесты профиля старта и отложенного 3D-виджета."""
+
+import builtins
+import importlib
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.shared.startup_profile import StartupProfiler
+
+
+class StartupProfilerTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        pkg = Path(self._tmp.name) / "sp_pkg"
+        pkg.mkdir()
+        (pkg / "__init__.py").write_text("from . import heavy\n")
+        (pkg / "heavy.py").write_text("import time\ntime.sleep(0.03)\nimport sp_pkg.light\n")
+        (pkg / "light.py").write_text("VALUE = 1\n")
+        sys.path.insert(0, self._tmp.name)
+        self.addCleanup(sys.path.remove, self._tmp.name)
+        self.addCleanup(lambda: [sys.modules.pop(m, None)
+                                 for m in ("sp_pkg", "sp_pkg.heavy", "sp_pkg.light")])
+
+    def test_import_tree_and_marks(self):
+        profiler = StartupProfiler(min_ms=0).install()
+        try:
+            exec("import json\nimport sp_pkg", {})   # json уже загружен — в дерево не попадает
+        finally:
+            profiler.uninstall()
+        profiler.mark("готово")
+
+        root = profiler._root
+        self.assertEqual([c.name for c in root.children], ["sp_pkg"])
+        heavy = root.children[0].children[0]
+        self.assertEqual(heavy.name, "sp_pkg.heavy")      # from . import heavy
+        self.assertEqual([c.name for c in heavy.children], ["sp_pkg.light"])
+        self.assertGreaterEqual(heavy.total, 0.03)
+        self.assertLessEqual(heavy.self_time, heavy.total)
+
+        text = profiler.report()
+        self.assertIn("готово", text)
+        self.assertIn("    sp_pkg.light", text)
+        self.assertNotEqual(builtins.__import__, profiler._import)
+
+    def test_min_ms_prunes_cheap_imports(self):
+        profiler = StartupProfiler(min_ms=10_000).install()
+        try:
+            exec("import sp_pkg", {})
+        finally:
+            profiler.uninstall()
+        self.assertNotIn("sp_pkg", profiler.format_report())
+
+
+def setup_fake_pyside6():
+    widgets = types.ModuleType("PySide6.QtWidgets")
+
+    class DummyLayout:
+        def __init__(self, parent=None):
+            self.widgets = []
+
+        def setContentsMargins(self, *args):
+            pass
+
+        def addWidget(self, widget):
+            self.widgets.append(widget)
+
+    class DummyWidget:
+        def __init__(self, parent=None):
+            self.parent = parent
+
+    widgets.QWidget = DummyWidget
+    widgets.QVBoxLayout = DummyLayout
+    sys.modules.setdefault("PySide6", types.ModuleType("PySide6"))
+    sys.modules["PySide6.QtWidgets"] = widgets
+
+
+class _FakeReal:
+    available = True
+
+    def __init__(self, parent=None):
+        self.calls = []
+        self.qt_widget = object()
+        self._bridge = "bridge"
+
+    def set_language(self, lang):
+        self.calls.append(("set_language", lang))
+
+    def show_loading(self, text=""):
+        self.calls.append(("show_loading", text))
+
+
+class Deferred3DWidgetTests(unittest.TestCase):
+    def setUp(self):
+        self._saved = {k: sys.modules.get(k) for k in ("PySide6", "PySide6.QtWidgets")}
+        setup_fake_pyside6()
+        self.addCleanup(self._restore)
+        sys.modules.pop("src.ui.preview_3d_widget", None)
+        self.module = importlib.import_module("src.ui.preview_3d_widget")
+        self.addCleanup(sys.modules.pop, "src.ui.preview_3d_widget", None)
+
+    def _restore(self):
+        for key, mod in self._saved.items():
+            if mod is None:
+                sys.modules.pop(key, None)
+            else:
+                sys.modules[key] = mod
+
+    def test_calls_are_replayed_after_materialize(self):
+        widget = self.module.Preview3DWidget.create(None, deferred=True)
+        ready = []
+        widget.on_ready(ready.append)
+        widget.set_language("ru")
+        widget.show_loading("...")
+        self.assertIsNone(widget._bridge)
+        self.assertFalse(widget.is_materialized())
+        with self.assertRaises(AttributeError):
+            widget.no_such_method
+
+        with patch.object(self.module.Preview3DWidget, "_create_now", side_effect=_FakeReal) as create:
+            real = widget.materialize()
+            self.assertIs(widget.materialize(), real)
+            self.assertEqual(create.call_count, 1)
+        self.assertEqual(real.calls, [("set_language", "ru"), ("show_loading", "...")])
+        self.assertEqual(ready, [real])
+        self.assertEqual(widget._bridge, "bridge")
+
+        # После создания — вызовы напрямую, on_ready — сразу
+        widget.set_language("en")
+        self.assertEqual(real.calls[-1], ("set_language", "en"))
+        widget.on_ready(ready.append)
+        self.assertEqual(ready, [real, real])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Тесты фоновой уборки временных папок."""
+
+import importlib
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+
+
+def setup_fake_pyside6():
+    qtcore = types.ModuleType("PySide6.QtCore")
+    pyside = types.ModuleType("PySide6")
+
+    class DummySignal:
+        def __init__(self, *args, **kwargs):
+            self.calls = []
+
+        def emit(self, *args):
+            self.calls.append(args)
+
+        def connect(self, _slot):
+            pass
+
+    class DummyThread:
+        class Priority:
+            IdlePriority = 0
+
+        def __init__(self, *args, **kwargs):
+            self._interrupted = False
+
+        def isInterruptionRequested(self):
+            return self._interrupted
+
+        def requestInterruption(self):
+            self._interrupted = True
+
+        def setPriority(self, _priority):
+            pass
+
+    qtcore.QThread = DummyThread
+    qtcore.Signal = DummySignal
+    sys.modules["PySide6"] = pyside
+    sys.modules["PySide6.QtCore"] = qtcore
+
+
+def _make_tree(root: Path, files: int = 3, size: int = 100) -> None:
+    (root / "sub").mkdir(parents=True)
+    for i in range(files):
+        (root / "sub" / f"f{i}.bin").write_bytes(b"x" * size)
+
+
+class TempJanitorTests(unittest.TestCase):
+    def setUp(self):
+        setup_fake_pyside6()
+        for _m in ("src.services.base_worker", "src.services.temp_janitor"):
+            sys.modules.pop(_m, None)
+        self.module = importlib.import_module("src.services.temp_janitor")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.build_temp = Path(self._tmp.name) / "tools" / "temp"
+        self.system_temp = Path(self._tmp.name) / "systmp"
+        self.build_temp.mkdir(parents=True)
+        self.system_temp.mkdir()
+        self.now = time.time()
+        self.old = self.now - self.module.SYSTEM_TEMP_MIN_AGE - 60
+
+    def _age(self, path: Path, mtime: float) -> None:
+        os.utime(path, (mtime, mtime))
+
+    def test_find_stale_respects_prefixes_and_age(self):
+        old_build = self.build_temp / "build_1"
+        _make_tree(old_build)
+        self._age(old_build, self.now - 10)
+        new_build = self.build_temp / "build_2"
+        new_build.mkdir()
+        self._age(new_build, self.now + 10)                  # создана уже после запуска
+        (self.build_temp / "keep_me").mkdir()
+        old_preview = self.system_temp / "tf2sg_3d_abc"
+        old_preview.mkdir()
+        self._age(old_preview, self.old)
+        fresh_preview = self.system_temp / "tf2sg_vpkmod_abc"
+        fresh_preview.mkdir()                                # может принадлежать другому экземпляру
+        (self.system_temp / "other_app").mkdir()
+        self._age(self.system_temp / "other_app", self.old)
+
+        found = self.module.find_stale(self.build_temp, self.system_temp, self.now)
+        self.assertEqual(sorted(p.name for p in found), ["build_1", "tf2sg_3d_abc"])
+
+    def test_worker_moves_to_trash_and_reports_freed_bytes(self):
+        build = self.build_temp / "build_old"
+        _make_tree(build, files=3, size=100)
+        self._age(build, self.now - 10)
+        custom = self.system_temp / "tf2sg_custom_x"
+        _make_tree(custom, files=1, size=50)
+        self._age(custom, self.old)
+        # Остаток прерванной прошлой уборки
+        leftover = self.build_temp / self.module.BUILD_TRASH / "build_prev.1234"
+        _make_tree(leftover, files=2, size=10)
+
+        worker = self.module.TempJanitorWorker(self.build_temp, self.system_temp, cutoff=self.now)
+        worker.run()
+
+        self.assertEqual(worker.cleaned.calls, [(370, 3)])
+        self.assertEqual(list(self.build_temp.iterdir()), [])
+        self.assertEqual(list(self.system_temp.iterdir()), [])
+
+    def test_interrupted_delete_stays_in_trash(self):
+        build = self.build_temp / "build_old"
+        _make_tree(build)
+        self._age(build, self.now - 10)
+        worker = self.module.TempJanitorWorker(self.build_temp, self.system_temp, cutoff=self.now)
+        worker.requestInterruption()
+        worker.run()
+
+        self.assertFalse(build.exists())                     # имя освобождено сразу
+        trash = self.build_temp / self.module.BUILD_TRASH
+        self.assertEqual(len(list(trash.iterdir())), 1)
+        self.assertEqual(worker.cleaned.calls, [(0, 0)])
+
+    def test_report_accumulates_and_formats(self):
+        first = self.module.merge_report(None, 2 * 1024 ** 3, 4, "2026-01-01T00:00:00")
+        second = self.module.merge_report(first, 512 * 1024 ** 2, 1, "2026-01-02T00:00:00")
+        self.assertEqual(second["total_bytes"], 2 * 1024 ** 3 + 512 * 1024 ** 2)
+        text = self.module.cleanup_report({}, second)
+        self.assertIn("512.0 MB", text)
+        self.assertIn("2.5 GB", text)
+        self.assertIn("nothing", self.module.cleanup_report({}, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
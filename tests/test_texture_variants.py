@@ -0,0 +1,146 @@
+"""Тесты вариантов текстур (несколько VPK за одну сборку)."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from src.services import image_store, texture_variants
+from src.services.texture_variants import TextureVariant
+
+
+def _fake_vtf(png_path, output_dir, format_type, flags, options):
+    """Кодировщик-заглушка: «VTF» — размер и формат текстом."""
+    png = Path(png_path)
+    with Image.open(png) as img:
+        size = img.size
+    texture_variants.record_vtf(png_path, output_dir, format_type, flags, options)
+    (Path(output_dir) / f"{png.stem}.vtf").write_text(f"{size[0]}x{size[1]} {format_type}")
+
+
+class VariantConfigTests(unittest.TestCase):
+    def test_from_config(self):
+        variants = texture_variants.from_config([
+            {"suffix": "lite", "size": 512, "format": "DXT1"},
+            {"suffix": "hq", "size": [2048, 1024]},
+            {"suffix": "lite", "size": 256},
+            {"suffix": "", "size": 128},
+            {"suffix": "bad", "size": "huge"},
+            "junk",
+        ], default_format="DXT5")
+        self.assertEqual(variants, [
+            TextureVariant("lite", (512, 512), "DXT1"),
+            TextureVariant("hq", (2048, 1024), "DXT5"),
+        ])
+
+    def test_settings_field_round_trip(self):
+        entries = texture_variants.parse_spec("lite:512, hq:2048x1024:dxt5; bad:huge, junk,")
+        self.assertEqual(entries, [
+            {"suffix": "lite", "size": 512},
+            {"suffix": "hq", "size": [2048, 1024], "format": "DXT5"},
+        ])
+        text = texture_variants.format_spec(entries)
+        self.assertEqual(text, "lite:512, hq:2048x1024:DXT5")
+        self.assertEqual(texture_variants.parse_spec(text), entries)
+        self.assertEqual(texture_variants.parse_spec(""), [])
+
+    def test_plan_puts_largest_first(self):
+        primary = TextureVariant("", (1024, 1024), "DXT1")
+        lite = TextureVariant("lite", (512, 512), "DXT1")
+        hq = TextureVariant("hq", (2048, 2048), "DXT5")
+        self.assertEqual(texture_variants.plan(primary, [lite, hq]), [hq, primary, lite])
+        self.assertEqual(texture_variants.plan(primary, []), [primary])
+
+    def test_names_and_sizes(self):
+        self.assertEqual(texture_variants.vpk_filename("mod.vpk", "lite"), "mod_lite.vpk")
+        self.assertEqual(texture_variants.vpk_filename("mod.vpk", ""), "mod.vpk")
+        self.assertEqual(texture_variants.scaled_size((256, 512), (2048, 2048), (512, 512)), (64, 128))
+        self.assertEqual(texture_variants.scaled_size((2, 2), (2048, 2048), (512, 512)), (1, 1))
+
+
+class RenderLogTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        tmp = Path(self._tmp.name)
+        self.root = tmp / "vpkroot"
+        self.mat = self.root / "materials" / "models" / "weapons"
+        self.mat.mkdir(parents=True)
+        self.source = tmp / "skin.png"
+        Image.new("RGB", (64, 64), (200, 30, 30)).save(self.source)
+        self.work = tmp / "work"
+        self.work.mkdir()
+
+    def _build(self):
+        """Как сборка: PNG из исходника, PNG-карта, копия VTF для BLU."""
+        png = self.work / "skin.png"
+        image_store.save_resized_png(str(self.source), "RGB", (32, 32), str(png))
+        texture_variants.record_png(str(png), str(self.source), "RGB")
+        _fake_vtf(str(png), str(self.mat), "DXT1", [], {})
+        png.unlink()
+
+        mask = self.work / "skin_mask.png"
+        Image.new("L", (16, 16), 128).save(mask)
+        _fake_vtf(str(mask), str(self.mat), "DXT5", [], {})
+        mask.unlink()
+
+        (self.mat / "skin_blue.vtf").write_bytes((self.mat / "skin.vtf").read_bytes())
+
+    def test_variant_rerenders_recorded_textures(self):
+        calls = []
+        with texture_variants.recording() as log:
+            self._build()
+            self.assertEqual(len(log.renders), 2)
+            count = log.render_variant(
+                self.root, TextureVariant("", (32, 32), "DXT1"), TextureVariant("lite", (16, 16), "BGR888"),
+                _fake_vtf, lambda *a: calls.append(a))
+            # Рендер варианта не записывается повторно
+            self.assertEqual(len(log.renders), 2)
+        self.assertEqual(count, 2)
+        self.assertFalse(log.directory.exists())
+        self.assertEqual((self.mat / "skin.vtf").read_text(), "16x16 BGR888")
+        self.assertEqual((self.mat / "skin_blue.vtf").read_text(), "16x16 BGR888")
+        # Формат не из сборки (DXT5 маски) сохраняется
+        self.assertEqual((self.mat / "skin_mask.vtf").read_text(), "8x8 DXT5")
+        self.assertEqual(calls, [])
+
+    def test_animated_variant_keeps_fps(self):
+        calls = []
+        out = self.mat / "anim.vtf"
+        with texture_variants.recording() as log:
+            out.write_text("anim")
+            texture_variants.record_animated(str(self.source), str(out), (64, 64), "DXT1", [],
+                                             {"anim_budget_mb": 4}, 12)
+            log.render_variant(self.root, TextureVariant("", (64, 64), "DXT1"),
+                               TextureVariant("lite", (32, 32), "DXT1"), _fake_vtf,
+                               lambda *a: calls.append(a))
+        (args,) = calls
+        self.assertEqual(args[2:4], ((32, 32), "DXT1"))
+        self.assertEqual(args[5], {"anim_max_fps": 12})
+
+    def test_not_recording_outside_scope(self):
+        self.assertIsNone(texture_variants.current())
+        texture_variants.record_animated("a.gif", "a.vtf", (4, 4), "DXT1", [], {}, None)
+        calls = []
+        wrapped = texture_variants.per_build(lambda **kw: calls.append(texture_variants.current()))
+        wrapped(variants=None)
+        wrapped(variants=[TextureVariant("lite", (8, 8), "DXT1")])
+        self.assertIsNone(calls[0])
+        self.assertIsInstance(calls[1], texture_variants.RenderLog)
+
+    def test_positional_variants_start_recording(self):
+        calls = []
+
+        def build(image_path, variants=None):
+            calls.append(texture_variants.current())
+
+        wrapped = texture_variants.per_build(build)
+        wrapped("a.png", [TextureVariant("lite", (8, 8), "DXT1")])
+        wrapped("a.png", [])
+        self.assertIsInstance(calls[0], texture_variants.RenderLog)
+        self.assertIsNone(calls[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
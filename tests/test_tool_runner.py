@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.services.model_build_service import ModelBuildService
+from src.services.tool_runner import ToolLane, ToolName, ToolRunnerService
+
+FAKE_TOOL = str(Path(__file__).parent / "fixtures" / "tools" / "fake_tool.py")
+
+
+class ToolRunnerServiceTests(unittest.TestCase):
+    def setUp(self):
+        ToolRunnerService.reset()
+
+    def tearDown(self):
+        ToolRunnerService.reset()
+
+    def test_success_captures_output_and_timing(self):
+        result = ToolRunnerService.run(ToolName.VTFCMD, [FAKE_TOOL, "-file", "a.png"])
+        self.assertTrue(result.ok)
+        self.assertIn("-file a.png", result.stdout)
+        self.assertEqual(result.stderr, "fake stderr")
+        self.assertGreater(result.duration, 0)
+        self.assertEqual(ToolRunnerService.timings(ToolName.VTFCMD), [result])
+        self.assertEqual(ToolRunnerService.stats()[ToolName.VTFCMD]["count"], 1)
+
+    def test_failure_keeps_output_from_single_run(self):
+        with patch.dict(os.environ, {"FAKE_TOOL_EXIT": "3", "FAKE_TOOL_STDOUT": "bad qc"}):
+            result = ToolRunnerService.run(ToolName.STUDIOMDL, [FAKE_TOOL])
+        self.assertFalse(result.ok)
+        self.assertEqual(result.returncode, 3)
+        self.assertEqual(result.stdout, "bad qc")
+        self.assertEqual(len(ToolRunnerService.timings()), 1)
+        self.assertEqual(ToolRunnerService.stats()[ToolName.STUDIOMDL]["failed"], 1)
+
+    def test_timeout_enforced(self):
+        with patch.dict(os.environ, {"FAKE_TOOL_SLEEP": "5"}):
+            result = ToolRunnerService.run(ToolName.CROWBAR, [FAKE_TOOL], timeout=0.5)
+        self.assertTrue(result.timed_out)
+        self.assertFalse(result.ok)
+
+    def test_default_timeout_from_tool_timeouts(self):
+        from src.shared.constants import ToolTimeouts
+        self.assertEqual(ToolRunnerService.get_timeout(ToolName.STUDIOMDL), ToolTimeouts.COMPILE)
+        self.assertEqual(ToolRunnerService.get_timeout(ToolName.VTFCMD), ToolTimeouts.VTF)
+
+    def test_concurrency_capped_per_tool(self):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def fake_run(*args, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return type("R", (), {"returncode": 0, "stdout": "", "stderr": ""})()
+
+        with patch("src.services.tool_runner._TOOL_CONCURRENCY", {ToolName.STUDIOMDL: 2}), \
+                patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
+            futures = [ToolRunnerService.submit(ToolName.STUDIOMDL, ["x.exe"]) for _ in range(6)]
+            for fut in futures:
+                self.assertTrue(fut.result().ok)
+        self.assertEqual(peak, 2)
+
+    def test_cancel_kills_running_tool(self):
+        started = time.perf_counter()
+        cancel = threading.Event()
+        threading.Timer(0.3, cancel.set).start()
+        with patch.dict(os.environ, {"FAKE_TOOL_SLEEP": "10"}):
+            result = ToolRunnerService.run(ToolName.CROWBAR, [FAKE_TOOL], cancel=cancel.is_set)
+        self.assertTrue(result.cancelled)
+        self.assertFalse(result.ok)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_cancel_callback_keeps_output_and_timeout(self):
+        result = ToolRunnerService.run(ToolName.VTFCMD, [FAKE_TOOL, "x"], cancel=lambda: False)
+        self.assertTrue(result.ok)
+        self.assertIn("x", result.stdout)
+        with patch.dict(os.environ, {"FAKE_TOOL_SLEEP": "5"}):
+            result = ToolRunnerService.run(ToolName.CROWBAR, [FAKE_TOOL], timeout=0.5,
+                                           cancel=lambda: False)
+        self.assertTrue(result.timed_out)
+        self.assertFalse(result.cancelled)
+
+    def test_background_lane_does_not_block_default_queue(self):
+        release = threading.Event()
+
+        def fake_run(*args, **kwargs):
+            return type("R", (), {"returncode": 0, "stdout": "", "stderr": ""})()
+
+        with patch("src.services.tool_runner._TOOL_CONCURRENCY", {ToolName.CROWBAR: 1}), \
+                patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
+            # Колбэк отмены держит слот фоновой полосы, пока не отпустим
+            background = ToolRunnerService.submit(
+                ToolName.CROWBAR, ["x.exe"], cancel=release.wait, lane=ToolLane.BACKGROUND)
+            # Единственный слот фоновой полосы занят — сборка всё равно проходит
+            self.assertTrue(ToolRunnerService.run(ToolName.CROWBAR, ["y.exe"]).ok)
+            self.assertFalse(background.done())
+            release.set()
+            self.assertTrue(background.result().cancelled)
+        self.assertEqual(ToolRunnerService.get_concurrency(ToolName.CROWBAR, ToolLane.BACKGROUND), 1)
+
+    def test_decompile_with_stand_in_crowbar(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            mdl = base / "c_test.mdl"
+            mdl.write_text("x", encoding="utf-8")
+            qc = ModelBuildService.decompile(str(mdl), str(base / "out"), FAKE_TOOL)
+            self.assertTrue(qc.endswith("c_test.qc"))
+            self.assertEqual(len(ToolRunnerService.timings(ToolName.CROWBAR)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
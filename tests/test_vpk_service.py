@@ -118,7 +118,7 @@ class VPKServiceTests(unittest.TestCase):
             png_path = base / "img.png"
             Image.new("RGBA", (8, 8), color=(255, 0, 0, 128)).save(png_path)
             with patch("src.services.texture_service.TextureService.get_vtf_tool", return_value=Path("vtf.exe")):
-                with patch("src.services.texture_service.subprocess.run") as run:
+                with patch("src.services.tool_runner.subprocess.run") as run:
                     run.return_value = type("R", (), {"returncode": 0, "stdout": "", "stderr": ""})()
                     VPKService._create_vtf(str(png_path), str(base), "DXT1", ["CLAMPS"], {"nomipmaps": True})
                     args = run.call_args[0][0]
@@ -134,7 +134,7 @@ class VPKServiceTests(unittest.TestCase):
             with patch("src.services.texture_service.TextureService.get_vtf_tool", return_value=Path("vtf.exe")):
                 def fake_run(*args, **kwargs):
                     return type("R", (), {"returncode": 1, "stdout": "bad", "stderr": "err"})()
-                with patch("src.services.texture_service.subprocess.run", side_effect=fake_run):
+                with patch("src.services.tool_runner.subprocess.run", side_effect=fake_run):
                     with self.assertRaises(VTFCreationError) as cm:
                         VPKService._create_vtf(str(png_path), str(base), "DXT1", [], {})
                     # Сообщение должно содержать вывод VTFCmd
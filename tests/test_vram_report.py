@@ -0,0 +1,110 @@
+"""Тесты отчёта о видеопамяти собранного мода."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.services import vram_report, vtf_file
+from src.services.build_context import BuildContext
+from src.services.vtf_file import VTFHeader, VTFImageFlags, VTFImageFormat
+
+_MB = 1024 * 1024
+
+
+def _write_vtf(path: Path, width: int, height: int, fmt: int, frames: int = 1,
+               mipmaps: bool = True, flags: int = 0) -> None:
+    mips = vtf_file.mip_count(width, height) if mipmaps else 1
+    header = VTFHeader(width, height, flags, frames, fmt, mips,
+                       thumbnail_format=vtf_file.THUMBNAIL_FORMAT,
+                       thumbnail_size=vtf_file.thumbnail_size(width, height))
+    size = vtf_file.vtf_size(width, height, fmt, frames, mipmaps)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(header.pack().ljust(size, b"\0"))
+
+
+class VRAMReportTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.ctx = BuildContext("b", "scout_c_scattergun", "c_scattergun", Path(self._tmp.name))
+        self.root = self.ctx.vpkroot_dir / "materials" / "models" / "weapons"
+
+    def test_sizes_from_headers(self):
+        _write_vtf(self.root / "dxt.vtf", 512, 256, VTFImageFormat.DXT1)
+        _write_vtf(self.root / "anim.vtf", 64, 64, VTFImageFormat.RGBA8888, frames=3, mipmaps=False)
+        report = vram_report.scan(self.ctx.vpkroot_dir)
+        by_name = {Path(t.path).name: t for t in report.textures}
+
+        dxt = by_name["dxt.vtf"]
+        self.assertEqual(dxt.path, "materials/models/weapons/dxt.vtf")
+        self.assertEqual((dxt.width, dxt.height, dxt.format_name), (512, 256, "DXT1"))
+        self.assertEqual(dxt.mipmaps, 10)
+        self.assertEqual(dxt.vram_bytes, sum(vtf_file.level_sizes(512, 256, VTFImageFormat.DXT1, 10)))
+        self.assertEqual(dxt.file_bytes, vtf_file.vtf_size(512, 256, VTFImageFormat.DXT1))
+
+        anim = by_name["anim.vtf"]
+        self.assertEqual((anim.frames, anim.mipmaps), (3, 1))
+        self.assertEqual(anim.vram_bytes, 3 * 64 * 64 * 4)
+        self.assertEqual(report.vram_bytes, dxt.vram_bytes + anim.vram_bytes)
+
+    def test_cubemap_counts_faces(self):
+        _write_vtf(self.root / "env.vtf", 32, 32, VTFImageFormat.DXT1, mipmaps=False,
+                   flags=VTFImageFlags.ENVMAP)
+        (info,) = vram_report.scan(self.ctx.vpkroot_dir).textures
+        self.assertEqual(info.vram_bytes, 6 * vtf_file.image_size(32, 32, VTFImageFormat.DXT1))
+
+    def test_suggestions(self):
+        _write_vtf(self.root / "big.vtf", 2048, 2048, VTFImageFormat.BGRA8888, frames=4)
+        _write_vtf(self.root / "flat.vtf", 256, 256, VTFImageFormat.BGR888)
+        infos = {Path(t.path).name: t for t in vram_report.scan(self.ctx.vpkroot_dir).textures}
+
+        big = vram_report.suggestions(infos["big.vtf"])
+        self.assertEqual({s.key for s in big}, {"dxt5", "halve", "frames"})
+        self.assertEqual([s.vram_bytes for s in big], sorted(s.vram_bytes for s in big))
+        dxt5 = next(s for s in big if s.key == "dxt5")
+        self.assertEqual(dxt5.vram_bytes, infos["big.vtf"].data_size(VTFImageFormat.DXT5))
+        self.assertLess(dxt5.vram_bytes, infos["big.vtf"].vram_bytes // 3)
+
+        (flat,) = vram_report.suggestions(infos["flat.vtf"])
+        self.assertEqual(flat.key, "dxt1")
+
+    def test_budget_warnings_and_report_file(self):
+        _write_vtf(self.root / "huge.vtf", 4096, 4096, VTFImageFormat.RGBA8888)
+        _write_vtf(self.root / "ok.vtf", 256, 256, VTFImageFormat.DXT5)
+        report = vram_report.report_build(
+            self.ctx, {"vram_budget_mb": 64, "vram_texture_budget_mb": 16}, "en")
+
+        self.assertEqual([Path(t.path).name for t in report.over_texture_budget()], ["huge.vtf"])
+        self.assertTrue(report.over_mod_budget())
+        self.assertEqual(len(self.ctx.warnings), 2)
+        self.assertIn("huge.vtf", self.ctx.warnings[0])
+        self.assertIn("switch to DXT5", self.ctx.warnings[0])
+
+        # Таблица — рядом с VPK (temp сборки удаляется), сводка — в итоговое сообщение
+        export = Path(self._tmp.name) / "export"
+        export.mkdir()
+        path = vram_report.publish(self.ctx, report, str(export / "my_mod.vpk"), "en")
+        self.assertEqual(path, export / "my_mod_vram.txt")
+        text = path.read_text(encoding="utf-8")
+        self.assertLess(text.index("huge.vtf"), text.index("ok.vtf"))
+        self.assertIn("RGBA8888", text)
+        (note,) = self.ctx.notes
+        self.assertTrue(note.startswith("my_mod.vpk: Textures: 2"))
+        self.assertIn(str(path), note)
+
+    def test_zero_budgets_disable_warnings(self):
+        _write_vtf(self.root / "huge.vtf", 4096, 4096, VTFImageFormat.RGBA8888)
+        report = vram_report.report_build(
+            self.ctx, {"vram_budget_mb": 0, "vram_texture_budget_mb": 0}, "ru")
+        self.assertGreater(report.vram_bytes, 64 * _MB)
+        self.assertEqual(self.ctx.warnings, [])
+        self.assertIn("видеопамять", report.summary("ru"))
+
+    def test_unreadable_files_skipped(self):
+        self.root.mkdir(parents=True)
+        (self.root / "broken.vtf").write_bytes(b"nope")
+        self.assertEqual(vram_report.scan(self.ctx.vpkroot_dir).textures, [])
+
+
+if __name__ == "__main__":
+    unittest.main()